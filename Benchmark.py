@@ -0,0 +1,763 @@
+#!/usr/bin/env python3
+
+# Benchmark the parse / check / write pipeline of FritzingCheckPart.py. The
+# corpus (directories of parts as given to FritzingCheckPart.py as src_dir,
+# or parts generated with GeneratePart.py) is checked in dir to dir mode in
+# to a new temporary dst_dir --repeat times with the stage functions
+# (PP.ParseFile, ProcessFzp, ProcessSvg, ProcessSvgsFromFzp, PP.Indent,
+# PP.PrettyPrintElements and PP.OutputTree) wrapped by TimingTools to time
+# every call. OutputTree streams the svgs through PrettyPrintLines, so
+# PrettyPrintElements is timed separately on every svg in the corpus after
+# each run. The results (throughput in files/s and MB/s, latency
+# percentiles per stage and peak RSS) are printed and saved as json, and two
+# json files can be compared to flag stages that got slower. --scaling
+# instead checks generated parts of geometrically growing size (connectors
+# per part, nesting depth and so svg elements per connector, and parts per
+# directory), fits the growth exponent of each stage's time and fails if any
+# grows faster than O(n log n), so a quadratic hot path can't come back
+# unnoticed.
+#
+# usage: Benchmark.py [--repeat=N] [--out=results.json] [--generate=OPTIONS] [src_dir ...]
+#        Benchmark.py --compare [--threshold=PERCENT] old.json new.json
+#        Benchmark.py --scaling [--axis=connectors|depth|parts] [--sizes=N,N...] [--max-exponent=E] [--repeat=N]
+#
+# --generate=OPTIONS  generate the corpus with GeneratePart.py using the
+#                     space separated GeneratePart.py options in OPTIONS
+#                     (the default if no src_dir is given is
+#                     '--connectors=10,100,1000 --layout=both')
+# --repeat=N          check the corpus N times (default 3)
+# --out=FILE          save the results to FILE (default benchmark.json)
+# --compare           compare old.json to new.json and exit 1 if a stage's
+#                     median or total time (or the peak RSS) is more than
+#                     --threshold percent (default 10) worse
+# --scaling           run the scaling test on every --axis (or the one
+#                     given) at its default sizes (or --sizes) taking the
+#                     best of --repeat runs, and exit 1 if a stage's fitted
+#                     exponent is over --max-exponent (default 1.3, n log n
+#                     over a 2 to 16 fold range fits to 1.1 to 1.2)
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os and sys for the files and argv, time for the clocks, json for
+# the results, tempfile and shutil for the dst directories and platform for
+# the description of the machine.
+
+import os, sys, time, json, tempfile, shutil, platform
+
+# math for the --scaling fit.
+
+import math
+
+# resource gives the peak RSS, but doesn't exist on Windows.
+
+try:
+
+    import resource
+
+except ImportError:
+
+    resource = None
+
+# End of try:
+
+# lxml to read the svgs for the PrettyPrintElements pass.
+
+from lxml import etree
+
+import FritzingTools as Fritzing, PPTools as PP, TimingTools as Timing, GeneratePart
+
+# The stages timed, as (module, function) pairs.
+
+Stages = [(PP, 'ParseFile'), (Fritzing, 'ProcessFzp'), (Fritzing, 'ProcessSvg'), (Fritzing, 'ProcessSvgsFromFzp'), (PP, 'Indent'), (PP, 'PrettyPrintElements'), (PP, 'OutputTree')]
+
+# The corpus GeneratePart.py makes when no src_dir is given.
+
+DefaultGenerate = '--connectors=10,100,1000 --layout=both'
+
+# The --scaling axes, the GeneratePart.py option that grows (with the
+# options it is used with) and the default sizes. Each size is double the
+# one before so the 4 sizes cover an 8 fold range.
+
+ScalingAxes = {'connectors': ('connectors', '--buses=8 --subparts=4 --style=20', [250, 500, 1000, 2000]), 'depth': ('depth', '--connectors=100 --style=20', [4, 8, 16, 32]), 'parts': ('parts', '--connectors=10 --style=20', [25, 50, 100, 200])}
+
+# Stages whose time at the largest size is less than this many seconds are
+# too quick (and so too noisy) to fit.
+
+ScalingMinTime = 0.05
+
+def ProcessArgs(Argv):
+
+    # Return the options dictionary and the list of src dirs (or json files
+    # for --compare).
+
+    Options = {'repeat': None, 'out': 'benchmark.json', 'generate': None, 'compare': 'n', 'threshold': '10', 'scaling': 'n', 'axis': None, 'sizes': None, 'max-exponent': '1.3'}
+
+    Args = []
+
+    for Arg in Argv[1:]:
+
+        if Arg == '--compare' or Arg == '--scaling':
+
+            Options[Arg[2:]] = 'y'
+
+        elif Arg.startswith('--') and '=' in Arg and Arg[2:].split('=')[0] in Options:
+
+            Options[Arg[2:].split('=')[0]] = Arg.split('=', 1)[1]
+
+        elif not Arg.startswith('--'):
+
+            Args.append(Arg)
+
+        else:
+
+            Usage(Argv, 'unknown option \'{0:s}\''.format(Arg))
+
+        # End of if Arg == '--compare' or Arg == '--scaling':
+
+    # End of for Arg in Argv[1:]:
+
+    if Options['repeat'] == None:
+
+        # The scaling test takes the best of 2, the benchmark averages 3.
+
+        Options['repeat'] = '2' if Options['scaling'] == 'y' else '3'
+
+    # End of if Options['repeat'] == None:
+
+    for Option in ('repeat', 'threshold'):
+
+        if not Options[Option].isdigit():
+
+            Usage(Argv, '--{0:s} value \'{1:s}\' isn\'t a number'.format(Option, Options[Option]))
+
+        # End of if not Options[Option].isdigit():
+
+        Options[Option] = int(Options[Option])
+
+    # End of for Option in ('repeat', 'threshold'):
+
+    if Options['compare'] == 'y' and len(Args) != 2:
+
+        Usage(Argv, '--compare needs an old and a new json file')
+
+    # End of if Options['compare'] == 'y' and len(Args) != 2:
+
+    try:
+
+        Options['max-exponent'] = float(Options['max-exponent'])
+
+    except ValueError:
+
+        Usage(Argv, '--max-exponent value \'{0:s}\' isn\'t a number'.format(Options['max-exponent']))
+
+    # End of try:
+
+    if Options['axis'] != None and not Options['axis'] in ScalingAxes:
+
+        Usage(Argv, '--axis must be one of {0:s}'.format(', '.join(ScalingAxes)))
+
+    # End of if Options['axis'] != None and not Options['axis'] in ScalingAxes:
+
+    if Options['sizes'] != None:
+
+        if Options['axis'] == None:
+
+            Usage(Argv, '--sizes needs an --axis')
+
+        # End of if Options['axis'] == None:
+
+        if not all(Size.isdigit() and int(Size) > 0 for Size in Options['sizes'].split(',')) or len(Options['sizes'].split(',')) < 2:
+
+            Usage(Argv, '--sizes must be 2 or more numbers')
+
+        # End of if not all(Size.isdigit() and int(Size) > 0 for Size in Options['sizes'].split(',')) ...
+
+        Options['sizes'] = [int(Size) for Size in Options['sizes'].split(',')]
+
+    # End of if Options['sizes'] != None:
+
+    if Options['compare'] == 'n' and Options['scaling'] == 'n' and len(Args) == 0 and Options['generate'] == None:
+
+        Options['generate'] = DefaultGenerate
+
+    # End of if Options['compare'] == 'n' and Options['scaling'] == 'n' and len(Args) == 0 and Options['generate'] == None:
+
+    return Options, Args
+
+# End of def ProcessArgs(Argv):
+
+def Usage(Argv, Message):
+
+    print('Usage: {0:s} [--repeat=N] [--out=results.json] [--generate=OPTIONS] [src_dir ...]\n       {0:s} --compare [--threshold=PERCENT] old.json new.json\n       {0:s} --scaling [--axis=connectors|depth|parts] [--sizes=N,N...] [--max-exponent=E] [--repeat=N]\n\n{1:s}\n'.format(Argv[0], Message))
+
+    sys.exit(1)
+
+# End of def Usage(Argv, Message):
+
+def Percentile(Samples, Percent):
+
+    # The Percent percentile of the sorted list Samples (nearest rank).
+
+    if len(Samples) == 0:
+
+        return 0.0
+
+    # End of if len(Samples) == 0:
+
+    Rank = max(1, -(-len(Samples) * Percent // 100))
+
+    return Samples[int(Rank) - 1]
+
+# End of def Percentile(Samples, Percent):
+
+def CorpusBytes(SrcDir):
+
+    # The files and bytes of a src_dir, including the svgs in
+    # ../svg/prefix for a core style directory.
+
+    Files = 0
+
+    Bytes = 0
+
+    SvgDir = os.path.join(os.path.dirname(os.path.normpath(SrcDir)), 'svg', os.path.basename(os.path.normpath(SrcDir)))
+
+    for Dir in (SrcDir, SvgDir):
+
+        for Root, Dirs, Names in os.walk(Dir):
+
+            for Name in Names:
+
+                Files += 1
+
+                Bytes += os.path.getsize(os.path.join(Root, Name))
+
+            # End of for Name in Names:
+
+        # End of for Root, Dirs, Names in os.walk(Dir):
+
+    # End of for Dir in (SrcDir, SvgDir):
+
+    return Files, Bytes
+
+# End of def CorpusBytes(SrcDir):
+
+def CheckDir(SrcDir, Options):
+
+    # Check SrcDir in to a new temporary dst dir the way ProcessDir does
+    # (without printing the messages) and delete the dst dir. Returns the
+    # number of messages.
+
+    DstDir = tempfile.mkdtemp(prefix='FritzingBenchmark')
+
+    Messages = 0
+
+    try:
+
+        Errors = []
+
+        DirProcessing, PrefixDir, Path, File, SrcDir, DstDir = Fritzing.ProcessDirArgs(['Benchmark.py', SrcDir, DstDir], Errors)
+
+        if len(Errors) != 0:
+
+            PP.PrintErrors(Errors)
+
+            sys.exit(1)
+
+        # End of if len(Errors) != 0:
+
+        FilesProcessed = {}
+
+        for InFile in sorted(os.listdir(SrcDir)):
+
+            if not 'processed.' + os.path.join(SrcDir, InFile) in FilesProcessed:
+
+                Errors, Warnings, Info, ModuleId = Fritzing.ProcessDirFile(InFile, SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, 0)
+
+                Messages += len(Errors) + len(Warnings) + len(Info)
+
+            # End of if not 'processed.' + os.path.join(SrcDir, InFile) in FilesProcessed:
+
+        # End of for InFile in sorted(os.listdir(SrcDir)):
+
+    finally:
+
+        shutil.rmtree(DstDir, ignore_errors=True)
+
+    # End of try:
+
+    return Messages
+
+# End of def CheckDir(SrcDir, Options):
+
+def PrettyPrintPass(SrcDirs):
+
+    # Pretty print (without writing) every svg of the corpus with
+    # PrettyPrintElements.
+
+    for SrcDir in SrcDirs:
+
+        SvgDir = os.path.join(os.path.dirname(os.path.normpath(SrcDir)), 'svg', os.path.basename(os.path.normpath(SrcDir)))
+
+        for Dir in (SrcDir, SvgDir):
+
+            for Root, Dirs, Names in os.walk(Dir):
+
+                for Name in sorted(Names):
+
+                    if Name.lower().endswith('.svg'):
+
+                        try:
+
+                            XmlIn = etree.tostring(etree.parse(os.path.join(Root, Name)), encoding='unicode')
+
+                        except (IOError, etree.XMLSyntaxError):
+
+                            continue
+
+                        # End of try:
+
+                        PP.PrettyPrintElements(XmlIn, [], 0)
+
+                    # End of if Name.lower().endswith('.svg'):
+
+                # End of for Name in sorted(Names):
+
+            # End of for Root, Dirs, Names in os.walk(Dir):
+
+        # End of for Dir in (SrcDir, SvgDir):
+
+    # End of for SrcDir in SrcDirs:
+
+# End of def PrettyPrintPass(SrcDirs):
+
+def PeakRss():
+
+    # The peak resident set size of this process in KB (None where it isn't
+    # available).
+
+    if resource == None:
+
+        return None
+
+    # End of if resource == None:
+
+    Rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform == 'darwin':
+
+        # MacOS reports bytes rather than KB.
+
+        Rss = Rss // 1024
+
+    # End of if sys.platform == 'darwin':
+
+    return Rss
+
+# End of def PeakRss():
+
+def RunBenchmark(Options, SrcDirs):
+
+    # Run the benchmark and return the results dictionary.
+
+    GenDir = None
+
+    if Options['generate'] != None:
+
+        # Generate the corpus in a temporary directory.
+
+        GenDir = tempfile.mkdtemp(prefix='FritzingCorpus')
+
+        GenOptions, Dir = GeneratePart.ProcessArgs(['GeneratePart.py'] + Options['generate'].split() + [GenDir])
+
+        GeneratePart.GenerateParts(GenDir, GenOptions)
+
+        for SubDir in ('core', 'parts'):
+
+            if os.path.isdir(os.path.join(GenDir, SubDir)):
+
+                SrcDirs.append(os.path.join(GenDir, SubDir))
+
+            # End of if os.path.isdir(os.path.join(GenDir, SubDir)):
+
+        # End of for SubDir in ('core', 'parts'):
+
+    # End of if Options['generate'] != None:
+
+    try:
+
+        Files = 0
+
+        Bytes = 0
+
+        for SrcDir in SrcDirs:
+
+            DirFiles, DirBytes = CorpusBytes(SrcDir)
+
+            Files += DirFiles
+
+            Bytes += DirBytes
+
+        # End of for SrcDir in SrcDirs:
+
+        # Only the stages are wrapped (so the rest runs at full speed) and
+        # every call is kept for the percentiles.
+
+        for Module in (Fritzing, PP):
+
+            Timing.Enable([Module], [Name for StageModule, Name in Stages if StageModule == Module], KeepSamples=True)
+
+        # End of for Module in (Fritzing, PP):
+
+        CheckOptions, Argv = Fritzing.ProcessOptions(['Benchmark.py'], [])
+
+        Runs = []
+
+        Messages = 0
+
+        for Repeat in range(Options['repeat']):
+
+            StartWall = time.perf_counter()
+
+            StartCpu = time.process_time()
+
+            for SrcDir in SrcDirs:
+
+                Messages += CheckDir(SrcDir, CheckOptions)
+
+            # End of for SrcDir in SrcDirs:
+
+            Runs.append([time.perf_counter() - StartWall, time.process_time() - StartCpu])
+
+            # The pretty printer on its own (not included in the run times).
+
+            PrettyPrintPass(SrcDirs)
+
+        # End of for Repeat in range(Options['repeat']):
+
+    finally:
+
+        if GenDir != None:
+
+            shutil.rmtree(GenDir, ignore_errors=True)
+
+        # End of if GenDir != None:
+
+    # End of try:
+
+    Wall = sum(Run[0] for Run in Runs)
+
+    Results = {'version': Version, 'python': platform.python_version(), 'machine': platform.platform(), 'corpus': Options['generate'] if Options['generate'] != None else SrcDirs, 'repeat': Options['repeat'], 'files': Files, 'bytes': Bytes, 'messages': Messages // Options['repeat'], 'wall': Wall, 'cpu': sum(Run[1] for Run in Runs), 'runs': Runs, 'files_per_s': Files * Options['repeat'] / Wall if Wall > 0 else 0.0, 'mb_per_s': Bytes * Options['repeat'] / Wall / 1000000 if Wall > 0 else 0.0, 'peak_rss_kb': PeakRss(), 'stages': {}}
+
+    for Module, Name in Stages:
+
+        Entry = Timing.Stats.get(Module.__name__ + '.' + Name)
+
+        if Entry == None or Entry[0] == 0:
+
+            continue
+
+        # End of if Entry == None or Entry[0] == 0:
+
+        Samples = sorted(Entry[4])
+
+        # The calls (and the times) are the outermost calls, a recursive 
+        # function like Indent counts once per file. 
+
+        Results['stages'][Name] = {'calls': len(Samples), 'total': Entry[1], 'cpu': Entry[2], 'mean': Entry[1] / len(Samples), 'p50': Percentile(Samples, 50), 'p90': Percentile(Samples, 90), 'p99': Percentile(Samples, 99), 'max': Samples[-1], 'calls_per_s': len(Samples) / Entry[1] if Entry[1] > 0 else 0.0}
+
+    # End of for Module, Name in Stages:
+
+    return Results
+
+# End of def RunBenchmark(Options, SrcDirs):
+
+def PrintResults(Results):
+
+    print('{0:d} files {1:.2f} MB x {2:d}: {3:.3f}s wall {4:.3f}s cpu, {5:.1f} files/s {6:.2f} MB/s, peak RSS {7:s} KB\n'.format(Results['files'], Results['bytes'] / 1000000, Results['repeat'], Results['wall'], Results['cpu'], Results['files_per_s'], Results['mb_per_s'], str(Results['peak_rss_kb'])))
+
+    print('{0:<20s} {1:>8s} {2:>10s} {3:>10s} {4:>10s} {5:>10s} {6:>10s}'.format('stage', 'calls', 'total s', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+
+    for Name in Results['stages']:
+
+        Stage = Results['stages'][Name]
+
+        print('{0:<20s} {1:8d} {2:10.4f} {3:10.3f} {4:10.3f} {5:10.3f} {6:10.3f}'.format(Name, Stage['calls'], Stage['total'], Stage['p50'] * 1000, Stage['p90'] * 1000, Stage['p99'] * 1000, Stage['max'] * 1000))
+
+    # End of for Name in Results['stages']:
+
+# End of def PrintResults(Results):
+
+def Compare(OldFile, NewFile, Threshold):
+
+    # Compare two results files, printing each stage's change and returning
+    # the list of regressions (more than Threshold percent slower).
+
+    with open(OldFile, 'r', encoding='utf-8') as f:
+
+        Old = json.load(f)
+
+    # End of with open(OldFile, 'r', encoding='utf-8') as f:
+
+    with open(NewFile, 'r', encoding='utf-8') as f:
+
+        New = json.load(f)
+
+    # End of with open(NewFile, 'r', encoding='utf-8') as f:
+
+    if Old['corpus'] != New['corpus'] or Old['repeat'] != New['repeat']:
+
+        print('Warning: the corpus or repeat count differs, totals may not be comparable\n')
+
+    # End of if Old['corpus'] != New['corpus'] or Old['repeat'] != New['repeat']:
+
+    Checks = [('wall', Old['wall'], New['wall']), ('peak_rss_kb', Old['peak_rss_kb'], New['peak_rss_kb'])]
+
+    for Name in Old['stages']:
+
+        if Name in New['stages']:
+
+            for Measure in ('p50', 'total'):
+
+                Checks.append(('{0:s} {1:s}'.format(Name, Measure), Old['stages'][Name][Measure], New['stages'][Name][Measure]))
+
+            # End of for Measure in ('p50', 'total'):
+
+        # End of if Name in New['stages']:
+
+    # End of for Name in Old['stages']:
+
+    Regressions = []
+
+    print('{0:<28s} {1:>12s} {2:>12s} {3:>8s}'.format('measure', 'old', 'new', 'change'))
+
+    for Name, OldValue, NewValue in Checks:
+
+        if OldValue == None or NewValue == None or OldValue == 0:
+
+            continue
+
+        # End of if OldValue == None or NewValue == None or OldValue == 0:
+
+        Change = 100.0 * (NewValue - OldValue) / OldValue
+
+        Flag = ''
+
+        if Change > Threshold:
+
+            Flag = '  REGRESSION'
+
+            Regressions.append(Name)
+
+        # End of if Change > Threshold:
+
+        print('{0:<28s} {1:12.6g} {2:12.6g} {3:7.1f}%{4:s}'.format(Name, OldValue, NewValue, Change, Flag))
+
+    # End of for Name, OldValue, NewValue in Checks:
+
+    return Regressions
+
+# End of def Compare(OldFile, NewFile, Threshold):
+
+def GrowthExponent(Sizes, Times):
+
+    # The least squares slope of log(time) against log(size), i.e. k for
+    # time = c * size ** k.
+
+    X = [math.log(Size) for Size in Sizes]
+
+    Y = [math.log(Time) for Time in Times]
+
+    MeanX = sum(X) / len(X)
+
+    MeanY = sum(Y) / len(Y)
+
+    return sum((XValue - MeanX) * (YValue - MeanY) for XValue, YValue in zip(X, Y)) / sum((XValue - MeanX) ** 2 for XValue in X)
+
+# End of def GrowthExponent(Sizes, Times):
+
+def ScalingRun(Axis, Size, Options):
+
+    # Generate the corpus for Size on Axis and return the best (lowest) 
+    # total time of each stage (and of the whole run as 'run') over 
+    # --repeat runs. 
+
+    Option, Extra, DefaultSizes = ScalingAxes[Axis]
+
+    GenDir = tempfile.mkdtemp(prefix='FritzingScaling')
+
+    try:
+
+        GenOptions, Dir = GeneratePart.ProcessArgs(['GeneratePart.py'] + Extra.split() + ['--{0:s}={1:d}'.format(Option, Size), GenDir])
+
+        GeneratePart.GenerateParts(GenDir, GenOptions)
+
+        SrcDir = os.path.join(GenDir, 'core')
+
+        CheckOptions, Argv = Fritzing.ProcessOptions(['Benchmark.py'], [])
+
+        Best = {}
+
+        for Repeat in range(Options['repeat']):
+
+            Timing.ResetStats()
+
+            StartWall = time.perf_counter()
+
+            CheckDir(SrcDir, CheckOptions)
+
+            Times = {'run': time.perf_counter() - StartWall}
+
+            for Module, Name in Stages:
+
+                Entry = Timing.Stats.get(Module.__name__ + '.' + Name)
+
+                if Entry != None and Entry[0] != 0:
+
+                    Times[Name] = Entry[1]
+
+                # End of if Entry != None and Entry[0] != 0:
+
+            # End of for Module, Name in Stages:
+
+            for Name in Times:
+
+                Best[Name] = min(Best.get(Name, Times[Name]), Times[Name])
+
+            # End of for Name in Times:
+
+        # End of for Repeat in range(Options['repeat']):
+
+    finally:
+
+        shutil.rmtree(GenDir, ignore_errors=True)
+
+    # End of try:
+
+    return Best
+
+# End of def ScalingRun(Axis, Size, Options):
+
+def ScalingTest(Options):
+
+    # Run the scaling test and return the list of stages (as 'axis stage')
+    # that grow faster than --max-exponent allows.
+
+    for Module in (Fritzing, PP):
+
+        Timing.Enable([Module], [Name for StageModule, Name in Stages if StageModule == Module])
+
+    # End of for Module in (Fritzing, PP):
+
+    if Options['axis'] == None:
+
+        Axes = list(ScalingAxes)
+
+    else:
+
+        Axes = [Options['axis']]
+
+    # End of if Options['axis'] == None:
+
+    Failures = []
+
+    for Axis in Axes:
+
+        Sizes = Options['sizes'] or ScalingAxes[Axis][2]
+
+        Runs = [ScalingRun(Axis, Size, Options) for Size in Sizes]
+
+        print('\n{0:s}: {1:s}\n'.format(Axis, ', '.join(str(Size) for Size in Sizes)))
+
+        print('{0:<20s} {1:s} {2:>9s}'.format('stage', ''.join('{0:>10s}'.format(str(Size)) for Size in Sizes), 'exponent'))
+
+        for Name in ['run'] + [Name for Module, Name in Stages]:
+
+            if not all(Name in Run for Run in Runs):
+
+                continue
+
+            # End of if not all(Name in Run for Run in Runs):
+
+            Times = [Run[Name] for Run in Runs]
+
+            Line = '{0:<20s} {1:s}'.format(Name, ''.join('{0:10.4f}'.format(Time) for Time in Times))
+
+            if Times[-1] < ScalingMinTime or min(Times) <= 0:
+
+                print(Line + '  too quick to fit')
+
+                continue
+
+            # End of if Times[-1] < ScalingMinTime or min(Times) <= 0:
+
+            Exponent = GrowthExponent(Sizes, Times)
+
+            Flag = ''
+
+            if Exponent > Options['max-exponent']:
+
+                Flag = '  WORSE THAN n log n'
+
+                Failures.append('{0:s} {1:s}'.format(Axis, Name))
+
+            # End of if Exponent > Options['max-exponent']:
+
+            print('{0:s} {1:9.2f}{2:s}'.format(Line, Exponent, Flag))
+
+        # End of for Name in ['run'] + [Name for Module, Name in Stages]:
+
+    # End of for Axis in Axes:
+
+    return Failures
+
+# End of def ScalingTest(Options):
+
+if __name__ == '__main__':
+
+    Options, Args = ProcessArgs(sys.argv)
+
+    if Options['scaling'] == 'y':
+
+        Failures = ScalingTest(Options)
+
+        if len(Failures) != 0:
+
+            print('\n{0:d} stage(s) grow faster than n log n (exponent over {1:.2f}): {2:s}'.format(len(Failures), Options['max-exponent'], ', '.join(Failures)))
+
+            sys.exit(1)
+
+        # End of if len(Failures) != 0:
+
+        sys.exit(0)
+
+    # End of if Options['scaling'] == 'y':
+
+    if Options['compare'] == 'y':
+
+        Regressions = Compare(Args[0], Args[1], Options['threshold'])
+
+        if len(Regressions) != 0:
+
+            print('\n{0:d} regression(s) over {1:d}%: {2:s}'.format(len(Regressions), Options['threshold'], ', '.join(Regressions)))
+
+            sys.exit(1)
+
+        # End of if len(Regressions) != 0:
+
+        sys.exit(0)
+
+    # End of if Options['compare'] == 'y':
+
+    Results = RunBenchmark(Options, Args)
+
+    PrintResults(Results)
+
+    with open(Options['out'], 'w', encoding='utf-8') as f:
+
+        json.dump(Results, f, indent=1)
+
+    # End of with open(Options['out'], 'w', encoding='utf-8') as f:
+
+    print('\nResults saved to {0:s}'.format(Options['out']))
+
+# End of if __name__ == '__main__':
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+
+# The support routines for the on disk result cache used by the --cache
+# option. An entry is keyed by a sha256 hash of the tool version and
+# settings plus the bytes of the fzp and every svg it references, and holds
+# the Errors, Warnings and Info from checking those files along with the
+# (compressed) output files that were written, so that an unchanged part
+# can be replayed without being parsed, checked or pretty printed again.
+
+# The largest size in bytes the cache directory is allowed to grow to. When
+# it is larger than this the least recently used entries are deleted until
+# it fits.
+
+CacheMaxSize = 512 * 1024 * 1024
+
+# The age in seconds after which an entry that hasn't been used is deleted
+# (30 days).
+
+CacheMaxAge = 30 * 24 * 60 * 60
+
+# The age in seconds after which a temporary file left by CacheStore (from a
+# run that was interrupted) is deleted (1 hour).
+
+CacheTmpMaxAge = 60 * 60
+
+Version = '0.0.2'  # Version number of this file.
+
+# Import os to get file rename, re for the entry names, time for the entry
+# ages and logging to get logging support.
+
+import os, re, time, logging
+
+# hashlib for the key, json for the entry format and zlib and base64 to
+# store the output files compactly in the json.
+
+import hashlib, json, zlib, base64
+
+# The Diagnostic records for the Error messages.
+
+import DiagnosticTools as Diag
+
+# The names of the sub directories, entries and temporary files that 
+# CacheStore writes. Nothing else in the cache directory is ever deleted, 
+# as --cache may have been pointed at a directory with other files in it.
+
+CacheSubDirRegex = re.compile(r'^[0-9a-f]{2}$')
+
+CacheEntryRegex = re.compile(r'^[0-9a-f]{64}\.json$')
+
+CacheTmpRegex = re.compile(r'^[0-9a-f]{64}\.json\.[0-9]+\.tmp$')
+
+def CacheKey(KeyParts):
+
+    # Hash a list of strings and bytes (in order) in to a cache key. The
+    # length of each part is hashed as well so that ['ab', 'c'] and
+    # ['a', 'bc'] don't produce the same key.
+
+    logging.info (' Entering CacheKey\n')
+
+    Hash = hashlib.sha256()
+
+    for Part in KeyParts:
+
+        if isinstance(Part, str):
+
+            Part = Part.encode('utf-8')
+
+        # End of if isinstance(Part, str):
+
+        Hash.update(str(len(Part)).encode('ascii') + b':')
+
+        Hash.update(Part)
+
+    # End of for Part in KeyParts:
+
+    logging.info (' Exiting CacheKey\n')
+
+    return Hash.hexdigest()
+
+# End of def CacheKey(KeyParts):
+
+def CacheFileName(CacheDir, Key):
+
+    # Entries are spread over 256 sub directories by the first two characters
+    # of the key to keep the directories a reasonable size.
+
+    return os.path.join(CacheDir, Key[:2], Key + '.json')
+
+# End of def CacheFileName(CacheDir, Key):
+
+def CacheLookup(CacheDir, Key):
+
+    # Return the entry for Key or None if there isn't one (or it can't be
+    # read, in which case it is treated as a miss and will be replaced). A
+    # hit updates the modification time of the entry so that eviction
+    # removes the least recently used entries first.
+
+    logging.info (' Entering CacheLookup Key %s\n', Key)
+
+    EntryFile = CacheFileName(CacheDir, Key)
+
+    try:
+
+        with open(EntryFile, 'r', encoding='utf-8') as f:
+
+            Entry = json.load(f)
+
+        os.utime(EntryFile)
+
+    except (OSError, ValueError):
+
+        logging.info (' Exiting CacheLookup on miss\n')
+
+        return None
+
+    # End of try:
+
+    logging.info (' Exiting CacheLookup on hit\n')
+
+    return Entry
+
+# End of def CacheLookup(CacheDir, Key):
+
+def CacheStore(CacheDir, Key, Entry):
+
+    # Write Entry to the cache under Key. The entry is written to a
+    # temporary file and renamed in to place so another process (from
+    # --jobs or a second run) never sees a partial entry. Failure to write
+    # the cache isn't an error (the checking has been done), it just means
+    # the next run will have to do it again.
+
+    logging.info (' Entering CacheStore Key %s\n', Key)
+
+    EntryFile = CacheFileName(CacheDir, Key)
+
+    TmpFile = EntryFile + '.' + str(os.getpid()) + '.tmp'
+
+    try:
+
+        os.makedirs(os.path.dirname(EntryFile), exist_ok=True)
+
+        with open(TmpFile, 'w', encoding='utf-8') as f:
+
+            json.dump(Entry, f)
+
+        os.replace(TmpFile, EntryFile)
+
+    except OSError as e:
+
+        logging.debug (' CacheStore: can not write %s %s\n', EntryFile, e.strerror)
+
+    # End of try:
+
+    logging.info (' Exiting CacheStore\n')
+
+# End of def CacheStore(CacheDir, Key, Entry):
+
+def CacheEncodeFile(File):
+
+    # Read an output file and return it compressed and base64 encoded for
+    # storing in a json entry, or None if it can't be read.
+
+    try:
+
+        with open(File, 'rb') as f:
+
+            Data = f.read()
+
+    except OSError:
+
+        return None
+
+    # End of try:
+
+    return base64.b64encode(zlib.compress(Data)).decode('ascii')
+
+# End of def CacheEncodeFile(File):
+
+def CacheRestoreFiles(Files, Errors):
+
+    # Write the output files stored in an entry (a dictionary of file name
+    # to encoded contents from CacheEncodeFile) back to the file system.
+
+    logging.info (' Entering CacheRestoreFiles\n')
+
+    for File in Files:
+
+        try:
+
+            with open(File, 'wb') as f:
+
+                f.write(zlib.decompress(base64.b64decode(Files[File])))
+
+        except OSError as e:
+
+            Errors.append(Diag.Diagnostic('Error 2: Can not open {0:s} {1:s} ({2:s})\n', e.filename, e.strerror, e.errno))
+
+        # End of try:
+
+    # End of for File in Files:
+
+    logging.info (' Exiting CacheRestoreFiles\n')
+
+# End of def CacheRestoreFiles(Files, Errors):
+
+def CacheEvict(CacheDir, MaxSize=None, MaxAge=None):
+
+    # Delete entries that haven't been used for more than MaxAge seconds,
+    # then delete the least recently used entries until the cache is no
+    # larger than MaxSize bytes. Returns the number of entries deleted.
+
+    logging.info (' Entering CacheEvict CacheDir %s\n', CacheDir)
+
+    if MaxSize == None:
+
+        MaxSize = CacheMaxSize
+
+    # End of if MaxSize == None:
+
+    if MaxAge == None:
+
+        MaxAge = CacheMaxAge
+
+    # End of if MaxAge == None:
+
+    # Collect [mtime, size, file name] for every entry in one pass. Only 
+    # the files CacheStore writes (an entry in a sub directory named for
+    # the first two characters of its key) are considered, and a temporary
+    # file only once it is old enough that nothing is still writing it.
+
+    Entries = []
+
+    TmpOldestAllowed = time.time() - CacheTmpMaxAge
+
+    if os.path.isdir(CacheDir):
+
+        for SubDir in os.scandir(CacheDir):
+
+            if not SubDir.is_dir(follow_symlinks=False) or not CacheSubDirRegex.match(SubDir.name):
+
+                continue
+
+            # End of if not SubDir.is_dir(follow_symlinks=False) or not CacheSubDirRegex.match(SubDir.name):
+
+            for Entry in os.scandir(SubDir.path):
+
+                if not Entry.name.startswith(SubDir.name) or not (CacheEntryRegex.match(Entry.name) or CacheTmpRegex.match(Entry.name)):
+
+                    continue
+
+                # End of if not Entry.name.startswith(SubDir.name) or ...
+
+                try:
+
+                    Stat = Entry.stat(follow_symlinks=False)
+
+                except OSError:
+
+                    continue
+
+                # End of try:
+
+                if CacheTmpRegex.match(Entry.name):
+
+                    if Stat.st_mtime < TmpOldestAllowed:
+
+                        # A stale temporary file so delete it first.
+
+                        Entries.append([0, Stat.st_size, Entry.path])
+
+                    # End of if Stat.st_mtime < TmpOldestAllowed:
+
+                    continue
+
+                # End of if CacheTmpRegex.match(Entry.name):
+
+                Entries.append([Stat.st_mtime, Stat.st_size, Entry.path])
+
+            # End of for Entry in os.scandir(SubDir.path):
+
+        # End of for SubDir in os.scandir(CacheDir):
+
+    # End of if os.path.isdir(CacheDir):
+
+    # Oldest first.
+
+    Entries.sort()
+
+    TotalSize = sum(Size for MTime, Size, File in Entries)
+
+    OldestAllowed = time.time() - MaxAge
+
+    Deleted = 0
+
+    for MTime, Size, File in Entries:
+
+        if MTime >= OldestAllowed and TotalSize <= MaxSize:
+
+            # As the entries are sorted oldest first, everything from here
+            # on is both new enough and fits.
+
+            break
+
+        # End of if MTime >= OldestAllowed and TotalSize <= MaxSize:
+
+        try:
+
+            os.remove(File)
+
+        except OSError:
+
+            continue
+
+        # End of try:
+
+        TotalSize -= Size
+
+        Deleted += 1
+
+    # End of for MTime, Size, File in Entries:
+
+    logging.debug (' CacheEvict: deleted %s entries, %s bytes left\n', Deleted, TotalSize)
+
+    logging.info (' Exiting CacheEvict\n')
+
+    return Deleted
+
+# End of def CacheEvict(CacheDir, MaxSize=None, MaxAge=None):
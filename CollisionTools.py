@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+# The support routines for the --collisions library index. FzpmoduleId only
+# compares the moduleId and referenceFile of an fzp with its own file name
+# (Warnings 3 and 6), so two parts with the same moduleId (of which Fritzing
+# silently loads only one) aren't noticed. Here the start of every fzp (the
+# module element, title and properties, up to the views) is read once from
+# a stream of parse events and entered in hash maps by moduleId, by
+# referenceFile and by family and properties, so the collisions across the
+# whole library are found from the one sweep.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import logging to get logging support.
+
+import logging
+
+# The Diagnostic records for the Error and Warning messages.
+
+import DiagnosticTools as Diag
+
+# and the lxml library for the xml.
+
+from lxml import etree
+
+def ScanFzp(InFile, Errors):
+
+    # Return the moduleId, referenceFile, title, family and properties (a
+    # dictionary of lower case property name to value, without the family)
+    # of the fzp InFile as a dictionary, or None (with Error 5 or 6 as from
+    # PP.ParseFile) if it can't be read. Parsing stops at the views, as
+    # everything needed comes before them.
+
+    logging.info (' Entering ScanFzp InFile %s\n', InFile)
+
+    Part = {'moduleId': None, 'referenceFile': None, 'title': None, 'family': None, 'properties': {}}
+
+    Depth = 0
+
+    try:
+
+        for Event, Elem in etree.iterparse(InFile, events=('start', 'end')):
+
+            if Event == 'start':
+
+                Depth += 1
+
+                if Depth == 1:
+
+                    Part['moduleId'] = Elem.get('moduleId')
+
+                    Part['referenceFile'] = Elem.get('referenceFile')
+
+                elif Depth == 2 and Elem.tag in ('views', 'connectors', 'buses', 'schematic-subparts'):
+
+                    break
+
+                # End of if Depth == 1:
+
+                continue
+
+            # End of if Event == 'start':
+
+            Depth -= 1
+
+            if Depth == 1 and Elem.tag == 'title':
+
+                Part['title'] = (Elem.text or '').strip()
+
+            elif Elem.tag == 'property' and Elem.getparent() != None and Elem.getparent().tag == 'properties':
+
+                Name = (Elem.get('name') or '').strip().lower()
+
+                if Name == 'family':
+
+                    Part['family'] = (Elem.text or '').strip()
+
+                elif Name != '':
+
+                    Part['properties'][Name] = (Elem.text or '').strip()
+
+                # End of if Name == 'family':
+
+            # End of if Depth == 1 and Elem.tag == 'title':
+
+        # End of for Event, Elem in etree.iterparse(InFile, events=('start', 'end')):
+
+    except IOError:
+
+        Errors.append(Diag.Diagnostic('Error 5: ParseFile can\'t read file {0:s}\n', InFile))
+
+        logging.info (' Exiting ScanFzp on no file error\n')
+
+        return None
+
+    except etree.XMLSyntaxError as e:
+
+        Errors.append(Diag.Diagnostic('Error 6: ParseFile error parsing the input xml file {0:s}\n', InFile))
+
+        Errors.append(Diag.Diagnostic('{0:s}\n', str(e)))
+
+        logging.info (' Exiting ScanFzp on parser error\n')
+
+        return None
+
+    # End of try:
+
+    logging.info (' Exiting ScanFzp\n')
+
+    return Part
+
+# End of def ScanFzp(InFile, Errors):
+
+def FindCollisions(Parts):
+
+    # Parts is a list of [InFile, PrefixDir, Part from ScanFzp] in work list
+    # order. Returns a dictionary of InFile to the list of collision
+    # messages for it, each file after the first with the same moduleId
+    # (Error 95), referenceFile (Warning 31) or family and properties
+    # (Warning 32, which isn't reported for obsolete parts as they are
+    # expected to match the parts that replace them) being reported against
+    # the first.
+
+    logging.info (' Entering FindCollisions Parts %s\n', len(Parts))
+
+    ModuleIds = {}
+
+    RefFiles = {}
+
+    Swaps = {}
+
+    Messages = {}
+
+    for InFile, PrefixDir, Part in Parts:
+
+        if Part['moduleId'] != None:
+
+            if Part['moduleId'] in ModuleIds:
+
+                Messages.setdefault(InFile, []).append(Diag.Diagnostic('Error 95: File\n\'{0:s}\'\n\nModuleId \'{1:s}\' is also the moduleId of\n\n\'{2:s}\'\n\nand Fritzing will only load one of them\n', InFile, Part['moduleId'], ModuleIds[Part['moduleId']]))
+
+            else:
+
+                ModuleIds[Part['moduleId']] = InFile
+
+            # End of if Part['moduleId'] in ModuleIds:
+
+        # End of if Part['moduleId'] != None:
+
+        if Part['referenceFile'] != None:
+
+            if Part['referenceFile'] in RefFiles:
+
+                Messages.setdefault(InFile, []).append(Diag.Diagnostic('Warning 31: File\n\'{0:s}\'\n\nReferenceFile \'{1:s}\' is also the referenceFile of\n\n\'{2:s}\'\n', InFile, Part['referenceFile'], RefFiles[Part['referenceFile']]))
+
+            else:
+
+                RefFiles[Part['referenceFile']] = InFile
+
+            # End of if Part['referenceFile'] in RefFiles:
+
+        # End of if Part['referenceFile'] != None:
+
+        if Part['family'] and PrefixDir != 'obsolete':
+
+            Key = (Part['family'].lower(), tuple(sorted(Part['properties'].items())))
+
+            if Key in Swaps:
+
+                Messages.setdefault(InFile, []).append(Diag.Diagnostic('Warning 32: File\n\'{0:s}\'\n\nPart \'{1:s}\' has the same family \'{2:s}\' and properties as\n\n\'{3:s}\'\n\nso they can\'t be told apart when swapping parts in Fritzing\n', InFile, Part['title'] or '', Part['family'], Swaps[Key]))
+
+            else:
+
+                Swaps[Key] = InFile
+
+            # End of if Key in Swaps:
+
+        # End of if Part['family'] and PrefixDir != 'obsolete':
+
+    # End of for InFile, PrefixDir, Part in Parts:
+
+    logging.info (' Exiting FindCollisions\n')
+
+    return Messages
+
+# End of def FindCollisions(Parts):
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+
+# The support routines for FritzingCheckDaemon.py and FritzingCheckClient.py.
+# The daemon imports FritzingTools (and so lxml) and compiles
+# FritzingCheckPart.py once, then listens on a Unix domain socket. Each
+# request (one line of json from the client) is run in a process forked from
+# the daemon, so it starts with everything already imported, requests run
+# concurrently and nothing (CheckOnly, the --suppress codes, the reports,
+# the directory indexes) is left over from one request to the next. The
+# request is run by FritzingCheckPart.py itself (with its stdout captured)
+# so the output and exit code are exactly those of the command line, and
+# the messages are also returned as records (the same as the --ndjson
+# ones).
+#
+# A request is
+#
+# {"argv": [arguments as for FritzingCheckPart.py], "cwd": directory,
+#  "name": file name or null, "data": base64 file contents or null}
+#
+# and when data is given, the file (named name) is checked (and fixed
+# unless --check is in argv) on its own in a temporary directory rather
+# than being read from disk. The reply is
+#
+# {"exit": exit code, "stdout": text, "stderr": text, "messages": [records],
+#  "output": base64 of the fixed file (for data requests) or null}
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os and sys for the files and argv, io for the captured output,
+# json and base64 for the requests and logging to get logging support.
+
+import os, sys, io, json, base64, logging
+
+# socket and socketserver for the Unix domain socket, tempfile and shutil
+# for the data requests' temporary directories, contextlib to capture the
+# output and traceback for the text of an unexpected exception.
+
+import socket, socketserver, tempfile, shutil, contextlib, traceback
+
+# The reports to collect the messages as records. FritzingTools (and so
+# lxml) isn't imported here, so the client starts quickly, but by
+# FritzingCheckDaemon.py.
+
+import ReportTools as Report
+
+# The command line script each request runs and its compiled code (set by
+# Serve).
+
+Script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'FritzingCheckPart.py')
+
+ScriptCode = None
+
+def SocketPath():
+
+    # The default socket, in $XDG_RUNTIME_DIR (or the temp directory if
+    # that isn't set) with the user id in the name so each user has their
+    # own daemon.
+
+    Dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+
+    return os.path.join(Dir, 'FritzingCheckPart-{0:d}.sock'.format(os.getuid()))
+
+# End of def SocketPath():
+
+class RecordReporter(object):
+
+    # A reporter (see ReportTools) that keeps the records of every file in
+    # the request for the reply.
+
+    def __init__(self):
+
+        self.Records = []
+
+    # End of def __init__(self):
+
+    def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+        self.Records.extend(Report.MessageRecords(InFile, ModuleId, Errors, Warnings, Info))
+
+    # End of def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+    def Close(self):
+
+        pass
+
+    # End of def Close(self):
+
+# End of class RecordReporter(object):
+
+def RunRequest(Request):
+
+    # Run one request (in the forked request process) and return the reply.
+
+    logging.info (' Entering RunRequest\n')
+
+    Argv = [str(Arg) for Arg in Request.get('argv', [])]
+
+    TmpDir = None
+
+    TmpFile = None
+
+    Reply = {'exit': 1, 'stdout': '', 'stderr': '', 'messages': [], 'output': None}
+
+    try:
+
+        os.chdir(Request.get('cwd') or '/')
+
+        if Request.get('data') != None:
+
+            # Write the data to a temporary directory under its own name (in
+            # a directory named for its prefix dir, such as core, so a
+            # Fritzing type fzp has the prefix dir ProcessArgs needs) and
+            # check that in place of a file on disk.
+
+            Name = Request.get('name') or ''
+
+            Prefix = os.path.basename(os.path.dirname(Name)) or 'core'
+
+            if Prefix in ('.', '..'):
+
+                Prefix = 'core'
+
+            # End of if Prefix in ('.', '..'):
+
+            TmpDir = tempfile.mkdtemp(prefix='FritzingCheckDaemon')
+
+            os.mkdir(os.path.join(TmpDir, Prefix))
+
+            TmpFile = os.path.join(TmpDir, Prefix, os.path.basename(Name))
+
+            with open(TmpFile, 'wb') as f:
+
+                f.write(base64.b64decode(Request['data']))
+
+            # End of with open(TmpFile, 'wb') as f:
+
+            if TmpFile.lower().endswith('.fzp'):
+
+                # The svgs of an fzp are looked for relative to it, so give
+                # it copies of the ones beside the real file.
+
+                CopySvgs(TmpDir, TmpFile, os.path.dirname(os.path.abspath(Name)))
+
+            # End of if TmpFile.lower().endswith('.fzp'):
+
+            Argv.append(TmpFile)
+
+        # End of if Request.get('data') != None:
+
+        Reporter = RecordReporter()
+
+        Report.Reporters.append(Reporter)
+
+        sys.argv = ['FritzingCheckPart.py'] + Argv
+
+        Stdout = io.StringIO()
+
+        Stderr = io.StringIO()
+
+        with contextlib.redirect_stdout(Stdout), contextlib.redirect_stderr(Stderr):
+
+            try:
+
+                exec(ScriptCode, {'__name__': '__main__', '__file__': Script})
+
+                Reply['exit'] = 0
+
+            except SystemExit as e:
+
+                if e.code == None:
+
+                    Reply['exit'] = 0
+
+                elif isinstance(e.code, int):
+
+                    Reply['exit'] = e.code
+
+                else:
+
+                    print(e.code, file=sys.stderr)
+
+                    Reply['exit'] = 1
+
+                # End of if e.code == None:
+
+            except Exception:
+
+                # As python would, print the traceback and exit 1.
+
+                traceback.print_exc()
+
+                Reply['exit'] = 1
+
+            # End of try:
+
+            # Finish any --ndjson or --sarif report the request had open
+            # (after an exception FritzingCheckPart.py won't have).
+
+            Report.CloseReports()
+
+        # End of with contextlib.redirect_stdout(Stdout), contextlib.redirect_stderr(Stderr):
+
+        Reply['stdout'] = Stdout.getvalue()
+
+        Reply['stderr'] = Stderr.getvalue()
+
+        Reply['messages'] = Reporter.Records
+
+        if TmpFile != None:
+
+            # Return the fixed file (FritzingCheckPart.py replaced the
+            # temporary one) and put the name's directory back in the
+            # messages in place of the temporary one.
+
+            if not '--check' in Argv and os.path.isfile(TmpFile):
+
+                with open(TmpFile, 'rb') as f:
+
+                    Reply['output'] = base64.b64encode(f.read()).decode('ascii')
+
+                # End of with open(TmpFile, 'rb') as f:
+
+            # End of if not '--check' in Argv and os.path.isfile(TmpFile):
+
+            TmpPrefix = os.path.dirname(TmpFile) + os.sep
+
+            NamePrefix = os.path.dirname(Request.get('name') or '')
+
+            if NamePrefix != '':
+
+                NamePrefix += os.sep
+
+            # End of if NamePrefix != '':
+
+            Reply['stdout'] = Reply['stdout'].replace(TmpPrefix, NamePrefix)
+
+            for Record in Reply['messages']:
+
+                for Key in ('file', 'input', 'message'):
+
+                    if isinstance(Record[Key], str):
+
+                        Record[Key] = Record[Key].replace(TmpPrefix, NamePrefix)
+
+                    # End of if isinstance(Record[Key], str):
+
+                # End of for Key in ('file', 'input', 'message'):
+
+            # End of for Record in Reply['messages']:
+
+        # End of if TmpFile != None:
+
+    except (OSError, ValueError, KeyError, TypeError) as e:
+
+        Reply['stderr'] += 'Error 97: Bad daemon request ({0:s})\n'.format(str(e))
+
+        Reply['exit'] = 1
+
+    finally:
+
+        if TmpDir != None:
+
+            shutil.rmtree(TmpDir, ignore_errors=True)
+
+        # End of if TmpDir != None:
+
+    # End of try:
+
+    logging.info (' Exiting RunRequest\n')
+
+    return Reply
+
+# End of def RunRequest(Request):
+
+def CopySvgs(TmpDir, TmpFile, RealDir):
+
+    # Copy the svgs that the fzp TmpFile (the request's data, in TmpDir) 
+    # references from where they are relative to RealDir (the directory of
+    # the name the request gave the data, in the request's cwd) to the same
+    # place relative to TmpFile, so they are checked as they would be for
+    # the real file. Each is copied under the name it has on disk, so a 
+    # case mismatch is still Error 21 rather than Error 20. They are copies
+    # rather than links so fixing them (without --check) can't change the
+    # real files, and nothing is copied outside TmpDir.
+
+    # FritzingTools isn't imported by this module (see above) but the 
+    # daemon has already loaded it, so this costs nothing.
+
+    import FritzingTools as Fritzing
+
+    logging.info (' Entering CopySvgs TmpFile %s RealDir %s\n', TmpFile, RealDir)
+
+    if os.path.basename(TmpFile).lower().startswith('part.'):
+
+        FzpType = 'FZPPART'
+
+    else:
+
+        FzpType = 'FZPFRITZ'
+
+    # End of if os.path.basename(TmpFile).lower().startswith('part.'):
+
+    TmpPrefixDir = os.path.dirname(TmpFile)
+
+    for View, SvgInFile, SvgOutFile in Fritzing.SvgFilesFromFzp(FzpType, TmpFile, None, os.path.basename(TmpPrefixDir)):
+
+        TmpSvg = os.path.normpath(SvgInFile)
+
+        if not TmpSvg.startswith(TmpDir + os.sep):
+
+            continue
+
+        # End of if not TmpSvg.startswith(TmpDir + os.sep):
+
+        RealSvgDir = os.path.dirname(os.path.normpath(os.path.join(RealDir, os.path.relpath(TmpSvg, TmpPrefixDir))))
+
+        BaseFile = os.path.basename(TmpSvg)
+
+        try:
+
+            Names = sorted(Entry for Entry in os.listdir(RealSvgDir) if Entry.casefold() == BaseFile.casefold())
+
+        except OSError:
+
+            continue
+
+        # End of try:
+
+        if BaseFile in Names:
+
+            Names = [BaseFile]
+
+        # End of if BaseFile in Names:
+
+        if len(Names) != 0 and os.path.isfile(os.path.join(RealSvgDir, Names[0])):
+
+            os.makedirs(os.path.dirname(TmpSvg), exist_ok=True)
+
+            shutil.copyfile(os.path.join(RealSvgDir, Names[0]), os.path.join(os.path.dirname(TmpSvg), Names[0]))
+
+        # End of if len(Names) != 0 and os.path.isfile(os.path.join(RealSvgDir, Names[0])):
+
+    # End of for View, SvgInFile, SvgOutFile in Fritzing.SvgFilesFromFzp(FzpType, TmpFile, None, os.path.basename(TmpPrefixDir)):
+
+    logging.info (' Exiting CopySvgs\n')
+
+# End of def CopySvgs(TmpDir, TmpFile, RealDir):
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    # Read a request line, run it and write the reply line. This runs in the
+    # process the server forked for the connection.
+
+    def handle(self):
+
+        try:
+
+            Request = json.loads(self.rfile.readline().decode('utf-8'))
+
+        except ValueError as e:
+
+            Reply = {'exit': 1, 'stdout': '', 'stderr': 'Error 97: Bad daemon request ({0:s})\n'.format(str(e)), 'messages': [], 'output': None}
+
+        else:
+
+            Reply = RunRequest(Request)
+
+        # End of try:
+
+        self.wfile.write(json.dumps(Reply).encode('utf-8') + b'\n')
+
+    # End of def handle(self):
+
+# End of class RequestHandler(socketserver.StreamRequestHandler):
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+
+    # Fork a process per connection so requests run concurrently.
+
+    pass
+
+# End of class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+
+def Serve(Path):
+
+    # Compile FritzingCheckPart.py and serve requests on the socket Path
+    # (only usable by this user) until interrupted.
+
+    global ScriptCode
+
+    logging.info (' Entering Serve\n')
+
+    with open(Script, encoding='utf-8') as f:
+
+        ScriptCode = compile(f.read(), Script, 'exec')
+
+    # End of with open(Script, encoding='utf-8') as f:
+
+    if os.path.exists(Path):
+
+        # A socket left by a daemon that didn't exit cleanly, unless one is
+        # still answering on it.
+
+        if Connect(Path) != None:
+
+            print('Error 98: A daemon is already running on {0:s}\n'.format(Path))
+
+            return 1
+
+        # End of if Connect(Path) != None:
+
+        os.unlink(Path)
+
+    # End of if os.path.exists(Path):
+
+    OldMask = os.umask(0o077)
+
+    try:
+
+        Listener = Server(Path, RequestHandler)
+
+    finally:
+
+        os.umask(OldMask)
+
+    # End of try:
+
+    print('Listening on {0:s}'.format(Path))
+
+    sys.stdout.flush()
+
+    try:
+
+        Listener.serve_forever()
+
+    except KeyboardInterrupt:
+
+        pass
+
+    finally:
+
+        Listener.server_close()
+
+        os.unlink(Path)
+
+    # End of try:
+
+    logging.info (' Exiting Serve\n')
+
+    return 0
+
+# End of def Serve(Path):
+
+def Connect(Path):
+
+    # Return a socket connected to the daemon on Path or None if there isn't
+    # one.
+
+    Socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+
+        Socket.connect(Path)
+
+    except OSError:
+
+        Socket.close()
+
+        return None
+
+    # End of try:
+
+    return Socket
+
+# End of def Connect(Path):
+
+def SendRequest(Socket, Request):
+
+    # Send Request on the connected Socket and return the reply.
+
+    Socket.sendall(json.dumps(Request).encode('utf-8') + b'\n')
+
+    with Socket.makefile('rb') as f:
+
+        Line = f.readline()
+
+    # End of with Socket.makefile('rb') as f:
+
+    Socket.close()
+
+    return json.loads(Line.decode('utf-8'))
+
+# End of def SendRequest(Socket, Request):
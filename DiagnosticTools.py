@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+# The Diagnostic record used for every Error, Warning and Info message. A
+# message used to be formatted in to a string as soon as it was found, which
+# on a noisy part (thousands of Warning 2 or Warning 12) meant formatting
+# and keeping thousands of long strings each with the full file path in
+# them. A Diagnostic instead keeps the (shared, constant) message template
+# and the arguments for it and is only formatted when it is printed (by
+# str()). Messages whose code has been suppressed with --suppress are never
+# formatted at all. The code, severity, file and line of a message come from
+# its template (which is parsed once per template) and its arguments.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import re for the template parsing and logging to get logging support.
+
+import re, logging
+
+# The suppressed codes set from the --suppress option, normalized by
+# NormalizeCode (i.e. 'warning2' for 'Warning 2').
+
+Suppressed = set()
+
+# The code at the start of a message ('Error 64:', 'Warning 2:',
+# 'Modified 3:'), the file name (which is argument 0 when the template says
+# it is a file) and the line number (the argument after 'At line').
+
+CodeRegex = re.compile(r'^(Error|Warning|Modified) (\d+):')
+
+FileRegex = re.compile(r'^[^{]*([Ff]ile|open)[^{]*\{0:s\}')
+
+LineRegex = re.compile(r'[Aa]t line \{(\d+):s\}')
+
+# A normalized code in the --suppress list.
+
+SuppressRegex = re.compile(r'^(error|warning|modified)\d+$')
+
+# The parsed templates (Code, Severity, FileIndex, LineIndex) indexed by
+# template.
+
+Templates = {}
+
+# The argument types that are kept as is, anything else (an lxml element or
+# error log entry for instance) is converted to str when the Diagnostic is
+# made so it doesn't keep a mutable object (or a whole tree) alive.
+
+KeepTypes = (str, int, type(None))
+
+class Diagnostic(object):
+
+    # One message, the template and the arguments to format in to it.
+
+    __slots__ = ('Template', 'Args')
+
+    def __init__(self, Template, *Args):
+
+        self.Template = Template
+
+        self.Args = tuple(Arg if type(Arg) in KeepTypes else str(Arg) for Arg in Args)
+
+    # End of def __init__(self, Template, *Args):
+
+    def Code(self):
+
+        # The code of the message ('Warning 2') or None if it doesn't have
+        # one.
+
+        return ParseTemplate(self.Template)[0]
+
+    # End of def Code(self):
+
+    def Severity(self):
+
+        # 'Error', 'Warning' or 'Modified' from the code or None for a
+        # message without a code (the list the message is in says what it
+        # is).
+
+        return ParseTemplate(self.Template)[1]
+
+    # End of def Severity(self):
+
+    def File(self):
+
+        # The file the message is about or None if the template doesn't
+        # name one.
+
+        FileIndex = ParseTemplate(self.Template)[2]
+
+        if FileIndex == None or FileIndex >= len(self.Args):
+
+            return None
+
+        # End of if FileIndex == None or FileIndex >= len(self.Args):
+
+        return self.Args[FileIndex]
+
+    # End of def File(self):
+
+    def Line(self):
+
+        # The source line the message is about or None if it doesn't have
+        # one.
+
+        LineIndex = ParseTemplate(self.Template)[3]
+
+        if LineIndex == None or LineIndex >= len(self.Args):
+
+            return None
+
+        # End of if LineIndex == None or LineIndex >= len(self.Args):
+
+        return self.Args[LineIndex]
+
+    # End of def Line(self):
+
+    def IsSuppressed(self):
+
+        # True if the code of this message has been suppressed.
+
+        Code = ParseTemplate(self.Template)[0]
+
+        return Code != None and NormalizeCode(Code) in Suppressed
+
+    # End of def IsSuppressed(self):
+
+    def Mentions(self, Text):
+
+        # True if Text appears in any of the arguments (without formatting
+        # the message, the templates are constant and never contain a path).
+
+        for Arg in self.Args:
+
+            if Arg != None and Text in str(Arg):
+
+                return True
+
+            # End of if Arg != None and Text in str(Arg):
+
+        # End of for Arg in self.Args:
+
+        return False
+
+    # End of def Mentions(self, Text):
+
+    def __str__(self):
+
+        # Format the message. A template without arguments is used as is
+        # (it may contain braces that were never meant to be formatted).
+
+        if len(self.Args) == 0:
+
+            return self.Template
+
+        # End of if len(self.Args) == 0:
+
+        return self.Template.format(*[str(Arg) for Arg in self.Args])
+
+    # End of def __str__(self):
+
+    def __repr__(self):
+
+        return 'Diagnostic({0:s})'.format(repr(str(self)))
+
+    # End of def __repr__(self):
+
+# End of class Diagnostic(object):
+
+def ParseTemplate(Template):
+
+    # Return (Code, Severity, FileIndex, LineIndex) for Template parsing it
+    # the first time it is seen.
+
+    Parsed = Templates.get(Template)
+
+    if Parsed == None:
+
+        Code = None
+
+        Severity = None
+
+        FileIndex = None
+
+        LineIndex = None
+
+        Match = CodeRegex.match(Template)
+
+        if Match != None:
+
+            Code = '{0:s} {1:s}'.format(Match.group(1), Match.group(2))
+
+            Severity = Match.group(1)
+
+        # End of if Match != None:
+
+        if FileRegex.match(Template) != None:
+
+            FileIndex = 0
+
+        # End of if FileRegex.match(Template) != None:
+
+        Match = LineRegex.search(Template)
+
+        if Match != None:
+
+            LineIndex = int(Match.group(1))
+
+        # End of if Match != None:
+
+        Parsed = (Code, Severity, FileIndex, LineIndex)
+
+        Templates[Template] = Parsed
+
+    # End of if Parsed == None:
+
+    return Parsed
+
+# End of def ParseTemplate(Template):
+
+def NormalizeCode(Code):
+
+    # 'Warning 2', 'warning2' and 'WARNING 2' are all the same code.
+
+    return Code.replace(' ', '').lower()
+
+# End of def NormalizeCode(Code):
+
+def SetSuppressed(Codes, Errors):
+
+    # Set the suppressed codes from the comma separated list in Codes (the
+    # value of --suppress) adding an error for anything that isn't a code.
+
+    logging.info (' Entering SetSuppressed\n')
+
+    for Code in Codes.split(','):
+
+        if Code.strip() == '':
+
+            continue
+
+        # End of if Code.strip() == '':
+
+        if SuppressRegex.match(NormalizeCode(Code)) == None:
+
+            Errors.append(Diagnostic('Usage: --suppress value \'{0:s}\' isn\'t a message code such as Warning2\n', Code))
+
+            continue
+
+        # End of if SuppressRegex.match(NormalizeCode(Code)) == None:
+
+        Suppressed.add(NormalizeCode(Code))
+
+    # End of for Code in Codes.split(','):
+
+    logging.debug (' SetSuppressed: Suppressed %s\n', Suppressed)
+
+    logging.info (' Exiting SetSuppressed\n')
+
+# End of def SetSuppressed(Codes, Errors):
+
+def Visible(Messages):
+
+    # The messages in Messages that haven't been suppressed. Plain strings
+    # (which don't have a code) are always visible.
+
+    return [Message for Message in Messages if not (type(Message) == Diagnostic and Message.IsSuppressed())]
+
+# End of def Visible(Messages):
+
+def Mentions(Messages, Text):
+
+    # True if Text appears in any of Messages without formatting them.
+
+    for Message in Messages:
+
+        if type(Message) == Diagnostic:
+
+            if Message.Mentions(Text):
+
+                return True
+
+            # End of if Message.Mentions(Text):
+
+        elif Text in Message:
+
+            return True
+
+        # End of if type(Message) == Diagnostic:
+
+    # End of for Message in Messages:
+
+    return False
+
+# End of def Mentions(Messages, Text):
+
+def Encode(Messages):
+
+    # Convert Messages to a json compatible list (for the cache), a
+    # Diagnostic becomes [Template, Args] and a string stays a string.
+
+    return [[Message.Template, list(Message.Args)] if type(Message) == Diagnostic else Message for Message in Messages]
+
+# End of def Encode(Messages):
+
+def Decode(Messages):
+
+    # The reverse of Encode.
+
+    return [Diagnostic(Message[0], *Message[1]) if type(Message) == list else Message for Message in Messages]
+
+# End of def Decode(Messages):
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+# The support routines for the --duplicates report. Many parts use a copy of
+# the same svg (a breadboard image or footprint saved again under a new name
+# for each part), which only differ in what the editor that saved them
+# added. Here each svg (after the style and px normalizations that
+# FritzingTools applies when checking it) has the editor only content
+# removed and is written as canonical xml (C14N, so the attribute order,
+# namespace prefixes and quoting don't matter) and hashed. The svgs with
+# the same hash are identical and the svgs with the same hash once the
+# numbers are rounded are near identical, so the fzps that use them could
+# share one svg.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os for the file names, re for the regexes, hashlib for the hashes
+# and logging to get logging support.
+
+import os, re, hashlib, logging
+
+# The Diagnostic records for the Warning messages.
+
+import DiagnosticTools as Diag
+
+# and the lxml library for the xml.
+
+from lxml import etree
+
+# The namespaces of the content that only the editor uses (Fritzing ignores
+# it) which is removed before hashing.
+
+EditorNamespaces = ('http://www.inkscape.org/namespaces/inkscape', 'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd')
+
+# The ids that Inkscape (and most other editors) make up for an element
+# that doesn't have one, the element name and a number, which are removed
+# unless something refers to them (connector, terminal and layer ids, which
+# Fritzing uses, don't match).
+
+GeneratedIdRegex = re.compile(r'^(svg|g|path|rect|circle|ellipse|line|polyline|polygon|text|tspan|textPath|defs|metadata|title|desc|use|image|clipPath|mask|pattern|marker|linearGradient|radialGradient|stop|filter|symbol|flowRoot|flowRegion|flowPara|namedview|layer)[0-9]+([-_][0-9]+)*$')
+
+# A reference to an id in an attribute (such as url(#id) or xlink:href="#id").
+
+IdRefRegex = re.compile(r'#([^\s)\'",;]+)')
+
+# The decimal numbers that are rounded for the near identical hash.
+
+NumberRegex = re.compile(rb'-?[0-9]*\.[0-9]+([eE][-+]?[0-9]+)?')
+
+def SvgHashes(Root):
+
+    # Return the [identical, near identical] hashes of the svg whose
+    # (already normalized) root element is Root. The tree is changed.
+
+    logging.info (' Entering SvgHashes\n')
+
+    Refs = set()
+
+    for Elem in Root.iter():
+
+        for Value in Elem.attrib.values():
+
+            Refs.update(IdRefRegex.findall(Value))
+
+        # End of for Value in Elem.attrib.values():
+
+    # End of for Elem in Root.iter():
+
+    for Elem in list(Root.iter()):
+
+        if not isinstance(Elem.tag, str) or etree.QName(Elem).namespace in EditorNamespaces or etree.QName(Elem).localname == 'metadata':
+
+            # A comment, processing instruction or editor element (such as
+            # sodipodi:namedview or the rdf metadata) so remove it.
+
+            if Elem.getparent() != None:
+
+                Elem.getparent().remove(Elem)
+
+            # End of if Elem.getparent() != None:
+
+            continue
+
+        # End of if not isinstance(Elem.tag, str) or etree.QName(Elem).namespace in EditorNamespaces ...
+
+        for Name in list(Elem.attrib):
+
+            if etree.QName(Name).namespace in EditorNamespaces or (Name == 'id' and GeneratedIdRegex.match(Elem.get(Name)) and not Elem.get(Name) in Refs):
+
+                del Elem.attrib[Name]
+
+            # End of if etree.QName(Name).namespace in EditorNamespaces or ...
+
+        # End of for Name in list(Elem.attrib):
+
+        # The whitespace around the text doesn't change the image.
+
+        Elem.text = (Elem.text or '').strip() or None
+
+        Elem.tail = (Elem.tail or '').strip() or None
+
+    # End of for Elem in list(Root.iter()):
+
+    # Exclusive C14N so the namespace declarations the editor left behind
+    # (which are no longer used) aren't included.
+
+    Canonical = etree.tostring(Root, method='c14n', exclusive=True)
+
+    Near = NumberRegex.sub(lambda Match: RoundNumber(Match.group(0)), Canonical)
+
+    logging.info (' Exiting SvgHashes\n')
+
+    return [hashlib.sha256(Canonical).hexdigest(), hashlib.sha256(Near).hexdigest()]
+
+# End of def SvgHashes(Root):
+
+def RoundNumber(Number):
+
+    # The bytes Number rounded to 2 decimal places (without trailing zeros).
+
+    try:
+
+        Rounded = '{0:.2f}'.format(float(Number)).rstrip('0').rstrip('.')
+
+    except ValueError:
+
+        return Number
+
+    # End of try:
+
+    if Rounded == '-0':
+
+        Rounded = '0'
+
+    # End of if Rounded == '-0':
+
+    return Rounded.encode('ascii')
+
+# End of def RoundNumber(Number):
+
+def FindDuplicates(Hashes, References):
+
+    # Hashes is a dictionary of svg file to its [identical, near identical]
+    # hashes from SvgHashes and References the [fzp file, svg file] of each
+    # svg that an fzp references. Returns a dictionary of svg file to its
+    # messages, each svg after the first (in name order) of a group of
+    # identical svgs (Warning 34) or near identical svgs (Warning 35) being
+    # reported against the first along with the fzps that use it, and the
+    # number of each found.
+
+    logging.info (' Entering FindDuplicates Hashes %s\n', len(Hashes))
+
+    Users = {}
+
+    for FzpFile, SvgFile in References:
+
+        Users.setdefault(os.path.normpath(SvgFile), []).append(FzpFile)
+
+    # End of for FzpFile, SvgFile in References:
+
+    Identical = {}
+
+    Near = {}
+
+    for Svg in sorted(Hashes):
+
+        Identical.setdefault(Hashes[Svg][0], []).append(Svg)
+
+        Near.setdefault(Hashes[Svg][1], []).append(Svg)
+
+    # End of for Svg in sorted(Hashes):
+
+    Messages = {}
+
+    Counts = {'identical': 0, 'near': 0}
+
+    for Hash in Identical:
+
+        for Svg in Identical[Hash][1:]:
+
+            Counts['identical'] += 1
+
+            Messages.setdefault(Svg, []).append(Diag.Diagnostic('Warning 34: File\n\'{0:s}\'\n\nSvg file is identical (once canonicalized) to\n\n\'{1:s}\'\n\nso the fzp file(s) using it could use that svg instead\n{2:s}', Svg, Identical[Hash][0], UsedBy(Users, Svg)))
+
+        # End of for Svg in Identical[Hash][1:]:
+
+    # End of for Hash in Identical:
+
+    for Hash in Near:
+
+        First = Near[Hash][0]
+
+        for Svg in Near[Hash][1:]:
+
+            # Only the first of a group of identical svgs is reported (the
+            # rest already are, against it).
+
+            if Hashes[Svg][0] != Hashes[First][0] and Identical[Hashes[Svg][0]][0] == Svg:
+
+                Counts['near'] += 1
+
+                Messages.setdefault(Svg, []).append(Diag.Diagnostic('Warning 35: File\n\'{0:s}\'\n\nSvg file only differs in the rounding of its numbers from\n\n\'{1:s}\'\n\nso the fzp file(s) using it could likely use that svg instead\n{2:s}', Svg, First, UsedBy(Users, Svg)))
+
+            # End of if Hashes[Svg][0] != Hashes[First][0] and Identical[Hashes[Svg][0]][0] == Svg:
+
+        # End of for Svg in Near[Hash][1:]:
+
+    # End of for Hash in Near:
+
+    logging.info (' Exiting FindDuplicates\n')
+
+    return Messages, Counts
+
+# End of def FindDuplicates(Hashes, References):
+
+def UsedBy(Users, Svg):
+
+    # The list of the fzps that use Svg for a message (nothing if none do).
+
+    if not Svg in Users:
+
+        return ''
+
+    # End of if not Svg in Users:
+
+    return '\nUsed by\n\n' + ''.join('\'{0:s}\'\n'.format(FzpFile) for FzpFile in sorted(set(Users[Svg])))
+
+# End of def UsedBy(Users, Svg):
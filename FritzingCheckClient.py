@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# The client for FritzingCheckDaemon.py. It takes the same arguments and
+# options as FritzingCheckPart.py, has the daemon run them and prints the
+# same output and exits with the same code, so it can be used in place of
+# FritzingCheckPart.py wherever the time to start python and import lxml
+# matters (such as an editor running it on every save). If no daemon is
+# running, FritzingCheckPart.py is run directly.
+#
+# usage: FritzingCheckClient.py [--socket=PATH] [--json] [--stdin=NAME [--output=FILE]] [FritzingCheckPart.py arguments]
+#
+# --socket=PATH  the daemon's socket (default as for the daemon)
+# --json         print the daemon's reply (the exit code, output and the
+#                messages as records) as json rather than the output
+# --stdin=NAME   check the file read from stdin as if it was named NAME
+#                (such as core/mypart.fzp or svg.breadboard.mypart.svg),
+#                on its own (the svgs of an fzp aren't available) and
+#                without anything being written
+# --output=FILE  with --stdin, write the fixed file to FILE
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os and sys for the argv and the exec of FritzingCheckPart.py,
+# base64 and json for the request and reply.
+
+import os, sys, base64, json
+
+import DaemonTools as Daemon
+
+Path = Daemon.SocketPath()
+
+Options = {'json': 'n', 'stdin': None, 'output': None}
+
+Argv = []
+
+for Arg in sys.argv[1:]:
+
+    if Arg.startswith('--socket='):
+
+        Path = Arg[len('--socket='):]
+
+    elif Arg == '--json':
+
+        Options['json'] = 'y'
+
+    elif Arg.startswith('--stdin=') or Arg.startswith('--output='):
+
+        Options[Arg[2:].split('=')[0]] = Arg.split('=', 1)[1]
+
+    else:
+
+        # Passed on to FritzingCheckPart.py.
+
+        Argv.append(Arg)
+
+    # End of if Arg.startswith('--socket='):
+
+# End of for Arg in sys.argv[1:]:
+
+Request = {'argv': Argv, 'cwd': os.getcwd(), 'name': None, 'data': None}
+
+if Options['stdin'] != None:
+
+    Request['name'] = Options['stdin']
+
+    Request['data'] = base64.b64encode(sys.stdin.buffer.read()).decode('ascii')
+
+# End of if Options['stdin'] != None:
+
+Socket = Daemon.Connect(Path)
+
+if Socket == None:
+
+    if Options['stdin'] != None or Options['json'] == 'y':
+
+        print('Error 96: No daemon is running on {0:s} (start FritzingCheckDaemon.py)\n'.format(Path))
+
+        sys.exit(1)
+
+    # End of if Options['stdin'] != None or Options['json'] == 'y':
+
+    # No daemon, so run FritzingCheckPart.py (with the same python) instead.
+
+    sys.stdout.flush()
+
+    os.execv(sys.executable, [sys.executable, Daemon.Script] + Argv)
+
+# End of if Socket == None:
+
+Reply = Daemon.SendRequest(Socket, Request)
+
+if Options['json'] == 'y':
+
+    print(json.dumps(Reply, indent=1))
+
+else:
+
+    sys.stdout.write(Reply['stdout'])
+
+    sys.stderr.write(Reply['stderr'])
+
+# End of if Options['json'] == 'y':
+
+if Options['output'] != None and Reply['output'] != None:
+
+    with open(Options['output'], 'wb') as f:
+
+        f.write(base64.b64decode(Reply['output']))
+
+    # End of with open(Options['output'], 'wb') as f:
+
+# End of if Options['output'] != None and Reply['output'] != None:
+
+sys.exit(Reply['exit'])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Run FritzingCheckPart.py as a daemon so each check (from
+# FritzingCheckClient.py) doesn't pay for starting python and importing
+# lxml. The requests are run concurrently, each in its own process forked
+# from the daemon (see DaemonTools.py).
+#
+# usage: FritzingCheckDaemon.py [--socket=PATH]
+#
+# The default socket is $XDG_RUNTIME_DIR/FritzingCheckPart-uid.sock (or in
+# the temp directory if XDG_RUNTIME_DIR isn't set). Stop it with ctrl-c or
+# kill.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import sys for the argv, signal to exit cleanly on kill, importlib to 
+# load the tools and logging to get logging support.
+
+import sys, signal, importlib, logging
+
+# The logging level needs to be set before the tools are imported.
+
+logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
+
+import DaemonTools as Daemon
+
+# Load the tools (and lxml) the requests use now, so every forked request
+# process starts with them already imported. Nothing here uses them, so
+# they are loaded by name rather than imported. 
+
+for Module in ('FritzingTools', 'PPTools'):
+
+    importlib.import_module(Module)
+
+# End of for Module in ('FritzingTools', 'PPTools'):
+
+Path = Daemon.SocketPath()
+
+for Arg in sys.argv[1:]:
+
+    if Arg.startswith('--socket='):
+
+        Path = Arg[len('--socket='):]
+
+    else:
+
+        print('Usage: {0:s} [--socket=PATH]\n'.format(sys.argv[0]))
+
+        sys.exit(1)
+
+    # End of if Arg.startswith('--socket='):
+
+# End of for Arg in sys.argv[1:]:
+
+# Turn a kill in to a normal exit so the socket gets removed.
+
+signal.signal(signal.SIGTERM, lambda Signal, Frame: sys.exit(0))
+
+sys.exit(Daemon.Serve(Path))
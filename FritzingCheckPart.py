@@ -26,10 +26,11 @@ Version = '0.0.2'  # Version number of this file.
 	
 # Set up the requested debug level
 
-# Import os and sys to get file rename and the argv stuff, re for regex and
-# logging for logging support
+# Import os and sys to get file rename and the argv stuff, re for regex,
+# atexit to finish the reports however the script exits and logging for 
+# logging support
 
-import os, sys, re, logging
+import os, sys, re, time, atexit, logging
 
 if Debug == 3:
 
@@ -49,7 +50,7 @@ else:
 	
 # Import various svg routines and pretty printing routines.
 	
-import FritzingTools as Fritzing, PPTools as PP
+import FritzingTools as Fritzing, PPTools as PP, DiagnosticTools as Diag, ReportTools as Report, TimingTools as Timing, WatchTools as Watch, IndexTools as Idx, SketchTools as Sketch
 	
 # Start of the main script
 
@@ -73,7 +74,78 @@ Errors, Warnings, Info, FzpDict, CurView, TagStack, State, InheritedAttributes =
 
 PrefixDir = None
 
-FileType, DirProcessing, PrefixDir, Path, File, SrcDir, DstDir = Fritzing.ProcessArgs (sys.argv, Errors)	
+# Remove any options (such as --jobs N or --check) from the arguments first.
+
+Options, Argv = Fritzing.ProcessOptions (sys.argv, Errors)
+
+if len(Errors) != 0:
+
+    PP.PrintErrors(Errors)
+
+    sys.exit(1)
+
+# End of if len(Errors) != 0:
+
+if Options['whouses'] != None:
+
+    # --who-uses, so list the files that use the svg (and in which view) 
+    # from the --index and exit (non zero if nothing uses it).
+
+    Index = Idx.ReadIndex(Options['index'], Errors)
+
+    if Index == None:
+
+        PP.PrintErrors(Errors)
+
+        sys.exit(1)
+
+    # End of if Index == None:
+
+    Users = Idx.WhoUses(Index, Options['whouses'])
+
+    for File, View in Users:
+
+        print('{0:s} ({1:s})'.format(File, View))
+
+    # End of for File, View in Users:
+
+    if len(Users) == 0:
+
+        sys.exit(1)
+
+    # End of if len(Users) == 0:
+
+    sys.exit(0)
+
+# End of if Options['whouses'] != None:
+
+# --check turns off all renaming and writing of files in FritzingTools.
+
+Fritzing.CheckOnly = Options['check']
+
+# --timing wraps every function in FritzingTools and PPTools to time it.
+
+if Options['timing'] == 'y':
+
+    Timing.Enable([Fritzing, PP])
+
+    RunWall = time.perf_counter()
+
+    RunCpu = time.process_time()
+
+# End of if Options['timing'] == 'y':
+
+if Options['library'] == 'y':
+
+    # A whole fritzing-parts directory.
+
+    FileType, DirProcessing, PrefixDir, Path, File, SrcDir, DstDir = Fritzing.ProcessLibraryArgs (Argv, Errors)
+
+else:
+
+    FileType, DirProcessing, PrefixDir, Path, File, SrcDir, DstDir = Fritzing.ProcessArgs (Argv, Errors)	
+
+# End of if Options['library'] == 'y':
 
 logging.debug (' FritzingCheckPart.py FileType %s, DirProcessing %s  PrefixDir %s,  Path %s, File %s, SrcDir %s, DstDir %s\n', FileType, DirProcessing, PrefixDir, Path, File, SrcDir, DstDir)
 
@@ -87,156 +159,97 @@ if FileType == None:
 
 # End of FileType == None:
 
-# Regex to match '.svg' to find svg files (ignoring case)
+if (Options['index'] != None or Options['gitrange'] != None or Options['collisions'] == 'y' or Options['orphans'] == 'y' or Options['duplicates'] == 'y') and DirProcessing != 'Y':
+
+    # The index, the git changes, the collisions, the orphans and the 
+    # duplicates are of a directory (or library), not a single file.
+
+    Errors.append(Diag.Diagnostic('Usage: {0:s} --index, --git-range, --collisions, --orphans and --duplicates only work with a src_dir or --library\n', sys.argv[0]))
+
+    PP.PrintErrors(Errors)
+
+    sys.exit(1)
+
+# End of if (Options['index'] != None or Options['gitrange'] != None or Options['collisions'] == 'y' or Options['orphans'] == 'y' or Options['duplicates'] == 'y') and DirProcessing != 'Y':
+
+if Options['watch'] != 'n' and (FileType == 'FZPZ' or FileType == 'SKETCH'):
+
+    # --watch checks files on disk, not the members of an archive.
 
-SvgExtRegex = re.compile(r'\.svg$', re.IGNORECASE)
+    Errors.append(Diag.Diagnostic('Usage: {0:s} --watch doesn\'t work with a .fzpz, .fzz or .fzb file\n', sys.argv[0]))
+
+    PP.PrintErrors(Errors)
+
+    sys.exit(1)
 
-# Regex to match .fzp to find fzp files
+# End of if Options['watch'] != 'n' and (FileType == 'FZPZ' or FileType == 'SKETCH'):
 
-FzpExtRegex = re.compile(r'\.fzp$', re.IGNORECASE)
+if len(Options['parts']) != 0:
 
-# Regex to match 'part. to identify an unzipped fzpz file'
+    # Index the moduleIds of the parts library once, before any sketch or
+    # bin is audited (and before a --jobs pool is started).
 
-PartRegex = re.compile(r'^part\.', re.IGNORECASE)
+    Sketch.LoadLibrary(Options['parts'])
+
+# End of if len(Options['parts']) != 0:
+
+# Open the --ndjson and --sarif report files (if any).
+
+ReportErrors = []
+
+Report.OpenReports(Options, ReportErrors)
+
+if len(ReportErrors) != 0:
+
+    PP.PrintErrors(ReportErrors)
+
+    sys.exit(1)
+
+# End of if len(ReportErrors) != 0:
+
+# Finish the reports (such as the closing of the --sarif json) even if the
+# checking below fails with an exception, so a CI uploader doesn't get a
+# truncated file. CloseReports does nothing once they are closed.
+
+atexit.register(Report.CloseReports)
+
+# Regex to match 'svg.' to identify an svg from an unzipped fzpz file
 
 SVgPrefixRegex = re.compile(r'^svg\.', re.IGNORECASE)
 
-if DirProcessing == 'Y':
+if Options['watch'] != 'n':
+
+    # --watch, so check the file (or every fzp and svg in the src directory)
+    # and then check again whatever changes until interrupted.
+
+    if DirProcessing == 'Y':
+
+        Files = [os.path.join(SrcDir, InFile) for InFile in sorted(os.listdir(SrcDir)) if InFile.lower().endswith(('.fzp', '.svg'))]
+
+    else:
+
+        Files = [os.path.join(Path, PrefixDir, File)]
+
+        SrcDir = None
+
+    # End of if DirProcessing == 'Y':
+
+    ErrorsSeen = Watch.Watch(Files, SrcDir, PrefixDir, Options['watch'], Debug)
+
+elif FileType == 'library':
+
+    # Process every prefix directory of the fritzing-parts directory in
+    # SrcDir in to DstDir (if there is one). 
+
+    ErrorsSeen, Errors = Fritzing.ProcessLibrary(SrcDir, DstDir, FilesProcessed, Options, Debug)
+
+elif DirProcessing == 'Y':
 
     # The input is two directories (src and dst), so process the files in src
-    # directory one at a time and write the results to the dst directory. 
-    # There are three cases, One: a directory of svg files only, which will 
-    # be processed and written to the dst directory (although the empty 
-    # directories for the svg files will be there as well) Two: a fzp file 
-    # where first the fzp file will be processed, and then its associated 
-    # svg files will be processed (with data from the fzp file to check against
-    # the svg data) and written in to the corresponding directories under the 
-    # dst directory. Three: a part.filename.fzp which will be processed in to 
-    # the dst directory, and then its associated svg files which will also be 
-    # processed in to the dst directory (again with the empty svg directories 
-    # being present as well). As the fzp file is processed (and its associated
-    # svgs) the svg filenames will be added to the FilesProcessed dictionary 
-    # and tested for here so that the svg does not get processed as part of 
-    # the fzp and then again as the individual svg (without the connector 
-    # information from the fzp) to avoid duplication, less information 
-    # (because of no fzp data), confusion and most importantly loss of the 
-    # original input file. Any svg files that aren't referenced by an fzp will 
-    # get processed as svg files though. 
-
-    # Then process all the files in the src directory
-
-    for InFile in os.listdir(SrcDir):
-
-        # Set the input and output file nams
-
-        FQInFile = os.path.join(SrcDir, InFile)
-
-        FQOutFile = os.path.join(DstDir, InFile)
-
-        # Then get just the file name (no path) for the regexs and the svg
-        # already processed as part of an fzp check. 
-
-        BaseFile = os.path.basename(FQInFile)
-
-        # Determine if this is a part. type file or not. 
-
-        if PartRegex.search(BaseFile) or SVgPrefixRegex.search(BaseFile):
-
-            FzpType = 'FZPPART'
-
-        else:
-
-            FzpType = 'FZPFRITZ'
-
-        # End of if PartRegex.search(BaseFile) or SVgPrefixRegex.search(BaseFile):
-
-        logging.debug (' FritzingCheckPart.py dir loop set FzpType %s\n', FzpType)
-                
-        # Check the dictionary to make sure we haven't already processed this
-        # svg as part of one of the fzp files we have already processed. 
-
-        logging.debug (' FritzingCheckPart.py dir loop trying FQInFile %s\n', FQInFile)
-
-        if not 'processed.' + FQInFile in FilesProcessed:
-
-            logging.debug (' FritzingCheckPart.py didn\'t find \"%s\" in FilesProcessed\n', 'processed.' + FQInFile )
-
-            # We haven't yet processed this file so do so now. 
-
-            # Initialize all the global variables before processing a new file.
-    
-            Errors, Warnings, Info, FzpDict, CurView, TagStack, State, InheritedAttributes = Fritzing.InitializeAll()
-    
-            print('\n**** Starting to process file {0:s}'.format(str(InFile)))
-    
-            if SvgExtRegex.search(BaseFile):
-    
-                # This looks to be an svg file so process it.
-    
-                # set the FzpType to None (as dir to dir processing doesn't 
-                # require filename translation).
-    
-                Doc = Fritzing.ProcessSvg(FzpType, 'SVG', FQInFile, FQOutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
-    
-            elif PartRegex.search(BaseFile):
-    
-                # This looks to be an part.filename.fzp file so process it.
-    
-                # set the FzpType to 'dir' (as dir to dir processing doesn't 
-                # require filename translation) and FileType to 'fzpPart'.
-    
-    
-                Doc = Fritzing.ProcessFzp(DirProcessing, FzpType, 'FZPPART', FQInFile, FQOutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
-    
-            elif FzpExtRegex.search(BaseFile):
-    
-                # This looks to be a filename.fzp file so process it.
-    
-                # set the FzpType to 'dir' (as dir to dir processing doesn't 
-                # require filename translation) and FileType to 'fzpFritz'.
-                # We do however need to add the PrefixDir to the output 
-                # filename.
-
-                FQOutFile = os.path.join(DstDir, PrefixDir)
-    
-                FQOutFile = os.path.join(FQOutFile, InFile)
-                
-                Doc = Fritzing.ProcessFzp(DirProcessing, FzpType, 'FZPFRITZ', FQInFile, FQOutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
-    
-            else:
-    
-                # Not a fritzing file type so warn about it but otherwise 
-                # ignore it.
-    
-                Warnings.append('Warning 1: File\n\n\'{0:s}\'\n\nIsn\'t a Fritzing file and has been ignored in processing the directory\n'.format(str(InFile)))
-    
-            # End of if SvgExtRegex.search(InFile):
-             
-            if len(Errors) != 0:
-    
-                # If we have seen errors in this file, note that to set the 
-                # eventual return code when all processing is done. 
-    
-                ErrorsSeen = 'Y'
-    
-            # End of if len(Errors) != 0:
-    
-            # Output the Info, Warnings and Errors associated with the document
-            # before they get cleared for the next file. 
-    
-            PP.PrintInfo(Info)
-    
-            PP.PrintWarnings(Warnings)
-    
-            PP.PrintErrors(Errors)
-
-        else:
-
-            logging.debug (' FritzingCheckPart.py skipped file %s as already proessed\n', FQInFile)
-
-        # End of if not 'processed.' + FQInFile in FilesProcessed:
-    
-    # End of for InFile in os.listdir(SrcDir):
+    # directory (one at a time or with a pool of processes if --jobs was 
+    # given) and write the results to the dst directory. 
+
+    ErrorsSeen, Errors = Fritzing.ProcessDir(SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug)
 
 elif FileType == 'SVG':
 
@@ -274,6 +287,8 @@ elif FileType == 'SVG':
 
     PP.PrintErrors(Errors)
 
+    Report.ReportFile(InFile, Fritzing.FzpModuleId(FzpDict), Errors, Warnings, Info)
+
 elif FileType == 'FZPPART':
 
     # This looks to be an fzpPart file so process it  Create the input file name
@@ -296,6 +311,8 @@ elif FileType == 'FZPPART':
 
     PP.PrintErrors(Errors)
 
+    Report.ReportFile(InFile, Fritzing.FzpModuleId(FzpDict), Errors, Warnings, Info)
+
 elif FileType == 'FZPFRITZ':    
 
     # This looks to be an fzp file so process it  Create the input file name
@@ -322,19 +339,76 @@ elif FileType == 'FZPFRITZ':
 
     PP.PrintErrors(Errors)
 
+    Report.ReportFile(InFile, Fritzing.FzpModuleId(FzpDict), Errors, Warnings, Info)
+
+elif FileType == 'FZPZ':
+
+    # A zipped part, so check the fzp and svgs in it without unzipping it 
+    # and (unless only checking) replace it with the new archive, keeping
+    # the original as filename.fzpz.bak.
+
+    InFile = os.path.join(Path, PrefixDir)
+
+    InFile = os.path.join(InFile, File)
+
+    Errors, Warnings, Info, ModuleId = Fritzing.ProcessFzpz(InFile, None, Options, Debug)
+
+    # Output the Info, Warnings and Errors associated with the archive
+
+    PP.PrintInfo(Info)
+
+    PP.PrintWarnings(Warnings)
+
+    PP.PrintErrors(Errors)
+
+    Report.ReportFile(InFile, ModuleId, Errors, Warnings, Info)
+
+elif FileType == 'SKETCH':
+
+    # A sketch (.fzz) or bin (.fzb) so audit the parts in it (nothing is 
+    # written).
+
+    InFile = os.path.join(Path, PrefixDir)
+
+    InFile = os.path.join(InFile, File)
+
+    Errors, Warnings, Info, ModuleId = Fritzing.ProcessSketch(InFile, Options, Debug)
+
+    # Output the Info, Warnings and Errors associated with the sketch
+
+    PP.PrintInfo(Info)
+
+    PP.PrintWarnings(Warnings)
+
+    PP.PrintErrors(Errors)
+
+    Report.ReportFile(InFile, ModuleId, Errors, Warnings, Info)
+
 else:
 
-    Errors.append('Error 8: Unknown FileType {0:s} (should not occur, software error)\n'.format(str(FileType)))
+    Errors.append(Diag.Diagnostic('Error 8: Unknown FileType {0:s} (should not occur, software error)\n', FileType))
 
 # End of if FileType == 'dir':
 
-if len(Errors) != 0:
+if len(Diag.Visible(Errors)) != 0:
 
-    # if there were errors set the flag so we exit non 0
+    # if there were (unsuppressed) errors set the flag so we exit non 0
 
     ErrorsSeen = 'y'
 
-# End of if len(Errors) != 0:
+# End of if len(Diag.Visible(Errors)) != 0:
+
+# Finish off the reports.
+
+Report.CloseReports()
+
+if Options['timing'] == 'y':
+
+    # Print the --timing summary.
+
+    Timing.PrintSummary(time.perf_counter() - RunWall, time.process_time() - RunCpu, Options['timingfile'])
+
+# End of if Options['timing'] == 'y':
 
 if ErrorsSeen == 'y':
 
@@ -348,4 +422,4 @@ else:
 
     sys.exit(0)
 
-# End of if ErrorsSeen == 'Y`:
+# End of if ErrorsSeen == 'y':
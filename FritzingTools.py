@@ -17,16 +17,79 @@ ModifyTerminal = 'n'
 
 IssueNameDupWarning = 'n'
 
-Version = '0.0.2'  # Version number of this file. 
+# Set to 'y' (by the --check option) to only check the files. Nothing is 
+# renamed to .bak, pretty printed or written (not even the copy of the icon
+# svg) so the exit code is the only result apart from the messages. 
+
+CheckOnly = 'n'
+
+# The usual prefix directories of a fritzing-parts directory in the order
+# --library processes them (any others follow in name order).
+
+LibraryOrder = ['core', 'contrib', 'user', 'obsolete']
+
+Version = '0.0.3'  # Version number of this file. 
 
 # Import copyfile
 
 from shutil import copyfile
 
-# Import os and sys to get file rename and the argv stuff, re for regex,
-# logging to get logging support and PPTools for the parse routine
+# Import os to get file rename, re for regex, logging to get logging 
+# support and PPTools for the parse routine
+
+import os, re, logging, PPTools as PP
+
+# Import multiprocessing for the --jobs process pool in directory mode.
+
+import multiprocessing
+
+# zipfile to read and write .fzpz files in memory.
+
+import zipfile
+
+# subprocess to ask git for the changed files for --git-range.
+
+import subprocess
+
+# and CacheTools for the --cache result cache.
+
+import CacheTools as Cache
+
+# and IndexTools for the --index dependency index.
+
+import IndexTools as Idx
+
+# and SketchTools for auditing sketches and bins.
 
-import os, sys, re, logging, PPTools as PP
+import SketchTools as Sketch
+
+# and CollisionTools for the --collisions library index.
+
+import CollisionTools as Collision
+
+# and OrphanTools for the --orphans report.
+
+import OrphanTools as Orphan
+
+# and DuplicateTools for the --duplicates report.
+
+import DuplicateTools as Duplicate
+
+# and PartModelTools for the part model the fzp checks build.
+
+import PartModelTools as Part
+
+# and DiagnosticTools for the Error, Warning and Info messages.
+
+import DiagnosticTools as Diag
+
+# and ReportTools for the --ndjson and --sarif reports.
+
+import ReportTools as Report
+
+# and TimingTools for the --timing counters.
+
+import TimingTools as Timing
 
 # and the lxml library for the xml
 
@@ -42,17 +105,13 @@ def InitializeAll():
 
     Info = []
 
-    FzpDict = {}
-
-    FzpDict['connectors.fzp.breadboardView'] = []
+    # FzpDict holds the flags for the file as a whole, the views,
+    # connectors, buses and subparts from the fzp are in the PartModel in
+    # FzpDict['partmodel'].
 
-    FzpDict['connectors.fzp.iconView'] = []
-
-    FzpDict['connectors.fzp.pcbView'] = []
-
-    FzpDict['connectors.fzp.schematicView'] = []
+    FzpDict = {}
 
-    FzpDict['views'] = []
+    FzpDict['partmodel'] = Part.PartModel()
 
     CurView = None
 
@@ -96,6 +155,14 @@ def ProcessArgs(Argv, Errors):
 
     FzpExtRegex = re.compile(r'\.fzp$', re.IGNORECASE)
 
+    # Regex to match .fzpz to find (zipped) fzpz files
+
+    FzpzExtRegex = re.compile(r'\.fzpz$', re.IGNORECASE)
+
+    # Regex to match .fzz and .fzb to find sketches and bins
+
+    SketchExtRegex = re.compile(r'\.(fzz|fzb)$', re.IGNORECASE)
+
     # Regex to match 'part. to identify an unzipped fzpz file'
 
     PartRegex = re.compile(r'^part\.', re.IGNORECASE)
@@ -122,11 +189,12 @@ def ProcessArgs(Argv, Errors):
 
     DstDir = None
 
-    if len(sys.argv) == 3:
+    if len(Argv) == 3 or (len(Argv) == 2 and CheckOnly == 'y' and os.path.isdir(Argv[1])):
 
         # If we have two directories, one empty, process all the fzp files in 
         # the first directory in to the empty second directory, creating 
-        # subdirectories as needed (but no backup files!) 
+        # subdirectories as needed (but no backup files!) When only checking
+        # (--check) nothing is written so the dst directory isn't needed. 
 
         DirProcessing, PrefixDir, Path, File, SrcDir, DstDir = ProcessDirArgs(Argv, Errors)
 
@@ -143,11 +211,11 @@ def ProcessArgs(Argv, Errors):
 
         return FileType, DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
 
-    elif len(sys.argv) != 2:
+    elif len(Argv) != 2:
 
         # No input file or too many arguments so print a usage message and exit.
 
-        Errors.append('Usage: {0:s} filename.fzp or filename.svg or srcdir dstdir\n'.format(str(sys.argv[0])))
+        Errors.append(Diag.Diagnostic('Usage: {0:s} filename.fzp or filename.svg or filename.fzpz or filename.fzz or filename.fzb or srcdir dstdir\n', Argv[0]))
 
         logging.info (' Exiting ProcessArgs\n')
 
@@ -157,7 +225,7 @@ def ProcessArgs(Argv, Errors):
 
         # only a single file is present so arrange to process it.
 
-        InFile = sys.argv[1]
+        InFile = Argv[1]
 
         logging.debug (' ProcessArgs: input filename %s\n', InFile)
 
@@ -169,17 +237,19 @@ def ProcessArgs(Argv, Errors):
 
         if (not os.path.isfile(InFile) or 
                 (SvgExtRegex.search(InFile) == None and
-                FzpExtRegex.search(InFile) == None)):
+                FzpExtRegex.search(InFile) == None and
+                FzpzExtRegex.search(InFile) == None and
+                SketchExtRegex.search(InFile) == None)):
 
             # Input file isn't valid, return a usage message.
 
-            Errors.append('Usage: {0:s} filename.fzp or filename.svg or srcdir dstdir\n\n\'{1:s}\'\n\neither isn\'t a file or doesn\'t end in .fzp or .svg\n'.format(str(sys.argv[0]),  str(InFile)))
+            Errors.append(Diag.Diagnostic('Usage: {0:s} filename.fzp or filename.svg or filename.fzpz or filename.fzz or filename.fzb or srcdir dstdir\n\n\'{1:s}\'\n\neither isn\'t a file or doesn\'t end in .fzp, .svg, .fzpz, .fzz or .fzb\n', Argv[0], InFile))
 
             logging.info (' Exiting ProcessArgs\n')
 
             return FileType, DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
 
-        # End of if not os.path.isfile(InFile) and not SvgExtRegex.search(InFile) and not FzpExtRegex.search(InFile):
+        # End of if not os.path.isfile(InFile) and not SvgExtRegex.search(InFile) and not FzpExtRegex.search(InFile) and not FzpzExtRegex.search(InFile) and not SketchExtRegex.search(InFile):
 
         Path = ''
 
@@ -207,6 +277,22 @@ def ProcessArgs(Argv, Errors):
 
             logging.debug (' ProcessArgs: Found svg input file %s set FileType %s\n', InFile, FileType)
 
+        elif FzpzExtRegex.search(File):
+
+            # a zipped part, whose members are checked in memory.
+
+            FileType = 'FZPZ'
+
+            logging.debug (' ProcessArgs: Found fzpz input file %s set FileType %s\n', InFile, FileType)
+
+        elif SketchExtRegex.search(File):
+
+            # a sketch or bin to audit.
+
+            FileType = 'SKETCH'
+
+            logging.debug (' ProcessArgs: Found sketch input file %s set FileType %s\n', InFile, FileType)
+
         else:
 
             # this is an fzp file of some kind so figure out which kind and 
@@ -244,7 +330,7 @@ def ProcessArgs(Argv, Errors):
     
                 if SplitDir[1] == '' or SplitDir[1] == '.' or SplitDir[1] == '..':
     
-                    Errors.append('Error 10: There must be a directory that is not \'.\' or \'..\' in the input name for\na fzp file in order to find the svg files.\n')
+                    Errors.append(Diag.Diagnostic('Error 10: There must be a directory that is not \'.\' or \'..\' in the input name for\na fzp file in order to find the svg files.\n'))
     
                     logging.info (' Exiting ProcessArgs no prefix dir error\n')
     
@@ -275,7 +361,7 @@ def ProcessArgs(Argv, Errors):
     
         # End of if SvgExtRegex.search(File):
 
-    # End of if len(sys.argv) == 3:
+    # End of if len(Argv) == 3 or (len(Argv) == 2 and CheckOnly == 'y' and os.path.isdir(Argv[1])):
 
     logging.debug (' ProcessArgs: End of ProcessArgs return FileType %s PrefixDir %s Path %s File %s\n', FileType, PrefixDir, Path, File)
 
@@ -285,464 +371,3600 @@ def ProcessArgs(Argv, Errors):
 
 # End of def ProcessArgs(Argv, Errors):
 
-def ProcessDirArgs(argv, Errors):
+def ProcessOptions(Argv, Errors):
 
-    logging.info (' Entering ProcessDirArgs\n')
+    # Strip the '--' options (which may appear anywhere on the command line)
+    # out of the argument list and return them in the Options dictionary 
+    # along with the remaining arguments (in the same form as sys.argv) for
+    # ProcessArgs to deal with as before. 
 
-    # Clear the return variables in case of error. 
+    logging.info (' Entering ProcessOptions\n')
 
-    DirProcessing = 'N'
+    # Set the defaults for all the options. 
 
-    PrefixDir = ""
+    Options = {'jobs': 1, 'cache': None, 'check': 'n', 'suppress': [], 'ndjson': None, 'sarif': None, 'timing': 'n', 'timingfile': None, 'watch': 'n', 'library': 'n', 'index': None, 'whouses': None, 'gitrange': None, 'parts': [], 'collisions': 'n', 'orphans': 'n', 'duplicates': 'n'}
 
-    Path = ""
+    # Copy the program name to the new argument list.
 
-    File = None
+    NewArgv = [Argv[0]]
 
-    # Get the 2 directories from the input arguments.
+    # Whether --jobs was given (rather than left at the default).
 
-    SrcDir = argv[1]
+    JobsGiven = False
 
-    DstDir = argv[2]
+    Index = 1
 
-    # Check that the source is a directory
+    while Index < len(Argv):
 
-    if not os.path.isdir(SrcDir):
+        Arg = Argv[Index]
 
-        Errors.append('Usage: {0:s} src_dir dst_dir\n\nsrc_dir {1:s} isn\'t a directory\n'.format(sys.argv[0], SrcDir))
+        if Arg == '--jobs' or Arg.startswith('--jobs='):
 
-        logging.info (' Exiting ProcessDirArgs src dir error\n')
+            # The number of processes to use in directory mode, either as
+            # '--jobs N' or '--jobs=N'. 0 means use all the cpus. 
 
-        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+            if Arg == '--jobs':
 
-    # End of if not os.path.isdir(SrcDir):
+                Index += 1
 
-    # then that the dest dir is a directory
+                if Index >= len(Argv):
 
-    if not os.path.isdir(DstDir):
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --jobs requires a number of processes\n', Argv[0]))
 
-        Errors.append('Usage: {0:s} src_dir dst_dir\n\ndst_dir {1:s} Isn\'t a directory\n'.format(sys.argv[0], DstDir))
+                    break
 
-        logging.info (' Exiting ProcessDirArgs dst dir error\n')
+                # End of if Index >= len(Argv):
 
-        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+                Value = Argv[Index]
 
-    # End of if not os.path.isdir(DstDir):
+            else:
 
-    # Both are directories so make sure the dest is empty
+                Value = Arg[len('--jobs='):]
 
-    if os.listdir(DstDir) != []:
+            # End of if Arg == '--jobs':
 
-        Errors.append('Error 13: dst dir\n\n{0:s}\n\nmust be empty and it is not\n'.format(str(DstDir)))
+            JobsGiven = True
 
-        logging.info (' Exiting ProcessDirArgs dst dir not empty error\n')
+            if not Value.isdigit():
 
-        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+                Errors.append(Diag.Diagnostic('Usage: {0:s} --jobs value \'{1:s}\' isn\'t a number of processes\n', Argv[0], Value))
 
-    # End of if os.listdir(DstDir) != []:
+            elif int(Value) == 0:
 
-    # Now get the last element of the src path to create the fzp and svg
-    # directories under the destination directory.
+                Options['jobs'] = os.cpu_count() or 1
 
-    SplitDir = os.path.split(SrcDir)
+            else:
 
-    logging.debug  (' ProcessDirArgs: SplitDir %s\n', SplitDir)
+                Options['jobs'] = int(Value)
 
-    if SplitDir[1] == '' or SplitDir[1] == '.' or SplitDir[1] == '..':
+            # End of if not Value.isdigit():
 
-        Errors.append('Error 10: There must be a directory that is not \'.\' or \'..\' in the input name for\na fzp file in order to find the svg files.\n')
+        elif Arg == '--cache' or Arg.startswith('--cache='):
 
-        logging.info (' Exiting ProcessDirArgs no prefix dir error\n')
+            # The directory to keep the result cache in, either as 
+            # '--cache DIR' or '--cache=DIR'. 
 
-        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+            if Arg == '--cache':
 
-    else:
-    
-        Path = SplitDir[0]
-    
-        PrefixDir =  SplitDir[1]
+                Index += 1
 
-        if PrefixDir == None:
+                if Index >= len(Argv):
 
-            # Insure PrefixDir has a string value for the directory routines. 
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --cache requires a cache directory\n', Argv[0]))
 
-            PrefixDir = ""
+                    break
 
-        # End of if PrefixDir == None:
+                # End of if Index >= len(Argv):
 
-        DstFzpDir = os.path.join(DstDir,PrefixDir) 
+                Options['cache'] = Argv[Index]
 
-        try:    
+            else:
 
-            os.makedirs(DstFzpDir)
+                Options['cache'] = Arg[len('--cache='):]
 
-        except os.error as e:
+            # End of if Arg == '--cache':
 
-            Errors.append('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n'.format(DstFzpDir), e.strerror, str(e.errno))
+        elif Arg == '--check':
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+            # Only check the files, don't rename or write anything.
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+            Options['check'] = 'y'
 
-        # End of try:
-    
-        logging.debug (' ProcessDirArgs: mkdir %s\n',DstFzpDir)
-        
-        # The fzp directory was created so create the base svg directory
-        
-        DstSvgDir = os.path.join(DstDir, 'svg')
-    
-        try:    
-    
-            os.makedirs(DstSvgDir)
+        elif Arg == '--suppress' or Arg.startswith('--suppress='):
 
-        except os.error as e:
+            # A comma separated list of message codes (such as 
+            # 'Warning2,Warning12') not to print, either as 
+            # '--suppress CODES' or '--suppress=CODES'. 
 
-            Errors.append('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n'.format(DstFzpDir), e.strerror, str(e.errno))
+            if Arg == '--suppress':
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+                Index += 1
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+                if Index >= len(Argv):
 
-        # End of try:
-    
-        logging.debug (' ProcessDirArgs: mkdir %s\n',DstSvgDir)
-        
-        DstSvgDir = os.path.join(DstSvgDir, PrefixDir)
-    
-        try:    
-        
-            os.makedirs(DstSvgDir)
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --suppress requires a list of message codes\n', Argv[0]))
 
-        except os.error as e:
+                    break
 
-            Errors.append('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n'.format(DstFzpDir), e.strerror, str(e.errno))
+                # End of if Index >= len(Argv):
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+                Value = Argv[Index]
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+            else:
 
-        # End of try:
-    
-        logging.debug (' ProcessDirArgs: mkdir %s\n', DstSvgDir)
-        
-        # then the four svg direcotries
-        
-        SvgDir = os.path.join(DstSvgDir, 'breadboard')
-    
-        try:    
-        
-            os.makedirs(SvgDir)
+                Value = Arg[len('--suppress='):]
 
-        except os.error as e:
+            # End of if Arg == '--suppress':
 
-            Errors.append('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n'.format(DstFzpDir), e.strerror, str(e.errno))
+            Diag.SetSuppressed(Value, Errors)
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+            Options['suppress'] = sorted(Diag.Suppressed)
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+        elif Arg in ('--ndjson', '--sarif') or Arg.startswith('--ndjson=') or Arg.startswith('--sarif='):
 
-        # End of try:
-    
-        logging.debug(' ProcessDirArgs: mkdir %s\n', SvgDir)
-        
-        SvgDir = os.path.join(DstSvgDir, 'icon')
-    
-        try:    
-        
-            os.makedirs(SvgDir)
+            # The file to write a json line per message (--ndjson) or a 
+            # SARIF log (--sarif) to, either as '--ndjson FILE' or 
+            # '--ndjson=FILE'. 
 
-        except os.error as e:
+            Option = Arg[2:].split('=')[0]
 
-            Errors.append('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n'.format(DstFzpDir), e.strerror, str(e.errno))
+            if not '=' in Arg:
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+                Index += 1
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+                if Index >= len(Argv):
 
-        # End of try:
-    
-        logging.debug(' ProcessDirArgs: mkdir %s\n', SvgDir)
-        
-        SvgDir = os.path.join(DstSvgDir, 'pcb')
-    
-        try:    
-        
-            os.makedirs(SvgDir)
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --{1:s} requires a report file name\n', Argv[0], Option))
 
-        except os.error as e:
+                    break
 
-            Errors.append('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n'.format(DstFzpDir), e.strerror, str(e.errno))
+                # End of if Index >= len(Argv):
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+                Options[Option] = Argv[Index]
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+            else:
 
-        # End of try:
-    
-        logging.debug(' ProcessDirArgs: mkdir %s\n', SvgDir)
-        
-        SvgDir = os.path.join(DstSvgDir, 'schematic')
-    
-        try:    
-        
-            os.makedirs(SvgDir)
+                Options[Option] = Arg[len(Option) + 3:]
 
-        except os.error as e:
+            # End of if not '=' in Arg:
 
-            Errors.append('Error, Creating dir {0:s} {1:s} ({2:s})\n'.format(DstFzpDir), e.strerror, str(e.errno))
+        elif Arg == '--timing' or Arg.startswith('--timing='):
 
-            logging.info (' Exiting ProcessDirArgs dir on error %s\n',e.strerror)
+            # Time each stage and check and print a summary at the end, 
+            # with the json dump of it going to the file from 
+            # '--timing=FILE' (or after the summary if there isn't one). 
 
-            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+            Options['timing'] = 'y'
 
-        # End of try:
-    
-        logging.debug(' ProcessDirArgs: mkdir %s\n', SvgDir)
+            if Arg != '--timing':
 
-    # End of if SplitDir[1] == '' or SplitDir[1] == '.' or SplitDir[1] == '..':
-        
-    # If we get here we have a src and dst directory plus all the required new
-    # dst directories so return all that to the calling routine. Set
-    # DirProcessing  to 'Y' to indicate success.
+                Options['timingfile'] = Arg[len('--timing='):]
 
-    DirProcessing,  = 'Y'
+            # End of if Arg != '--timing':
 
-    # Then set FileType to 'dir' from None to not cause a silent error exit
-    # on return. 
+        elif Arg == '--watch' or Arg == '--watch=poll':
 
-    FileType = 'dir'
+            # Check the file or src directory, then keep checking it again
+            # as it changes (see WatchTools.py), polling for changes rather
+            # than using inotify with '--watch=poll'. Nothing is written
+            # while watching, so this implies --check.
 
-    logging.debug (' ProcessDirArgs returning DirProcessing %s PrefixDir %s Path %s File %s SrcDir %s DstDir %s\n', DirProcessing, PrefixDir, Path, File, SrcDir, DstDir)
+            Options['watch'] = Arg[len('--watch='):] or 'y'
 
-    logging.info (' Exiting ProcessDirArgs\n')
+            Options['check'] = 'y'
 
-    return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+        elif Arg == '--library':
 
-# End of def ProcessDirArgs(Argv, Errors):
+            # The argument is a whole fritzing-parts directory (core, 
+            # contrib, user, obsolete ... and svg) rather than one prefix
+            # directory. 
 
-def PopTag(TagStack, Level):
+            Options['library'] = 'y'
 
-    # Determine from the current level if the value on the tag stack is still
-    # in scope. If it is not, then remove the value from the stack.
+        elif Arg == '--collisions':
 
-    logging.info (' Entering PopTag Level %s\n', Level)
+            # Rather than checking the files, report the moduleIds, 
+            # referenceFiles and families that more than one fzp has.
 
-    logging.debug(' PopTag: entry TagStack %s Level %s\n', TagStack, Level)
+            Options['collisions'] = 'y'
 
-    Tag, StackLevel = TagStack[len(TagStack) - 1]
+        elif Arg == '--orphans':
 
-    # Because we may have exited several recusion levels before calling this
-    # delete all the tags below the current level. 
+            # Rather than checking the files, report the svgs that are 
+            # missing, differ in case or aren't used by any fzp.
 
-    while Level != 0 and StackLevel >= Level:
+            Options['orphans'] = 'y'
 
-        # Pop the last item from the stack.
+        elif Arg == '--duplicates':
 
-        logging.debug(' PopTag: popped Tag %s, StackLevel %s\n', Tag, StackLevel )
+            # Rather than checking the files, report the svgs that are the
+            # same (or nearly the same) as another svg once canonicalized.
 
-        TagStack.pop(len(TagStack) - 1)
+            Options['duplicates'] = 'y'
 
-        Tag, StackLevel = TagStack[len(TagStack) - 1]
+        elif Arg in ('--index', '--who-uses') or Arg.startswith('--index=') or Arg.startswith('--who-uses='):
 
-    # End of while Level != 0 and StackLevel >= Level:
+            # The dependency index file to only check what has changed 
+            # since the last run (--index FILE or --index=FILE) and the svg
+            # to list the users of from it (--who-uses SVG or 
+            # --who-uses=SVG). 
 
-    logging.debug(' PopTag: exit TagStack %s Level %s\n', TagStack, Level)
+            Option = Arg[2:].split('=')[0]
 
-    logging.info (' Exiting PopTag Level %s\n', Level)
+            if not '=' in Arg:
 
-# End of def PopTag(Elem, TagStack, Level):
+                Index += 1
 
-def BackupFilename(InFile, Errors):
+                if Index >= len(Argv):
 
-    logging.info (' Entering BackupFilename\n')
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --{1:s} requires a file name\n', Argv[0], Option))
 
-    # First set the appropriate output file name None for an error condition.
+                    break
 
-    OutFile = None
+                # End of if Index >= len(Argv):
 
-    try:
+                Value = Argv[Index]
 
-        # Then try and rename the input file to InFile.bak
+            else:
 
-        os.rename (InFile, InFile + '.bak')
+                Value = Arg[len(Option) + 3:]
 
-    except os.error as e:
+            # End of if not '=' in Arg:
 
-        Errors.append('Error 15: Can not rename\n\n\'{0:s}\'\n\nto\n\n\'{1:s}\'\n\n\'{2:s}\'\n\n{3:s} ({4:s})\n'.format(str(InFile), str(InFile + '.bak'), str( e.filename), e.strerror, str(e.errno)))
+            Options[Option.replace('-', '')] = Value
 
-        return InFile, OutFile
+        elif Arg == '--git-range' or Arg.startswith('--git-range='):
 
-    # End of try:
+            # Only check the files changed in a git revision range (such as
+            # main..HEAD) and the fzps that use a changed svg, either as
+            # '--git-range RANGE' or '--git-range=RANGE'.
 
-    # If we get here, then the file was successfully renamed so change the 
-    # filenames and return.
+            if Arg == '--git-range':
 
-    OutFile = InFile
+                Index += 1
 
-    InFile = InFile + '.bak'
+                if Index >= len(Argv):
 
-    return InFile, OutFile
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --git-range requires a revision range\n', Argv[0]))
 
-    logging.info (' Exiting BackupFilename\n')
+                    break
 
-# End of def BackupFilename(InFile, Errors):
+                # End of if Index >= len(Argv):
 
-def DupNameError(InFile, Id, Elem, Errors):
+                Options['gitrange'] = Argv[Index]
 
-    logging.info (' Entering DupNameError:\n')
+            else:
 
-    logging.debug (' DupNameError: Entry InFile %s Id %s Elem %s Errors %s\n', InFile, Id, Elem, Errors)
+                Options['gitrange'] = Arg[len('--git-range='):]
 
-    # Log duplicate name error 
+            # End of if Arg == '--git-range':
 
-    Errors.append('Error 16: File\n\'{0:s}\'\nAt line {1:s}\n\nId {2:s} present more than once (and should be unique)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+        elif Arg == '--parts' or Arg.startswith('--parts='):
 
-    logging.info (' Exiting DupNameError\n')
+            # A parts library directory (such as fritzing-parts) to look up
+            # the moduleIds of the parts in sketches and bins in, either as
+            # '--parts DIR' or '--parts=DIR', which can be given more than
+            # once.
 
-#End of def DupNameError(InFile, Id, Elem, Errors):
+            if Arg == '--parts':
 
-def DupNameWarning(InFile, Id, Elem, Warnings):
+                Index += 1
 
-    logging.info (' Entering DupNameWarning:\n')
+                if Index >= len(Argv):
 
-    logging.debug (' DupNameWarning: Entry InFile %s Id %s Elem %s Errors %s\n', InFile, Id, Elem, Warnings)
+                    Errors.append(Diag.Diagnostic('Usage: {0:s} --parts requires a parts directory\n', Argv[0]))
 
-    # Log duplicate name warning
+                    break
 
-    Warnings.append('Warning 28: File\n\'{0:s}\'\nAt line {1:s}\n\nname {2:s} present more than once (and should be unique)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                # End of if Index >= len(Argv):
 
-    logging.info (' Exiting DupNameWarning\n')
+                Value = Argv[Index]
 
-#End of def DupNameWarning(InFile, Id, Elem, Warnings):
+            else:
 
-def ProcessTree(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level=0):
+                Value = Arg[len('--parts='):]
 
-    # Potentially recursively process the element nodes of an lxml tree to 
-    # aquire the information we need to check file integrity. This routine gets
-    # called recursively to process child nodes (other routines get called for
-    # leaf node processing). 
+            # End of if Arg == '--parts':
 
-    logging.info (' Entering ProcessTree FileType %s InFile %s Level %s\n', FileType, InFile, Level)
+            if not os.path.isdir(Value):
 
-    logging.debug (' **** ProcessTree: Source line %s Elem len %s Level %s\nTag %s\nattributes\n%s\ntext %s\nFzpType %s FileType %s InFile %s OutFile %s CurView %s PrefixDir %s Errors %s Warnings %s Info %s TagStack %s State %s InheritedAttributes %s\n', Elem.sourceline, len(Elem), Level, Elem.tag, Elem.attrib, Elem.text, FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, Warnings, Info, TagStack, State, InheritedAttributes)
+                Errors.append(Diag.Diagnostic('Usage: {0:s} --parts directory \'{1:s}\' isn\'t a directory\n', Argv[0], Value))
 
+            # End of if not os.path.isdir(Value):
 
-    # Start by checking for non whitespace charactes in tail (which is likely
-    # an error) and flag the line if present. 
+            Options['parts'].append(Value)
 
-    Tail = Elem.tail
+        elif Arg.startswith('--'):
 
-    logging.debug (' ProcessTree: Tail = \'%s\'\n', Tail)
+            Errors.append(Diag.Diagnostic('Usage: {0:s} unknown option \'{1:s}\'\n', Argv[0], Arg))
 
-    if Tail != None and not Tail.isspace(): 
+        else:
 
-        Warnings.append('Warning 2: File\n\'{0:s}\'\nAt line {1:s}\n\nText \'{2:s}\' isn\'t white space and may cause a problem\n'.format(str(InFile), str(Elem.sourceline), str(Tail)))
-        
-    # End of if not Elem.tail.isspace(): 
+            # Not an option so pass it on to ProcessArgs.
 
-    if len(Elem):
+            NewArgv.append(Arg)
 
-        logging.debug (' ProcessTree: Procees parent node attributes Source line %s len %s Level %s tag %s\n', Elem.sourceline, len(Elem), Level, Elem.tag)
+        # End of if Arg == '--jobs' or Arg.startswith('--jobs='):
 
-        ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level)
+        Index += 1
 
-        logging.debug (' ProcessTree: Child nodes Source line %s len %s Level %s tag %s\n', Elem.sourceline, len(Elem), Level, Elem.tag)
+    # End of while Index < len(Argv):
 
-        # This node has children so recurse down the tree to deal with them.
+    if Options['library'] == 'y' and Options['watch'] != 'n':
 
-        for Elem in Elem:
+        Errors.append(Diag.Diagnostic('Usage: {0:s} --watch can\'t be used with --library\n', Argv[0]))
 
-            if len(Elem):
+    # End of if Options['library'] == 'y' and Options['watch'] != 'n':
 
-                # this node has children so process them (the attributes of 
-                # this node will be processed by the recursion call and the 
-                # level will be increased by one.) 
+    if Options['whouses'] != None and Options['index'] == None:
 
-                ProcessTree(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level+1)
+        Errors.append(Diag.Diagnostic('Usage: {0:s} --who-uses needs the --index to look in\n', Argv[0]))
 
-            else: # This particular element in the for loop is a leaf node.
+    elif Options['index'] != None and Options['whouses'] == None and (Options['check'] != 'y' or Options['watch'] != 'n'):
 
-                # As this is a leaf node proecess it again increasing the 
-                # level by 1 before doing the call. 
+        # Only what has changed is checked, so there wouldn't be a 
+        # complete dst dir to write in to (and --watch does its own 
+        # tracking of changes). 
 
-                ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level+1)
+        Errors.append(Diag.Diagnostic('Usage: {0:s} --index needs --check (and can\'t be used with --watch)\n', Argv[0]))
 
-            # End of if len(Elem):
+    # End of if Options['whouses'] != None and Options['index'] == None:
 
-        # End of for Elem in Elem:
+    if Options['gitrange'] != None:
 
-    else:
-    
-        # This is a leaf node and thus the level needs to be increased by 1
-        # before we process it.  
+        if Options['index'] != None or Options['watch'] != 'n':
 
-        ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level+1)
+            Errors.append(Diag.Diagnostic('Usage: {0:s} --git-range can\'t be used with --index or --watch\n', Argv[0]))
 
-    # end of if len(Elem):
+        # End of if Options['index'] != None or Options['watch'] != 'n':
 
-    logging.info (' Exiting ProcessTree Level %s\n', Level)
+        if not JobsGiven:
 
-# End of def ProcessTree(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level=0):
+            # The changed files are checked in parallel unless --jobs says
+            # otherwise.
 
-def ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level):
+            Options['jobs'] = os.cpu_count() or 1
 
-    logging.info (' Entering ProcessLeafNode FileType %s Level %s\n', FileType, Level)
+        # End of if not JobsGiven:
 
-    logging.debug (' ProcessLeafNode: FzpType %s FileType %s InFile %s CurView %s Errors %s\n', FzpType, FileType, InFile,CurView, Errors)
+    # End of if Options['gitrange'] != None:
 
-    # Start by checking for non whitespace charactes in tail (which is likely
-    # an error) and flag the line if present. 
+    for Option in ('collisions', 'orphans', 'duplicates'):
 
-    Tail = Elem.tail
+        if Options[Option] == 'y' and (Options['check'] != 'y' or Options['watch'] != 'n' or Options['index'] != None or Options['gitrange'] != None):
 
-    logging.debug (' ProcessLeafNode: Tail = \'%s\'\n', Tail)
+            # Nothing is checked or written, and every fzp is needed.
 
-    if Tail != None and not Tail.isspace(): 
+            Errors.append(Diag.Diagnostic('Usage: {0:s} --{1:s} needs --check (and can\'t be used with --watch, --index or --git-range)\n', Argv[0], Option))
 
-        Warnings.append('Warning 2: File\n\'{0:s}\'\nAt line {1:s}\n\nText  \'{2:s}\' isn\'t white space and may cause a problem\n'.format(str(InFile), str(Elem.sourceline), str(Tail)))
-        
-    # End of if not Elem.tail.isspace(): 
+        # End of if Options[Option] == 'y' and (Options['check'] != 'y' or Options['watch'] != 'n' or Options['index'] != None or Options['gitrange'] != None):
 
-    # Select the appropriate leaf node processing routing based on the FileType
-    # variable. 
+    # End of for Option in ('collisions', 'orphans', 'duplicates'):
 
-    if FileType == 'FZPFRITZ' or  FileType == 'FZPPART':
+    if [Options['collisions'], Options['orphans'], Options['duplicates']].count('y') > 1:
 
-        # If this is a fzp file do the leaf node processing for that. 
+        Errors.append(Diag.Diagnostic('Usage: {0:s} only one of --collisions, --orphans and --duplicates can be used\n', Argv[0]))
 
-        ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, Level)
-        
-    elif FileType == 'SVG':
+    # End of if [Options['collisions'], Options['orphans'], Options['duplicates']].count('y') > 1:
 
-        ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Level)
+    if Options['duplicates'] == 'y' and not JobsGiven:
 
-    else:
+        # The svgs are canonicalized in parallel unless --jobs says
+        # otherwise.
 
-        if not 'SoftwareError' in State:
+        Options['jobs'] = os.cpu_count() or 1
 
-            # Report the software error once, then set 'SoftwareError' in State
-            # to supress more messages and just return. It won't work right 
-            # but the problem will at least be reported. 
+    # End of if Options['duplicates'] == 'y' and not JobsGiven:
 
-            Errors.append('Error 19: File\n\'{0:s}\'\n\nFile type {1:s} is an unknown format (software error)\n'.format(str(InFile), str(FileType)))
+    logging.debug (' ProcessOptions: Options %s NewArgv %s\n', Options, NewArgv)
 
-            State['SoftwareError'] = 'y'
+    logging.info (' Exiting ProcessOptions\n')
 
-        # End of if not 'SoftwareError' in State:
+    return Options, NewArgv
 
-    # End of if FileType == 'FZPFRITZ' or  FileType == 'FZPPART':
+# End of def ProcessOptions(Argv, Errors):
 
-    logging.info (' Exiting ProcessLeafNode Level %s\n', Level)
+def ProcessDirArgs(argv, Errors):
+
+    logging.info (' Entering ProcessDirArgs\n')
+
+    # Clear the return variables in case of error. 
+
+    DirProcessing = 'N'
+
+    PrefixDir = ""
+
+    Path = ""
+
+    File = None
+
+    # Get the 2 directories from the input arguments.
+
+    SrcDir = argv[1]
+
+    if len(argv) > 2:
+
+        DstDir = argv[2]
+
+    else:
+
+        # Check only with no dst directory.
+
+        DstDir = None
+
+    # End of if len(argv) > 2:
+
+    # Check that the source is a directory
+
+    if not os.path.isdir(SrcDir):
+
+        Errors.append(Diag.Diagnostic('Usage: {0:s} src_dir dst_dir\n\nsrc_dir {1:s} isn\'t a directory\n', argv[0], SrcDir))
+
+        logging.info (' Exiting ProcessDirArgs src dir error\n')
+
+        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+    # End of if not os.path.isdir(SrcDir):
+
+    # then that the dest dir (if there is one) is a directory
+
+    if DstDir != None and not os.path.isdir(DstDir):
+
+        Errors.append(Diag.Diagnostic('Usage: {0:s} src_dir dst_dir\n\ndst_dir {1:s} Isn\'t a directory\n', argv[0], DstDir))
+
+        logging.info (' Exiting ProcessDirArgs dst dir error\n')
+
+        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+    # End of if DstDir != None and not os.path.isdir(DstDir):
+
+    # Both are directories so make sure the dest is empty
+
+    if DstDir != None and os.listdir(DstDir) != []:
+
+        Errors.append(Diag.Diagnostic('Error 13: dst dir\n\n{0:s}\n\nmust be empty and it is not\n', DstDir))
+
+        logging.info (' Exiting ProcessDirArgs dst dir not empty error\n')
+
+        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+    # End of if DstDir != None and os.listdir(DstDir) != []:
+
+    # Now get the last element of the src path to create the fzp and svg
+    # directories under the destination directory.
+
+    SplitDir = os.path.split(SrcDir)
+
+    logging.debug  (' ProcessDirArgs: SplitDir %s\n', SplitDir)
+
+    if SplitDir[1] == '' or SplitDir[1] == '.' or SplitDir[1] == '..':
+
+        Errors.append(Diag.Diagnostic('Error 10: There must be a directory that is not \'.\' or \'..\' in the input name for\na fzp file in order to find the svg files.\n'))
+
+        logging.info (' Exiting ProcessDirArgs no prefix dir error\n')
+
+        return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+    else:
+    
+        Path = SplitDir[0]
+    
+        PrefixDir =  SplitDir[1]
+
+        if PrefixDir == None:
+
+            # Insure PrefixDir has a string value for the directory routines. 
+
+            PrefixDir = ""
+
+        # End of if PrefixDir == None:
+
+        if DstDir == None:
+
+            # Check only, so there are no dst directories to create.
+
+            DirProcessing = 'Y'
+
+            logging.info (' Exiting ProcessDirArgs with no dst dir\n')
+
+            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+        # End of if DstDir == None:
+
+        if MakeDstDirs(DstDir, PrefixDir, Errors) != 'Y':
+
+            logging.info (' Exiting ProcessDirArgs on dst dir error\n')
+
+            return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+        # End of if MakeDstDirs(DstDir, PrefixDir, Errors) != 'Y':
+
+    # End of if SplitDir[1] == '' or SplitDir[1] == '.' or SplitDir[1] == '..':
+        
+    # If we get here we have a src and dst directory plus all the required new
+    # dst directories so return all that to the calling routine. Set
+    # DirProcessing  to 'Y' to indicate success.
+
+    DirProcessing,  = 'Y'
+
+    # Then set FileType to 'dir' from None to not cause a silent error exit
+    # on return. 
+
+    FileType = 'dir'
+
+    logging.debug (' ProcessDirArgs returning DirProcessing %s PrefixDir %s Path %s File %s SrcDir %s DstDir %s\n', DirProcessing, PrefixDir, Path, File, SrcDir, DstDir)
+
+    logging.info (' Exiting ProcessDirArgs\n')
+
+    return DirProcessing, PrefixDir, Path, File, SrcDir, DstDir
+
+# End of def ProcessDirArgs(Argv, Errors):
+
+def ProcessLibraryArgs(Argv, Errors):
+
+    # Process the arguments for --library, a fritzing-parts directory (with
+    # the prefix directories such as core and contrib and the svg directory
+    # in it) and an empty dst directory (which isn't needed with --check).
+    # Returns the same values as ProcessArgs with a FileType of 'library'
+    # (or None on an error) and the parts directory in SrcDir. 
+
+    logging.info (' Entering ProcessLibraryArgs\n')
+
+    FileType = None
+
+    DirProcessing = 'N'
+
+    SrcDir = None
+
+    DstDir = None
+
+    if len(Argv) != 3 and not (len(Argv) == 2 and CheckOnly == 'y'):
+
+        Errors.append(Diag.Diagnostic('Usage: {0:s} --library parts_dir dst_dir (or --check --library parts_dir)\n', Argv[0]))
+
+        logging.info (' Exiting ProcessLibraryArgs usage error\n')
+
+        return FileType, DirProcessing, "", "", None, SrcDir, DstDir
+
+    # End of if len(Argv) != 3 and not (len(Argv) == 2 and CheckOnly == 'y'):
+
+    SrcDir = Argv[1]
+
+    if len(Argv) == 3:
+
+        DstDir = Argv[2]
+
+    # End of if len(Argv) == 3:
+
+    if not os.path.isdir(SrcDir):
+
+        Errors.append(Diag.Diagnostic('Usage: {0:s} --library parts_dir dst_dir\n\nparts_dir {1:s} isn\'t a directory\n', Argv[0], SrcDir))
+
+    elif DstDir != None and not os.path.isdir(DstDir):
+
+        Errors.append(Diag.Diagnostic('Usage: {0:s} --library parts_dir dst_dir\n\ndst_dir {1:s} Isn\'t a directory\n', Argv[0], DstDir))
+
+    elif DstDir != None and os.listdir(DstDir) != []:
+
+        Errors.append(Diag.Diagnostic('Error 13: dst dir\n\n{0:s}\n\nmust be empty and it is not\n', DstDir))
+
+    else:
+
+        FileType = 'library'
+
+        DirProcessing = 'Y'
+
+    # End of if not os.path.isdir(SrcDir):
+
+    logging.info (' Exiting ProcessLibraryArgs\n')
+
+    return FileType, DirProcessing, "", "", None, SrcDir, DstDir
+
+# End of def ProcessLibraryArgs(Argv, Errors):
+
+def LibraryWorkList(PartsDir):
+
+    # Find the prefix directories (every directory with fzp files in it 
+    # other than svg, the usual ones first) of a fritzing-parts directory
+    # and return them and the work list (see DirWorkList) for all of them,
+    # listing each directory just once. 
+
+    logging.info (' Entering LibraryWorkList PartsDir %s\n', PartsDir)
+
+    Prefixes = []
+
+    WorkList = []
+
+    Dirs = sorted(os.listdir(PartsDir), key=lambda Dir: (LibraryOrder.index(Dir) if Dir in LibraryOrder else len(LibraryOrder), Dir))
+
+    for PrefixDir in Dirs:
+
+        SrcDir = os.path.join(PartsDir, PrefixDir)
+
+        if PrefixDir == 'svg' or PrefixDir.startswith('.') or not os.path.isdir(SrcDir):
+
+            continue
+
+        # End of if PrefixDir == 'svg' or PrefixDir.startswith('.') or not os.path.isdir(SrcDir):
+
+        PrefixWorkList = DirWorkList(SrcDir, PrefixDir, 'y')
+
+        if any(InFile.lower().endswith('.fzp') for SrcDir, PrefixDir, InFile, Name in PrefixWorkList):
+
+            Prefixes.append(PrefixDir)
+
+            WorkList.extend(PrefixWorkList)
+
+        # End of if any(InFile.lower().endswith('.fzp') for SrcDir, PrefixDir, InFile, Name in PrefixWorkList):
+
+    # End of for PrefixDir in Dirs:
+
+    logging.debug (' LibraryWorkList: Prefixes %s Files %s\n', Prefixes, len(WorkList))
+
+    logging.info (' Exiting LibraryWorkList\n')
+
+    return Prefixes, WorkList
+
+# End of def LibraryWorkList(PartsDir):
+
+def ProcessLibrary(PartsDir, DstDir, FilesProcessed, Options, Debug):
+
+    # Check (and with a DstDir, fix in to DstDir in the same layout) every 
+    # prefix directory of a fritzing-parts directory in one work list, so
+    # the directory indexes and the processed svgs are shared by all of 
+    # them and with --jobs one pool does the whole library. Returns the 
+    # same as ProcessDir. 
+
+    logging.info (' Entering ProcessLibrary PartsDir %s DstDir %s\n', PartsDir, DstDir)
+
+    Errors = []
+
+    Prefixes, WorkList = LibraryWorkList(PartsDir)
+
+    if len(Prefixes) == 0:
+
+        Errors.append(Diag.Diagnostic('Error 88: parts dir\n\n{0:s}\n\nhas no prefix directories (such as core) with fzp files in them\n', PartsDir))
+
+        PP.PrintErrors(Errors)
+
+        logging.info (' Exiting ProcessLibrary no prefix dirs\n')
+
+        return 'y', Errors
+
+    # End of if len(Prefixes) == 0:
+
+    if DstDir != None:
+
+        for PrefixDir in Prefixes:
+
+            if MakeDstDirs(DstDir, PrefixDir, Errors) != 'Y':
+
+                PP.PrintErrors(Errors)
+
+                logging.info (' Exiting ProcessLibrary on dst dir error\n')
+
+                return 'y', Errors
+
+            # End of if MakeDstDirs(DstDir, PrefixDir, Errors) != 'Y':
+
+        # End of for PrefixDir in Prefixes:
+
+    # End of if DstDir != None:
+
+    print('**** Checking {0:d} files in {1:s}'.format(len(WorkList), ', '.join(Prefixes)))
+
+    if Options['index'] != None:
+
+        ErrorsSeen, Errors = ProcessIndexedWorkList(WorkList, PartsDir, DstDir, 'Y', FilesProcessed, Options, Debug)
+
+    elif Options['gitrange'] != None:
+
+        ErrorsSeen, Errors = ProcessGitWorkList(WorkList, PartsDir, DstDir, 'Y', FilesProcessed, Options, Debug)
+
+    elif Options['collisions'] == 'y':
+
+        ErrorsSeen, Errors = ProcessCollisionWorkList(WorkList, Options, Debug)
+
+    elif Options['orphans'] == 'y':
+
+        ErrorsSeen, Errors = ProcessOrphanWorkList(WorkList, [os.path.join(PartsDir, 'svg')], Options, Debug)
+
+    elif Options['duplicates'] == 'y':
+
+        ErrorsSeen, Errors = ProcessDuplicateWorkList(WorkList, [os.path.join(PartsDir, 'svg')], Options, Debug)
+
+    else:
+
+        ErrorsSeen, Errors = ProcessWorkList(WorkList, DstDir, 'Y', FilesProcessed, Options, Debug)
+
+    # End of if Options['index'] != None:
+
+    logging.info (' Exiting ProcessLibrary\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessLibrary(PartsDir, DstDir, FilesProcessed, Options, Debug):
+
+def MakeDstDirs(DstDir, PrefixDir, Errors):
+
+    # Create the PrefixDir fzp directory and the svg/PrefixDir view 
+    # directories under DstDir. Returns 'Y' if they were all created or 'N'
+    # (with an error) if one couldn't be. 
+
+    logging.info (' Entering MakeDstDirs DstDir %s PrefixDir %s\n', DstDir, PrefixDir)
+
+    DstFzpDir = os.path.join(DstDir,PrefixDir) 
+
+    try:    
+
+        os.makedirs(DstFzpDir)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug (' MakeDstDirs: mkdir %s\n',DstFzpDir)
+    
+    # The fzp directory was created so create the base svg directory (which
+    # will already be there for the second and later prefix directories of
+    # a library). 
+    
+    DstSvgDir = os.path.join(DstDir, 'svg')
+
+    try:    
+
+        os.makedirs(DstSvgDir, exist_ok=True)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug (' MakeDstDirs: mkdir %s\n',DstSvgDir)
+    
+    DstSvgDir = os.path.join(DstSvgDir, PrefixDir)
+
+    try:    
+    
+        os.makedirs(DstSvgDir)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug (' MakeDstDirs: mkdir %s\n', DstSvgDir)
+    
+    # then the four svg direcotries
+    
+    SvgDir = os.path.join(DstSvgDir, 'breadboard')
+
+    try:    
+    
+        os.makedirs(SvgDir)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug(' MakeDstDirs: mkdir %s\n', SvgDir)
+    
+    SvgDir = os.path.join(DstSvgDir, 'icon')
+
+    try:    
+    
+        os.makedirs(SvgDir)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug(' MakeDstDirs: mkdir %s\n', SvgDir)
+    
+    SvgDir = os.path.join(DstSvgDir, 'pcb')
+
+    try:    
+    
+        os.makedirs(SvgDir)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 14: Creating dir\n\n{0:s} {1:s} \({2:s}\)\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug(' MakeDstDirs: mkdir %s\n', SvgDir)
+    
+    SvgDir = os.path.join(DstSvgDir, 'schematic')
+
+    try:    
+    
+        os.makedirs(SvgDir)
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error, Creating dir {0:s} {1:s} ({2:s})\n', DstFzpDir, e.strerror, e.errno))
+
+        logging.info (' Exiting MakeDstDirs on error %s\n',e.strerror)
+
+        return 'N'
+
+    # End of try:
+
+    logging.debug(' MakeDstDirs: mkdir %s\n', SvgDir)
+
+    logging.info (' Exiting MakeDstDirs\n')
+
+    return 'Y'
+
+# End of def MakeDstDirs(DstDir, PrefixDir, Errors):
+
+def ProcessDir(SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug):
+
+    # The input is two directories (src and dst), so process the files in src
+    # directory and write the results to the dst directory. There are three 
+    # cases, One: a directory of svg files only, which will be processed and 
+    # written to the dst directory (although the empty directories for the 
+    # svg files will be there as well) Two: a fzp file where first the fzp 
+    # file will be processed, and then its associated svg files will be 
+    # processed (with data from the fzp file to check against the svg data) 
+    # and written in to the corresponding directories under the dst 
+    # directory. Three: a part.filename.fzp which will be processed in to 
+    # the dst directory, and then its associated svg files which will also be 
+    # processed in to the dst directory (again with the empty svg directories 
+    # being present as well). As the fzp file is processed (and its associated
+    # svgs) the svg filenames will be added to the FilesProcessed dictionary 
+    # and tested for here so that the svg does not get processed as part of 
+    # the fzp and then again as the individual svg (without the connector 
+    # information from the fzp) to avoid duplication, less information 
+    # (because of no fzp data), confusion and most importantly loss of the 
+    # original input file. Any svg files that aren't referenced by an fzp will 
+    # get processed as svg files though. If Options['jobs'] is more than 1 
+    # the files are farmed out to a pool of processes (see 
+    # ProcessDirParallel) but the output is the same as doing them one at a 
+    # time. Returns ErrorsSeen ('y' if any file had errors) and the Errors 
+    # from the last file processed. 
+
+    logging.info (' Entering ProcessDir SrcDir %s DstDir %s PrefixDir %s Options %s\n', SrcDir, DstDir, PrefixDir, Options)
+
+    if Options['index'] != None:
+
+        ErrorsSeen, Errors = ProcessIndexedWorkList(DirWorkList(SrcDir, PrefixDir, 'n'), SrcDir, DstDir, DirProcessing, FilesProcessed, Options, Debug)
+
+    elif Options['gitrange'] != None:
+
+        ErrorsSeen, Errors = ProcessGitWorkList(DirWorkList(SrcDir, PrefixDir, 'n'), SrcDir, DstDir, DirProcessing, FilesProcessed, Options, Debug)
+
+    elif Options['collisions'] == 'y':
+
+        ErrorsSeen, Errors = ProcessCollisionWorkList(DirWorkList(SrcDir, PrefixDir, 'n'), Options, Debug)
+
+    elif Options['orphans'] == 'y':
+
+        ErrorsSeen, Errors = ProcessOrphanWorkList(DirWorkList(SrcDir, PrefixDir, 'n'), [os.path.join(SrcDir, '..', 'svg', PrefixDir)], Options, Debug)
+
+    elif Options['duplicates'] == 'y':
+
+        ErrorsSeen, Errors = ProcessDuplicateWorkList(DirWorkList(SrcDir, PrefixDir, 'n'), [os.path.join(SrcDir, '..', 'svg', PrefixDir)], Options, Debug)
+
+    else:
+
+        ErrorsSeen, Errors = ProcessWorkList(DirWorkList(SrcDir, PrefixDir, 'n'), DstDir, DirProcessing, FilesProcessed, Options, Debug)
+
+    # End of if Options['index'] != None:
+
+    logging.info (' Exiting ProcessDir\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessDir(SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug):
+
+def DirWorkList(SrcDir, PrefixDir, Library):
+
+    # The work list for the files in SrcDir in directory order, each entry
+    # is [SrcDir, PrefixDir, file name, the name to print] where the name to
+    # print is the file name, or PrefixDir/file name if Library is 'y' (so 
+    # files from different prefix directories can be told apart). 
+
+    WorkList = []
+
+    for InFile in os.listdir(SrcDir):
+
+        if Library == 'y':
+
+            WorkList.append([SrcDir, PrefixDir, InFile, os.path.join(PrefixDir, InFile)])
+
+        else:
+
+            WorkList.append([SrcDir, PrefixDir, InFile, InFile])
+
+        # End of if Library == 'y':
+
+    # End of for InFile in os.listdir(SrcDir):
+
+    return WorkList
+
+# End of def DirWorkList(SrcDir, PrefixDir, Library):
+
+def ProcessWorkList(WorkList, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+    # Process the files in WorkList (from DirWorkList, for one src directory
+    # or the prefix directories of a library) in order in to DstDir as 
+    # described for ProcessDir, one at a time or with a pool of processes.
+    # FilesProcessed (and so which svgs have already been processed) and 
+    # the directory indexes are shared by every file in the list. First 
+    # plan the work (see PlanWorkList) so an svg that several fzps share is
+    # only processed once. 
+
+    logging.info (' Entering ProcessWorkList DstDir %s Options %s\n', DstDir, Options)
+
+    ErrorsSeen = 'n'
+
+    Errors = []
+
+    Plan = PlanWorkList(WorkList, FilesProcessed)
+
+    if Options['jobs'] > 1 and Debug == 0 and 'fork' in multiprocessing.get_all_start_methods():
+
+        # The pool workers need to inherit this module from the parent as the 
+        # main script isn't safe to re-import, so only use a pool where fork
+        # is available (i.e. not Windows) and not when debugging (the output
+        # would go to stdout in random order). 
+
+        ErrorsSeen, Errors = ProcessDirParallel(WorkList, Plan, DstDir, DirProcessing, FilesProcessed, Options, Debug)
+
+        SharedSvgs.clear()
+
+        if Options['cache'] != None:
+
+            # Keep the cache to its size and age limits.
+
+            Cache.CacheEvict(Options['cache'])
+
+        # End of if Options['cache'] != None:
+
+        logging.info (' Exiting ProcessWorkList after parallel processing\n')
+
+        return ErrorsSeen, Errors
+
+    # End of if Options['jobs'] > 1 and Debug == 0 and 'fork' in multiprocessing.get_all_start_methods():
+
+    # Then process all the files in the work list one at a time.
+
+    for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+        FQInFile = os.path.join(SrcDir, InFile)
+
+        # Check the dictionary to make sure we haven't already processed this
+        # svg as part of one of the fzp files we have already processed. 
+
+        logging.debug (' ProcessDir: dir loop trying FQInFile %s\n', FQInFile)
+
+        if not 'processed.' + FQInFile in FilesProcessed:
+
+            logging.debug (' ProcessDir: didn\'t find \"%s\" in FilesProcessed\n', 'processed.' + FQInFile )
+
+            # We haven't yet processed this file so do so now. 
+
+            print('\n**** Starting to process file {0:s}'.format(str(Name)))
+
+            Errors, Warnings, Info, ModuleId = ProcessDirFile(InFile, SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug)
+
+            if len(Diag.Visible(Errors)) != 0:
+    
+                # If we have seen (unsuppressed) errors in this file, note 
+                # that to set the eventual return code when all processing is
+                # done. 
+    
+                ErrorsSeen = 'y'
+    
+            # End of if len(Diag.Visible(Errors)) != 0:
+    
+            # Output the Info, Warnings and Errors associated with the document
+            # before they get cleared for the next file. 
+    
+            PP.PrintInfo(Info)
+    
+            PP.PrintWarnings(Warnings)
+    
+            PP.PrintErrors(Errors)
+
+            # and write them to the --ndjson and --sarif reports (if any).
+
+            Report.ReportFile(FQInFile, ModuleId, Errors, Warnings, Info)
+
+        else:
+
+            logging.debug (' ProcessDir: skipped file %s as already proessed\n', FQInFile)
+
+        # End of if not 'processed.' + FQInFile in FilesProcessed:
+    
+    # End of for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+    # Drop the results of shared svgs that weren't used up (because an fzp
+    # came from the cache or didn't get as far as its svgs).
+
+    SharedSvgs.clear()
+
+    if Options['cache'] != None:
+
+        # Keep the cache to its size and age limits.
+
+        Cache.CacheEvict(Options['cache'])
+
+    # End of if Options['cache'] != None:
+
+    logging.info (' Exiting ProcessWorkList\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessWorkList(WorkList, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+def ProcessIndexedWorkList(WorkList, Root, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+    # The --index option. Only process the files in WorkList (from the 
+    # directory or fritzing-parts directory Root) that are new or have 
+    # changed since the index in Options['index'] was written, and the 
+    # fzps that reference an svg that has changed (which checks the svg as 
+    # well), then bring the index up to date (see IndexTools.py). Files 
+    # that haven't changed but had errors last time are listed and still 
+    # make the exit code non zero. Returns the same as ProcessWorkList. 
+
+    logging.info (' Entering ProcessIndexedWorkList Root %s Index %s\n', Root, Options['index'])
+
+    # Anything that changes the messages means checking everything again.
+
+    Config = [Version, PP.Version, ModifyTerminal, IssueNameDupWarning, CheckOnly, PP.DetailPP] + sorted(Diag.Suppressed)
+
+    Index = Idx.LoadIndex(Options['index'], Root, Config)
+
+    # First fingerprint the svgs the index knows about and note those that
+    # have changed.
+
+    ChangedSvgs = {}
+
+    for Svg in Index['svgs']:
+
+        Fingerprint = Idx.Fingerprint(os.path.join(Root, Svg), Index['svgs'][Svg])
+
+        if Idx.Changed(Index['svgs'][Svg], Fingerprint):
+
+            ChangedSvgs[Svg] = 'y'
+
+        # End of if Idx.Changed(Index['svgs'][Svg], Fingerprint):
+
+        Index['svgs'][Svg] = Fingerprint
+
+    # End of for Svg in Index['svgs']:
+
+    # Then go through the work list in order deciding what to check. The
+    # new index entries replace the old ones (so files that have gone 
+    # drop out of the index).
+
+    Files = {}
+
+    CheckList = []
+
+    for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+        FQInFile = os.path.join(SrcDir, InFile)
+
+        File = Idx.IndexPath(Root, FQInFile)
+
+        Entry = Index['files'].get(File)
+
+        if Entry == None:
+
+            Fingerprint = Idx.Fingerprint(FQInFile)
+
+        else:
+
+            Fingerprint = Idx.Fingerprint(FQInFile, Entry['fingerprint'])
+
+        # End of if Entry == None:
+
+        if Entry == None or Idx.Changed(Entry['fingerprint'], Fingerprint):
+
+            # A new or changed file, so find the svgs it references (with 
+            # the same path rules ProcessSvgsFromFzp uses) and check it.
+
+            Entry = {'fingerprint': Fingerprint, 'svgs': IndexSvgs(Root, PrefixDir, FQInFile), 'errors': 'n'}
+
+            CheckList.append([SrcDir, PrefixDir, InFile, Name])
+
+        else:
+
+            Entry['fingerprint'] = Fingerprint
+
+            if any(Svg in ChangedSvgs for View, Svg in Entry['svgs']):
+
+                # Unchanged, but an svg it uses has changed.
+
+                CheckList.append([SrcDir, PrefixDir, InFile, Name])
+
+            # End of if any(Svg in ChangedSvgs for View, Svg in Entry['svgs']):
+
+        # End of if Entry == None or Idx.Changed(Entry['fingerprint'], Fingerprint):
+
+        for View, Svg in Entry['svgs']:
+
+            if not Svg in Index['svgs']:
+
+                Index['svgs'][Svg] = Idx.Fingerprint(os.path.join(Root, Svg))
+
+            # End of if not Svg in Index['svgs']:
+
+        # End of for View, Svg in Entry['svgs']:
+
+        Files[File] = Entry
+
+    # End of for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+    print('\n**** Checking {0:d} of {1:d} files (new, changed or using a changed svg since the index was written)'.format(len(CheckList), len(WorkList)))
+
+    # Note which of the files checked have errors as they are reported.
+
+    Reporter = Idx.IndexReporter()
+
+    Report.Reporters.append(Reporter)
+
+    try:
+
+        ErrorsSeen, Errors = ProcessWorkList(CheckList, DstDir, DirProcessing, FilesProcessed, Options, Debug)
+
+    finally:
+
+        Report.Reporters.remove(Reporter)
+
+    # End of try:
+
+    Checked = {}
+
+    for SrcDir, PrefixDir, InFile, Name in CheckList:
+
+        FQInFile = os.path.normpath(os.path.join(SrcDir, InFile))
+
+        Checked[Idx.IndexPath(Root, FQInFile)] = 'y'
+
+        if FQInFile in Reporter.Errors:
+
+            Files[Idx.IndexPath(Root, FQInFile)]['errors'] = Reporter.Errors[FQInFile]
+
+        # End of if FQInFile in Reporter.Errors:
+
+    # End of for SrcDir, PrefixDir, InFile, Name in CheckList:
+
+    # List the files that weren't checked this time but had errors.
+
+    Unchecked = [File for File in Files if not File in Checked and Files[File]['errors'] == 'y']
+
+    if len(Unchecked) != 0:
+
+        print('\n**** Unchanged since the last check, with errors:\n\n{0:s}'.format('\n'.join(sorted(Unchecked))))
+
+        ErrorsSeen = 'y'
+
+    # End of if len(Unchecked) != 0:
+
+    # Keep only the svgs that are still referenced and write the new index.
+
+    Svgs = {}
+
+    for File in Files:
+
+        for View, Svg in Files[File]['svgs']:
+
+            Svgs[Svg] = Index['svgs'][Svg]
+
+        # End of for View, Svg in Files[File]['svgs']:
+
+    # End of for File in Files:
+
+    Index['files'] = Files
+
+    Index['svgs'] = Svgs
+
+    IndexErrors = []
+
+    Idx.SaveIndex(Options['index'], Index, IndexErrors)
+
+    PP.PrintErrors(IndexErrors)
+
+    logging.info (' Exiting ProcessIndexedWorkList\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessIndexedWorkList(WorkList, Root, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+def ProcessCollisionWorkList(WorkList, Options, Debug):
+
+    # --collisions, so rather than checking the files in WorkList (from 
+    # DirWorkList or LibraryWorkList) read the start of each fzp once (see
+    # CollisionTools.py) and report the moduleIds, referenceFiles and 
+    # families and properties that more than one fzp has. Returns the same
+    # as ProcessWorkList.
+
+    logging.info (' Entering ProcessCollisionWorkList Files %s\n', len(WorkList))
+
+    ErrorsSeen = 'n'
+
+    Errors = []
+
+    Parts = []
+
+    Names = {}
+
+    # Take the files of each directory in name order (keeping the order of
+    # the directories, core first in a library) so the file a collision is
+    # reported against doesn't depend on the order the file system lists
+    # them in.
+
+    Dirs = {}
+
+    for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+        Dirs.setdefault(SrcDir, len(Dirs))
+
+    # End of for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+    for SrcDir, PrefixDir, InFile, Name in sorted(WorkList, key=lambda Entry: (Dirs[Entry[0]], Entry[2])):
+
+        if not InFile.lower().endswith('.fzp'):
+
+            continue
+
+        # End of if not InFile.lower().endswith('.fzp'):
+
+        FQInFile = os.path.join(SrcDir, InFile)
+
+        Names[FQInFile] = Name
+
+        ScanErrors = []
+
+        Part = Collision.ScanFzp(FQInFile, ScanErrors)
+
+        if Part == None:
+
+            # The file can't be read, so report that in place of its
+            # collisions.
+
+            print('\n**** Collisions for file {0:s}'.format(str(Name)))
+
+            PP.PrintErrors(ScanErrors)
+
+            Report.ReportFile(FQInFile, None, ScanErrors, [], [])
+
+            ErrorsSeen = 'y'
+
+            continue
+
+        # End of if Part == None:
+
+        Parts.append([FQInFile, PrefixDir, Part])
+
+    # End of for SrcDir, PrefixDir, InFile, Name in sorted(WorkList, key=lambda Entry: (Dirs[Entry[0]], Entry[2])):
+
+    print('**** Checked {0:d} fzp files for duplicate moduleIds, referenceFiles and families'.format(len(Parts)))
+
+    Messages = Collision.FindCollisions(Parts)
+
+    for FQInFile, PrefixDir, Part in Parts:
+
+        if not FQInFile in Messages:
+
+            continue
+
+        # End of if not FQInFile in Messages:
+
+        Errors = [Message for Message in Messages[FQInFile] if Message.Severity() == 'Error']
+
+        Warnings = [Message for Message in Messages[FQInFile] if Message.Severity() != 'Error']
+
+        print('\n**** Collisions for file {0:s}'.format(str(Names[FQInFile])))
+
+        PP.PrintWarnings(Warnings)
+
+        PP.PrintErrors(Errors)
+
+        Report.ReportFile(FQInFile, Part['moduleId'], Errors, Warnings, [])
+
+        if len(Diag.Visible(Errors)) != 0:
+
+            ErrorsSeen = 'y'
+
+        # End of if len(Diag.Visible(Errors)) != 0:
+
+    # End of for FQInFile, PrefixDir, Part in Parts:
+
+    logging.info (' Exiting ProcessCollisionWorkList\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessCollisionWorkList(WorkList, Options, Debug):
+
+def WorkListSvgReferences(WorkList):
+
+    # The number of fzps in WorkList (from DirWorkList or LibraryWorkList), 
+    # the [fzp file, svg file] of each svg they reference (in work list 
+    # order) and the svg files in the work list, for --orphans and 
+    # --duplicates.
+
+    logging.info (' Entering WorkListSvgReferences Files %s\n', len(WorkList))
+
+    References = []
+
+    Files = []
+
+    Fzps = 0
+
+    for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+        FQInFile = os.path.join(SrcDir, InFile)
+
+        if InFile.lower().endswith('.svg'):
+
+            Files.append(FQInFile)
+
+        elif InFile.lower().endswith('.fzp'):
+
+            Fzps += 1
+
+            if InFile.lower().startswith('part.'):
+
+                FzpType = 'FZPPART'
+
+            else:
+
+                FzpType = 'FZPFRITZ'
+
+            # End of if InFile.lower().startswith('part.'):
+
+            for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, FQInFile, None, PrefixDir):
+
+                References.append([FQInFile, SvgInFile])
+
+            # End of for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, FQInFile, None, PrefixDir):
+
+        # End of if InFile.lower().endswith('.svg'):
+
+    # End of for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+    logging.info (' Exiting WorkListSvgReferences\n')
+
+    return Fzps, References, Files
+
+# End of def WorkListSvgReferences(WorkList):
+
+def ProcessOrphanWorkList(WorkList, SvgDirs, Options, Debug):
+
+    # --orphans, so rather than checking the files in WorkList (from 
+    # DirWorkList or LibraryWorkList) collect the svgs every fzp references
+    # and compare them with one walk of the SvgDirs (see OrphanTools.py) to
+    # report the svgs that don't exist (Error 20) or only exist with a 
+    # different case (Error 21) and the svgs that no fzp uses (Warning 33).
+    # Returns the same as ProcessWorkList.
+
+    logging.info (' Entering ProcessOrphanWorkList Files %s SvgDirs %s\n', len(WorkList), SvgDirs)
+
+    ErrorsSeen = 'n'
+
+    Errors = []
+
+    Fzps, References, Files = WorkListSvgReferences(WorkList)
+
+    Svgs = Orphan.SvgTree([SvgDir for SvgDir in SvgDirs if os.path.isdir(SvgDir)], Files)
+
+    Messages, Counts = Orphan.FindOrphans(References, Svgs)
+
+    print('**** {0:d} fzp files reference {1:d} svgs, {2:d} svg files found: {3:d} dangling, {4:d} case mismatches, {5:d} orphans'.format(Fzps, len(References), len(Svgs), Counts['dangling'], Counts['case'], Counts['orphan']))
+
+    # The fzps then the orphan svgs, each in name order.
+
+    for File in sorted(Messages, key=lambda File: (File in Svgs, File)):
+
+        Errors = [Message for Message in Messages[File] if Message.Severity() == 'Error']
+
+        Warnings = [Message for Message in Messages[File] if Message.Severity() != 'Error']
+
+        print('\n**** Svg references for file {0:s}'.format(File))
+
+        PP.PrintWarnings(Warnings)
+
+        PP.PrintErrors(Errors)
+
+        Report.ReportFile(File, None, Errors, Warnings, [])
+
+        if len(Diag.Visible(Errors)) != 0:
+
+            ErrorsSeen = 'y'
+
+        # End of if len(Diag.Visible(Errors)) != 0:
+
+    # End of for File in sorted(Messages, key=lambda File: (File in Svgs, File)):
+
+    logging.info (' Exiting ProcessOrphanWorkList\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessOrphanWorkList(WorkList, SvgDirs, Options, Debug):
+
+def ProcessDuplicateWorkList(WorkList, SvgDirs, Options, Debug):
+
+    # --duplicates, so rather than checking the files in WorkList (from 
+    # DirWorkList or LibraryWorkList) canonicalize and hash every svg in the
+    # SvgDirs and the work list (with a pool of processes when there is 
+    # more than one job) and report the svgs that are identical (Warning 34)
+    # or near identical (Warning 35) to another (see DuplicateTools.py), 
+    # along with the fzps that use them. Returns the same as 
+    # ProcessWorkList.
+
+    logging.info (' Entering ProcessDuplicateWorkList Files %s SvgDirs %s\n', len(WorkList), SvgDirs)
+
+    ErrorsSeen = 'n'
+
+    Errors = []
+
+    Fzps, References, Files = WorkListSvgReferences(WorkList)
+
+    Svgs = sorted(Orphan.SvgTree([SvgDir for SvgDir in SvgDirs if os.path.isdir(SvgDir)], Files))
+
+    Hashes = {}
+
+    Failed = {}
+
+    if Options['jobs'] > 1 and Debug == 0 and 'fork' in multiprocessing.get_all_start_methods():
+
+        # As for ProcessDirParallel, only use a pool where fork is 
+        # available and not when debugging. The svgs are small so send them
+        # to the pool in chunks.
+
+        Context = multiprocessing.get_context('fork')
+
+        with Context.Pool(Options['jobs']) as Pool:
+
+            Results = list(Pool.imap(DuplicateSvgJob, Svgs, chunksize=max(1, min(64, len(Svgs) // (Options['jobs'] * 4)))))
+
+        # End of with Context.Pool(Options['jobs']) as Pool:
+
+    else:
+
+        Results = [DuplicateSvgJob(Svg) for Svg in Svgs]
+
+    # End of if Options['jobs'] > 1 and Debug == 0 and 'fork' in multiprocessing.get_all_start_methods():
+
+    for Svg, SvgHashes, SvgErrors in Results:
+
+        if SvgHashes != None:
+
+            Hashes[Svg] = SvgHashes
+
+        else:
+
+            Failed[Svg] = SvgErrors
+
+        # End of if SvgHashes != None:
+
+    # End of for Svg, SvgHashes, SvgErrors in Results:
+
+    Messages, Counts = Duplicate.FindDuplicates(Hashes, References)
+
+    print('**** {0:d} svg files hashed ({1:d} unreadable): {2:d} identical, {3:d} near identical'.format(len(Hashes), len(Failed), Counts['identical'], Counts['near']))
+
+    for File in sorted(set(Messages) | set(Failed)):
+
+        Errors = Failed.get(File, [])
+
+        Warnings = Messages.get(File, [])
+
+        print('\n**** Duplicates for file {0:s}'.format(File))
+
+        PP.PrintWarnings(Warnings)
+
+        PP.PrintErrors(Errors)
+
+        Report.ReportFile(File, None, Errors, Warnings, [])
+
+        if len(Diag.Visible(Errors)) != 0:
+
+            ErrorsSeen = 'y'
+
+        # End of if len(Diag.Visible(Errors)) != 0:
+
+    # End of for File in sorted(set(Messages) | set(Failed)):
+
+    logging.info (' Exiting ProcessDuplicateWorkList\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessDuplicateWorkList(WorkList, SvgDirs, Options, Debug):
+
+def DuplicateSvgJob(InFile):
+
+    # Parse the svg InFile, apply the same normalizations as checking it 
+    # would (the style attribute in line and no px on font sizes) and return
+    # [InFile, [identical, near identical] hashes, []] or [InFile, None, 
+    # the parse errors] if it can't be read. 
+
+    Errors = []
+
+    Doc, Root = PP.ParseFile(InFile, Errors)
+
+    if Root == None:
+
+        return [InFile, None, Errors]
+
+    # End of if Root == None:
+
+    State = {'KeyErrors': []}
+
+    for Elem in Root.iter():
+
+        if isinstance(Elem.tag, str):
+
+            # The messages are of no interest here, only the changes. 
+
+            SvgInlineStyle(InFile, Elem, [], State)
+
+            RemovePx(InFile, Elem, [], 0)
+
+        # End of if isinstance(Elem.tag, str):
+
+    # End of for Elem in Root.iter():
+
+    return [InFile, Duplicate.SvgHashes(Root), []]
+
+# End of def DuplicateSvgJob(InFile):
+
+def IndexSvgs(Root, PrefixDir, InFile):
+
+    # The [View, svg] pairs for the index of the svgs that the file InFile
+    # references (relative to Root), none unless it is an fzp.
+
+    if not InFile.lower().endswith('.fzp'):
+
+        return []
+
+    # End of if not InFile.lower().endswith('.fzp'):
+
+    if os.path.basename(InFile).lower().startswith('part.'):
+
+        FzpType = 'FZPPART'
+
+    else:
+
+        FzpType = 'FZPFRITZ'
+
+    # End of if os.path.basename(InFile).lower().startswith('part.'):
+
+    return [[View, Idx.IndexPath(Root, SvgInFile)] for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, InFile, None, PrefixDir)]
+
+# End of def IndexSvgs(Root, PrefixDir, InFile):
+
+def RunGit(Root, Args, Range, Errors):
+
+    # Run git with Args in Root and return its output, or None (with an 
+    # error about Range) if git isn't there or fails.
+
+    try:
+
+        Result = subprocess.run(['git', '-C', Root] + Args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    except OSError as e:
+
+        Errors.append(Diag.Diagnostic('Error 90: git diff of range {0:s} in\n\n{1:s}\n\nfailed: {2:s}\n', Range, Root, e.strerror))
+
+        return None
+
+    # End of try:
+
+    if Result.returncode != 0:
+
+        # Only the first line, git can follow it with a page of usage.
+
+        Message = (Result.stderr.decode('utf-8', 'replace').strip().splitlines() or [''])[0]
+
+        Errors.append(Diag.Diagnostic('Error 90: git diff of range {0:s} in\n\n{1:s}\n\nfailed: {2:s}\n', Range, Root, Message))
+
+        return None
+
+    # End of if Result.returncode != 0:
+
+    return Result.stdout.decode('utf-8', 'surrogateescape')
+
+# End of def RunGit(Root, Args, Range, Errors):
+
+def GitChangedFiles(Root, Range, Errors):
+
+    # Ask git for the files changed in the revision Range (as for git diff,
+    # so A..B, A...B or a single revision for the changes since it, 
+    # including ones not yet committed). Returns a dictionary of the paths
+    # relative to Root (which may be outside it, such as ../svg for a 
+    # prefix directory) or None (with an error) if git fails. Renames are 
+    # listed as a delete and an add so both names are there.
+
+    logging.info (' Entering GitChangedFiles Root %s Range %s\n', Root, Range)
+
+    TopLevel = RunGit(Root, ['rev-parse', '--show-toplevel'], Range, Errors)
+
+    if TopLevel == None:
+
+        logging.info (' Exiting GitChangedFiles on git error\n')
+
+        return None
+
+    # End of if TopLevel == None:
+
+    Output = RunGit(Root, ['diff', '--name-only', '--no-renames', '-z', Range, '--'], Range, Errors)
+
+    if Output == None:
+
+        logging.info (' Exiting GitChangedFiles on git error\n')
+
+        return None
+
+    # End of if Output == None:
+
+    RealRoot = os.path.realpath(Root)
+
+    Changed = {}
+
+    for Path in Output.split('\0'):
+
+        if Path != '':
+
+            Changed[os.path.relpath(os.path.join(TopLevel.strip(), Path), RealRoot)] = 'y'
+
+        # End of if Path != '':
+
+    # End of for Path in Output.split('\0'):
+
+    logging.debug (' GitChangedFiles: Changed %s\n', Changed)
+
+    logging.info (' Exiting GitChangedFiles\n')
+
+    return Changed
+
+# End of def GitChangedFiles(Root, Range, Errors):
+
+def ProcessGitWorkList(WorkList, Root, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+    # The --git-range option. Only process the files in WorkList (from the
+    # directory or fritzing-parts directory Root, which is in a git work 
+    # tree) that changed in the revision range Options['gitrange'] and the
+    # fzps that reference an svg that changed in it (found with the same 
+    # path rules ProcessSvgsFromFzp uses), with a pool of processes unless
+    # --jobs says otherwise. Returns the same as ProcessWorkList. 
+
+    logging.info (' Entering ProcessGitWorkList Root %s Range %s\n', Root, Options['gitrange'])
+
+    Errors = []
+
+    Changed = GitChangedFiles(Root, Options['gitrange'], Errors)
+
+    if Changed == None:
+
+        PP.PrintErrors(Errors)
+
+        logging.info (' Exiting ProcessGitWorkList on git error\n')
+
+        return 'y', Errors
+
+    # End of if Changed == None:
+
+    # The changed svgs (case folded, as a reference that only differs in
+    # case should be checked too) and their file names to look for in the
+    # fzps. 
+
+    ChangedSvgs = {}
+
+    SvgNames = {}
+
+    for Path in Changed:
+
+        if Path.lower().endswith('.svg'):
+
+            ChangedSvgs[Path.lower()] = 'y'
+
+            SvgNames[os.path.basename(Path).lower().encode('utf-8')] = 'y'
+
+        # End of if Path.lower().endswith('.svg'):
+
+    # End of for Path in Changed:
+
+    CheckList = []
+
+    for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+        FQInFile = os.path.join(SrcDir, InFile)
+
+        if Idx.IndexPath(Root, FQInFile) in Changed:
+
+            CheckList.append([SrcDir, PrefixDir, InFile, Name])
+
+            continue
+
+        # End of if Idx.IndexPath(Root, FQInFile) in Changed:
+
+        if len(SvgNames) == 0 or not InFile.lower().endswith('.fzp'):
+
+            continue
+
+        # End of if len(SvgNames) == 0 or not InFile.lower().endswith('.fzp'):
+
+        # Only parse the fzp for its svgs if one of the changed svg file
+        # names appears in it somewhere, which for most fzps it won't.
+
+        try:
+
+            with open(FQInFile, 'rb') as f:
+
+                Data = f.read().lower()
+
+        except OSError:
+
+            # Leave it for the check to complain about. 
+
+            CheckList.append([SrcDir, PrefixDir, InFile, Name])
+
+            continue
+
+        # End of try:
+
+        if not any(SvgName in Data for SvgName in SvgNames):
+
+            continue
+
+        # End of if not any(SvgName in Data for SvgName in SvgNames):
+
+        for View, Svg in IndexSvgs(Root, PrefixDir, FQInFile):
+
+            if Svg.lower() in ChangedSvgs:
+
+                CheckList.append([SrcDir, PrefixDir, InFile, Name])
+
+                break
+
+            # End of if Svg.lower() in ChangedSvgs:
+
+        # End of for View, Svg in IndexSvgs(Root, PrefixDir, FQInFile):
+
+    # End of for SrcDir, PrefixDir, InFile, Name in WorkList:
+
+    print('\n**** Checking {0:d} of {1:d} files (changed in {2:s} or using an svg changed in it)'.format(len(CheckList), len(WorkList), Options['gitrange']))
+
+    ErrorsSeen, Errors = ProcessWorkList(CheckList, DstDir, DirProcessing, FilesProcessed, Options, Debug)
+
+    logging.info (' Exiting ProcessGitWorkList\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessGitWorkList(WorkList, Root, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+def ProcessDirFile(InFile, SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug):
+
+    # Process a single file (and for an fzp the svgs it references) from the
+    # src directory in to the dst directory with fresh Errors, Warnings and 
+    # Info lists which are returned to the caller to print (along with the
+    # moduleId of the fzp for the reports). If there is a
+    # cache (the --cache option) and it has an entry for exactly these input
+    # files, the messages and output files are replayed from the cache 
+    # instead of processing the files again. 
+
+    logging.info (' Entering ProcessDirFile InFile %s\n', InFile)
+
+    # Regex to match '.svg' to find svg files (ignoring case)
+
+    SvgExtRegex = re.compile(r'\.svg$', re.IGNORECASE)
+
+    # Regex to match .fzp to find fzp files
+
+    FzpExtRegex = re.compile(r'\.fzp$', re.IGNORECASE)
+
+    # Regex to match 'part. to identify an unzipped fzpz file'
+
+    PartRegex = re.compile(r'^part\.', re.IGNORECASE)
+
+    SVgPrefixRegex = re.compile(r'^svg\.', re.IGNORECASE)
+
+    # Regex to match .fzpz to find (zipped) fzpz files
+
+    FzpzExtRegex = re.compile(r'\.fzpz$', re.IGNORECASE)
+
+    # Regex to match .fzz and .fzb to find sketches and bins
+
+    SketchExtRegex = re.compile(r'\.(fzz|fzb)$', re.IGNORECASE)
+
+    # Set the input and output file nams. When only checking there is no
+    # DstDir, so use the input file as the output file to get dir to dir 
+    # processing (nothing will be written to it).
+
+    FQInFile = os.path.join(SrcDir, InFile)
+
+    if DstDir == None:
+
+        FQOutFile = FQInFile
+
+    else:
+
+        FQOutFile = os.path.join(DstDir, InFile)
+
+    # End of if DstDir == None:
+
+    # Then get just the file name (no path) for the regexs.
+
+    BaseFile = os.path.basename(FQInFile)
+
+    # Determine if this is a part. type file or not. 
+
+    if PartRegex.search(BaseFile) or SVgPrefixRegex.search(BaseFile):
+
+        FzpType = 'FZPPART'
+
+    else:
+
+        FzpType = 'FZPFRITZ'
+
+    # End of if PartRegex.search(BaseFile) or SVgPrefixRegex.search(BaseFile):
+
+    logging.debug (' ProcessDirFile: set FzpType %s\n', FzpType)
+
+    # Then the FileType (None for a non Fritzing file).
+
+    if FzpzExtRegex.search(BaseFile):
+
+        FileType = 'FZPZ'
+
+    elif SketchExtRegex.search(BaseFile):
+
+        FileType = 'SKETCH'
+
+    elif SvgExtRegex.search(BaseFile):
+
+        FileType = 'SVG'
+
+    elif PartRegex.search(BaseFile):
+
+        FileType = 'FZPPART'
+
+    elif FzpExtRegex.search(BaseFile):
+
+        # A filename.fzp file needs the PrefixDir added to the output 
+        # filename.
+
+        FileType = 'FZPFRITZ'
+
+        if DstDir != None:
+
+            FQOutFile = os.path.join(DstDir, PrefixDir)
+
+            FQOutFile = os.path.join(FQOutFile, InFile)
+
+        # End of if DstDir != None:
+
+    else:
+
+        FileType = None
+
+    # End of if SvgExtRegex.search(BaseFile):
+
+    # Initialize all the global variables before processing a new file.
+
+    Errors, Warnings, Info, FzpDict, CurView, TagStack, State, InheritedAttributes = InitializeAll()
+
+    Key = None
+
+    if Options['cache'] != None and FileType != None and Debug == 0:
+
+        # See if the cache has already seen exactly these files. 
+
+        Key, OutFiles = DirFileCacheKey(FzpType, FileType, FQInFile, FQOutFile, PrefixDir, DirProcessing, FilesProcessed)
+
+        if Key != None:
+
+            Entry = Cache.CacheLookup(Options['cache'], Key)
+
+            if Entry != None:
+
+                # A hit, so restore the output files, mark the files the
+                # fzp processed as processed and replay the messages. 
+
+                logging.debug (' ProcessDirFile: cache hit for %s\n', FQInFile)
+
+                Errors.extend(Diag.Decode(Entry['errors']))
+
+                Warnings.extend(Diag.Decode(Entry['warnings']))
+
+                Info.extend(Diag.Decode(Entry['info']))
+
+                if DstDir != None:
+
+                    Files = {}
+
+                    for File in Entry['files']:
+
+                        Files[os.path.join(DstDir, File)] = Entry['files'][File]
+
+                    # End of for File in Entry['files']:
+
+                    Cache.CacheRestoreFiles(Files, Errors)
+
+                # End of if DstDir != None:
+
+                FilesProcessed.update(Entry['processed'])
+
+                logging.info (' Exiting ProcessDirFile on cache hit\n')
+
+                return Errors, Warnings, Info, Entry.get('moduleid')
+
+            # End of if Entry != None:
+
+        # End of if Key != None:
+
+        # Note what has already been processed so we can store what this 
+        # file adds. 
+
+        ProcessedBefore = set(FilesProcessed)
+
+    # End of if Options['cache'] != None and FileType != None and Debug == 0:
+
+    if FileType == 'SVG':
+
+        # This looks to be an svg file so process it.
+
+        ProcessSvg(FzpType, FileType, FQInFile, FQOutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
+
+    elif FileType == 'FZPPART' or FileType == 'FZPFRITZ':
+
+        # This looks to be an part.filename.fzp or a filename.fzp file so 
+        # process it.
+
+        ProcessFzp(DirProcessing, FzpType, FileType, FQInFile, FQOutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
+
+    elif FileType == 'FZPZ':
+
+        # A zipped part, so check its members in memory and write the new
+        # archive in to the dst directory. 
+
+        Errors, Warnings, Info, ModuleId = ProcessFzpz(FQInFile, FQOutFile, Options, Debug)
+
+        FzpDict['moduleId'] = [ModuleId]
+
+    elif FileType == 'SKETCH':
+
+        # A sketch or bin, which is only audited (nothing is written).
+
+        Errors, Warnings, Info, ModuleId = ProcessSketch(FQInFile, Options, Debug)
+
+    else:
+
+        # Not a fritzing file type so warn about it but otherwise 
+        # ignore it.
+
+        Warnings.append(Diag.Diagnostic('Warning 1: File\n\n\'{0:s}\'\n\nIsn\'t a Fritzing file and has been ignored in processing the directory\n', InFile))
+
+    # End of if FileType == 'SVG':
+
+    if Key != None and (DstDir == None or not Diag.Mentions(Errors + Warnings + Info, DstDir)):
+
+        # Store the results in the cache for next time (unless a message 
+        # mentions the dst directory, as the next run may well use a 
+        # different one). The output files are stored relative to DstDir
+        # for the same reason (and there aren't any when only checking).
+
+        Files = {}
+
+        if DstDir != None:
+
+            for File in OutFiles:
+
+                if os.path.isfile(File):
+
+                    Files[os.path.relpath(File, DstDir)] = Cache.CacheEncodeFile(File)
+
+                # End of if os.path.isfile(File):
+
+            # End of for File in OutFiles:
+
+        # End of if DstDir != None:
+
+        Entry = {'errors': Diag.Encode(Errors), 'warnings': Diag.Encode(Warnings), 'info': Diag.Encode(Info), 'moduleid': FzpModuleId(FzpDict), 'processed': dict((Processed, FilesProcessed[Processed]) for Processed in sorted(set(FilesProcessed) - ProcessedBefore)), 'files': Files}
+
+        Cache.CacheStore(Options['cache'], Key, Entry)
+
+    # End of if Key != None and (DstDir == None or not Diag.Mentions(Errors + Warnings + Info, DstDir)):
+
+    logging.info (' Exiting ProcessDirFile\n')
+
+    return Errors, Warnings, Info, FzpModuleId(FzpDict)
+
+# End of def ProcessDirFile(InFile, SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug):
+
+def ProcessFzpz(InFile, OutFile, Options, Debug):
+
+    # Check the zipped part (.fzpz file) InFile without unzipping it to disk.
+    # Every member is read in to memory (see OpenArchive) once, the 
+    # part.*.fzp members are checked as in dir to dir processing (which 
+    # checks the svg.* members they reference) followed by any svg.* 
+    # members no fzp referenced, and the pretty printed output is collected
+    # in PP.MemoryOutput. Then (unless only checking or debugging) the new 
+    # archive is written to OutFile member by member, in the original 
+    # order, in one pass. If OutFile is None (a single fzpz file) InFile is
+    # renamed to InFile.bak and the new archive takes its place. Returns the
+    # Errors, Warnings and Info of all the members and the moduleId of the 
+    # fzp. 
+
+    logging.info (' Entering ProcessFzpz InFile %s OutFile %s\n', InFile, OutFile)
+
+    Errors = []
+
+    Warnings = []
+
+    Info = []
+
+    ModuleIds = []
+
+    Members, Contents = ReadArchive(InFile, Errors)
+
+    if Members == None:
+
+        logging.info (' Exiting ProcessFzpz on read error\n')
+
+        return Errors, Warnings, Info, None
+
+    # End of if Members == None:
+
+    Names = OpenArchive(InFile, Members, Contents)
+
+    try:
+
+        if CheckArchiveParts(InFile, Names, ModuleIds, Errors, Warnings, Info, Options, Debug) == 0:
+
+            Errors.append(Diag.Diagnostic('Error 92: File\n\'{0:s}\'\n\nfzpz file has no part.*.fzp file in it\n', InFile))
+
+        # End of if CheckArchiveParts(InFile, Names, ModuleIds, Errors, Warnings, Info, Options, Debug) == 0:
+
+        if CheckOnly != 'y' and Debug == 0:
+
+            WriteFzpz(InFile, OutFile, Members, Contents, Errors)
+
+        # End of if CheckOnly != 'y' and Debug == 0:
+
+    finally:
+
+        CloseArchive(InFile)
+
+    # End of try:
+
+    logging.info (' Exiting ProcessFzpz\n')
+
+    return Errors, Warnings, Info, (ModuleIds or [None])[0]
+
+# End of def ProcessFzpz(InFile, OutFile, Options, Debug):
+
+def ProcessSketch(InFile, Options, Debug):
+
+    # Audit the Fritzing sketch (.fzz file) or bin (.fzb file) InFile. The 
+    # parts embedded in a sketch are checked in memory as the members of a
+    # .fzpz are (see ProcessFzpz) and then (if the parts library was given
+    # with --parts) the moduleId of every part instance in the sketch (the
+    # .fz member) or bin is looked up in the embedded parts and the library.
+    # Nothing is written, a sketch is only audited. Returns the Errors, 
+    # Warnings and Info and None for the moduleId.
+
+    logging.info (' Entering ProcessSketch InFile %s\n', InFile)
+
+    Errors = []
+
+    Warnings = []
+
+    Info = []
+
+    ModuleIds = []
+
+    if not InFile.lower().endswith('.fzz'):
+
+        # A bin is a plain xml file with no embedded parts.
+
+        Instances = Sketch.SketchInstances(InFile, InFile, Errors)
+
+        if Instances != None and Sketch.Library != None:
+
+            Sketch.ResolveInstances(InFile, Instances, ModuleIds, Errors)
+
+        # End of if Instances != None and Sketch.Library != None:
+
+        logging.info (' Exiting ProcessSketch after bin\n')
+
+        return Errors, Warnings, Info, None
+
+    # End of if not InFile.lower().endswith('.fzz'):
+
+    Members, Contents = ReadArchive(InFile, Errors)
+
+    if Members == None:
+
+        logging.info (' Exiting ProcessSketch on read error\n')
+
+        return Errors, Warnings, Info, None
+
+    # End of if Members == None:
+
+    Names = OpenArchive(InFile, Members, Contents)
+
+    try:
+
+        CheckArchiveParts(InFile, Names, ModuleIds, Errors, Warnings, Info, Options, Debug)
+
+        Sketches = [Name for Name in Names if Name.lower().endswith('.fz')]
+
+        if len(Sketches) == 0:
+
+            Errors.append(Diag.Diagnostic('Error 94: File\n\'{0:s}\'\n\nfzz file has no .fz sketch file in it\n', InFile))
+
+        # End of if len(Sketches) == 0:
+
+        if Sketch.Library != None:
+
+            Sketch.CheckEmbedded(InFile, ModuleIds, Warnings)
+
+        # End of if Sketch.Library != None:
+
+        for Name in Sketches:
+
+            SketchFile = os.path.join(InFile, Name)
+
+            Instances = Sketch.SketchInstances(PP.InputSource(SketchFile), SketchFile, Errors)
+
+            if Instances != None and Sketch.Library != None:
+
+                Sketch.ResolveInstances(SketchFile, Instances, ModuleIds, Errors)
+
+            # End of if Instances != None and Sketch.Library != None:
+
+        # End of for Name in Sketches:
+
+    finally:
+
+        CloseArchive(InFile)
+
+    # End of try:
+
+    logging.info (' Exiting ProcessSketch\n')
+
+    return Errors, Warnings, Info, None
+
+# End of def ProcessSketch(InFile, Options, Debug):
+
+def ReadArchive(InFile, Errors):
+
+    # Read the members of the zip file InFile (a .fzpz or .fzz) in to 
+    # memory. Returns the list of ZipInfos and the list of their contents, 
+    # or None, None (with Error 91) if it can't be read.
+
+    logging.info (' Entering ReadArchive InFile %s\n', InFile)
+
+    try:
+
+        with zipfile.ZipFile(InFile) as Zip:
+
+            Members = Zip.infolist()
+
+            Contents = [Zip.read(Member) for Member in Members]
+
+        # End of with zipfile.ZipFile(InFile) as Zip:
+
+    except (OSError, zipfile.BadZipFile, zipfile.LargeZipFile, RuntimeError, NotImplementedError) as e:
+
+        Errors.append(Diag.Diagnostic('Error 91: File\n\'{0:s}\'\n\nisn\'t a readable zip file: {1:s}\n', InFile, str(e)))
+
+        logging.info (' Exiting ReadArchive on read error\n')
+
+        return None, None
+
+    # End of try:
+
+    logging.info (' Exiting ReadArchive\n')
+
+    return Members, Contents
+
+# End of def ReadArchive(InFile, Errors):
+
+def OpenArchive(InFile, Members, Contents):
+
+    # Make the archive InFile the directory the checks see. The members are
+    # put in PP.MemoryFiles (named InFile/member) for ParseFile to read and
+    # the names of the members at the top of the archive (which is where 
+    # Fritzing puts them, anything else is copied unchanged) are indexed as
+    # that directory's files for Errors 20 and 21. Returns those names.
+
+    Names = [Member.filename for Member in Members if not '/' in Member.filename and not Member.is_dir()]
+
+    Folded = {}
+
+    for Name in Names:
+
+        Folded.setdefault(Name.casefold(), set()).add(Name)
+
+    # End of for Name in Names:
+
+    DirIndex[os.path.abspath(InFile)] = [set(Names), Folded]
+
+    PP.MemoryFiles = {}
+
+    for Member, Data in zip(Members, Contents):
+
+        PP.MemoryFiles[os.path.normpath(os.path.join(InFile, Member.filename))] = Data
+
+    # End of for Member, Data in zip(Members, Contents):
+
+    PP.MemoryOutput = {}
+
+    return Names
+
+# End of def OpenArchive(InFile, Members, Contents):
+
+def CloseArchive(InFile):
+
+    # Go back to reading and writing files on disk after OpenArchive.
+
+    PP.MemoryFiles = None
+
+    PP.MemoryOutput = None
+
+    DirIndex.pop(os.path.abspath(InFile), None)
+
+# End of def CloseArchive(InFile):
+
+def CheckArchiveParts(InFile, Names, ModuleIds, Errors, Warnings, Info, Options, Debug):
+
+    # Check the part.*.fzp members (and the svg.* members they reference)
+    # of the open archive InFile, then any svg.* members no fzp referenced,
+    # adding the messages to Errors, Warnings and Info and the moduleIds of
+    # the fzps to ModuleIds. The members have their own FilesProcessed and
+    # don't use the cache (a cached archive is replayed whole by 
+    # ProcessDirFile). Returns the number of fzps.
+
+    logging.info (' Entering CheckArchiveParts InFile %s\n', InFile)
+
+    # Regex to match 'part.*.fzp' and 'svg.*.svg' to find the members to 
+    # check.
+
+    PartRegex = re.compile(r'^part\..*\.fzp$', re.IGNORECASE)
+
+    SvgRegex = re.compile(r'^svg\..*\.svg$', re.IGNORECASE)
+
+    Parts = [Name for Name in Names if PartRegex.search(Name)]
+
+    Svgs = [Name for Name in Names if SvgRegex.search(Name)]
+
+    FilesProcessed = {}
+
+    MemberOptions = dict(Options, cache=None)
+
+    for Name in Parts + Svgs:
+
+        if 'processed.' + os.path.join(InFile, Name) in FilesProcessed:
+
+            # An fzp has already checked this svg.
+
+            continue
+
+        # End of if 'processed.' + os.path.join(InFile, Name) in FilesProcessed:
+
+        MemberErrors, MemberWarnings, MemberInfo, MemberModuleId = ProcessDirFile(Name, InFile, None, '', 'Y', FilesProcessed, MemberOptions, Debug)
+
+        Errors.extend(MemberErrors)
+
+        Warnings.extend(MemberWarnings)
+
+        Info.extend(MemberInfo)
+
+        if MemberModuleId != None:
+
+            ModuleIds.append(MemberModuleId)
+
+        # End of if MemberModuleId != None:
+
+    # End of for Name in Parts + Svgs:
+
+    logging.info (' Exiting CheckArchiveParts\n')
+
+    return len(Parts)
+
+# End of def CheckArchiveParts(InFile, Names, ModuleIds, Errors, Warnings, Info, Options, Debug):
+
+def WriteFzpz(InFile, OutFile, Members, Contents, Errors):
+
+    # Write the new archive for ProcessFzpz, each member being its pretty 
+    # printed output (from PP.MemoryOutput) or its original contents, with
+    # the original names, dates and compression. 
+
+    logging.info (' Entering WriteFzpz InFile %s OutFile %s\n', InFile, OutFile)
+
+    if OutFile == None:
+
+        # A single fzpz file, so keep the original as InFile.bak.
+
+        BakFile, OutFile = BackupFilename(InFile, Errors)
+
+        if OutFile == None:
+
+            logging.info (' Exiting WriteFzpz on rename error\n')
+
+            return
+
+        # End of if OutFile == None:
+
+    # End of if OutFile == None:
+
+    try:
+
+        with zipfile.ZipFile(OutFile, 'w') as Zip:
+
+            for Member, Data in zip(Members, Contents):
+
+                NewMember = zipfile.ZipInfo(Member.filename, Member.date_time)
+
+                NewMember.compress_type = Member.compress_type
+
+                NewMember.external_attr = Member.external_attr
+
+                Zip.writestr(NewMember, PP.MemoryOutput.get(os.path.normpath(os.path.join(InFile, Member.filename)), Data))
+
+            # End of for Member, Data in zip(Members, Contents):
+
+        # End of with zipfile.ZipFile(OutFile, 'w') as Zip:
+
+    except (OSError, RuntimeError, NotImplementedError) as e:
+
+        Errors.append(Diag.Diagnostic('Error 3: Can not write {0:s} {1:s}\n', OutFile, str(e)))
+
+    # End of try:
+
+    DirIndexUpdate(OutFile)
+
+    logging.info (' Exiting WriteFzpz\n')
+
+# End of def WriteFzpz(InFile, OutFile, Members, Contents, Errors):
+
+def FzpModuleId(FzpDict):
+
+    # The (first) moduleId of the fzp processed with FzpDict for the reports,
+    # or None if there wasn't one (or it was an svg).
+
+    if 'moduleId' in FzpDict:
+
+        return FzpDict['moduleId'][0]
+
+    # End of if 'moduleId' in FzpDict:
+
+    return None
+
+# End of def FzpModuleId(FzpDict):
+
+def DirFileCacheKey(FzpType, FileType, InFile, OutFile, PrefixDir, DirProcessing, FilesProcessed):
+
+    # Create the cache key for processing InFile in dir to dir mode from the
+    # version and configuration settings, the file names (which appear in 
+    # the messages), the bytes of InFile and for an fzp the bytes of every 
+    # svg it references (or that it is missing), how its name matched the
+    # directory (DirIndexLookup) and whether an earlier fzp has already 
+    # processed it and for which view key (which decides between sharing 
+    # its results and Warning 29). Returns the key and the list of output 
+    # files processing will write, or None if a file can't be read (in 
+    # which case the file isn't cached). 
+
+    logging.info (' Entering DirFileCacheKey InFile %s\n', InFile)
+
+    KeyParts = [Version, PP.Version, ModifyTerminal, IssueNameDupWarning, CheckOnly, PP.DetailPP, FzpType, FileType, InFile, PrefixDir, DirProcessing]
+
+    OutFiles = [OutFile]
+
+    try:
+
+        with open(InFile, 'rb') as f:
+
+            KeyParts.append(f.read())
+
+    except OSError:
+
+        logging.info (' Exiting DirFileCacheKey on read error\n')
+
+        return None, []
+
+    # End of try:
+
+    if FileType == 'SKETCH':
+
+        # The audit depends on the moduleIds in the parts library (and the
+        # files they are in, which Warning 30 names).
+
+        if Sketch.Library == None:
+
+            KeyParts.append('nolibrary')
+
+        else:
+
+            KeyParts.append('\n'.join(ModuleId + '\t' + Sketch.Library[ModuleId] for ModuleId in sorted(Sketch.Library)))
+
+        # End of if Sketch.Library == None:
+
+    # End of if FileType == 'SKETCH':
+
+    if FileType == 'FZPPART' or FileType == 'FZPFRITZ':
+
+        KeyParts.append(str('processed.' + InFile in FilesProcessed))
+
+        for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, InFile, OutFile, PrefixDir):
+
+            # How the name matched the directory (exactly or only in a 
+            # different case) decides between Error 20 and Error 21 and, 
+            # on a case insensitive file system, changes when a file is 
+            # renamed to fix its case without its bytes changing.
+
+            KeyParts.extend([View, SvgInFile, str('processed.' + SvgInFile in FilesProcessed), FilesProcessed.get('viewkey.' + SvgInFile, 'none'), DirIndexLookup(SvgInFile)])
+
+            OutFiles.append(SvgOutFile)
+
+            if os.path.isfile(SvgInFile):
+
+                try:
+
+                    with open(SvgInFile, 'rb') as f:
+
+                        KeyParts.extend(['present', f.read()])
+
+                except OSError:
+
+                    logging.info (' Exiting DirFileCacheKey on svg read error\n')
+
+                    return None, []
+
+                # End of try:
+
+            else:
+
+                KeyParts.append('missing')
+
+            # End of if os.path.isfile(SvgInFile):
+
+        # End of for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, InFile, OutFile, PrefixDir):
+
+    # End of if FileType == 'FZPPART' or FileType == 'FZPFRITZ':
+
+    logging.info (' Exiting DirFileCacheKey\n')
+
+    return Cache.CacheKey(KeyParts), OutFiles
+
+# End of def DirFileCacheKey(FzpType, FileType, InFile, OutFile, PrefixDir, DirProcessing, FilesProcessed):
+
+def ProcessDirFileJob(Job):
+
+    # Pool worker for ProcessDirParallel. Each job is a group of files that
+    # share svgs, which are processed in work list order with their own 
+    # FilesProcessed (preloaded with what the parent already knows about 
+    # their svgs) so a shared svg is processed once and its results fanned 
+    # out to the other fzps exactly as the one at a time loop would. Returns
+    # the results of each file and FilesProcessed for the parent to merge.
+
+    Entries, DstDir, DirProcessing, Preload, Options, Debug = Job
+
+    FilesProcessed = dict(Preload)
+
+    Results = []
+
+    for Index, InFile, SrcDir, PrefixDir in Entries:
+
+        Errors, Warnings, Info, ModuleId = ProcessDirFile(InFile, SrcDir, DstDir, PrefixDir, DirProcessing, FilesProcessed, Options, Debug)
+
+        Results.append([Index, Errors, Warnings, Info, ModuleId])
+
+    # End of for Index, InFile, SrcDir, PrefixDir in Entries:
+
+    # The --timing stats for this job go back to the parent as well.
+
+    return Results, FilesProcessed, Timing.TakeStats()
+
+# End of def ProcessDirFileJob(Job):
+
+def SvgFilesFromFzp(FzpType, InFile, OutFile, PrefixDir):
+
+    # Cheaply find the svg files that ProcessSvgsFromFzp will process for 
+    # this fzp (in dir to dir mode) without doing any checking. Returns a 
+    # list of [View, svg input file, svg output file] for each view (whether
+    # or not the svg file exists) using the same path rules as 
+    # ProcessSvgsFromFzp. The output file is None if OutFile is None. A file
+    # that won't parse returns an empty list (the error will be reported 
+    # when the file is processed for real). 
+
+    logging.info (' Entering SvgFilesFromFzp InFile %s\n', InFile)
+
+    SvgFiles = []
+
+    try:
+
+        Root = etree.parse(InFile).getroot()
+
+    except (IOError, etree.XMLSyntaxError):
+
+        logging.info (' Exiting SvgFilesFromFzp on parse error\n')
+
+        return SvgFiles
+
+    # End of try:
+
+    InPath = os.path.dirname(InFile)
+
+    # Collect the image names by view in document order (as ProcessSvgsFromFzp
+    # joins them if there is more than one we need to as well).
+
+    Views = []
+
+    Images = {}
+
+    for ViewElem in Root.iterfind('views/*'):
+
+        View = ViewElem.tag
+
+        if not View in ['iconView', 'breadboardView', 'schematicView', 'pcbView']:
+
+            continue
+
+        # End of if not View in ['iconView', 'breadboardView', 'schematicView', 'pcbView']:
+
+        if not View in Views:
+
+            Views.append(View)
+
+            Images[View] = []
+
+        # End of if not View in Views:
+
+        for LayersElem in ViewElem.iterfind('layers'):
+
+            Images[View].append(LayersElem.get('image', 'none'))
+
+        # End of for LayersElem in ViewElem.iterfind('layers'):
+
+    # End of for ViewElem in Root.iterfind('views/*'):
+
+    for View in Views:
+
+        Image = ''.join(Images[View])
+
+        if FzpType == 'FZPPART':
+
+            NewFile = 'svg.' + Image.replace(r"/", ".")
+
+        else:
+
+            NewFile = os.path.join('..', 'svg', PrefixDir, Image)
+
+        # End of if FzpType == 'FZPPART':
+
+        if OutFile == None:
+
+            SvgFiles.append([View, os.path.join(InPath, NewFile), None])
+
+        else:
+
+            SvgFiles.append([View, os.path.join(InPath, NewFile), os.path.join(os.path.dirname(OutFile), NewFile)])
+
+        # End of if OutFile == None:
+
+    # End of for View in Views:
+
+    logging.debug (' SvgFilesFromFzp: SvgFiles %s\n', SvgFiles)
+
+    logging.info (' Exiting SvgFilesFromFzp\n')
+
+    return SvgFiles
+
+# End of def SvgFilesFromFzp(FzpType, InFile, OutFile, PrefixDir):
+
+# The svgs that more than one fzp view in the work list being processed 
+# references (found by PlanWorkList) indexed by svg file name. Each entry is
+# a dictionary with the number of references still to come ('refs') and, 
+# once ProcessSvgFromFzp has processed the svg, the view key it was 
+# processed with ('viewkey') and its results: the messages ('errors', 
+# 'warnings' and 'info'), the connector ids it found ('svgconnectors'), 
+# the connectors found for each subpart ('subparts') and whether it issued 
+# the font warning ('fontwarning'). The entry is dropped when the last 
+# reference has used it.
+
+SharedSvgs = {}
+
+def PlanWorkList(WorkList, FilesProcessed):
+
+    # The planning stage of ProcessWorkList. Walk the work list in order (as
+    # the one at a time loop will) and build the fzp to svg reference graph
+    # without doing any checking: the first fzp to reach an svg claims it 
+    # and an svg file in the list that an earlier fzp has claimed won't be 
+    # processed on its own. Returns a list of [index in WorkList, svg files]
+    # for each file that will be processed, where svg files is the list of
+    # [View, svg file] of the existing svgs it will read or write (with the 
+    # view 'svg' for a stand alone svg). Every svg referenced by more than 
+    # one fzp view (other than iconView which is only copied) is entered in 
+    # SharedSvgs with its number of references so that it is only parsed, 
+    # checked and written once and the results are fanned out to the 
+    # others (see ProcessSvgFromFzp). 
+
+    logging.info (' Entering PlanWorkList Files %s\n', len(WorkList))
+
+    # Regex to match '.svg' to find svg files (ignoring case)
+
+    SvgExtRegex = re.compile(r'\.svg$', re.IGNORECASE)
+
+    # Regex to match .fzp to find fzp files
+
+    FzpExtRegex = re.compile(r'\.fzp$', re.IGNORECASE)
+
+    # Regex to match 'part. to identify an unzipped fzpz file'
+
+    PartRegex = re.compile(r'^part\.', re.IGNORECASE)
+
+    # The svgs already claimed and the number of fzp views that reference 
+    # each svg. 
+
+    Claimed = {}
+
+    References = {}
+
+    Plan = []
+
+    for Index, [SrcDir, PrefixDir, InFile, Name] in enumerate(WorkList):
+
+        FQInFile = os.path.join(SrcDir, InFile)
+
+        if 'processed.' + FQInFile in FilesProcessed or FQInFile in Claimed:
+
+            # An earlier fzp will process this svg so skip it. 
+
+            logging.debug (' PlanWorkList: skipped file %s as already claimed\n', FQInFile)
+
+            continue
+
+        # End of if 'processed.' + FQInFile in FilesProcessed or FQInFile in Claimed:
+
+        if SvgExtRegex.search(InFile):
+
+            # A stand alone svg only writes itself (and as it isn't marked
+            # as processed doesn't claim itself). 
+
+            SvgFiles = [['svg', FQInFile]]
+
+        elif FzpExtRegex.search(InFile):
+
+            if PartRegex.search(InFile):
+
+                FzpType = 'FZPPART'
+
+            else:
+
+                FzpType = 'FZPFRITZ'
+
+            # End of if PartRegex.search(InFile):
+
+            # Only the svgs that exist will be processed (or copied).
+
+            SvgFiles = []
+
+            for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, FQInFile, None, PrefixDir):
+
+                if os.path.isfile(SvgInFile):
+
+                    SvgFiles.append([View, SvgInFile])
+
+                # End of if os.path.isfile(SvgInFile):
+
+            # End of for View, SvgInFile, SvgOutFile in SvgFilesFromFzp(FzpType, FQInFile, None, PrefixDir):
+
+        else:
+
+            SvgFiles = []
+
+        # End of if SvgExtRegex.search(InFile):
+
+        for View, SvgFile in SvgFiles:
+
+            if View != 'iconView' and View != 'svg':
+
+                Claimed[SvgFile] = 'y'
+
+                References[SvgFile] = References.get(SvgFile, 0) + 1
+
+            # End of if View != 'iconView' and View != 'svg':
+
+        # End of for View, SvgFile in SvgFiles:
+
+        Plan.append([Index, SvgFiles])
+
+    # End of for Index, [SrcDir, PrefixDir, InFile, Name] in enumerate(WorkList):
+
+    SharedSvgs.clear()
+
+    for SvgFile in References:
+
+        if References[SvgFile] > 1:
+
+            SharedSvgs[SvgFile] = {'refs': References[SvgFile], 'viewkey': None}
+
+        # End of if References[SvgFile] > 1:
+
+    # End of for SvgFile in References:
+
+    logging.debug (' PlanWorkList: %s files to process %s shared svgs\n', len(Plan), len(SharedSvgs))
+
+    logging.info (' Exiting PlanWorkList\n')
+
+    return Plan
+
+# End of def PlanWorkList(WorkList, FilesProcessed):
+
+def SvgViewKey(FzpType, CurView, FzpDict):
+
+    # The view key for checking the svg of view CurView of the fzp whose 
+    # data is in FzpDict: a hash of everything from the fzp that the svg 
+    # checks look at (the view, the connector ids and layerIds of the view,
+    # for schematic the subparts and their connectors, and whether the font
+    # warning has already been issued). Two fzps with the same view key for 
+    # the same svg get the same messages and output file from it, so the 
+    # svg only needs to be processed for the first of them. 
+
+    Model = FzpDict['partmodel']
+
+    ViewModel = Model.View(CurView)
+
+    KeyParts = [FzpType, CurView, str('font.warning' in FzpDict), 'connectors'] + sorted(ViewModel.Connectors) + ['layers'] + list(ViewModel.Layers)
+
+    if CurView == 'schematicView':
+
+        for SubPart in Model.Subparts.values():
+
+            KeyParts.extend(['subpart', SubPart.Id] + sorted(SubPart.Cons))
+
+        # End of for SubPart in Model.Subparts.values():
+
+    # End of if CurView == 'schematicView':
+
+    return Cache.CacheKey(KeyParts)
+
+# End of def SvgViewKey(FzpType, CurView, FzpDict):
+
+def ProcessDirParallel(WorkList, Plan, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+    # Process the work list with a pool of Options['jobs'] processes using 
+    # the Plan from PlanWorkList. Files that touch the same svg (sharing it,
+    # or as a stand alone svg that an fzp later in the list rewrites, which 
+    # includes the copied iconView svg) are put in the same group, and each
+    # group is one job that processes its files one at a time in work list
+    # order. So no two jobs write the same output file, a shared svg is 
+    # processed once and its results fanned out within the job, and the 
+    # groups can all run at the same time (the biggest first). The results 
+    # are printed in work list order as they become available. 
+
+    logging.info (' Entering ProcessDirParallel Files %s Jobs %s\n', len(WorkList), Options['jobs'])
+
+    # The groups (lists of positions in Plan), the svgs each group touches 
+    # and the group that each svg is in.
+
+    Groups = []
+
+    GroupSvgs = []
+
+    GroupOf = {}
+
+    for Position, [Index, SvgFiles] in enumerate(Plan):
+
+        Found = sorted(set(GroupOf[SvgFile] for View, SvgFile in SvgFiles if SvgFile in GroupOf))
+
+        if len(Found) == 0:
+
+            # Touches nothing an earlier file does so start a new group.
+
+            Group = len(Groups)
+
+            Groups.append([])
+
+            GroupSvgs.append([])
+
+        else:
+
+            # Join the first group found and merge any others in to it as
+            # this file connects them.
+
+            Group = Found[0]
+
+            for Other in Found[1:]:
+
+                Groups[Group].extend(Groups[Other])
+
+                Groups[Other] = []
+
+                for SvgFile in GroupSvgs[Other]:
+
+                    GroupOf[SvgFile] = Group
+
+                # End of for SvgFile in GroupSvgs[Other]:
+
+                GroupSvgs[Group].extend(GroupSvgs[Other])
+
+                GroupSvgs[Other] = []
+
+            # End of for Other in Found[1:]:
+
+        # End of if len(Found) == 0:
+
+        Groups[Group].append(Position)
+
+        for View, SvgFile in SvgFiles:
+
+            if not SvgFile in GroupOf:
+
+                GroupOf[SvgFile] = Group
+
+                GroupSvgs[Group].append(SvgFile)
+
+            # End of if not SvgFile in GroupOf:
+
+        # End of for View, SvgFile in SvgFiles:
+
+    # End of for Position, [Index, SvgFiles] in enumerate(Plan):
+
+    # Make a job of each group (its files in work list order along with 
+    # anything FilesProcessed already has for its svgs).
+
+    Jobs = []
+
+    for Group in range(len(Groups)):
+
+        if len(Groups[Group]) == 0:
+
+            continue
+
+        # End of if len(Groups[Group]) == 0:
+
+        Entries = []
+
+        for Position in sorted(Groups[Group]):
+
+            SrcDir, PrefixDir, InFile, Name = WorkList[Plan[Position][0]]
+
+            Entries.append([Position, InFile, SrcDir, PrefixDir])
+
+        # End of for Position in sorted(Groups[Group]):
+
+        Preload = {}
+
+        for SvgFile in GroupSvgs[Group]:
+
+            for Key in ('processed.' + SvgFile, 'viewkey.' + SvgFile):
+
+                if Key in FilesProcessed:
+
+                    Preload[Key] = FilesProcessed[Key]
+
+                # End of if Key in FilesProcessed:
+
+            # End of for Key in ('processed.' + SvgFile, 'viewkey.' + SvgFile):
+
+        # End of for SvgFile in GroupSvgs[Group]:
+
+        Jobs.append((Entries, DstDir, DirProcessing, Preload, Options, Debug))
+
+    # End of for Group in range(len(Groups)):
+
+    Jobs.sort(key=lambda Job: -len(Job[0]))
+
+    logging.debug (' ProcessDirParallel: %s files in %s jobs\n', len(Plan), len(Jobs))
+
+    ErrorsSeen = 'n'
+
+    Errors = []
+
+    Results = {}
+
+    NextResult = 0
+
+    Context = multiprocessing.get_context('fork')
+
+    with Context.Pool(Options['jobs'], initializer=Timing.ResetStats) as Pool:
+
+        for JobResults, JobFilesProcessed, JobStats in Pool.imap_unordered(ProcessDirFileJob, Jobs):
+
+            FilesProcessed.update(JobFilesProcessed)
+
+            Timing.MergeStats(JobStats)
+
+            for Result in JobResults:
+
+                Results[Result[0]] = Result[1:]
+
+            # End of for Result in JobResults:
+
+            # Print any results that are now in work list order.
+
+            while NextResult in Results:
+
+                Errors, Warnings, Info, ModuleId = Results.pop(NextResult)
+
+                SrcDir, PrefixDir, InFile, Name = WorkList[Plan[NextResult][0]]
+
+                print('\n**** Starting to process file {0:s}'.format(str(Name)))
+
+                if len(Diag.Visible(Errors)) != 0:
+
+                    ErrorsSeen = 'y'
+
+                # End of if len(Diag.Visible(Errors)) != 0:
+
+                PP.PrintInfo(Info)
+
+                PP.PrintWarnings(Warnings)
+
+                PP.PrintErrors(Errors)
+
+                Report.ReportFile(os.path.join(SrcDir, InFile), ModuleId, Errors, Warnings, Info)
+
+                NextResult += 1
+
+            # End of while NextResult in Results:
+
+        # End of for JobResults, JobFilesProcessed, JobStats in Pool.imap_unordered(ProcessDirFileJob, Jobs):
+
+    # End of with Context.Pool(Options['jobs'], initializer=Timing.ResetStats) as Pool:
+
+    logging.info (' Exiting ProcessDirParallel\n')
+
+    return ErrorsSeen, Errors
+
+# End of def ProcessDirParallel(WorkList, Plan, DstDir, DirProcessing, FilesProcessed, Options, Debug):
+
+def PopTag(TagStack, Level):
+
+    # Determine from the current level if the value on the tag stack is still
+    # in scope. If it is not, then remove the value from the stack.
+
+    logging.info (' Entering PopTag Level %s\n', Level)
+
+    logging.debug(' PopTag: entry TagStack %s Level %s\n', TagStack, Level)
+
+    Tag, StackLevel = TagStack[len(TagStack) - 1]
+
+    # Because we may have exited several recusion levels before calling this
+    # delete all the tags below the current level. 
+
+    while Level != 0 and StackLevel >= Level:
+
+        # Pop the last item from the stack.
+
+        logging.debug(' PopTag: popped Tag %s, StackLevel %s\n', Tag, StackLevel )
+
+        TagStack.pop(len(TagStack) - 1)
+
+        Tag, StackLevel = TagStack[len(TagStack) - 1]
+
+    # End of while Level != 0 and StackLevel >= Level:
+
+    logging.debug(' PopTag: exit TagStack %s Level %s\n', TagStack, Level)
+
+    logging.info (' Exiting PopTag Level %s\n', Level)
+
+# End of def PopTag(Elem, TagStack, Level):
+
+def BackupFilename(InFile, Errors):
+
+    logging.info (' Entering BackupFilename\n')
+
+    # First set the appropriate output file name None for an error condition.
+
+    OutFile = None
+
+    try:
+
+        # Then try and rename the input file to InFile.bak
+
+        os.rename (InFile, InFile + '.bak')
+
+    except os.error as e:
+
+        Errors.append(Diag.Diagnostic('Error 15: Can not rename\n\n\'{0:s}\'\n\nto\n\n\'{1:s}\'\n\n\'{2:s}\'\n\n{3:s} ({4:s})\n', InFile, InFile + '.bak', e.filename, e.strerror, e.errno))
+
+        return InFile, OutFile
+
+    # End of try:
+
+    # If we get here, then the file was successfully renamed so change the 
+    # filenames (and the directory index) and return.
+
+    DirIndexUpdate(InFile)
+
+    DirIndexUpdate(InFile + '.bak')
+
+    OutFile = InFile
+
+    InFile = InFile + '.bak'
+
+    return InFile, OutFile
+
+    logging.info (' Exiting BackupFilename\n')
+
+# End of def BackupFilename(InFile, Errors):
+
+# The per directory index of file names used by ProcessSvgsFromFzp to check
+# that an svg exists (Error 20) and that its case matches the file system 
+# (Error 21) without listing the directory for every svg. Indexed by the 
+# absolute directory name, each entry is [set of file names, dictionary of 
+# case folded file name to set of file names] filled by one os.scandir of 
+# the directory the first time a file in it is looked up. 
+
+DirIndex = {}
+
+def DirIndexGet(Dir):
+
+    # Return the index entry for Dir (scanning the directory if it hasn't
+    # been seen yet) or None if the directory can't be read. 
+
+    if Dir == '':
+
+        # Change an empty path to current directory to prevent os error
+
+        Dir = './'
+
+    # End of if Dir == '':
+
+    Key = os.path.abspath(Dir)
+
+    if not Key in DirIndex:
+
+        logging.debug (' DirIndexGet: scanning %s\n', Key)
+
+        Names = set()
+
+        Folded = {}
+
+        try:
+
+            with os.scandir(Dir) as Entries:
+
+                for Entry in Entries:
+
+                    if Entry.is_file():
+
+                        Names.add(Entry.name)
+
+                        Folded.setdefault(Entry.name.casefold(), set()).add(Entry.name)
+
+                    # End of if Entry.is_file():
+
+                # End of for Entry in Entries:
+
+        except OSError:
+
+            # Don't remember a failure, the directory may appear later.
+
+            return None
+
+        # End of try:
+
+        DirIndex[Key] = [Names, Folded]
+
+    # End of if not Key in DirIndex:
+
+    return DirIndex[Key]
+
+# End of def DirIndexGet(Dir):
+
+def DirIndexLookup(File):
+
+    # Look File up in the index of its directory. Returns 'exact' if a file 
+    # of exactly that name exists, 'case' if a file whose name differs only 
+    # in case exists and 'missing' if neither does. 
+
+    Entry = DirIndexGet(os.path.dirname(File))
+
+    if Entry == None:
+
+        return 'missing'
+
+    # End of if Entry == None:
+
+    Names, Folded = Entry
+
+    BaseFile = os.path.basename(File)
+
+    if BaseFile in Names:
+
+        return 'exact'
+
+    elif BaseFile.casefold() in Folded:
+
+        return 'case'
+
+    else:
+
+        return 'missing'
+
+    # End of if BaseFile in Names:
+
+# End of def DirIndexLookup(File):
+
+def DirIndexUpdate(File):
+
+    # File may have been created, renamed or deleted, so if its directory is
+    # in the index bring the entry for File up to date (with one stat 
+    # rather than scanning the directory again). 
+
+    Key = os.path.abspath(os.path.dirname(File) or './')
+
+    if not Key in DirIndex:
+
+        # Not indexed yet, the scan will pick it up when it is.
+
+        return
+
+    # End of if not Key in DirIndex:
+
+    Names, Folded = DirIndex[Key]
+
+    BaseFile = os.path.basename(File)
+
+    if os.path.isfile(File) or PP.InMemory(File):
+
+        Names.add(BaseFile)
+
+        Folded.setdefault(BaseFile.casefold(), set()).add(BaseFile)
+
+    else:
+
+        Names.discard(BaseFile)
+
+        if BaseFile.casefold() in Folded:
+
+            Folded[BaseFile.casefold()].discard(BaseFile)
+
+            if len(Folded[BaseFile.casefold()]) == 0:
+
+                del Folded[BaseFile.casefold()]
+
+            # End of if len(Folded[BaseFile.casefold()]) == 0:
+
+        # End of if BaseFile.casefold() in Folded:
+
+    # End of if os.path.isfile(File):
+
+# End of def DirIndexUpdate(File):
+
+def DupNameError(InFile, Id, Elem, Errors):
+
+    logging.info (' Entering DupNameError:\n')
+
+    logging.debug (' DupNameError: Entry InFile %s Id %s Elem %s Errors %s\n', InFile, Id, Elem, Errors)
+
+    # Log duplicate name error 
+
+    Errors.append(Diag.Diagnostic('Error 16: File\n\'{0:s}\'\nAt line {1:s}\n\nId {2:s} present more than once (and should be unique)\n', InFile, Elem.sourceline, Id))
+
+    logging.info (' Exiting DupNameError\n')
+
+#End of def DupNameError(InFile, Id, Elem, Errors):
+
+def DupNameWarning(InFile, Id, Elem, Warnings):
+
+    logging.info (' Entering DupNameWarning:\n')
+
+    logging.debug (' DupNameWarning: Entry InFile %s Id %s Elem %s Errors %s\n', InFile, Id, Elem, Warnings)
+
+    # Log duplicate name warning
+
+    Warnings.append(Diag.Diagnostic('Warning 28: File\n\'{0:s}\'\nAt line {1:s}\n\nname {2:s} present more than once (and should be unique)\n', InFile, Elem.sourceline, Id))
+
+    logging.info (' Exiting DupNameWarning\n')
+
+#End of def DupNameWarning(InFile, Id, Elem, Warnings):
+
+def ProcessTree(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level=0):
+
+    # Potentially recursively process the element nodes of an lxml tree to 
+    # aquire the information we need to check file integrity. This routine gets
+    # called recursively to process child nodes (other routines get called for
+    # leaf node processing). 
+
+    logging.info (' Entering ProcessTree FileType %s InFile %s Level %s\n', FileType, InFile, Level)
+
+    logging.debug (' **** ProcessTree: Source line %s Elem len %s Level %s\nTag %s\nattributes\n%s\ntext %s\nFzpType %s FileType %s InFile %s OutFile %s CurView %s PrefixDir %s Errors %s Warnings %s Info %s TagStack %s State %s InheritedAttributes %s\n', Elem.sourceline, len(Elem), Level, Elem.tag, Elem.attrib, Elem.text, FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, Warnings, Info, TagStack, State, InheritedAttributes)
+
+
+    # Start by checking for non whitespace charactes in tail (which is likely
+    # an error) and flag the line if present. 
+
+    Tail = Elem.tail
+
+    logging.debug (' ProcessTree: Tail = \'%s\'\n', Tail)
+
+    if Tail != None and not Tail.isspace(): 
+
+        Warnings.append(Diag.Diagnostic('Warning 2: File\n\'{0:s}\'\nAt line {1:s}\n\nText \'{2:s}\' isn\'t white space and may cause a problem\n', InFile, Elem.sourceline, Tail))
+        
+    # End of if not Elem.tail.isspace(): 
+
+    if len(Elem):
+
+        logging.debug (' ProcessTree: Procees parent node attributes Source line %s len %s Level %s tag %s\n', Elem.sourceline, len(Elem), Level, Elem.tag)
+
+        ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level)
+
+        logging.debug (' ProcessTree: Child nodes Source line %s len %s Level %s tag %s\n', Elem.sourceline, len(Elem), Level, Elem.tag)
+
+        # This node has children so recurse down the tree to deal with them.
+
+        for Elem in Elem:
+
+            if len(Elem):
+
+                # this node has children so process them (the attributes of 
+                # this node will be processed by the recursion call and the 
+                # level will be increased by one.) 
+
+                ProcessTree(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level+1)
+
+            else: # This particular element in the for loop is a leaf node.
+
+                # As this is a leaf node proecess it again increasing the 
+                # level by 1 before doing the call. 
+
+                ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level+1)
+
+            # End of if len(Elem):
+
+        # End of for Elem in Elem:
+
+    else:
+    
+        # This is a leaf node and thus the level needs to be increased by 1
+        # before we process it.  
+
+        ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level+1)
+
+    # end of if len(Elem):
+
+    logging.info (' Exiting ProcessTree Level %s\n', Level)
+
+# End of def ProcessTree(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level=0):
+
+def ProcessLeafNode(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level):
+
+    logging.info (' Entering ProcessLeafNode FileType %s Level %s\n', FileType, Level)
+
+    logging.debug (' ProcessLeafNode: FzpType %s FileType %s InFile %s CurView %s Errors %s\n', FzpType, FileType, InFile,CurView, Errors)
+
+    # Start by checking for non whitespace charactes in tail (which is likely
+    # an error) and flag the line if present. 
+
+    Tail = Elem.tail
+
+    logging.debug (' ProcessLeafNode: Tail = \'%s\'\n', Tail)
+
+    if Tail != None and not Tail.isspace(): 
+
+        Warnings.append(Diag.Diagnostic('Warning 2: File\n\'{0:s}\'\nAt line {1:s}\n\nText  \'{2:s}\' isn\'t white space and may cause a problem\n', InFile, Elem.sourceline, Tail))
+        
+    # End of if not Elem.tail.isspace(): 
+
+    # Select the appropriate leaf node processing routing based on the FileType
+    # variable. 
+
+    if FileType == 'FZPFRITZ' or  FileType == 'FZPPART':
+
+        # If this is a fzp file do the leaf node processing for that. 
+
+        ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, Level)
+        
+    elif FileType == 'SVG':
+
+        ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Level)
+
+    else:
+
+        if not 'SoftwareError' in State:
+
+            # Report the software error once, then set 'SoftwareError' in State
+            # to supress more messages and just return. It won't work right 
+            # but the problem will at least be reported. 
+
+            Errors.append(Diag.Diagnostic('Error 19: File\n\'{0:s}\'\n\nFile type {1:s} is an unknown format (software error)\n', InFile, FileType))
+
+            State['SoftwareError'] = 'y'
+
+        # End of if not 'SoftwareError' in State:
+
+    # End of if FileType == 'FZPFRITZ' or  FileType == 'FZPPART':
+
+    logging.info (' Exiting ProcessLeafNode Level %s\n', Level)
 
 # End of def ProcessLeafNode(FzpType, InFile, OutFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug, Level):
 
+def ProcessFzpStream(FzpType, FileType, InFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug):
+
+    # Check an fzp file from a stream of iterparse events rather than by 
+    # parsing the whole file in to a tree and walking it with ProcessTree.
+    # The elements are fed to ProcessFzpLeafNode (and thus the same FzpTags,
+    # FzpProcessConnectorsTs*, FzpProcessBusTs* and 
+    # FzpProcessSchematicPartsTs* checks) in the same order and at the same
+    # Level that ProcessTree would use, and each element is deleted as soon 
+    # as it has been checked so memory use doesn't grow with the size of 
+    # the file. As the tail text of an element isn't known until the parser
+    # has moved past it, the Warning 2 (tail text) check that ProcessTree 
+    # and ProcessLeafNode do is done at the next event instead and the 
+    # warning inserted where they would have put it. Nothing can be written
+    # from here (there is no tree left at the end) so this is only for 
+    # checking. Returns 'y' if the file parsed 
+    # successfully and 'n' (with Error 5 or 6 as from PP.ParseFile and 
+    # without any messages from the partial check) if it didn't. 
+
+    logging.info (' Entering ProcessFzpStream FileType %s InFile %s\n', FileType, InFile)
+
+    # Note where the messages start so a parse error can remove the ones
+    # from the part of the file that was checked. 
+
+    ErrorsLen = len(Errors)
+
+    WarningsLen = len(Warnings)
+
+    InfoLen = len(Info)
+
+    # The open elements as [Elem, Warnings index, has children] (the root is
+    # OpenElems[0]) and the last element finished but waiting for its tail.
+
+    OpenElems = []
+
+    Pending = None
+
+    # The root isn't checked until we know if it has children, as 
+    # ProcessTree checks a root without children at Level 1 rather than 0.
+
+    RootChecked = 'n'
+
+    try:
+
+        Context = etree.iterparse(PP.InputSource(InFile), events=('start', 'end', 'comment', 'pi'), remove_blank_text=True)
+
+        for Event, Elem in Context:
+
+            if Pending != None:
+
+                # The parser has moved past the last element finished so its
+                # tail is now complete.
+
+                ProcessFzpStreamTail(InFile, Pending, Warnings)
+
+                Pending = None
+
+            # End of if Pending != None:
+
+            if Event == 'end':
+
+                Entry = OpenElems.pop()
+
+                if len(OpenElems) == 0 and RootChecked == 'n':
+
+                    # The root without any children is checked at Level 1.
+
+                    Entry[1] = len(Warnings)
+
+                    ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, 1)
+
+                    RootChecked = 'y'
+
+                # End of if len(OpenElems) == 0 and RootChecked == 'n':
+
+                Pending = Entry
+
+                continue
+
+            # End of if Event == 'end':
+
+            if len(OpenElems) == 0:
+
+                if Event == 'start':
+
+                    # This is the root, which is checked later.
+
+                    OpenElems.append([Elem, None, 'n'])
+
+                # End of if Event == 'start':
+
+                # Comments and processing instructions outside the root 
+                # aren't part of the tree ProcessTree walks so ignore them.
+
+                continue
+
+            # End of if len(OpenElems) == 0:
+
+            # This is a child of the last open element, so mark that it has 
+            # children and check the root now if it hasn't been.
+
+            OpenElems[len(OpenElems) - 1][2] = 'y'
+
+            if RootChecked == 'n':
+
+                OpenElems[0][1] = len(Warnings)
+
+                ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, OpenElems[0][0], Errors, Warnings, Info, FzpDict, TagStack, State, 0)
+
+                RootChecked = 'y'
+
+            # End of if RootChecked == 'n':
+
+            # The Level of an element is its depth in the tree.
+
+            Level = len(OpenElems)
+
+            Entry = [Elem, len(Warnings), 'n']
+
+            ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, Level)
+
+            if Event == 'start':
+
+                OpenElems.append(Entry)
+
+            else:
+
+                # A comment or processing instruction has no end event so
+                # it is finished now. 
+
+                Pending = Entry
+
+            # End of if Event == 'start':
+
+        # End of for Event, Elem in Context:
+
+        if Pending != None:
+
+            ProcessFzpStreamTail(InFile, Pending, Warnings)
+
+        # End of if Pending != None:
+
+    except IOError:
+
+        del Errors[ErrorsLen:]
+
+        del Warnings[WarningsLen:]
+
+        del Info[InfoLen:]
+
+        Errors.append(Diag.Diagnostic('Error 5: ParseFile can\'t read file {0:s}\n', InFile))    
+
+        logging.info (' Exiting ProcessFzpStream on no file error\n')
+
+        return 'n'
+
+    except etree.XMLSyntaxError:
+
+        del Errors[ErrorsLen:]
+
+        del Warnings[WarningsLen:]
+
+        del Info[InfoLen:]
+
+        # iterparse stops at the first error, while the tree parser lists
+        # every error it finds, so parse the (broken) file again with 
+        # PP.ParseFile to give the same messages as without --check. 
+
+        PP.ParseFile(InFile, Errors)
+
+        logging.info (' Exiting ProcessFzpStream on parser error\n')
+
+        return 'n'
+
+    # End of try:
+
+    logging.info (' Exiting ProcessFzpStream\n')
+
+    return 'y'
+
+# End of def ProcessFzpStream(FzpType, FileType, InFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug):
+
+def ProcessFzpStreamTail(InFile, Entry, Warnings):
+
+    # Do the Warning 2 tail text check for a finished element from 
+    # ProcessFzpStream, inserting the warning(s) at the point ProcessTree 
+    # (for an element with children) and ProcessLeafNode would have issued
+    # them, then delete the element as we are done with it. 
+
+    Elem, Index, HasChildren = Entry
+
+    Tail = Elem.tail
+
+    if Tail != None and not Tail.isspace(): 
+
+        TailWarnings = []
+
+        if HasChildren == 'y':
+
+            TailWarnings.append(Diag.Diagnostic('Warning 2: File\n\'{0:s}\'\nAt line {1:s}\n\nText \'{2:s}\' isn\'t white space and may cause a problem\n', InFile, Elem.sourceline, Tail))
+
+        # End of if HasChildren == 'y':
+
+        TailWarnings.append(Diag.Diagnostic('Warning 2: File\n\'{0:s}\'\nAt line {1:s}\n\nText  \'{2:s}\' isn\'t white space and may cause a problem\n', InFile, Elem.sourceline, Tail))
+
+        Warnings[Index:Index] = TailWarnings
+
+    # End of if Tail != None and not Tail.isspace(): 
+
+    Parent = Elem.getparent()
+
+    if Parent != None:
+
+        # All of this element's children have already been removed, so
+        # removing it from its parent frees it.
+
+        Parent.remove(Elem)
+
+    # End of if Parent != None:
+
+# End of def ProcessFzpStreamTail(InFile, Entry, Warnings):
+
 def ProcessFzp(DirProcessing, FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug):
 
     logging.info (' Entering ProcessFzp FzpType %s FileType %s InFile %s\n', FzpType, FileType, InFile)
 
     logging.debug ('  ProcessFzp: FzpType %s FileType %s InFile %s OutFile %s CurView %s PrefixDir %s Errors %s Warnings %s Info %s FzpDict %s TagStack %s State %s InheritedAttributes %s Debug %s\n', FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug)
 
+    if CheckOnly == 'y':
+
+        # We are only checking, so there is no need for a tree to write out
+        # and the fzp can be checked from a stream of parse events. 
+
+        if ProcessFzpStream(FzpType, FileType, InFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug) == 'y':
+
+            # We are at the end of processing the fzp file so check that the
+            # connector numbers are contiguous then check the svgs.
+
+            FzpCheckConnectors(InFile, None, FzpDict, Errors, Warnings, Info, State)
+
+            ProcessSvgsFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug)
+
+        # End of if ProcessFzpStream(FzpType, FileType, InFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug) == 'y':
+
+        logging.info (' Exiting ProcessFzp after check only\n')
+
+        return
+
+    # End of if CheckOnly == 'y':
+
     # Parse the input document.
 
     Doc, Root = PP.ParseFile (InFile, Errors)
@@ -799,453 +4021,619 @@ def ProcessFzp(DirProcessing, FzpType, FileType, InFile, OutFile, CurView, Prefi
         # Now that we have an appropriate input file name, process the tree.
         # (we won't get here if there is a file rename error above!)
 
-        logging.debug (' ProcessFzp: before ProcessTree FileType %s FQOutFile %s\n', FileType, FQOutFile)
+        logging.debug (' ProcessFzp: before ProcessTree FileType %s FQOutFile %s\n', FileType, FQOutFile)
+
+        ProcessTree(FzpType, FileType, InFile, FQOutFile, None, PrefixDir, Root, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug)
+
+        logging.debug (' ProcessFzp: After ProcessTree FileType %s FQOutFile %s\n', FileType, FQOutFile)
+
+        # We are at the end of processing the fzp file so check that the
+        # connector numbers are contiguous.
+
+        FzpCheckConnectors(InFile, Root, FzpDict, Errors, Warnings, Info, State)        
+        # We have an output file name so write the fzp file to it (or the 
+        # console if Debug is > 0.)
+
+        logging.debug (' ProcessFzp: Prettyprint FQOutFile %s FileType %s\n', FQOutFile, FileType)
+
+        PP.OutputTree(Doc, Root, FileType, InFile, FQOutFile, Errors, Warnings, Info, Debug)
+
+        if FQOutFile != None:
+
+            DirIndexUpdate(FQOutFile)
+
+        # End of if FQOutFile != None:
+
+        # Then process the associatted svg files from the fzp.
+
+        logging.debug (' ProcessFzp: Calling ProcessSvgsFromFzp DirProcessing %s FzpType %s FileType %s InFile %s OutFile %s PrefixDir %s Errors %s Warnings %s Info %s FzpDict %s Debug %s\n', DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, Debug)
+
+
+        # Use the original value of OutFile to process the svgs. 
+
+        ProcessSvgsFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug)
+
+    # End of if Doc != None:
+    
+    logging.info (' Exiting ProcessFzp\n')
+
+# End of def ProcessFzp(DirProcessing, FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug):
+
+def ProcessSvgsFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug):
+
+    # Process the svg files referenced in the FzpDict created from a Fritzing
+    # .fzp file.
+
+    logging.info (' Entering ProcessSvgsFromFzp DirProcessing %s FzpType %s FileType %s InFile %s\n', DirProcessing,  FzpType, FileType, InFile)
+
+    logging.debug (' ProcessSvgsFromFzp: OutFile %s PrefixDir %s FzpDict %s\n', OutFile, PrefixDir, FzpDict)
+
+    # First we need to determine the directory structure / filename for the 
+    # svg files as there are several to choose from: uncompressed parts which 
+    # are all in the same directory but with odd prefixes of 
+    # svg.layer.filename or in a Fritzing directory which will be 
+    # ../svg/PrefixDir/layername/filename in 4 different directories. In
+    # addition we may be processing a single fzp file (in which case the input
+    # file needs a '.bak' appended to it), or directory of fzp files in which
+    # case the '.bak' isn't needed. We will form appropriate file names from 
+    # the InFile, OutFile and PrefixDir arguments to feed to the svg 
+    # processing routine. 
+
+    # Get the path from the input and output files (which will be the fzp file 
+    # at this point.) 
+
+    InPath = os.path.dirname(InFile)
+
+    if 'processed.' + InFile in FilesProcessed:
+
+        # If we have already processed it, flag an error (should not occur).
+
+        logging.debug (' ProcessSvgsFromFzp: InFile %s Error 87 issued\n', InFile)
+
+        Errors.append(Diag.Diagnostic('Error 87: File\n\'{0:s}\'\n\nFile has already been processed (software error)\n', InFile))
+
+        logging.info (' Exiting ProcessSvgsFromFzp on already processed error\n')
+
+        return
+        
+    else:
+
+        # Mark that we have processed this file. 
+
+        FilesProcessed['processed.' + InFile] = 'y'
+
+        logging.debug (' ProcessSvgsFromFzp: InFile %s marked as processed\n', InFile)
+
+    # End of if 'processed.' + InFile in FilesProcessed:
+
+    logging.debug (' ProcessSvgsFromFzp: InPath %s InFile %s', InPath, InFile)
+
+    if OutFile == None:
+
+        OutPath = ''
+
+        logging.debug (' ProcessSvgsFromFzp: OutPath %s OutFile %s', OutPath, OutFile)
+
+    else:
+
+        OutPath = os.path.dirname(OutFile)
+
+        logging.debug (' ProcessSvgsFromFzp: OutPath %s OutFile %s', OutPath, OutFile)
+
+    # End of if OutFile == None:
+
+    Model = FzpDict['partmodel']
+
+    for CurView in Model.ViewNames:
+
+        logging.debug (' ProcessSvgsFromFzp: Process View %s FileType %s ViewNames %s\n', CurView, FileType, Model.ViewNames)
+
+        ProcessSvgFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, CurView, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug)
+
+    # End of for CurView in Model.ViewNames:
+
+    logging.info (' Exiting ProcessSvgsFromFzp\n')
+
+#End of def ProcessSvgsFromFzp(FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug):
+
+def ProcessSvgFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, CurView, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug):
+
+    # Process the svg file for view CurView of the fzp InFile (whose data is
+    # in FzpDict) and check its connectors against the fzp. Called for each
+    # view by ProcessSvgsFromFzp and for a single changed view by --watch.
+
+    logging.info (' Entering ProcessSvgFromFzp FzpType %s InFile %s CurView %s\n', FzpType, InFile, CurView)
+
+    FQOutFile = None
+
+    InPath = os.path.dirname(InFile)
+
+    if OutFile == None:
+
+        OutPath = ''
+
+    else:
+
+        OutPath = os.path.dirname(OutFile)
+
+    # End of if OutFile == None:
+
+    Model = FzpDict['partmodel']
+
+    ViewModel = Model.View(CurView)
+
+    # Extract just the image name as a string from the list entry.
+
+    Image = ''.join(ViewModel.Images)
+
+    logging.debug (' ProcessSvgsFromFzp 1: CurView %s Image %s FzpType %s FileType %s OutFile %s\n', CurView, Image, FzpType, FileType, OutFile)
+
+    # indicate we haven't seen an output file rename error. 
+
+    OutFileError = 'n'
+
+    if FzpType == 'FZPPART':
+
+        # The svg is of the form svg.layer.filename in the directory 
+        # pointed to by Path. So append a svg. to the file name and 
+        # convert the '/' to a '.' to form the file name for processing. 
+
+        Image = Image.replace(r"/", ".")
+
+        if OutFile == None:
+
+            # Single file processing so set the output filename and use 
+            # FQOutFile.bak as the input. Again preserve the original 
+            # value of OutFile for processing later svg files. 
+
+            Image = Image.replace(r"/", ".")
 
-        ProcessTree(FzpType, FileType, InFile, FQOutFile, None, PrefixDir, Root, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug)
+            FQOutFile = os.path.join(InPath, 'svg.' + Image)
 
-        logging.debug (' ProcessFzp: After ProcessTree FileType %s FQOutFile %s\n', FileType, FQOutFile)
+            # Set the input file from the output file in case debug is non
+            # zero and we don't set a backup file. 
 
-        # We are at the end of processing the fzp file so check that the
-        # connector numbers are contiguous.
+            FQInFile = FQOutFile
 
-        FzpCheckConnectors(InFile, Root, FzpDict, Errors, Warnings, Info, State)        
-        # We have an output file name so write the fzp file to it (or the 
-        # console if Debug is > 0.)
+            if Debug == 0 and CheckOnly != 'y':
 
-        logging.debug (' ProcessFzp: Prettyprint FQOutFile %s FileType %s\n', FQOutFile, FileType)
+                # If Debug isn't set (and we aren't only checking) then 
+                # rename the input file and change the input file name.
+                # Otherwise leave it alone (in this case OutFile is 
+                # unused and output goes to the console for debugging or
+                # no where at all.)
 
-        PP.OutputTree(Doc, Root, FileType, InFile, FQOutFile, Errors, Warnings, Info, Debug)
+                FQInFile, FQOutFile = BackupFilename(FQInFile, Errors)
 
-        # Then process the associatted svg files from the fzp.
+                if FQOutFile == None:
 
-        logging.debug (' ProcessFzp: Calling ProcessSvgsFromFzp DirProcessing %s FzpType %s FileType %s InFile %s OutFile %s PrefixDir %s Errors %s Warnings %s Info %s FzpDict %s Debug %s\n', DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, Debug)
+                    # an error occurred renaming the input file so set an
+                    # an OutFileError so we don't try and process this 
+                    # file as we have no valid output file to write it to. 
 
+                    OutFileError = 'n'
 
-        # Use the original value of OutFile to process the svgs. 
+                # End of if FQOutFile == None:
 
-        ProcessSvgsFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug)
+                logging.debug (' ProcessSvgsFromFzp 2: FQInFile %s FQOutFile %s OutFileError %s\n', FQInFile, FQOutFile, OutFileError)
+                
+            # End of if Debug == 0 and CheckOnly != 'y':
 
-    # End of if Doc != None:
-    
-    logging.info (' Exiting ProcessFzp\n')
+        else:
 
-# End of def ProcessFzp(DirProcessing, FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug):
+            # dir to dir processing so set appropriate file names
+            # (identical except for path)
 
-def ProcessSvgsFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug):
+            FQInFile = os.path.join(InPath, 'svg.' + Image)
 
-    # Process the svg files referenced in the FzpDict created from a Fritzing
-    # .fzp file.
+            FQOutFile = os.path.join(OutPath, 'svg.' + Image)
 
-    logging.info (' Entering ProcessSvgsFromFzp DirProcessing %s FzpType %s FileType %s InFile %s\n', DirProcessing,  FzpType, FileType, InFile)
+        # End of if OutFile == None:
 
-    logging.debug (' ProcessSvgsFromFzp: OutFile %s PrefixDir %s FzpDict %s\n', OutFile, PrefixDir, FzpDict)
+    elif FzpType == 'FZPFRITZ':
 
-    # First we need to determine the directory structure / filename for the 
-    # svg files as there are several to choose from: uncompressed parts which 
-    # are all in the same directory but with odd prefixes of 
-    # svg.layer.filename or in a Fritzing directory which will be 
-    # ../svg/PrefixDir/layername/filename in 4 different directories. In
-    # addition we may be processing a single fzp file (in which case the input
-    # file needs a '.bak' appended to it), or directory of fzp files in which
-    # case the '.bak' isn't needed. We will form appropriate file names from 
-    # the InFile, OutFile and PrefixDir arguments to feed to the svg 
-    # processing routine. 
+        # The svg is of the form path../svg/PrefixDir/layername/filename, 
+        # so prepend the appropriate path and use that as the file name. 
 
-    # Insure FQOutFile has a value
+        # First create the new end path as NewFile 
+        # (i.e. '../svg/PrefixDir/Image') once, ready to append as needed.
 
-    FQOutFile = None
+        NewFile = '..'
 
-    # Get the path from the input and output files (which will be the fzp file 
-    # at this point.) 
+        NewFile = os.path.join(NewFile, 'svg')
 
-    InPath = os.path.dirname(InFile)
+        logging.debug (' ProcessSvgsFromFzp: after add svg NewFile %s PrefixDir %s\n', NewFile, PrefixDir)
 
-    # Record in FilesProcessed that we have processed this file name in case 
-    # this is a directory operation. Get just the file name.
+        NewFile = os.path.join(NewFile, PrefixDir)
 
-    BaseFile = os.path.basename(InFile)
+        logging.debug (' ProcessSvgsFromFzp: after add  PrefixDir NewFile %s\n', NewFile)
 
-    if 'processed.' + InFile in FilesProcessed:
+        NewFile = os.path.join(NewFile, Image)
 
-        # If we have already processed it, flag an error (should not occur).
+        logging.debug (' ProcessSvgsFromFzp: after add  Image NewFile %s\n', NewFile)
 
-        logging.debug (' ProcessSvgsFromFzp: InFile %s Error 87 issued\n', InFile)
+        # add the new end path to the end of the source path
 
-        Errors.append('Error 87: File\n\'{0:s}\'\n\nFile has already been processed (software error)\n'.format(str(InFile)))
+        FQInFile = os.path.join(InPath, NewFile)
 
-        logging.info (' Exiting ProcessSvgsFromFzp on already processed error\n')
+        if OutFile == None:
 
-        return
-        
-    else:
+            if Debug == 0 and CheckOnly != 'y':
 
-        # Mark that we have processed this file. 
+                # If Debug isn't set (and we aren't only checking) then 
+                # rename the input file and change the input file name.
+                # Otherwise leave it alone (in this case OutFile is 
+                # unused and output goes to the console for debugging or
+                # no where at all.)
 
-        FilesProcessed['processed.' + InFile] = 'y'
+                FQInFile, FQOutFile = BackupFilename(FQInFile, Errors)
 
-        logging.debug (' ProcessSvgsFromFzp: InFile %s marked as processed\n', InFile)
+                logging.debug (' ProcessSvgsFromFzp: after rename FQInfile %s FQOutFile %s\n', FQInFile, FQOutFile)
 
-    # End of if 'processed.' + InFile in FilesProcessed:
+                if FQOutFile == None:
 
-    logging.debug (' ProcessSvgsFromFzp: InPath %s InFile %s', InPath, InFile)
+                    # an error occurred renaming the input file so set an
+                    # an OutFileError so we don't try and process this 
+                    # file as we have no valid output file to write it to. 
 
-    if OutFile == None:
+                    OutFileError = 'y'
 
-        OutPath = ''
+                # End of if FQOutFile == None:
 
-        logging.debug (' ProcessSvgsFromFzp: OutPath %s OutFile %s', OutPath, OutFile)
+            else:
 
-    else:
+                # Insure FQOutFile has a value
 
-        OutPath = os.path.dirname(OutFile)
+                FQOutFile = None
 
-        logging.debug (' ProcessSvgsFromFzp: OutPath %s OutFile %s', OutPath, OutFile)
+            # End of if Debug == 0 and CheckOnly != 'y':
 
-    # End of if OutFile == None:
+        else:
 
-    for CurView in FzpDict['views']:
+            # dir to dir processing 
 
-        logging.debug (' ProcessSvgsFromFzp: Process View %s FileType %s FzpDict[views] %s\n', CurView, FileType, FzpDict['views'])
+            FQInFile = os.path.join(InPath, NewFile)
 
-        # Extract just the image name as a string from the list entry.
+            FQOutFile = os.path.join(OutPath, NewFile)
 
-        Image = ''.join(FzpDict[CurView + '.image'])
 
-        logging.debug (' ProcessSvgsFromFzp 1: CurView %s Image %s FzpType %s FileType %s OutFile %s\n', CurView, Image, FzpType, FileType, OutFile)
+        # End of if OutFile == None:
 
-        # indicate we haven't seen an output file rename error. 
+    else:
 
-        OutFileError = 'n'
+        # Software error! Shouldn't ever get here.
 
-        if FzpType == 'FZPPART':
+        Errors.append(Diag.Diagnostic('Error 19: File\n\'{0:s}\'\n\nFile type {1:s} is an unknown format (software error)\n', InFile, FzpType))
 
-            # The svg is of the form svg.layer.filename in the directory 
-            # pointed to by Path. So append a svg. to the file name and 
-            # convert the '/' to a '.' to form the file name for processing. 
+        # Don't try and process further as will likely crash due to unset
+        # variables.
 
-            Image = Image.replace(r"/", ".")
+        logging.info (' Exiting ProcessSvgFromFzp on unknown FzpType\n')
 
-            if OutFile == None:
+        return
 
-                # Single file processing so set the output filename and use 
-                # FQOutFile.bak as the input. Again preserve the original 
-                # value of OutFile for processing later svg files. 
+    # End of if FzpType == 'FZPPART':
 
-                Image = Image.replace(r"/", ".")
+    logging.debug (' ProcessSvgsFromFzp: FileType %s Process %s to %s\n', FileType, FQInFile, FQOutFile)
 
-                FQOutFile = os.path.join(InPath, 'svg.' + Image)
+    # Look the file up in the directory index (which only lists the 
+    # directory once rather than for every svg). If only a file with a
+    # different case is there, whether it exists depends on the file 
+    # system (Windows doesn't care but Linux and probably MacOS do) so 
+    # ask the file system. 
 
-                # Set the input file from the output file in case debug is non
-                # zero and we don't set a backup file. 
+    Found = DirIndexLookup(FQInFile)
 
-                FQInFile = FQOutFile
+    if Found == 'missing' or (Found == 'case' and not os.path.isfile(FQInFile)):
 
-                if Debug == 0:
+        # The file doesn't exist so flag an error,
 
-                    # If Debug isn't set then rename the input file and
-                    # change the input file name. Otherwise leave it alone 
-                    # (in this case OutFile is unused and output goes to the
-                    # console for debugging.)
+        Errors.append(Diag.Diagnostic('Error 20: File\n\'{0:s}\'\n\nDuring processing svgs from fzp, svg file doesn\'t exist\n', FQInFile))
 
-                    FQInFile, FQOutFile = BackupFilename(FQInFile, Errors)
+    else:
 
-                    if FQOutFile == None:
+        # Check for identical case in the filename.
 
-                        # an error occurred renaming the input file so set an
-                        # an OutFileError so we don't try and process this 
-                        # file as we have no valid output file to write it to. 
+        logging.debug(' ProcessSvgsFromFzp: FQInFile %s Found %s\n', FQInFile, Found)
 
-                        OutFileError = 'n'
+        if Found != 'exact':
 
-                    # End of if FQOutFile == None:
+            # File system case mismatch error. 
 
-                    logging.debug (' ProcessSvgsFromFzp 2: FQInFile %s FQOutFile %s OutFileError %s\n', FQInFile, FQOutFile, OutFileError)
-                    
-                # End of if Debug == 0:
+            logging.debug(' ProcessSvgsFromFzp: InFile %s OutFile %s FzpType %s \n', InFile, OutFile, FzpType)
 
-            else:
+            if OutFile == None or DirProcessing == 'Y':
 
-                # dir to dir processing so set appropriate file names
-                # (identical except for path)
+                # Then InFile is the fzp file.
 
-                FQInFile = os.path.join(InPath, 'svg.' + Image)
+                Errors.append(Diag.Diagnostic('Error 21: Svg file\n\n\'{0:s}\'\n\nHas a different case in the file system than in the fzp file\n\n\'{1:s}\'\n', FQInFile, InFile))
 
-                FQOutFile = os.path.join(OutPath, 'svg.' + Image)
+            else:
 
-            # End of if OutFile == None:
+                # Then OutFile is the fzp file (InFile will have .bak 
+                # appended which we don't want.)
 
-        elif FzpType == 'FZPFRITZ':
+                Errors.append(Diag.Diagnostic('Error 21: Svg file\n\n\'{0:s}\'\n\nHas a different case in the file system than in the fzp file\n\n\'{1:s}\'\n', FQInFile, OutFile))
 
-            # The svg is of the form path../svg/PrefixDir/layername/filename, 
-            # so prepend the appropriate path and use that as the file name. 
+            # End of if OutFile == None or DirProcessing == 'Y':
 
-            # First create the new end path as NewFile 
-            # (i.e. '../svg/PrefixDir/Image') once, ready to append as needed.
+        # End of if Found != 'exact':
 
-            NewFile = '..'
+        if OutFileError == 'n':
 
-            NewFile = os.path.join(NewFile, 'svg')
+            if CurView == 'iconView':
 
-            logging.debug (' ProcessSvgsFromFzp: after add svg NewFile %s PrefixDir %s\n', NewFile, PrefixDir)
+                # If this is iconview, don't do processing as we aren't 
+                # going to check anything and sometimes the breadboard 
+                # svg is reused which will cause a warning and replace 
+                # the .bak file (which is undesirable). We do however
+                # want to have the output file even though we didn't
+                # do anything to it, so do copy the infile to the outfile
+                # (so as to leave both the input file and a new outfile)
+                # if FQOutFile isn't None, unless another view has already
+                # processed the svg in to the outfile (which would then be
+                # overwritten with the unprocessed input).
 
-            NewFile = os.path.join(NewFile, PrefixDir)
+                if FQOutFile != None and Debug == 0 and CheckOnly != 'y' and not 'processed.' + FQInFile in FilesProcessed and not PP.InMemory(FQInFile):
 
-            logging.debug (' ProcessSvgsFromFzp: after add  PrefixDir NewFile %s\n', NewFile)
+                    # If Debug isn't 0, the file names are the same and 
+                    # will cause an exception during the copy (and when 
+                    # only checking nothing is written). An archive member
+                    # goes in to the new archive unchanged without a copy.
 
-            NewFile = os.path.join(NewFile, Image)
+                    copyfile(FQInFile, FQOutFile)
 
-            logging.debug (' ProcessSvgsFromFzp: after add  Image NewFile %s\n', NewFile)
+                    DirIndexUpdate(FQOutFile)
 
-            # add the new end path to the end of the source path
+                # End of if FQOutFile != None and Debug == 0 and CheckOnly != 'y' and not 'processed.' + FQInFile in FilesProcessed and not PP.InMemory(FQInFile):
 
-            FQInFile = os.path.join(InPath, NewFile)
+                logging.debug (' ProcessSvgsFromFzp: Process View %s skipping iconview\n', CurView)
 
-            if OutFile == None:
+                logging.info (' Exiting ProcessSvgFromFzp after iconView\n')
 
-                if Debug == 0:
+                return
 
-                    # If Debug isn't set then rename the input file and
-                    # change the input file name. Otherwise leave it alone 
-                    # (in this case OutFile is unused and output goes to the
-                    # console for debugging.)
+            # End of if CurView == 'iconview':
 
-                    FQInFile, FQOutFile = BackupFilename(FQInFile, Errors)
+            # The view key says what the svg is checked against (see 
+            # SvgViewKey) and Shared is the SharedSvgs entry if other fzps
+            # in this directory use this svg as well.
 
-                    logging.debug (' ProcessSvgsFromFzp: after rename FQInfile %s FQOutFile %s\n', FQInFile, FQOutFile)
+            ViewKey = SvgViewKey(FzpType, CurView, FzpDict)
 
-                    if FQOutFile == None:
+            Shared = SharedSvgs.get(FQInFile)
 
-                        # an error occurred renaming the input file so set an
-                        # an OutFileError so we don't try and process this 
-                        # file as we have no valid output file to write it to. 
+            # Mark that we have processed this file (and with which view 
+            # key) in case this is directory processing of part.files to 
+            # avoid double processing the svg files.
 
-                        OutFileError = 'y'
+            if 'processed.' + FQInFile in FilesProcessed and FilesProcessed.get('viewkey.' + FQInFile) == ViewKey:
 
-                    # End of if FQOutFile == None:
+                # Already processed for another fzp that checks it in 
+                # exactly the same way, so the results would be the same 
+                # and there is nothing new to warn about.
 
-                else:
+                logging.debug(' ProcessSvgsFromFzp: FQInFile %s already processed with the same view key\n', FQInFile)
 
-                    # Insure FQOutFile has a value
+            elif 'processed.' + FQInFile in FilesProcessed:
 
-                    FQOutFile = None
+                # Already seen, may occur if svgs are shared, so warn as 
+                # the .bak file will be overwritten and the user needs to 
+                # know that 
 
-                # End of if Debug == 0:
+                logging.debug(' ProcessSvgsFromFzp: FQInFile %s Warning 29 issued. FilesProcessed %s\n', FQInFile, FilesProcessed)
+
+                Warnings.append(Diag.Diagnostic('Warning 29: File\n\'{0:s}\'\n\nProcessing view {1:s}, File {2:s}\nhas already been processed\nbut will be processed again as part of this fzp file in case of new warnings.\n', InFile, CurView, FQInFile))
 
             else:
 
-                # dir to dir processing 
+                logging.debug(' ProcessSvgsFromFzp: FQInFile %s marked as processed.\n', FQInFile)
 
-                FQInFile = os.path.join(InPath, NewFile)
+                FilesProcessed['processed.' + FQInFile] = 'y'
 
-                FQOutFile = os.path.join(OutPath, NewFile)
+                FilesProcessed['viewkey.' + FQInFile] = ViewKey
 
+            # End of if 'processed.' + FQInFile in FilesProcessed and FilesProcessed.get('viewkey.' + FQInFile) == ViewKey:
 
-            # End of if OutFile == None:
+            if Shared != None and Shared['viewkey'] == ViewKey:
 
-        else:
+                # An earlier fzp has already processed this shared svg with 
+                # the same view key, so rather than parsing, checking and 
+                # writing it again, fan its results out to this fzp. 
 
-            # Software error! Shouldn't ever get here.
+                logging.debug(' ProcessSvgsFromFzp: FQInFile %s results shared\n', FQInFile)
 
-            Errors.append('Error 19: File\n\'{0:s}\'\n\nFile type {1:s} is an unknown format (software error)\n'.format(str(InFile), str(FzpType)))
+                Errors.extend(Shared['errors'])
 
-            # Don't try and process further as will likely crash due to unset
-            # variables.
+                Warnings.extend(Shared['warnings'])
 
-            continue
+                Info.extend(Shared['info'])
 
-        # End of if FzpType == 'FZPPART':
+                if Shared['svgconnectors'] != None:
 
-        logging.debug (' ProcessSvgsFromFzp: FileType %s Process %s to %s\n', FileType, FQInFile, FQOutFile)
+                    ViewModel.SvgConnectors = dict(Shared['svgconnectors'])
 
-        if not os.path.isfile(FQInFile):
+                # End of if Shared['svgconnectors'] != None:
 
-            # The file doesn't exist so flag an error,
+                for SubPartId in Shared['subparts']:
 
-            Errors.append('Error 20: File\n\'{0:s}\'\n\nDuring processing svgs from fzp, svg file doesn\'t exist\n'.format(str(FQInFile)))
+                    Model.Subparts[SubPartId].SvgCons = dict(Shared['subparts'][SubPartId])
 
-        else:
+                # End of for SubPartId in Shared['subparts']:
 
-            # Check for identical case in the filename (Windows doesn't care
-            # but Linux and probably MacOS do)
+                if Shared['fontwarning'] == 'y':
 
-            TmpPath = os.path.dirname(FQInFile)
+                    FzpDict['font.warning'] = 'y'
 
-            TmpFile = os.path.basename(FQInFile)
+                # End of if Shared['fontwarning'] == 'y':
 
-            # get the path from the input file
+                Timing.Count('shared svgs reused')
 
-            logging.debug(' ProcessSvgsFromFzp: TmpPath %s TmpFile %s\n', TmpPath, TmpFile)
+            else:
 
-            if TmpPath == '':
+                # If the file exists and there was not a file rename error 
+                # then go and try and process the svg (set the FileType 
+                # explicitly to svg), but first reset the state variables 
+                # for the new file (but not FzpDict or CurView). The 
+                # messages are collected on their own so they can be 
+                # shared. 
 
-                # Change an empty path to current directory to prevent os error
+                TagStack, State, InheritedAttributes = InitializeState()
 
-                TmpPath = './'
+                SvgErrors, SvgWarnings, SvgInfo = [], [], []
 
-            # End of if TmpPath == '':
+                ProcessSvg(FzpType, 'SVG', FQInFile, FQOutFile, CurView, PrefixDir, SvgErrors, SvgWarnings, SvgInfo, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
 
-            if not TmpFile in os.listdir(TmpPath):
+                Errors.extend(SvgErrors)
 
-                logging.debug(' ProcessSvgsFromFzp: dir names %s\n', os.listdir(TmpPath))
+                Warnings.extend(SvgWarnings)
 
-                # File system case mismatch error. 
+                Info.extend(SvgInfo)
 
-                logging.debug(' ProcessSvgsFromFzp: InFile %s OutFile %s FzpType %s \n', InFile, OutFile, FzpType)
+                if Shared != None and Shared['viewkey'] == None and FilesProcessed.get('viewkey.' + FQInFile) == ViewKey:
 
-                if OutFile == None or DirProcessing == 'Y':
+                    # The first time through for a shared svg, so keep 
+                    # the results for the other fzps that use it. 
 
-                    # Then InFile is the fzp file.
+                    Shared['viewkey'] = ViewKey
 
-                    Errors.append('Error 21: Svg file\n\n\'{0:s}\'\n\nHas a different case in the file system than in the fzp file\n\n\'{1:s}\'\n'.format(str(FQInFile), str(InFile)))
+                    Shared['errors'] = SvgErrors
 
-                else:
+                    Shared['warnings'] = SvgWarnings
 
-                    # Then OutFile is the fzp file (InFile will have .bak 
-                    # appended which we don't want.)
+                    Shared['info'] = SvgInfo
 
-                    Errors.append('Error 21: Svg file\n\n\'{0:s}\'\n\nHas a different case in the file system than in the fzp file\n\n\'{1:s}\'\n'.format(str(FQInFile), str(OutFile)))
+                    if ViewModel.SvgConnectors == None:
 
-                # End of if OutFile == None or DirProcessing == 'Y':
+                        Shared['svgconnectors'] = None
 
-            # End of if not TmpFile in os.listdir(TmpPath):
+                    else:
 
-            if OutFileError == 'n':
+                        Shared['svgconnectors'] = dict(ViewModel.SvgConnectors)
 
-                if CurView == 'iconView':
+                    # End of if ViewModel.SvgConnectors == None:
 
-                    # If this is iconview, don't do processing as we aren't 
-                    # going to check anything and sometimes the breadboard 
-                    # svg is reused which will cause a warning and replace 
-                    # the .bak file (which is undesirable). We do however
-                    # want to have the output file even though we didn't
-                    # do anything to it, so do copy the infile to the outfile
-                    # (so as to leave both the input file and a new outfile)
-                    # if FQOutFile isn't None.
+                    Shared['subparts'] = {}
 
-                    if FQOutFile != None and Debug == 0:
+                    if CurView == 'schematicView':
 
-                        # If Debug isn't 0, the file names are the same and 
-                        # will cause an exception during the copy. 
+                        for SubPart in Model.Subparts.values():
 
-                        copyfile(FQInFile, FQOutFile)
+                            if SubPart.SvgCons != None:
 
-                    # End of if FQOutFile != None:
+                                Shared['subparts'][SubPart.Id] = dict(SubPart.SvgCons)
 
-                    logging.debug (' ProcessSvgsFromFzp: Process View %s skipping iconview\n', CurView)
+                            # End of if SubPart.SvgCons != None:
 
-                    continue
+                        # End of for SubPart in Model.Subparts.values():
 
-                # End of if CurView == 'iconview':
+                    # End of if CurView == 'schematicView':
 
-                # Mark that we have processed this file in case this is 
-                # directory processing of part.files to avoid double 
-                # processing the svg files.
+                    if 'font.warning' in FzpDict:
 
-                if 'processed.' + FQInFile in FilesProcessed:
+                        Shared['fontwarning'] = 'y'
 
-                    # Already seen, may occur if svgs are shared, so warn as 
-                    # the .bak file will be overwritten and the user needs to 
-                    # know that 
+                    else:
 
-                    logging.debug(' ProcessSvgsFromFzp: FQInFile %s Warning 29 issued. FilesProcessed %s\n', FQInFile, FilesProcessed)
+                        Shared['fontwarning'] = 'n'
 
-                    Warnings.append('Warning 29: File\n\'{0:s}\'\n\nProcessing view {1:s}, File {2:s}\nhas already been processed\nbut will be processed again as part of this fzp file in case of new warnings.\n'.format(str(InFile), str(CurView), str(FQInFile)))
+                    # End of if 'font.warning' in FzpDict:
 
-                else:
+                # End of if Shared != None and Shared['viewkey'] == None and FilesProcessed.get('viewkey.' + FQInFile) == ViewKey:
 
-                    logging.debug(' ProcessSvgsFromFzp: FQInFile %s marked as processed.\n', FQInFile)
+            # End of if Shared != None and Shared['viewkey'] == ViewKey:
 
-                    FilesProcessed['processed.' + FQInFile] = 'y'
+            if Shared != None:
 
-                # End of if 'processed.' + FQInFile in FilesProcessed:
+                # Drop the shared results once the last fzp that uses 
+                # them is done with them. 
 
-                # If the file exists and there was not a file rename error then
-                # go and try and process the svg (set the FileType explicitly 
-                # to svg), but first reset the state variables for the new 
-                # file (but not Errors, Warnings, FzpDict or CurView).
+                Shared['refs'] -= 1
 
-                TagStack, State, InheritedAttributes = InitializeState()
+                if Shared['refs'] <= 0:
 
-                ProcessSvg(FzpType, 'SVG', FQInFile, FQOutFile, CurView, PrefixDir,  Errors, Warnings, Info, FzpDict, FilesProcessed, TagStack, State, InheritedAttributes, Debug)
+                    del SharedSvgs[FQInFile]
 
-                # We are finished processing this file from an fzp, and it 
-                # isn't the icon file (which doesn't have connectors) because
-                # that was caught above, so check the connectors on this svg 
-                # file to make sure they are all present.
+                # End of if Shared['refs'] <= 0:
 
-                logging.debug  (' ProcessSvgsFromFzp: Checking connectors for %s\n', InFile)
+            # End of if Shared != None:
 
-                for Connector in FzpDict['connectors.fzp.' + CurView]:
+            # We are finished processing this file from an fzp, and it 
+            # isn't the icon file (which doesn't have connectors) because
+            # that was caught above, so check the connectors on this svg 
+            # file to make sure they are all present.
 
-                    # Check that the connector is in the svg and error if not. 
+            logging.debug  (' ProcessSvgsFromFzp: Checking connectors for %s\n', InFile)
 
-                    logging.debug  (' ProcessSvgsFromFzp: Checking connector %s\n', Connector)
+            for Connector in ViewModel.Connectors:
 
-                    if not 'connectors.svg.' + CurView in FzpDict:
+                # Check that the connector is in the svg and error if not. 
 
-                        Errors.append('Error 17: File\n\'{0:s}\'\n\nNo connectors found for view {1:s}.\n'.format(str(InFile), str(CurView)))
+                logging.debug  (' ProcessSvgsFromFzp: Checking connector %s\n', Connector)
 
-                    elif not Connector in FzpDict['connectors.svg.' + CurView]:
+                if ViewModel.SvgConnectors == None:
 
-                        logging.debug  (' ProcessSvgsFromFzp: Connector %s missing\n', Connector)
+                    Errors.append(Diag.Diagnostic('Error 17: File\n\'{0:s}\'\n\nNo connectors found for view {1:s}.\n', InFile, CurView))
 
-                        Errors.append('Error 18: File\n\'{0:s}\'\n\nConnector {1:s} is in the fzp file but not the svg file. (typo?)\n\nsvg {2:s}\n'.format(str(InFile), str(Connector), str(FQInFile)))
+                elif not Connector in ViewModel.SvgConnectors:
 
-                    # End of if not 'connectors.svg.' + CurView in FzpDict:
-                
-                # End of `for Connector in FzpDict['connectors.fzp.' + CurView]:
+                    logging.debug  (' ProcessSvgsFromFzp: Connector %s missing\n', Connector)
 
-                if CurView == 'schematicView' and 'subparts' in FzpDict:
+                    Errors.append(Diag.Diagnostic('Error 18: File\n\'{0:s}\'\n\nConnector {1:s} is in the fzp file but not the svg file. (typo?)\n\nsvg {2:s}\n', InFile, Connector, FQInFile))
 
-                    # We have subparts, so now having processed the entire svg
-                    # make sure we have found all the connectors we should have.
+                # End of if ViewModel.SvgConnectors == None:
+            
+            # End of `for Connector in ViewModel.Connectors:
 
-                    logging.debug(' ProcessSvgsFromFzp: Subpart start FzpDict[\'subparts\'] %s\n',FzpDict['subparts'])
+            if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
-                    for SubPart in FzpDict['subparts']:
+                # We have subparts, so now having processed the entire svg
+                # make sure we have found all the connectors we should have.
 
-                        # Get the list of subparts from the fzp.
+                logging.debug(' ProcessSvgsFromFzp: Subpart start Subparts %s\n', list(Model.Subparts))
 
-                        logging.debug(' ProcessSvgsFromFzp: Subpart before loop SubPart=%s\nFzpDict[SubPart + \'.subpart.cons\']=%s\nFzpDict[SubPart + \'.svg.subparts\']=%s\n',SubPart, FzpDict[SubPart + '.subpart.cons'], FzpDict[SubPart + '.svg.subparts'])
+                for SubPart in Model.Subparts.values():
 
-                        for SubpartConnector in FzpDict[SubPart + '.subpart.cons']:
+                    # Get the list of subparts from the fzp.
 
-                            logging.debug(' ProcessSvgsFromFzp: SubpartConnector %s\n',SubpartConnector)
+                    logging.debug(' ProcessSvgsFromFzp: Subpart before loop SubPart=%s\nCons=%s\nSvgCons=%s\n',SubPart.Id, list(SubPart.Cons), SubPart.SvgCons)
 
-                            if not SubPart + '.svg.subparts' in FzpDict:
+                    for SubpartConnector in SubPart.Cons:
 
-                                # No connectors in svg error. 
+                        logging.debug(' ProcessSvgsFromFzp: SubpartConnector %s\n',SubpartConnector)
 
-                                logging.debug(' ProcessSvgsFromFzp: no connectors in svg, SubpartConnector %s\n',SubPartConnector, SubPart)
+                        if SubPart.SvgCons == None:
 
-                                Errors.append('Error 78: Svg file\n\n\'{0:s}\'\n\nWhile looking for {1:s}, Subpart {2:s} has no connectors in the svg\n'.format(str(FQInFile), str(OutFile), str(SubpartConnector), str(SubPart)))
+                            # No connectors in svg error. 
 
-                            elif not SubpartConnector in FzpDict[SubPart + '.svg.subparts']:
+                            logging.debug(' ProcessSvgsFromFzp: no connectors in svg, SubpartConnector %s Subpart %s\n',SubpartConnector, SubPart.Id)
 
-                                # Throw an error if one of the connectors we 
-                                # should have isn't in the svg. 
+                            Errors.append(Diag.Diagnostic('Error 78: Svg file\n\n\'{0:s}\'\n\nWhile looking for {1:s}, Subpart {2:s} has no connectors in the svg\n', FQInFile, OutFile, SubpartConnector, SubPart.Id))
 
-                                Errors.append('Error 79: Svg file\n\n\'{0:s}\'\n\nSubpart {1:s} is missing connector {2:s} in the svg\n'.format(str(FQInFile), str(SubPart), str(SubpartConnector)))
+                        elif not SubpartConnector in SubPart.SvgCons:
 
-                                logging.debug(' ProcessSvgsFromFzp: Error 79: no connector %s in svg, SubpartConnector %s\n',SubpartConnector, SubPart)
+                            # Throw an error if one of the connectors we 
+                            # should have isn't in the svg. 
 
-                            # if not SubPart + '.svg.subparts' in FzpDict:
+                            Errors.append(Diag.Diagnostic('Error 79: Svg file\n\n\'{0:s}\'\n\nSubpart {1:s} is missing connector {2:s} in the svg\n', FQInFile, SubPart.Id, SubpartConnector))
 
-                        # End of for SubpartConnector in FzpDict[SubPart + '.subpart.cons']:
+                            logging.debug(' ProcessSvgsFromFzp: Error 79: no connector %s in svg, SubpartConnector %s\n',SubpartConnector, SubPart.Id)
 
-                    # End of for SubPart in FzpDict['subparts']:
+                        # if SubPart.SvgCons == None:
 
-                # End of if CurView == 'schematicView' and 'subparts' in FzpDict:
+                    # End of for SubpartConnector in SubPart.Cons:
 
-            # End of if OutFileError == 'n':
+                # End of for SubPart in Model.Subparts.values():
 
-        # End of if not os.path.isfile(FQInFile):
+            # End of if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
-    # End of for CurView in FzpDict['views']:
+        # End of if OutFileError == 'n':
 
-    logging.info (' Exiting ProcessSvgsFromFzp\n')
+    # End of if Found == 'missing' or (Found == 'case' and not os.path.isfile(FQInFile)):
 
-#End of def ProcessSvgsFromFzp(FzpType, FileType, InFile, OutFile, PrefixDir, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug):
+    logging.info (' Exiting ProcessSvgFromFzp\n')
+
+# End of def ProcessSvgFromFzp(DirProcessing, FzpType, FileType, InFile, OutFile, PrefixDir, CurView, Errors, Warnings, Info, FzpDict, FilesProcessed, Debug):
 
 def ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Errors, Warnings, Info, FzpDict, TagStack, State, Level):
 
@@ -1307,7 +4695,7 @@ def ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
     elif len(TagStack) == 2:
 
-        Errors.append('Error 22: File\n\'{0:s}\'\n\nAt line {1:s}\n\nNo ModuleId found in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+        Errors.append(Diag.Diagnostic('Error 22: File\n\'{0:s}\'\n\nAt line {1:s}\n\nNo ModuleId found in fzp file\n', InFile, Elem.sourceline))
 
     # End of if len(TagStack) == 2 and StackTag == 'module':
 
@@ -1335,16 +4723,6 @@ def ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
         # As long as we haven't cycled to 'connectors' as the primary tag,
         # keep processing views tags.
    
-        if not 'views' in FzpDict:
-
-            # If we don't have a views yet create an empty one. 
-
-            logging.debug (' ProcessFzpLeafNode: create \'views\' in dictionary\n')
-
-            FzpDict['views'] = []
-
-        # End of if not 'views' in FzpDict:
-
         if State['lasttag'] == 'module':
 
             # Note that we have seen the 'views' tag now. 
@@ -1476,7 +4854,7 @@ def ProcessFzpLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                 if 'bus_defined' == 'n':
 
-                    Errors.append('Error 23: File\n\'{0:s}\'\nAt line {1:s}\n\nA bus is already defined, schematic parts won\'t work with busses\n'.format(str(InFile), str(Elem.sourceline)))
+                    Errors.append(Diag.Diagnostic('Error 23: File\n\'{0:s}\'\nAt line {1:s}\n\nA bus is already defined, schematic parts won\'t work with busses\n', InFile, Elem.sourceline))
 
                     # Mark that we have flagged the error so we don't repeat it.
 
@@ -1565,7 +4943,7 @@ def FzpTags(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, Level):
 
             # If its already been seen flag an errror.
 
-            Errors.append('Error 24: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one copy of Tag {2:s}\n'.format(str(InFile), str(Elem.sourceline), str( Tag)))
+            Errors.append(Diag.Diagnostic('Error 24: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one copy of Tag {2:s}\n', InFile, Elem.sourceline, Tag))
         
         # End of if Tag in FzpDict:
         
@@ -1624,7 +5002,7 @@ def FzpmoduleId(FzpType, InFile, Elem, Errors, Warnings, Info, FzpDict, State, L
 
         if not 'moduleId' in FzpDict:
 
-            Errors.append('Error 22: File\n\'{0:s}\'\n\nAt line {1:s}\n\nNo ModuleId found in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 22: File\n\'{0:s}\'\n\nAt line {1:s}\n\nNo ModuleId found in fzp file\n', InFile, Elem.sourceline))
 
         # End of if not 'moduleId' in FzpDict:
 
@@ -1665,13 +5043,13 @@ def FzpmoduleId(FzpType, InFile, Elem, Errors, Warnings, Info, FzpDict, State, L
 
         if File != ModuleId:
 
-            Warnings.append('Warning 3: File\n\'{0:s}\'\nAt line {1:s}\n\nModuleId \'{2:s}\'\n\nDoesn\'t match filename\n\n\'{3:s}\'\n'.format(str(InFile), str(Elem.sourceline), str(ModuleId), str(File)))
+            Warnings.append(Diag.Diagnostic('Warning 3: File\n\'{0:s}\'\nAt line {1:s}\n\nModuleId \'{2:s}\'\n\nDoesn\'t match filename\n\n\'{3:s}\'\n', InFile, Elem.sourceline, ModuleId, File))
             
         # End of if File != ModuleId:
     
         if 'moduleId' in FzpDict:
         
-            Errors.append('Error 25: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple ModuleIds found in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 25: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple ModuleIds found in fzp file\n', InFile, Elem.sourceline))
 
             FzpDict['moduleId'].append(ModuleId)
 
@@ -1696,13 +5074,13 @@ def FzpmoduleId(FzpType, InFile, Elem, Errors, Warnings, Info, FzpDict, State, L
     
     if RefFile == None:
 
-        Warnings.append('Warning 4: File\n\'{0:s}\'\nAt line {1:s}\n\nNo referenceFile found in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+        Warnings.append(Diag.Diagnostic('Warning 4: File\n\'{0:s}\'\nAt line {1:s}\n\nNo referenceFile found in fzp file\n', InFile, Elem.sourceline))
 
     else:
 
         if 'referenceFile' in FzpDict:
 
-            Warnings.append('Warning 5: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple referenceFile found in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 5: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple referenceFile found in fzp file\n', InFile, Elem.sourceline))
 
             FzpDict['referenceFile'].append(RefFile)
 
@@ -1720,7 +5098,7 @@ def FzpmoduleId(FzpType, InFile, Elem, Errors, Warnings, Info, FzpDict, State, L
             # The reference file doesn't match the input file name which it 
             # should.
 
-            Warnings.append('Warning 6: File\n\'{0:s}\'\nAt line {1:s}\n\nReferenceFile name \n\n\'{2:s}\'\n\nDoesn\'t match fzp filename\n\n\'{3:s}\'\n'.format(str(InFile), str(Elem.sourceline), str(RefFile), str(File + '.fzp')))
+            Warnings.append(Diag.Diagnostic('Warning 6: File\n\'{0:s}\'\nAt line {1:s}\n\nReferenceFile name \n\n\'{2:s}\'\n\nDoesn\'t match fzp filename\n\n\'{3:s}\'\n', InFile, Elem.sourceline, RefFile, File + '.fzp'))
 
         # End of if RefFile != File + '.fzp':
 
@@ -1732,7 +5110,7 @@ def FzpmoduleId(FzpType, InFile, Elem, Errors, Warnings, Info, FzpDict, State, L
 
     if Version == None:
 
-            Warnings.append('Warning 7: File\n\'{0:s}\'\nAt line {1:s}\n\nNo Fritzing version in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 7: File\n\'{0:s}\'\nAt line {1:s}\n\nNo Fritzing version in fzp file\n', InFile, Elem.sourceline))
 
     else:
 
@@ -1740,7 +5118,7 @@ def FzpmoduleId(FzpType, InFile, Elem, Errors, Warnings, Info, FzpDict, State, L
             
         if 'fritzingVersion' in FzpDict:
         
-            Warnings.append('Warning 8: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple fritzingVersion found in fzp file\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 8: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple fritzingVersion found in fzp file\n', InFile, Elem.sourceline))
 
             FzpDict['fritzingVersion'].append(Version)
 
@@ -1770,6 +5148,8 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
     logging.debug (' FzpProcessViewsTs3: StackTag %s State %s TagStack %s attributes %s\n', StackTag, State, TagStack, Elem.attrib)
 
+    Model = FzpDict['partmodel']
+
     # TagStack length of 3 ('empty', 'module', 'views') is what tripped the 
     # call to this routine so we start processing at TagStack length 4 in 
     # this large case statement which trips when it finds the correct state 
@@ -1784,7 +5164,7 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
         if State['nexttag'] != 'viewname' and State['nexttag'] != 'layer':
 
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag {2:s} not a view name\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag'])))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag {2:s} not a view name\n', InFile, Elem.sourceline, State['nexttag']))
             
         # End of if State['nexttag'] != 'viewname' and State['nexttag'] != 'layer':
 
@@ -1803,7 +5183,7 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
             logging.debug (' FzpProcessViewsTs3: missing view, View set to none\n', View)
 
-            Errors.append('Error 27: File\n\'{0:s}\'\nAt line {1:s}\n\nView name missing\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 27: File\n\'{0:s}\'\nAt line {1:s}\n\nView name missing\n', InFile, Elem.sourceline))
 
         # End of if View == 'layers':
             
@@ -1811,39 +5191,27 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
             # View value is legal so process it. 
 
-            if not 'views' in FzpDict:
-
-                # views doesn't exist yet so create it and add this view.
-
-                FzpDict['views'] = [View]
-
-                logging.debug (' FzpProcessViewsTs3: Created dict entry views and added  %s\n', View)
-
-            else:
-
-                if View in FzpDict['views']:
+            if View in Model.ViewNames:
 
-                    # Error, already seen.
+                # Error, already seen.
 
-                    Errors.append('Error 28: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple view tags {2:s} present, ignored\n'.format(str(InFile), str(Elem.sourceline), str(View)))
+                Errors.append(Diag.Diagnostic('Error 28: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple view tags {2:s} present, ignored\n', InFile, Elem.sourceline, View))
 
-                    logging.debug (' FzpProcessViewsTs3: error view %s already present\n', View)
+                logging.debug (' FzpProcessViewsTs3: error view %s already present\n', View)
 
-                else: 
+            else: 
 
-                    # Add this view to the list. 
-                    
-                    FzpDict['views'].append(View)
-
-                    logging.debug (' FzpProcessViewsTs3: appended View %s to dict entry views\n', View)
+                # Add this view to the list. 
+                
+                Model.ViewNames.append(View)
 
-                # End of if View in FzpDict['views']:
+                logging.debug (' FzpProcessViewsTs3: appended View %s to ViewNames\n', View)
 
-            # End of if not 'views' in FzpDict:
+            # End of if View in Model.ViewNames:
 
         else:
 
-            Errors.append('Error 29: File\n\'{0:s}\'\nAt line {1:s}\n\nView tag {2:s} not recognized (typo?)\n'.format(str(InFile), str(Elem.sourceline), str(View)))
+            Errors.append(Diag.Diagnostic('Error 29: File\n\'{0:s}\'\nAt line {1:s}\n\nView tag {2:s} not recognized (typo?)\n', InFile, Elem.sourceline, View))
 
             logging.debug (' FzpProcessViewsTs3: error View %s not recognized\n', View)
 
@@ -1865,7 +5233,7 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
             # note an internal state error.
 
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nNState error, nexttag {2:s} not \'layers\'\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag'])))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nNState error, nexttag {2:s} not \'layers\'\n', InFile, Elem.sourceline, State['nexttag']))
            
         # End of if State['nexttag'] != 'layers': 
         
@@ -1885,32 +5253,32 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
             Image = 'none'
 
-            Errors.append('Error 30: File\n\'{0:s}\'\nAt line {1:s}\n\nNo image name present\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 30: File\n\'{0:s}\'\nAt line {1:s}\n\nNo image name present\n', InFile, Elem.sourceline))
 
         # End of if Image == None:
         
-        # We have found an image attribute so put it in the dictonary 
-        # indexed by viewname aquired above.
+        # We have found an image attribute so put it in the model for the 
+        # viewname aquired above.
 
-        if (View + '.image') in FzpDict:
+        ViewModel = Model.View(View)
+
+        if len(ViewModel.Images) != 0:
 
             # too many input files!
 
-            Errors.append('Error 31: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple {2:s} image files present\n'.format(str(InFile), str(Elem.sourceline), str(View)))
+            Errors.append(Diag.Diagnostic('Error 31: File\n\'{0:s}\'\nAt line {1:s}\n\nMultiple {2:s} image files present\n', InFile, Elem.sourceline, View))
 
-            FzpDict[View + '.image'].append(Image)
-    
             logging.debug (' FzpProcessViewsTs3: error multiple image files added %s\n', Image)
 
         else:
 
-            # Put it in a list in case we find another (which is an error!)
+            logging.debug (' FzpProcessViewsTs3: added image file %s\n', Image)
 
-            FzpDict[View + '.image'] = [Image]
+        # End if len(ViewModel.Images) != 0:
 
-            logging.debug (' FzpProcessViewsTs3: added image file %s\n', Image)
+        # Keep them all in a list in case we find another (which is an error!)
 
-        # End if (View + 'image') in FzpDict:
+        ViewModel.Images.append(Image)
 
         # Then set State['lastvalue'] to the image to capture the layerids that 
         # should follow this image file.
@@ -1927,7 +5295,7 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
             # note an internal state error.
 
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, nexttag {2:s} not \'layer\'\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag'])))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, nexttag {2:s} not \'layer\'\n', InFile, Elem.sourceline, State['nexttag']))
            
         # End of if State['nexttag'] != 'layers': 
         
@@ -1951,85 +5319,71 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
             LayerId = 'none'
 
-            Errors.append('Error 32: File\n\'{0:s}\'\nAt line {1:s}\n\nNo layerId value present\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 32: File\n\'{0:s}\'\nAt line {1:s}\n\nNo layerId value present\n', InFile, Elem.sourceline))
 
         # End of if LayerId == None:
 
-        # Set the index value to View.LayerId
+        # Get the model for this view to add the layer to.
 
-        Index = View + '.' + 'LayerId'
+        ViewModel = Model.View(View)
 
         # For all except pcb view there should only be one LayerId
 
         if View != 'pcbView':
 
-            if Index in FzpDict:
+            if len(ViewModel.Layers) != 0:
 
-                Errors.append('Error 33: File\n\'{0:s}\'\nAt line {1:s}\n\nView {2:s} already has layerId {3:s}, {4:s} ignored\n'.format(str(InFile), str(Elem.sourceline),str(View), str(FzpDict[Index]), str(LayerId)))
+                Errors.append(Diag.Diagnostic('Error 33: File\n\'{0:s}\'\nAt line {1:s}\n\nView {2:s} already has layerId {3:s}, {4:s} ignored\n', InFile, Elem.sourceline, View, ViewModel.LayerIdText(), LayerId))
 
             else:
 
-                FzpDict[Index] = LayerId
+                ViewModel.Layers[LayerId] = Part.Layer(LayerId, Elem.sourceline)
 
-            # End of if Index in FzpDict:
+            # End of if len(ViewModel.Layers) != 0:
 
         else:
 
             # This is pcb view so there may be multiple layerIds but they must
             # be unique.
 
-            if not Index in FzpDict:
-
-                # this is the first and possibly only layerId so create it. 
-
-                FzpDict[Index] = [LayerId]
+            if LayerId in ViewModel.Layers:
 
-                logging.debug (' FzpProcessViewsTs3: created LayerId %s\n', LayerId)
+                # must be unique and isn't.
 
-            elif LayerId in FzpDict[Index]:
+                Errors.append(Diag.Diagnostic('Error 33: File\n{0:s}\nAt line {1:s}\n\nView {2:s} already has layerId {3:s}, ignored\n', InFile, Elem.sourceline, View, ViewModel.LayerIdText(), LayerId))
 
-                # must be unique and isn't.
+                # A second copper0 or copper1 still moves the line number
+                # used in the through hole / smd messages to this line.
 
-                Errors.append('Error 33: File\n{0:s}\nAt line {1:s}\n\nView {2:s} already has layerId {3:s}, ignored\n'.format(str(InFile), str(Elem.sourceline),str(View), str(FzpDict[Index]), str(LayerId)))
+                ViewModel.Layers[LayerId].LineNo = Elem.sourceline
 
             else:
 
-                # if this is a second or later layerId append it
+                # this is the first (and possibly only) or a later layerId
+                # so add it. 
 
-                FzpDict[Index].append(LayerId)
+                ViewModel.Layers[LayerId] = Part.Layer(LayerId, Elem.sourceline)
 
-                logging.debug (' FzpProcessViewsTs3: appended LayerId %s\n', LayerId)
+                logging.debug (' FzpProcessViewsTs3: added LayerId %s\n', LayerId)
 
-            # End of if not Index in FzpDict:
+            # End of if LayerId in ViewModel.Layers:
 
         # End of if View != 'pcbView':
 
-        # if the view is pcbview and the layer is copper0 or copper1 note 
-        # the layers presense to decide if this is a through hole or smd part
-        # later (if there is only copper1 layer it is smd if both are present
-        # it is through hole only copper0 is an error.
+        # The pcbView copper0 and copper1 layers (and their line numbers) 
+        # decide if this is a through hole or smd part later (if there is 
+        # only copper1 layer it is smd if both are present it is through hole
+        # only copper0 is an error.
 
         logging.debug (' FzpProcessViewsTs3: View %s LayerId %s\n', View, LayerId)
 
-        if View == 'pcbView' and LayerId in ['copper0', 'copper1']:
-
-            # mark this layer id as present
-
-            FzpDict[LayerId + '.layerid'] = 'y'
-
-            # and save its source line number for error messages later.
-
-            FzpDict[LayerId + '.lineno'] = Elem.sourceline
-
-        # End of if View == 'pcbview' and LayerId in ['copper0', 'copper1']:
-
         # State is fine as is, no need for updates here. 
 
     else:
 
         # Input state incorrect so set an error.
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag {2:s} got tag {3:s}\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag']), str(StackTag)))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag {2:s} got tag {3:s}\n', InFile, Elem.sourceline, State['nexttag'], StackTag))
             
         # then set the next expected tag to be 'layer' for the layerId.
 
@@ -2039,7 +5393,7 @@ def FzpProcessViewsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack,
 
     # End of if len(TagStack) == 4:
 
-    logging.debug (' FzpProcessViewsTs3: FzpDict: %s\n', FzpDict)
+    logging.debug (' FzpProcessViewsTs3: Model: %s\n', Model)
 
     logging.info (' Exiting FzpProcessViewsTs3 Level %s\n', Level)
 
@@ -2051,46 +5405,39 @@ def FzpCheckViews(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, State
 
     logging.debug (' FzpCheckViews: State: %s\n', State)
 
+    Model = FzpDict['partmodel']
+
     # note no valid views seen yet
 
     ViewsSeen = 0
 
-    if not 'views' in FzpDict:
-
-        Errors.append('Error 34: File\n\'{0:s}\'\n\nNo views found.\n'.format(str(InFile)))
-       
-    else:
-
-        # Check for unexpected View names
-
-    
-        for View in FzpDict['views']:
+    # Check for unexpected View names
 
-            if View not in ['iconView', 'breadboardView', 'schematicView', 'pcbView']:
+    for View in Model.ViewNames:
 
-                Errors.append('Error 35: File\n\'{0:s}\'\n\nUnknown view {1:s} found. (Typo?)\n'.format(str(InFile), str(View)))
+        if View not in ['iconView', 'breadboardView', 'schematicView', 'pcbView']:
 
-            else:
+            Errors.append(Diag.Diagnostic('Error 35: File\n\'{0:s}\'\n\nUnknown view {1:s} found. (Typo?)\n', InFile, View))
 
-                # Note we have seen a valid view.
+        else:
 
-                ViewsSeen += 1
+            # Note we have seen a valid view.
 
-            # End of if View not in ['iconView', 'breadboardView', 'schematicView', 'pcbView']
+            ViewsSeen += 1
 
-        # End of for View in FzpDict['views']:
+        # End of if View not in ['iconView', 'breadboardView', 'schematicView', 'pcbView']
 
-    # End of if not 'views' in FzpDict:
+    # End of for View in Model.ViewNames:
 
     # Now make sure we have at least one view and warn if we don't have all 4.
 
     if ViewsSeen == 0:
 
-            Errors.append('Error 36: File\n\'{0:s}\'\n\nNo valid views found.\n'.format(str(InFile)))
+            Errors.append(Diag.Diagnostic('Error 36: File\n\'{0:s}\'\n\nNo valid views found.\n', InFile))
 
     elif ViewsSeen < 4:
 
-            Warnings.append('Warning 9: File\n\'{0:s}\'\n\nOne or more expected views missing (may be intended)\n'.format(str(InFile)))
+            Warnings.append(Diag.Diagnostic('Warning 9: File\n\'{0:s}\'\n\nOne or more expected views missing (may be intended)\n', InFile))
          
     # End of if ViewsSeen == 0:
 
@@ -2099,23 +5446,27 @@ def FzpCheckViews(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, State
     # and only copper0 is an error. No copper or State['hybridsetforpcbView'] 
     # indicates no pcb view.
 
+    Copper0 = Model.CopperLayer('copper0')
+
+    Copper1 = Model.CopperLayer('copper1')
+
     if 'hybridsetforpcbView' in State:
 
         # There is no pcb view.
 
-        Info.append('File\n\'{0:s}\'\n\nThere is no PCB view for this part.\n')
+        Info.append(Diag.Diagnostic('File\n\'{0:s}\'\n\nThere is no PCB view for this part.\n'))
 
-    elif 'copper0.layerid' in FzpDict and 'copper1.layerid' in FzpDict:
+    elif Copper0 != None and Copper1 != None:
 
-        Info.append('File\n\'{0:s}\'\n\nThis is a through hole part as both copper0 and copper1 views are present.\nIf you wanted a smd part remove the copper0 definition from line {1:s}\n'.format(str(InFile), str(FzpDict['copper0.lineno'])))
+        Info.append(Diag.Diagnostic('File\n\'{0:s}\'\n\nThis is a through hole part as both copper0 and copper1 views are present.\nIf you wanted a smd part remove the copper0 definition from line {1:s}\n', InFile, Copper0.LineNo))
 
-    elif not 'copper0.layerid' in FzpDict and 'copper1.layerid' in FzpDict:
+    elif Copper0 == None and Copper1 != None:
 
-        Info.append('File\n\'{0:s}\'\n\nThis is a smd part as only the copper1 view is present.\nIf you wanted a through hole part add the copper0 definition before line {1:s}\n'.format(str(InFile), str(FzpDict['copper1.lineno'])))
+        Info.append(Diag.Diagnostic('File\n\'{0:s}\'\n\nThis is a smd part as only the copper1 view is present.\nIf you wanted a through hole part add the copper0 definition before line {1:s}\n', InFile, Copper1.LineNo))
 
-    elif 'copper0.layerid' in FzpDict and not 'copper1.layerid' in FzpDict:
+    elif Copper0 != None and Copper1 == None:
 
-        Errors.append('Error 37: File\n\'{0:s}\'\n\nThis is a smd part as only the copper0 view is present but it is on the bottom layer, not the top.\nIf you wanted a smd part change copper0 to copper 1 at line  {1:s}\nIf you wanted a through hole part add the copper1 definition after line {1:s}\n'.format(str(InFile), str(FzpDict['copper0.lineno'])))
+        Errors.append(Diag.Diagnostic('Error 37: File\n\'{0:s}\'\n\nThis is a smd part as only the copper0 view is present but it is on the bottom layer, not the top.\nIf you wanted a smd part change copper0 to copper 1 at line  {1:s}\nIf you wanted a through hole part add the copper1 definition after line {1:s}\n', InFile, Copper0.LineNo))
 
     # End of if 'hybridsetforpcbView' in State:
 
@@ -2167,7 +5518,7 @@ def FzpProcessConnectorsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
         # Too many levels down in the tag stack. There is an error somewhere. 
 
-        Errors.append('Error 38: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, tag stack is at level {2:s} and should only go to level 7\n'.format(str(InFile), str(Elem.sourceline), str(len(TagStack))))
+        Errors.append(Diag.Diagnostic('Error 38: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, tag stack is at level {2:s} and should only go to level 7\n', InFile, Elem.sourceline, len(TagStack)))
 
     # End of if len(TagStack) == 4:
 
@@ -2212,7 +5563,7 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
             logging.debug (' FzpProcessConnectorsTs4: assuming Tag %s is spice data\n', Tag)
 
-            Warnings.append('Warning 10: File\n\'{0:s}\'\nAt line {1:s}\n\nTag {2:s}\nis not recognized and assumed to be spice data which is ignored\n(but it might be a typo, thus this warning)\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+            Warnings.append(Diag.Diagnostic('Warning 10: File\n\'{0:s}\'\nAt line {1:s}\n\nTag {2:s}\nis not recognized and assumed to be spice data which is ignored\n(but it might be a typo, thus this warning)\n', InFile, Elem.sourceline, Tag))
 
         # End of if not Tag in ['erc', 'voltage', 'current']:
          
@@ -2228,7 +5579,7 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
             logging.debug (' FzpProcessConnectorsTs4: TagStack 3: %s should be p or connector\n', State['nexttag'])
     
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'connector\' or \'p\' not {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag'])))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'connector\' or \'p\' not {2:s}\n', InFile, Elem.sourceline, State['nexttag']))
             
         # End of if State['nexttag'] != 'connector' and State['nexttag'] != 'p':
     
@@ -2239,7 +5590,7 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
             logging.debug (' FzpProcessConnectorsTs4: TagStack 3: Tag %s should be connector\n', Tag)
     
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nSate error, expected tag \'connector\' not {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nSate error, expected tag \'connector\' not {2:s}\n', InFile, Elem.sourceline, Tag))
     
         # End of if Tag != 'connector':
     
@@ -2251,6 +5602,8 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
         State['nexttag'] = 'description'
     
+        Model = FzpDict['partmodel']
+
         # Get the attribute values we should have
     
         Id = Elem.get('id')
@@ -2261,57 +5614,39 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
         if Id == None:
     
-            Errors.append('Error 39: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector has no id\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 39: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector has no id\n', InFile, Elem.sourceline))
     
             # give it a bogus value so it has one.
     
             Id = 'none'
         
-        elif Id in FzpDict:
+        elif Model.IdInUse(Id):
     
             # If it is a dup, error!
     
             DupNameError(InFile, Id, Elem, Errors)
     
         else:
-    
-            # else mark it as seen
-    
-            FzpDict[Id] = Id
 
-            # and note that we have seen this pin number. To get the number
+            # note that we have seen this pin number. To get the number
             # remove the prepended 'connector'.
 
             PinNo = LeadingConnectorRegex.sub('', Id)
 
-            if 'pinnos' in FzpDict:
-
-                # The entry already exists so append this pin number to the 
-                # list. 
-
-                FzpDict['pinnos'].append(PinNo)
-
-            else:
-
-                # create the entry and add the pin number.
-
-                FzpDict['pinnos'] = [PinNo]
-
-            # End of if 'pinnos' in FzpDict:
+            Model.PinNos.append(PinNo)
     
         # End of if Id == None:
     
-        # Create an entry with unique prefix 'connectorx.id.bus so bus 
-        # checking won't match svg terminal or leg ids, only id entries. 
-        # Set it to itself so we know this isn't yet part of any bus during 
-        # bus processing later. 
+        # Get (or for a new id create) the connector in the model which marks
+        # it as seen. It isn't yet part of any bus or subpart (the same is 
+        # done for subparts so we are ready if buses and subparts can ever 
+        # coexist, they can't right now ...)
     
-        FzpDict[Id + '.id.bus'] = Id + '.id.bus'
+        Con = Model.Connector(Id)
 
-        # Do the same for subparts so we are ready if buses and subparts can
-        # ever coexist (they can't right now ...)
+        Con.Bus = None
 
-        FzpDict[Id + '.id.subpart'] = Id + '.id.subpart'
+        Con.Subpart = None
     
         # Set the id value in to State for later processing. 
     
@@ -2319,13 +5654,13 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
         if Name == None:
     
-            Errors.append('Error 40: File\'n{0:s}\'\nAt line {1:s}\n\nConnector has no name\n'.format(str(InFile), str(elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 40: File\'n{0:s}\'\nAt line {1:s}\n\nConnector has no name\n', InFile, Elem.sourceline))
     
             # give it a bogus value so it has one.
     
             Name = 'none'
     
-        elif Name in FzpDict:
+        elif Model.IdInUse(Name):
 
             # If it is a dup, warning if such warnings are enabled!
     
@@ -2341,13 +5676,13 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
             # else mark it as seen
     
-            FzpDict[Name] = Name
+            Model.Names.add(Name)
     
         # End of if Name == None:
     
-        # record the name in the dictionary
+        # record the name in the connector
     
-        FzpDict[Id + '.name'] = Name
+        Con.Name = Name
     
         logging.debug (' FzpProcessConnectorsTs4 source line %s Tag %s Id %s Type %s Name %s\n', Elem.sourceline, Tag, Id, Type, Name)
     
@@ -2356,7 +5691,7 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
             # If this isn't a breadboard file (which has hundreds of female 
             # connectors) give a warning. 
     
-            Warnings.append('Warning 11: File\n\'{0:s}\'\nAt line {1:s}\n\nType {2:s} is not male (it usually should be)\n'.format(str(InFile), str(Elem.sourceline), str(Type)))
+            Warnings.append(Diag.Diagnostic('Warning 11: File\n\'{0:s}\'\nAt line {1:s}\n\nType {2:s} is not male (it usually should be)\n', InFile, Elem.sourceline, Type))
 
             # Note we have output this warning so we don't repeat it.
 
@@ -2368,7 +5703,7 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
             # If not flag an error as it must have one.
     
-            Errors.append('Error 41: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no type\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+            Errors.append(Diag.Diagnostic('Error 41: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no type\n', InFile, Elem.sourceline, Id))
     
             # then assign it a bogus value so it has one. 
     
@@ -2376,9 +5711,9 @@ def FzpProcessConnectorsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
         # End of if Type == None:
     
-        # Record the connector type indexed by connector name
+        # Record the connector type in the connector
     
-        FzpDict[Id + '.type'] = Type
+        Con.Type = Type
     
         logging.info (' Exiting FzpProcessConnectorsTs4\n')
 
@@ -2408,7 +5743,7 @@ def FzpProcessConnectorsTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
         logging.debug (' FzpProcessConnectorsTs5: assuming Tag %s is spice data\n', Tag)
 
-        Warnings.append('Warning: File\n\'{0:s}\'\nAt line {1:s}\n\nTag {2:s}\nis not recognized and assumed to be spice data which is ignored\n(but it might also be a typo, thus this warning)\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+        Warnings.append(Diag.Diagnostic('Warning: File\n\'{0:s}\'\nAt line {1:s}\n\nTag {2:s}\nis not recognized and assumed to be spice data which is ignored\n(but it might also be a typo, thus this warning)\n', InFile, Elem.sourceline, Tag))
          
         # leave the state variables as is until we find something we recognize.
 
@@ -2423,7 +5758,7 @@ def FzpProcessConnectorsTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
         if State['nexttag'] != 'description' and State['nexttag'] != 'views':
     
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'description\' or \'views\' not {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag'])))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'description\' or \'views\' not {2:s}\n', InFile, Elem.sourceline, State['nexttag']))
     
         # End of if State['nexttag'] != 'description' and State['nexttag'] != 'views':
         if  Tag == 'description':
@@ -2441,7 +5776,7 @@ def FzpProcessConnectorsTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
             if State['lasttag'] != 'description':
                 
-                Errors.append('Error 42: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no description\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Errors.append(Diag.Diagnostic('Error 42: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no description\n', InFile, Elem.sourceline, Id))
     
             # End of if State['lasttag'] != 'description':
     
@@ -2451,7 +5786,7 @@ def FzpProcessConnectorsTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
     
         else:
     
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, connector {2:s}, expected tag \'description\' or \'views\' got {3:s}\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(Tag)))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, connector {2:s}, expected tag \'description\' or \'views\' got {3:s}\n', InFile, Elem.sourceline, Id, Tag))
     
         # End of if Tag == 'description':
     
@@ -2479,7 +5814,7 @@ def FzpProcessConnectorsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
     if Tag == 'p':
 
-        Errors.append('Error 43: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} missing viewname\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+        Errors.append(Diag.Diagnostic('Error 43: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} missing viewname\n', InFile, Elem.sourceline, Id))
    
         State['lasttag'] = 'viewname'
 
@@ -2487,7 +5822,7 @@ def FzpProcessConnectorsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
     elif State['nexttag'] != 'p' and State['nexttag'] != 'viewname':
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, connector {2:s}, expected \'p\' or \'viewname\' got {3:s}\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(State['nexttag'])))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, connector {2:s}, expected \'p\' or \'viewname\' got {3:s}\n', InFile, Elem.sourceline, Id, State['nexttag']))
 
         # It is unclear what State should be so leave it as is which will
         # likely cause an error cascade, but we have flagged the first one.
@@ -2500,7 +5835,7 @@ def FzpProcessConnectorsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
             logging.debug (' ProcessConnectorsTs6 source line %s Append invalid tag error Tag %s TagStack %s State %s\n', Elem.sourceline, Tag, TagStack, State)
 
-            Errors.append('Error 44: File\n\'{0:s}\'\nAt line {1:s}\n\nViewname {2:s} invalid (typo?)\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+            Errors.append(Diag.Diagnostic('Error 44: File\n\'{0:s}\'\nAt line {1:s}\n\nViewname {2:s} invalid (typo?)\n', InFile, Elem.sourceline, Tag))
 
         else:
 
@@ -2545,7 +5880,7 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
         logging.debug (' FzpProcessConnectorsTs7 source line %s State[\'nexttag\'] %s isn\'t \'p\'\n', Elem.sourceline, State['nexttag'])
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'p\' got {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(State['nexttag'])))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'p\' got {2:s}\n', InFile, Elem.sourceline, State['nexttag']))
 
         # unclear what State should be so leave as is which may cause an
         # error cascade. 
@@ -2567,6 +5902,10 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
             logging.debug (' FzpProcessConnectorsTs7 View set to %s\n', View)
 
+            Model = FzpDict['partmodel']
+
+            ViewModel = Model.View(View)
+
             # We need a layer value (even if it is None) for the index.
 
             Layer = Elem.get('layer')
@@ -2577,75 +5916,57 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
                 logging.debug (' FzpProcessConnectorsTs7 source line %s missing layer\n', Elem.sourceline)
 
-                Errors.append('Error 45: File\n\'{0:s}\'\nAt line {1:s}\n\nLayer missing\n'.format(str(InFile), str(Elem.sourceline)))
+                Errors.append(Diag.Diagnostic('Error 45: File\n\'{0:s}\'\nAt line {1:s}\n\nLayer missing\n', InFile, Elem.sourceline))
 
             # End of if Layer == None:
 
             # Verify the layerId is correct. 
 
-            if not View  + '.' + 'LayerId' in FzpDict:
+            if len(ViewModel.Layers) == 0:
 
                 # Don't have a layerId for this view!
 
-                Errors.append('Error 46: File\n\'{0:s}\'\nAt line {1:s}\n\nNo layerId for View {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(View)))
+                Errors.append(Diag.Diagnostic('Error 46: File\n\'{0:s}\'\nAt line {1:s}\n\nNo layerId for View {2:s}\n', InFile, Elem.sourceline, View))
 
-            elif View != 'pcbView' and Layer != FzpDict[View  + '.' + 'LayerId']:
+            elif View != 'pcbView' and Layer != ViewModel.FirstLayerId():
 
                 # For all except pcbView, the layerIds don't match.
 
-                Errors.append('Error 47: File\n\'{0:s}\'\nAt line {1:s}\n\nLayerId {2:s} doesn\'t match View {3:s} layerId {4:s}\n'.format(str(InFile), str(Elem.sourceline), str(Layer), str(View), str(FzpDict[View  + '.' + 'LayerId'])))
+                Errors.append(Diag.Diagnostic('Error 47: File\n\'{0:s}\'\nAt line {1:s}\n\nLayerId {2:s} doesn\'t match View {3:s} layerId {4:s}\n', InFile, Elem.sourceline, Layer, View, ViewModel.LayerIdText()))
 
             elif View == 'pcbView':
 
-                if  not Layer in FzpDict[View  + '.' + 'LayerId']:
+                if  not Layer in ViewModel.Layers:
 
                     # Layer isn't a valid layer for pcbView.
 
-                    Errors.append('Error 47: File\n\'{0:s}\'\nAt line {1:s}\n\nLayerId {2:s} doesn\'t match any in View {3:s} layerIds {4:s}\n'.format(str(InFile), str(Elem.sourceline), str(Layer), str(View), str(FzpDict[View  + '.' + 'LayerId'])))
+                    Errors.append(Diag.Diagnostic('Error 47: File\n\'{0:s}\'\nAt line {1:s}\n\nLayerId {2:s} doesn\'t match any in View {3:s} layerIds {4:s}\n', InFile, Elem.sourceline, Layer, View, ViewModel.LayerIdText()))
 
-                elif Layer == 'copper0':
+                elif Layer in ['copper0', 'copper1']:
 
                     # While multiple layers are allowed, only copper0 and 
                     # copper1 (if they exist) are allowed in connectors and
                     # they must be unique. 
 
-                    if Id + '.' + Layer in FzpDict:
-
-                        # Not unique so error. 
-
-                        Errors.append('Error 48: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} layer {3:s} already defined, must be unique\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(Layer)))
-
-                    else:
-    
-                        # It is unique so note that we have seen it now. 
-
-                        FzpDict[Id + '.' + Layer] = 'y'
+                    Con = Model.Connector(Id)
 
-                    # End of if Id + '.' + Layer in FzpDict:
-
-                elif Layer == 'copper1':
-
-                    # While multiple layers are allowed, only copper0 and 
-                    # copper1 (if they exist) are allowed in connectors and
-                    # they must be unique. 
-
-                    if Id + '.' + Layer in FzpDict:
+                    if Layer in Con.Layers:
 
                         # Not unique so error. 
 
-                        Errors.append('Error 48: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} layer {3:s} already defined, must be unique\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(Layer)))
+                        Errors.append(Diag.Diagnostic('Error 48: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} layer {3:s} already defined, must be unique\n', InFile, Elem.sourceline, Id, Layer))
 
                     else:
     
                         # It is unique so note that we have seen it now. 
 
-                        FzpDict[Id + '.' + Layer] = 'y'
+                        Con.Layers.add(Layer)
 
-                    # End of if Id + '.' + Layer in FzpDict:
+                    # End of if Layer in Con.Layers:
 
-                # End of if  not Layer in FzpDict[View  + '.' + 'LayerId']:
+                # End of if  not Layer in ViewModel.Layers:
 
-            # End of if not View  + '.' + 'LayerId' in FzpDict:
+            # End of if len(ViewModel.Layers) == 0:
 
             # Get the hybrid attribute if present (as it affects checking 
             # below)
@@ -2659,7 +5980,7 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
                 if Hybrid != 'yes':
 
-                    Errors.append('Error 49: File\n\'{0:s}\'\nAt line {1:s}\n\nhybrid is present but isn\'t \'yes\' but {2:s} (typo?)\n'.format(str(InFile), str(Elem.eline),str(Hybrid)))
+                    Errors.append(Diag.Diagnostic('Error 49: File\n\'{0:s}\'\nAt line {1:s}\n\nhybrid is present but isn\'t \'yes\' but {2:s} (typo?)\n', InFile, Elem.eline, Hybrid))
 
                 else:
 
@@ -2700,7 +6021,7 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
                     logging.debug (' FzpProcessConnectorsTs7 unknown key %s\n', Key)
 
-                    Warnings.append('Warning 12: File\n\'{0:s}\'\nAt line {1:s}\n\nKey {2:s} is not recognized\n'.format(str(InFile), str(Elem.sourceline), str(Key)))
+                    Warnings.append(Diag.Diagnostic('Warning 12: File\n\'{0:s}\'\nAt line {1:s}\n\nKey {2:s} is not recognized\n', InFile, Elem.sourceline, Key))
 
                 # End of if Key not in ['terminalId', 'svgId', 'layer', 'legId']:
                 # Now get the value of the key.
@@ -2709,7 +6030,7 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
                 if Key == None:
 
-                    Errors.append('Error 50: File\n\'{0:s}\'\nAt line {1:s}\n\nTag {2:s} is present but has no value\n'.format(str(InFile), str(Elem.sourceline),str(Key)))
+                    Errors.append(Diag.Diagnostic('Error 50: File\n\'{0:s}\'\nAt line {1:s}\n\nTag {2:s} is present but has no value\n', InFile, Elem.sourceline, Key))
 
                 # End of if Key == None"
 
@@ -2750,27 +6071,15 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
                     # to look for in the svg. The layer needs to be the same
                     # for all
 
-                    if View + '.layer' in FzpDict:
-
-                        # Already exists so append this one if it isn't 
-                        # already present.
-
-                        if not Layer in FzpDict[View + '.layer']:
+                    # Append this one if it isn't already present.
 
-                            logging.debug (' FzpProcessConnectorsTs7: source line %s View %s layer %s added\n', Elem.sourceline, View, Layer)
+                    if not Layer in ViewModel.ConnectorLayers:
 
-                            FzpDict[View + '.layer'].append(Layer)
+                        logging.debug (' FzpProcessConnectorsTs7: source line %s View %s layer %s added\n', Elem.sourceline, View, Layer)
 
-                        # End of if not Layer in FzpDict[View + '.layer']:
+                        ViewModel.ConnectorLayers.append(Layer)
 
-                    else:
-
-                        # Doesn't exist yet, so create it and add the layer.
-
-                        logging.debug (' FzpProcessConnectorsTs7: source line %s View %s, create and add layer %s added\n', Elem.sourceline, View, Layer)
-                        FzpDict[View + '.layer'] = [Layer]
-
-                    # End of if View + '.layer' in FzpDict:
+                    # End of if not Layer in ViewModel.ConnectorLayers:
 
                 else:
 
@@ -2789,7 +6098,7 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
  
                             logging.debug (' FzpProcessConnectorsTs7: Id %s doesn\'t match Value %s\n',Id, Value)
 
-                            Warnings.append('Warning 13: File\n\'{0:s}\'\nAt line {1:s}\n\nValue {2:s} doesn\'t match Id {3:s}. (Typo?)\n'.format(str(InFile), str(Elem.sourceline), str(Value), str(Id)))
+                            Warnings.append(Diag.Diagnostic('Warning 13: File\n\'{0:s}\'\nAt line {1:s}\n\nValue {2:s} doesn\'t match Id {3:s}. (Typo?)\n', InFile, Elem.sourceline, Value, Id))
 
 
                         # End of if not re.match(Id, Value):
@@ -2798,64 +6107,48 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
                         # and if it is add it to the list of connectors to 
                         # verify is in the associated svg.
 
-                        if not View + '.' + Value + '.' + Layer in FzpDict:
+                        if not (Value, Layer) in ViewModel.ConnectorKeys:
 
                             # This is one of the pin names and we haven't seen
                             # it before, so add it to the connectors list for 
                             # matching in the svg. Indicate we have seen this
                             # connector (in case we see another)
 
-                            FzpDict[View + '.' + Value + '.' + Layer] = 'y'
-
-                            # If the entry for this view doesn't exist yet, 
-                            # create it and add this connector to the list
-                            # otherwise append the connector to the existing
-                            # list (weeding out duplicate . 
-
-                            if not 'connectors.fzp.' + View in FzpDict:
-    
-                                logging.debug (' FzpProcessConnectorsTs7: create %s add %s\n','connectors.fzp.' + View, Value)
-
-                                # First connector so create the list.
+                            ViewModel.ConnectorKeys.add((Value, Layer))
 
-                                FzpDict['connectors.fzp.' + View] = [Value]
+                            logging.debug (' FzpProcessConnectorsTs7: View %s contents %s\n', View, list(ViewModel.Connectors))
 
-                            else:
+                            if not Value in ViewModel.Connectors:
 
+                                # For pcb view pins will appear twice, once
+                                # for copper0 and once for copper1, we only
+                                # need one value so if it is already here 
+                                # don't add a new one.
 
-                                logging.debug (' FzpProcessConnectorsTs7: View %s conents %s\n','connectors.fzp.' + View, FzpDict['connectors.fzp.' + View])
+                                logging.debug (' FzpProcessConnectorsTs7: View %s add %s\n', View, Value)
 
-                                if not Value in FzpDict['connectors.fzp.' + View]:
+                                ViewModel.Connectors[Value] = None
 
-                                    # For pcb view pins will appear twice, once
-                                    # for copper0 and once for copper1, we only
-                                    # need one value so if it is already here 
-                                    # don't add a new one.
+                            # End of if not Value in ViewModel.Connectors:
 
-                                    logging.debug (' FzpProcessConnectorsTs7: add %s add %s\n','connectors.fzp.' + View, Value)
-
-                                    FzpDict['connectors.fzp.' + View].append(Value)
-
-                                # End of if not Value in FzpDict['connectors.fzp.' + View]:
-
-                            # End of if not 'connectors.fzp.' + View in FzpDict:
-
-                        # End of if not View + '.' + Value + '.' + Layer in FzpDict:
+                        # End of if not (Value, Layer) in ViewModel.ConnectorKeys:
 
                         if View == 'schematicView':
 
                             # This is schematic view, so in case this is a 
                             # subpart, associate the pins with the connectorId
 
-                            if not 'schematic.' + Id in FzpDict:
+                            Con = Model.Connector(Id)
+
+                            if Con.SchematicPins == None:
 
                                 # Doesn't exist yet so create it.
 
-                                FzpDict['schematic.' + Id] = []
+                                Con.SchematicPins = []
 
-                            # End of if not 'schematic.' + Id in FzpDict:
+                            # End of if Con.SchematicPins == None:
 
-                            FzpDict['schematic.' + Id].append(Value)
+                            Con.SchematicPins.append(Value)
 
                         # End of if View == 'schematicView':
 
@@ -2875,18 +6168,18 @@ def FzpProcessConnectorsTs7(InFile, Elem, Errors, Warnings, Info, FzpDict, TagSt
 
             if TerminalIdSeen == 'y' and LegIdSeen == 'y':
 
-                Errors.append('Error 80: File\n\'{0:s}\'\nAt line {1:s}\n\nBoth terminalId and legId present, only one or the other is allowed.\n'.format(str(InFile), str(Elem.sourceline)))
+                Errors.append(Diag.Diagnostic('Error 80: File\n\'{0:s}\'\nAt line {1:s}\n\nBoth terminalId and legId present, only one or the other is allowed.\n', InFile, Elem.sourceline))
 
             # End of if TerminalIdSeen == 'y' and LegIdSeen == 'y':
 
             if SvgIdSeen != 'y' and Hybrid != 'yes':
 
-                Errors.append('Error 51: File\n\'{0:s}\'\nAt line {1:s}\n\nsvgId missing\n'.format(str(InFile), str(Elem.sourceline)))
+                Errors.append(Diag.Diagnostic('Error 51: File\n\'{0:s}\'\nAt line {1:s}\n\nsvgId missing\n', InFile, Elem.sourceline))
          
             # End of if SvgIdSeen != 'y' and Hybrid != 'yes':
 
             if TerminalIdSeen != 'y' and View == 'schematicView' and Hybrid != 'yes':
-                Warnings.append('Warning 14: File\n\'{0:s}\'\nAt line {1:s}\n\nterminalId missing in schematicView (likely an error)\n'.format(str(InFile), str(Elem.sourceline)))
+                Warnings.append(Diag.Diagnostic('Warning 14: File\n\'{0:s}\'\nAt line {1:s}\n\nterminalId missing in schematicView (likely an error)\n', InFile, Elem.sourceline))
 
             # End of if TerminalIdSeen != 'y' and View == 'schematicview' and Hybrid != 'yes':
 
@@ -2925,7 +6218,7 @@ def FzpProcessBusTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
         # There shouldn't be anything past 5th level so something is wrong. 
 
-        Errors.append('Error 38: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, tag stack is at level {2:s} and should only go to level 5\n\nTag {3:s} will be ignored\n'.format(str(InFile), str(Elem.sourceline), str(len(TagStack)), str(Tag)))
+        Errors.append(Diag.Diagnostic('Error 38: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, tag stack is at level {2:s} and should only go to level 5\n\nTag {3:s} will be ignored\n', InFile, Elem.sourceline, len(TagStack), Tag))
 
     # End of if len(TagStack) == 4:
     
@@ -2945,7 +6238,7 @@ def FzpProcessBusTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
         # Not the expected state possibly a missing line. 
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected lasttag \'buses\' or \'nodeMember\' not {2:s}\n(Missing line?)\n'.format(str(InFile), str(Elem.sourceline), str(State['lasttag'])))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected lasttag \'buses\' or \'nodeMember\' not {2:s}\n(Missing line?)\n', InFile, Elem.sourceline, State['lasttag']))
         
     # End of if not State['lasttag'] in ['buses', 'nodeMember']:
 
@@ -2957,7 +6250,7 @@ def FzpProcessBusTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
         logging.debug (' FzpProcessBusTs4:  Unexpected Tag %s expected bus\n', Tag)
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'bus\' not {2:s}. (Missing line?)\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'bus\' not {2:s}. (Missing line?)\n', InFile, Elem.sourceline, Tag))
         
         # it is unclear what state should be so leave it as is which may cause
         # an error cascade ...
@@ -2966,6 +6259,8 @@ def FzpProcessBusTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
         # We look to have a bus line so get the bus id. 
 
+        Model = FzpDict['partmodel']
+
         Id = Elem.get('id')
 
         if Id == None:
@@ -2977,7 +6272,7 @@ def FzpProcessBusTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
             FzpDict['empty_bus_defined'] = 'y'
 
-            Warnings.append('Warning 15: File:\n\'{0:s}\'\nAt line {1:s}\n\nEmpty bus definition, no id (remove?)\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 15: File:\n\'{0:s}\'\nAt line {1:s}\n\nEmpty bus definition, no id (remove?)\n', InFile, Elem.sourceline))
 
         else:            
 
@@ -2989,21 +6284,13 @@ def FzpProcessBusTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
             logging.debug (' FzpProcessBusTs4: source line %s Tag %s Id %s State %s\n', Elem.sourceline, Tag, Id, State)
 
-            if Id + '.bus_seen' in FzpDict:
+            if Id in Model.Buses:
     
                 # Not unique error
     
                 DupNameError(InFile, Id, Elem, Errors)
     
-            else:
-    
-                logging.debug (' FzpProcessBusTs4: Marked Id %s seen\n', Id)
-    
-                # else mark it as seen 
-    
-                FzpDict[Id + '.bus_seen'] = Id
-    
-            # End of if Id + '.bus_seen' in FzpDict:
+            # End of if Id in Model.Buses:
     
         # End of Id == None:
 
@@ -3012,23 +6299,23 @@ def FzpProcessBusTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
         State['lastvalue'] = Id
 
-        if (Id + '.bus') in FzpDict:
+        if Id in Model.Buses:
 
             logging.debug (' FzpProcessBusTs4: Id %s already exists\n', Id)
 
             # If we already have this bus id flag an error.
 
-            Errors.append('Error 52: File\n\'{0:s}\'\nAt line {1:s}\n\nBus {2:s} already defined\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+            Errors.append(Diag.Diagnostic('Error 52: File\n\'{0:s}\'\nAt line {1:s}\n\nBus {2:s} already defined\n', InFile, Elem.sourceline, Id))
 
         else:
 
-            logging.debug (' FzpProcessBusTs4: created counter for Id %s\n', Id)
+            logging.debug (' FzpProcessBusTs4: created bus Id %s\n', Id)
 
             # mark this as a bus currently with no nodes.
 
-            FzpDict[Id + '.bus'] = 0
+            Model.Buses[Id] = Part.Bus(Id)
 
-        # End of if (Id + '.bus') in FzpDict:
+        # End of if Id in Model.Buses:
 
         # Set the current and expected State
 
@@ -3065,7 +6352,7 @@ def FzpProcessBusTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
         # State isn't what we expected, error
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected lasttag \'bus\' or \'nodeMember\' not {2:s}\n(Missing line?)\n'.format(str(InFile), str(Elem.sourceline), str(State['lasttag'])))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected lasttag \'bus\' or \'nodeMember\' not {2:s}\n(Missing line?)\n', InFile, Elem.sourceline, State['lasttag']))
 
     else:    
     
@@ -3075,33 +6362,35 @@ def FzpProcessBusTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
             # it is.
     
             Connector = Elem.get('connectorId')
+
+            Model = FzpDict['partmodel']
     
             if Connector != None:
     
                 # Check if the connector exists
     
-                if not Connector + '.id.bus' in FzpDict:
+                if not Connector in Model.Connectors:
 
                     logging.debug (' FzpProcessBusTs5:  Connector %s doesn\'t exist\n',Connector)
     
                     # No, flag an error.
     
-                    Errors.append('Error 53: File\n\'{0:s}\'\nAt line {1:s}\n\nBus nodeMember {2:s} does\'t exist\n'.format(str(InFile), str(Elem.sourceline), str(Connector)))
+                    Errors.append(Diag.Diagnostic('Error 53: File\n\'{0:s}\'\nAt line {1:s}\n\nBus nodeMember {2:s} does\'t exist\n', InFile, Elem.sourceline, Connector))
     
                 else:
     
-                    # Since we set the value as the key as a place holder 
-                    # intially, check if that is still true (i.e. this isn't 
-                    # part of another bus already). 
+                    # Check the connector isn't part of another bus already.
+
+                    Con = Model.Connectors[Connector]
     
-                    if FzpDict[Connector + '.id.bus'] == FzpDict[Connector + '.id.bus']:
+                    if Con.Bus == None:
 
                         logging.debug (' FzpProcessBusTs5: Connector %s added to bus %s\n',Connector, Id)
     
                         # connector not part of another bus so mark it as ours. 
                         # by writing our bus Id in to it.
     
-                        FzpDict[Connector + '.id.bus'] = Id
+                        Con.Bus = Id
     
                     else:
     
@@ -3109,15 +6398,15 @@ def FzpProcessBusTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, TagStack, St
 
                         logging.debug (' FzpProcessBusTs5: connector %s already in another bus\n',Connector)
     
-                        Errors.append('Error 54: File\n\'{0:s}\'\nAt line {1:s}\n\nBus nodeMember {2:s} already in bus {3:s}\n'.format(str(InFile), str(Elem.sourceline), str(Connector), str(FzpDict[Connector + '.id.bus'])))
+                        Errors.append(Diag.Diagnostic('Error 54: File\n\'{0:s}\'\nAt line {1:s}\n\nBus nodeMember {2:s} already in bus {3:s}\n', InFile, Elem.sourceline, Connector, Con.Bus))
     
-                    # End of if FzpDict[connector + '.id.bus'] == FzpDict[connector + '.id.bus']:
+                    # End of if Con.Bus == None:
     
-                # End of if not Connector + '.id.bus' in FzpDict:
+                # End of if not Connector in Model.Connectors:
     
                 # Now increase the count of nodes in the bus by 1.
     
-                FzpDict[Id + '.bus'] += 1
+                Model.Buses[Id].NodeCount += 1
     
             # End of if Connector != None:
     
@@ -3143,7 +6432,7 @@ def FzpProcessSchematicPartsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         # Unexpected state error
 
-        Errors.append('Error: File\n\'{0:s}\'\nAt line {1:s}\n\nDuplicate tag in schematic-subparts\n'.format(str(InFile), str(Elem.sourceline)))
+        Errors.append(Diag.Diagnostic('Error: File\n\'{0:s}\'\nAt line {1:s}\n\nDuplicate tag in schematic-subparts\n', InFile, Elem.sourceline))
 
     # End of if Tag == 'schematic-subparts':
 
@@ -3174,7 +6463,7 @@ def FzpProcessSchematicPartsTs3(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         # There shouldn't be anything past 5th level so something is wrong. 
 
-        Errors.append('Error 38: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, tag stack is at level {2:s} and should only go to level 6\n\nTag {3:s} will be ignored\n'.format(str(InFile), str(Elem.sourceline), str(len(TagStack)), str(Tag)))
+        Errors.append(Diag.Diagnostic('Error 38: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, tag stack is at level {2:s} and should only go to level 6\n\nTag {3:s} will be ignored\n', InFile, Elem.sourceline, len(TagStack), Tag))
 
     # End of if len(TagStack) == 3:
 
@@ -3196,11 +6485,13 @@ def FzpProcessSchematicPartsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         # State isn't what we expected, error
 
-        Errors.append('Error 26: File\n\n{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'subpart\' not {2:s}. (Missing line?)\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\n{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'subpart\' not {2:s}. (Missing line?)\n', InFile, Elem.sourceline, Tag))
 
     else:
 
         if State['lasttag'] == 'schematic-subparts' or State['lasttag'] == 'connector':
+
+            Model = FzpDict['partmodel']
     
             Id = Elem.get('id')
     
@@ -3208,15 +6499,15 @@ def FzpProcessSchematicPartsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, T
     
                 logging.debug (' FzpProcessSchematicPartsTs4: Id none error\n')
 
-                Errors.append('Error 55: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart has no id\n'.format(str(InFile), str(Elem.sourceline)))
+                Errors.append(Diag.Diagnostic('Error 55: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart has no id\n', InFile, Elem.sourceline))
     
-            elif Id in FzpDict:
+            elif Model.IdInUse(Id):
     
                 logging.debug (' FzpProcessSchematicPartsTs4: subpart Id not unique error\n')
 
                 # error, connector must be unique
     
-                Errors.append('Error 56: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart id {2:s} already exists (must be unique)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Errors.append(Diag.Diagnostic('Error 56: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart id {2:s} already exists (must be unique)\n', InFile, Elem.sourceline, Id))
     
             # End of if Id == None:
     
@@ -3226,9 +6517,9 @@ def FzpProcessSchematicPartsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, T
     
                 logging.debug (' FzpProcessSchematicPartsTs4: Label None error\n')
     
-                Errors.append('Error 57: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart has no label\n'.format(str(InFile), str(Elem.sourceline)))
+                Errors.append(Diag.Diagnostic('Error 57: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart has no label\n', InFile, Elem.sourceline))
     
-            elif Label in FzpDict:
+            elif Model.IdInUse(Label):
     
                 # not unique error
     
@@ -3242,47 +6533,35 @@ def FzpProcessSchematicPartsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, T
     
                 logging.debug (' FzpProcessSchematicPartsTs4: Mark Label %s seen\n',Label)
     
-                FzpDict[Label] = Label 
+                Model.Labels.add(Label)
     
-            # End of if Label in FzpDict:
+            # End of if Model.IdInUse(Label):
     
             # Set the subpart id even if it is None so we don't impact the last
             # subpart.
     
             State['lastvalue'] = Id
     
-            if (Id + '.subpart') in FzpDict:
+            if Id in Model.Subparts:
     
                 # If we already have this subpart id flag an error (note in the
                 # case of None, it may be due to other errors.)
     
                 logging.debug (' FzpProcessSchematicPartsTs4: Id %s seeni already\n',Id)
     
-                Errors.append('Error 58: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart {2:s} already defined (duplicate?)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Errors.append(Diag.Diagnostic('Error 58: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart {2:s} already defined (duplicate?)\n', InFile, Elem.sourceline, Id))
     
             else:
     
-                # mark this as a subpart currently with no connections.
+                # Add this subpart, currently with no connections, to the
+                # model (which also tells the svg processing that there are
+                # subparts). It hasn't been seen in the svg yet.
     
                 logging.debug (' FzpProcessSchematicPartsTs4: Id %s set empty\n',Id)
     
-                FzpDict[Id + '.subpart'] = 0
-
-                if not 'subparts' in FzpDict:
-
-                    # Note that we have subparts in the dictionary for svg 
-                    # processing. 
-
-                    FzpDict['subparts'] = []
-
-                # End of if not Subparts in FzpDict:
-
-                # Then add this subpart to the list of subpart ids and indicate
-                # we haven't yet seen it in the svg. 
-
-                FzpDict['subparts'].append(Id) 
+                Model.Subparts[Id] = Part.Subpart(Id, Label)
     
-            # End of if (Id + '.subpart') in FzpDict:
+            # End of if Id in Model.Subparts:
     
         else:
 
@@ -3290,7 +6569,7 @@ def FzpProcessSchematicPartsTs4(InFile, Elem, Errors, Warnings, Info, FzpDict, T
     
             logging.debug (' FzpProcessSchematicPartsTs4: State error\n',State)
 
-            Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'schematic-subparts\' or \'connector\' not {2:s}.\n'.format(str(InFile), str(Elem.sourceline), str(State['lasttag'])))
+            Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'schematic-subparts\' or \'connector\' not {2:s}.\n', InFile, Elem.sourceline, State['lasttag']))
 
         # End of if State['lasttag'] == 'schematic-subparts' or State['lasttag'] == 'connector':
 
@@ -3318,7 +6597,7 @@ def FzpProcessSchematicPartsTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         # State isn't what we expected, error
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error expected tag \'connectors\' not {2:s}. Missing line?\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error expected tag \'connectors\' not {2:s}. Missing line?\n', InFile, Elem.sourceline, Tag))
 
     # End of if Tag != 'connectors':
 
@@ -3336,7 +6615,7 @@ def FzpProcessSchematicPartsTs5(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         logging.debug (' FzpProcessSchematicPartsTs5: unexpected state %s expected connector\n', Tag)
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected last tag \'subpart\' not {2:s}.  (Missing line?)\n'.format(str(InFile), str(Elem.sourceline), str(State['lasttag'])))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected last tag \'subpart\' not {2:s}.  (Missing line?)\n', InFile, Elem.sourceline, State['lasttag']))
 
     # End of if State['lasttag'] == 'subpart':
 
@@ -3358,7 +6637,7 @@ def FzpProcessSchematicPartsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         # State isn't what we expected, error
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'connector\' not {2:s}. (Missing line?)\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected tag \'connector\' not {2:s}. (Missing line?)\n', InFile, Elem.sourceline, Tag))
 
     # End of if Tag != 'connector':
 
@@ -3366,6 +6645,8 @@ def FzpProcessSchematicPartsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
     Id = State['lastvalue']
 
+    Model = FzpDict['partmodel']
+
     if State['lasttag'] == 'connectors' or State['lasttag'] == 'connector':
 
         # Get the ConnectorId
@@ -3374,59 +6655,53 @@ def FzpProcessSchematicPartsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         if ConnectorId == None:
 
-            Errors.append('Error 59: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector id missing, ignored\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 59: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector id missing, ignored\n', InFile, Elem.sourceline))
 
-        elif not ConnectorId in FzpDict:
+        elif not ConnectorId in Model.Connectors:
 
-            Errors.append('Error 60: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} doesn\'t exist (and it must)\n'.format(str(InFile), str(Elem.sourceline), str(ConnectorId)))
+            Errors.append(Diag.Diagnostic('Error 60: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} doesn\'t exist (and it must)\n', InFile, Elem.sourceline, ConnectorId))
 
         else:
     
-            # Since we set the value as the key as a place holder 
-            # intially, check if that is still true (i.e. this isn't 
-            # part of another subpart already). 
+            # Check the connector isn't part of another subpart already.
+
+            Connector = Model.Connectors[ConnectorId]
     
-            if FzpDict[ConnectorId + '.id.subpart'] == FzpDict[ConnectorId + '.id.subpart']:
+            if Connector.Subpart == None:
 
-                logging.debug (' FzpProcessSchematicPartsTs6: Connector %s added to bus %s\n',ConnectorId, Id)
+                logging.debug (' FzpProcessSchematicPartsTs6: Connector %s added to subpart %s\n',ConnectorId, Id)
     
                 # connector not part of another subpart so mark it as ours. 
                 # by writing our subpart Id in to it.
     
-                FzpDict[ConnectorId + '.id.subpart'] = Id
+                Connector.Subpart = Id
 
                 # success, so increase the connector count for this subpart
                 # by 1. 
 
-                FzpDict[Id + '.subpart'] += 1
-
-                if not Id + '.subpart.cons' in FzpDict:
-
-                    # Entry doesn't exist so create it.
+                SubPart = Model.Subparts[Id]
 
-                    FzpDict[Id + '.subpart.cons'] = []
-
-                # End of if not Id + '.subpart.cons' in FzpDict:
+                SubPart.ConnectorCount += 1
 
                 # Then add this connector to it. 
 
-                if not 'schematic.' + ConnectorId in FzpDict:
+                if Connector.SchematicPins == None:
     
-                    Errors.append('Error 81: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart connector {2:s} has no pins defined\n'.format(str(InFile), str(Elem.sourceline), str(ConnectorId), str(FzpDict[ConnectorId + '.id.subpart'])))
+                    Errors.append(Diag.Diagnostic('Error 81: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart connector {2:s} has no pins defined\n', InFile, Elem.sourceline, ConnectorId))
 
                 else:
 
-                    for Con in FzpDict['schematic.' + ConnectorId]: 
+                    for Con in Connector.SchematicPins: 
 
                         # Append the pins associated with this connector to 
-                        # the subpart ID list to check when the schematic 
+                        # the subpart's list to check when the schematic 
                         # svg is processed later. 
 
-                        FzpDict[Id + '.subpart.cons'].append(Con)
+                        SubPart.Cons[Con] = None
 
-                    # End of for Con in FzpDict['schematic.' + ConnectorId]: 
+                    # End of for Con in Connector.SchematicPins: 
 
-                # End of if not 'schematic.' + ConnectorId in FzpDict:
+                # End of if Connector.SchematicPins == None:
     
             else:
     
@@ -3434,9 +6709,9 @@ def FzpProcessSchematicPartsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
                 logging.debug (' FzpProcessSchematicPartsTs6: connector %s already in another subpart\n',ConnectorId)
     
-                Errors.append('Error 61: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart connector {2:s} already in subpart {3:s}\n'.format(str(InFile), str(Elem.sourceline), str(ConnectorId), str(FzpDict[ConnectorId + '.id.subpart'])))
+                Errors.append(Diag.Diagnostic('Error 61: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart connector {2:s} already in subpart {3:s}\n', InFile, Elem.sourceline, ConnectorId, Connector.Subpart))
     
-            # End of if FzpDict[connectorId + '.id.subpart'] == FzpDict[connectorId + '.id.subpart']:
+            # End of if Connector.Subpart == None:
 
         # End of if ConnectorId == None:
 
@@ -3444,7 +6719,7 @@ def FzpProcessSchematicPartsTs6(InFile, Elem, Errors, Warnings, Info, FzpDict, T
 
         # State isn't what we expected, error
 
-        Errors.append('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected last tag \'connectors\' or \'connector\' not {2:s}.\n'.format(str(InFile), str(Elem.sourceline), str(State['lasttag'])))
+        Errors.append(Diag.Diagnostic('Error 26: File\n\'{0:s}\'\nAt line {1:s}\n\nState error, expected last tag \'connectors\' or \'connector\' not {2:s}.\n', InFile, Elem.sourceline, State['lasttag']))
 
     # end of if State['lasttag'] == 'connectors' or State['lasttag'] == 'connector':
 
@@ -3460,46 +6735,102 @@ def FzpCheckConnectors(InFile, Elem, FzpDict, Errors, Warnings, Info, State):
 
     logging.info (' Entering FzpCheckConnectors\n')
 
-    if not 'pinnos' in FzpDict or len(FzpDict['pinnos']) == 0:
+    PinNos = FzpDict['partmodel'].PinNos
+
+    if len(PinNos) == 0:
 
         # no connectors found!
 
         logging.debug (' FzpCheckConnectors: no pinnos found\n')
 
-        Errors.append('Error 62: File\n\'{0:s}\'\n\nNo connectors found to check\n'.format(str(InFile)))
+        Errors.append(Diag.Diagnostic('Error 62: File\n\'{0:s}\'\n\nNo connectors found to check\n', InFile))
 
     else:
 
-        # Check that pin numbers start at 0 and are contiguous. 
+        # Check that pin numbers start at 0 and are contiguous. Make a set 
+        # of the pin numbers once so each check is a single lookup.
 
-        logging.debug (' FzpCheckConnectors: pinnos %s\n',FzpDict['pinnos'])
+        logging.debug (' FzpCheckConnectors: pinnos %s\n',PinNos)
 
-        for Pin in range(len(FzpDict['pinnos'])):
-    
-            # Mark an error if any number in sequence doesn't exist as the 
-            # connector numbers must be contiguous. 
+        PinSet = set(PinNos)
 
-            logging.debug (' FzpCheckConnectors: Pin %s\n', Pin)
+        # The sequence should run from 0 to one less than the number of 
+        # connectors, but check up to the highest pin number if that is 
+        # larger so gaps before it are found too. Only ascii digits are pin
+        # numbers (str.isdigit would accept '²', which int() rejects).
 
-            if not 'pinnosmsg' in State:
+        PinCount = len(PinNos)
 
-                # Only output a pin number message once per file.
+        Pins = []
 
-                if not str(Pin) in FzpDict['pinnos']:
+        for PinNo in PinSet:
 
-                    logging.debug (' FzpCheckConnectors: pin %s pinnos %s\n',Pin, FzpDict['pinnos'])
+            if re.fullmatch(r'[0-9]+', PinNo):
 
-                    Errors.append('Error 64: File\n\'{0:s}\'\n\nConnector{1:s} doesn\'t exist when it must to stay in sequence\n'.format(str(InFile), str(Pin)))
+                if int(PinNo) >= PinCount:
 
-                    State['pinnosmsg'] = 'y'
+                    PinCount = int(PinNo) + 1
 
-                # End of if not Pin in FzpDict['pinnos']:
+                # End of if int(PinNo) >= PinCount:
 
-            # End of if not 'pinnosmsg' in State:
-        
-        # End of for pin in range(len(FzpDict['pinnos'])):
+                if str(int(PinNo)) == PinNo:
+
+                    # connector01 isn't connector1, so only a pin number 
+                    # without leading zeros fills its place in the sequence.
+
+                    Pins.append(int(PinNo))
+
+                # End of if str(int(PinNo)) == PinNo:
+
+            # End of if re.fullmatch(r'[0-9]+', PinNo):
+
+        # End of for PinNo in PinSet:
+
+        # Mark an error for every gap in the sequence as the connector 
+        # numbers must be contiguous. A run of missing numbers is one gap 
+        # (between two pins that exist, or after the last one) so it gets 
+        # one message. Only the pins that exist are looked at, so the work 
+        # doesn't depend on how large the pin numbers are.
+
+        Gaps = []
+
+        LastPin = -1
+
+        for Pin in sorted(Pins):
+
+            if Pin > LastPin + 1:
+
+                Gaps.append([LastPin + 1, Pin - 1])
+
+            # End of if Pin > LastPin + 1:
+
+            LastPin = Pin
+
+        # End of for Pin in sorted(Pins):
+
+        if LastPin < PinCount - 1:
+
+            Gaps.append([LastPin + 1, PinCount - 1])
+
+        # End of if LastPin < PinCount - 1:
+
+        for GapStart, GapEnd in Gaps:
+
+            logging.debug (' FzpCheckConnectors: pins %s to %s missing\n', GapStart, GapEnd)
+
+            if GapStart == GapEnd:
 
-    # End of if not pinnos in FzpDict or len(FzpDict['pinnos']) == 0:
+                Errors.append(Diag.Diagnostic('Error 64: File\n\'{0:s}\'\n\nConnector{1:s} doesn\'t exist when it must to stay in sequence\n', InFile, GapStart))
+
+            else:
+
+                Errors.append(Diag.Diagnostic('Error 64: File\n\'{0:s}\'\n\nConnector{1:s} to connector{2:s} don\'t exist when they must to stay in sequence\n', InFile, GapStart, GapEnd))
+
+            # End of if GapStart == GapEnd:
+
+        # End of for GapStart, GapEnd in Gaps:
+
+    # End of if len(PinNos) == 0:
 
     logging.info (' Exiting FzpCheckConnectors\n')
 
@@ -3536,7 +6867,26 @@ def ProcessSvg(FzpType, FileType, InFile, OutFile, CurView, PrefixDir, Errors, W
 
         # End of if not 'fzp' in FzpDict:
 
-        PP.OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Debug)
+        if CheckOnly != 'y':
+
+            PP.OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Debug)
+
+            # Keep the directory index up to date with the files OutputTree 
+            # may have written or renamed (to .bak if OutFile is None).
+
+            if OutFile == None:
+
+                DirIndexUpdate(InFile)
+
+                DirIndexUpdate(InFile + '.bak')
+
+            else:
+
+                DirIndexUpdate(OutFile)
+
+            # End of if OutFile == None:
+
+        # End of if CheckOnly != 'y':
 
     # End of if Doc != None:
 
@@ -3566,7 +6916,9 @@ def RemovePx(InFile, Elem, Info, Level):
 
             Elem.set('font-size', FontSize)
 
-            Info.append('Modified 1: File\n\'{0:s}\'\nAt line {1:s}\n\nRemoved px from font-size leaving {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(FontSize)))
+            Timing.Count('attributes rewritten')
+
+            Info.append(Diag.Diagnostic('Modified 1: File\n\'{0:s}\'\nAt line {1:s}\n\nRemoved px from font-size leaving {2:s}\n', InFile, Elem.sourceline, FontSize))
 
         # End of if pxRegex.search(FontSize) != None:
 
@@ -3655,7 +7007,7 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
             # Issue the warning then mark it as done so it only happens once
             # per file. 
 
-            Warnings.append('Warning 24: File\n\'{0:s}\'\nAt line {1:s}\n\nFont family {2:s} is not Droid Sans or OCRA\nThis won\'t render in Fritzing\n'.format(str(InFile), str(Elem.sourceline), str(FontFamily)))
+            Warnings.append(Diag.Diagnostic('Warning 24: File\n\'{0:s}\'\nAt line {1:s}\n\nFont family {2:s} is not Droid Sans or OCRA\nThis won\'t render in Fritzing\n', InFile, Elem.sourceline, FontFamily))
 
             FzpDict['font.warning'] = 'y'
 
@@ -3679,7 +7031,7 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
             # Note one of the illegal terminalId types is present.
 
-            Errors.append('Error 77: File\n\'{0:s}\'\nAt line {1:s}\n\nterminalId {2:s} can\'t be a {3:s} as it won\'t work.\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(Tag)))
+            Errors.append(Diag.Diagnostic('Error 77: File\n\'{0:s}\'\nAt line {1:s}\n\nterminalId {2:s} can\'t be a {3:s} as it won\'t work.\n', InFile, Elem.sourceline, Id, Tag))
 
         # End of if Tag in ['path']: 
 
@@ -3700,14 +7052,16 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                 Elem.set('height', '10')
 
+                Timing.Count('attributes rewritten')
+
                 # and log an error to warn the user we made a change that will 
                 # affect the svg terminal position so they check it. 
 
-                Error.append('Modified 2: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} had a zero height, set to 10\nCheck the alignment of this pin in the svg!\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Errors.append(Diag.Diagnostic('Modified 2: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} had a zero height, set to 10\nCheck the alignment of this pin in the svg!\n', InFile, Elem.sourceline, Id))
 
             else :
 
-                Warnings.append('Warning 16: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has a zero height\nand thus is not selectable in Inkscape\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Warnings.append(Diag.Diagnostic('Warning 16: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has a zero height\nand thus is not selectable in Inkscape\n', InFile, Elem.sourceline, Id))
 
             # End of if ModifyTerminal == 'y':
 
@@ -3725,11 +7079,13 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                 Elem.set('width', '10')
 
-                Errors.append('Modified 2: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} had a zero width, set to 10\nCheck the alignment of this pin in the svg!\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Timing.Count('attributes rewritten')
+
+                Errors.append(Diag.Diagnostic('Modified 2: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} had a zero width, set to 10\nCheck the alignment of this pin in the svg!\n', InFile, Elem.sourceline, Id))
 
             else:
 
-                Warnings.append('Warning 16: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has a zero width\nand thus is not selectable in Inkscape\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                Warnings.append(Diag.Diagnostic('Warning 16: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has a zero width\nand thus is not selectable in Inkscape\n', InFile, Elem.sourceline, Id))
 
             # End of if ModifyTerminal == 'y':
 
@@ -3744,42 +7100,46 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
     if Id != None and 'fzp' in FzpDict:
 
         # We are processing an svg from a fzp file so we can do more tests as 
-        # we have connector and subpart data in the dict.
+        # we have connector and subpart data in the model.
+
+        Model = FzpDict['partmodel']
 
         # iconView doesn't have connectors so ignore it. 
 
-        if CurView != None and CurView != 'iconView' and Id in FzpDict['connectors.fzp.' + CurView]:
+        if CurView != None and CurView != 'iconView' and Id in Model.View(CurView).Connectors:
 
-            if not 'connectors.svg.' + CurView in FzpDict:
+            ViewModel = Model.View(CurView)
+
+            if ViewModel.SvgConnectors == None:
         
                 # Doesn't exist yet so create it and add this connector.
         
-                FzpDict['connectors.svg.' + CurView] = [Id]
+                ViewModel.SvgConnectors = {Id: None}
         
-                logging.debug (' ProcessSvgLeafNode: Created connectors.svg.%s and added %s to get %s\n', CurView, Id, FzpDict['connectors.svg.' + CurView])
+                logging.debug (' ProcessSvgLeafNode: Created svg connectors for %s and added %s to get %s\n', CurView, Id, list(ViewModel.SvgConnectors))
         
             else:
         
                 # Check for a dup connector. While Inkscape won't let you 
                 # create one, a text editor or script generated part would ...
         
-                if Id in FzpDict['connectors.svg.' + CurView]:
+                if Id in ViewModel.SvgConnectors:
         
-                    Errors.append('Error 66: File\n{0:s}\nAt line {1:s}\n\nConnector {2:s} is a duplicate (and should be unique)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                    Errors.append(Diag.Diagnostic('Error 66: File\n{0:s}\nAt line {1:s}\n\nConnector {2:s} is a duplicate (and should be unique)\n', InFile, Elem.sourceline, Id))
         
                 else:
         
                     # not a dup, so append it to the list. 
         
-                    FzpDict['connectors.svg.' + CurView].append(Id)
+                    ViewModel.SvgConnectors[Id] = None
         
-                    logging.debug (' ProcessSvgLeafNode: Appended %s to connectors.svg.%s to get %s\n', Id, CurView, FzpDict['connectors.svg.' + CurView])
+                    logging.debug (' ProcessSvgLeafNode: Appended %s to svg connectors for %s to get %s\n', Id, CurView, list(ViewModel.SvgConnectors))
         
-                # End of if Id in FzpDict['connectors.svg.' + CurView]:
+                # End of if Id in ViewModel.SvgConnectors:
 
-            # End of if not 'connectors.svg.' + CurView in FzpDict:
+            # End of if ViewModel.SvgConnectors == None:
 
-            if CurView == 'schematicView' and 'subparts' in FzpDict:
+            if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
                 # Get what should be the subpart tag from the tag stack
 
@@ -3799,7 +7159,7 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                     # no subpartID present at this time error.
 
-                    Errors.append('Error 82: File\n\'{0:s}\'\nAt line {1:s}\n\nconnector {2:s} isn\'t in a subpart\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                    Errors.append(Diag.Diagnostic('Error 82: File\n\'{0:s}\'\nAt line {1:s}\n\nconnector {2:s} isn\'t in a subpart\n', InFile, Elem.sourceline, Id))
 
                     logging.debug (' ProcessSvgLeafNode: subparts connector %s not in subpart\n', Id)
 
@@ -3811,37 +7171,37 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                         if SubPartTag == 'none':
 
-                            Errors.append('Error 82: File\n\'{0:s}\'\nAt line {1:s}\n\nconnector {2:s} isn\'t in a subpart\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                            Errors.append(Diag.Diagnostic('Error 82: File\n\'{0:s}\'\nAt line {1:s}\n\nconnector {2:s} isn\'t in a subpart\n', InFile, Elem.sourceline, Id))
 
                             logging.debug (' ProcessSvgLeafNode: subparts connector %s not in subpart\n', Id)
 
                         else:
 
-                            Errors.append('Error 83: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} shouldn\'t be in subpart {3:s} as it is\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(SubPartTag)))
+                            Errors.append(Diag.Diagnostic('Error 83: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} shouldn\'t be in subpart {3:s} as it is\n', InFile, Elem.sourceline, Id, SubPartTag))
 
                             logging.debug (' ProcessSvgLeafNode: subparts connector %s not in correct subpart\n', Id)
 
                         # End of if SubPartTag == 'none':
 
-                    elif Id in FzpDict[SubPartTag + '.subpart.cons']:
+                    elif Id in Model.Subparts[SubPartTag].Cons:
 
                         # Correct subpart so mark this connector as seen
 
-                        FzpDict[SubPartTag + '.svg.subparts'].append(Id)
+                        Model.Subparts[SubPartTag].SvgCons[Id] = None
 
-                        logging.debug (' ProcessSvgLeafNode: connector %s added to FzpDict[%s]\n', Id, SubPartTag + '.svg.subparts')
+                        logging.debug (' ProcessSvgLeafNode: connector %s added to subpart %s\n', Id, SubPartTag)
 
                     else:
 
-                        Errors.append('Error 84: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} in incorrect subpart {3:s}\n'.format(str(InFile), str(Elem.sourceline), str(Id), str(SubPartTag)))
+                        Errors.append(Diag.Diagnostic('Error 84: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} in incorrect subpart {3:s}\n', InFile, Elem.sourceline, Id, SubPartTag))
 
                         logging.debug (' ProcessSvgLeafNode: subparts connector %s in wrong subpart %s\n', Id, SubPartTag)
 
-                    # End of if Id in FzpDict[SubPartTag + ',subpart.cons']:
+                    # End of if Id in Model.Subparts[SubPartTag].Cons:
 
                 # End of if not 'subpartid' in State and not State['subpartid'] == SubPartTag:
 
-            # End of if CurView == 'schematicView' and 'subparts' in FzpDict:
+            # End of if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
             if CurView == 'pcbView':
 
@@ -3857,17 +7217,17 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                 if RadiusX != None:
 
-                    if not 'hybridsetforpcbView' in State and 'copper0.layerid' in FzpDict and 'copper1.layerid' in FzpDict:
+                    if not 'hybridsetforpcbView' in State and Model.CopperLayer('copper0') != None and Model.CopperLayer('copper1') != None:
 
                         # pcb exists and has copper0 and copper1
 
-                        Errors.append('Error 65: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} is an ellipse not a circle, (gerber generation will break.)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                        Errors.append(Diag.Diagnostic('Error 65: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} is an ellipse not a circle, (gerber generation will break.)\n', InFile, Elem.sourceline, Id))
 
                     else:
 
-                        State['noradius'].append('Error 65: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} is an ellipse not a circle, (gerber generation will break.)\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                        State['noradius'].append(Diag.Diagnostic('Error 65: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} is an ellipse not a circle, (gerber generation will break.)\n', InFile, Elem.sourceline, Id))
 
-                    # End of if not 'hybridsetforpcbView' in State and copper0.layerid' in FzpDict and 'copper1.layerid' in FzpDict:
+                    # End of if not 'hybridsetforpcbView' in State and Model.CopperLayer('copper0') != None and Model.CopperLayer('copper1') != None:
 
                 # End of if RadiusX != None:
 
@@ -3880,11 +7240,11 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
                 if Radius == None:
 
-                    if not 'hybridsetforpcbView' in State and 'copper0.layerid' in FzpDict and 'copper1.layerid' in FzpDict:
+                    if not 'hybridsetforpcbView' in State and Model.CopperLayer('copper0') != None and Model.CopperLayer('copper1') != None:
 
                         # pcb exists and has copper0 and copper1
 
-                        Errors.append('Error 74: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no radius no hole will be generated\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                        Errors.append(Diag.Diagnostic('Error 74: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no radius no hole will be generated\n', InFile, Elem.sourceline, Id))
 
                     else:
         
@@ -3892,35 +7252,35 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
                         # a through hole part yet so save the error message
                         # in State until we do.
             
-                        State['noradius'].append('Error 74: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no radius no hole will be generated\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                        State['noradius'].append(Diag.Diagnostic('Error 74: File\n\'{0:s}\'\nAt line {1:s}\n\nConnector {2:s} has no radius no hole will be generated\n', InFile, Elem.sourceline, Id))
 
-                    # End of if not 'hybridsetforpcbView' in State and copper0.layerid' in FzpDict and 'copper1.layerid' in FzpDict:
+                    # End of if not 'hybridsetforpcbView' in State and Model.CopperLayer('copper0') != None and Model.CopperLayer('copper1') != None:
 
                 # End of if Radius != None:
 
             # End of if CurView == 'pcbView':
 
-        # End of if Id in FzpDict['connectors.fzp' + CurView]:
+        # End of if CurView != None and CurView != 'iconView' and Id in Model.View(CurView).Connectors:
 
-        if CurView == 'schematicView' and 'subparts' in FzpDict:
+        if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
             # We are in schematic and it has subparts so check they are 
             # correct.
 
-            if Id in FzpDict['subparts']:
+            if Id in Model.Subparts:
 
                 logging.debug (' ProcessSvgLeafNode: Start of  subpart Id %s\n', Id)
 
                 # Mark that we have seen a subpart label with (so far) no 
                 # connectors
 
-                if Id + '.svg.subparts' in FzpDict:
+                if Model.Subparts[Id].SvgCons != None:
 
                     # Complain about a dup (although this shouldn't be able 
                     # to occur except via manual editing). 
 
                     logging.debug (' ProcessSvgLeafNode: subparts Id %s duplicate\n', Id)
-                    Errors.append('Error 85: File\n\'{0:s}\'\nAt line {1:s}\n\nsubpart label {2:s} is already defined\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                    Errors.append(Diag.Diagnostic('Error 85: File\n\'{0:s}\'\nAt line {1:s}\n\nsubpart label {2:s} is already defined\n', InFile, Elem.sourceline, Id))
 
                 else:
 
@@ -3928,20 +7288,20 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
                     # for this label for later checking (to make sure they are
                     # all present). 
 
-                    FzpDict[Id + '.svg.subparts'] = []
+                    Model.Subparts[Id].SvgCons = {}
 
                     # Then record this subpartid in State for later connector
                     # ids. 
 
                     State['subpartid'] = Id
 
-                    logging.debug (' ProcessSvgLeafNode: Create FzpDict[%s] and set state[\'subpartid\'] to %s\n', Id + '.svg.subparts', Id)
+                    logging.debug (' ProcessSvgLeafNode: Create svg connectors for subpart %s and set state[\'subpartid\']\n', Id)
 
-                # End of if Id + '.subparts' in FzpDict:
+                # End of if Model.Subparts[Id].SvgCons != None:
 
-            # End of if Id in FzpDict['subparts']:
+            # End of if Id in Model.Subparts:
 
-        # End of if CurView == 'schematicView' and 'subparts' in FzpDict:
+        # End of if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
     # End of if Id != None and 'fzp' in FzpDict:
 
@@ -3978,16 +7338,20 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
             Elem.set('stroke', '#000000')
 
+            Timing.Count('attributes rewritten')
+
             # Change any non black color to black. 
 
-            Info.append('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen, converted stoke from white to black\n'.format(str(InFile), str(Elem.sourceline)))
+            Info.append(Diag.Diagnostic('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen, converted stoke from white to black\n', InFile, Elem.sourceline))
 
         elif not (Stroke == None or Stroke == 'none' or Stroke in ColorIsBlack):
 
-            Info.append('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen stroke color {2:s} isn\'t white or black. Set to black.\n'.format(str(InFile), str(Elem.sourceline), str(Stroke)))
+            Info.append(Diag.Diagnostic('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen stroke color {2:s} isn\'t white or black. Set to black.\n', InFile, Elem.sourceline, Stroke))
 
             Elem.set('stroke', '#000000')
 
+            Timing.Count('attributes rewritten')
+
         # End of if Stroke in ColorIsWhite:
 
         Fill = Elem.get('fill')
@@ -3996,19 +7360,23 @@ def ProcessSvgLeafNode(FzpType, FileType, InFile, CurView, PrefixDir, Elem, Erro
 
             # If the color is currently white or not black set it to black.
 
-            Info.append('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen, converted fill from white to black\n'.format(str(InFile), str(Elem.sourceline)))
+            Info.append(Diag.Diagnostic('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen, converted fill from white to black\n', InFile, Elem.sourceline))
 
             Elem.set('fill', '#000000')
 
+            Timing.Count('attributes rewritten')
+
         elif not (Fill == None or Fill == 'none' or Fill in ColorIsBlack):
 
             # If the current color is neither white nor black (but not none),
             # tell the user so but otherwise ignore it.
 
-            Info.append('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen fill color {2:s} isn\'t white or black. Set to black.\n'.format(str(InFile), str(Elem.sourceline), str(Fill)))
+            Info.append(Diag.Diagnostic('Modified 3: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen fill color {2:s} isn\'t white or black. Set to black.\n', InFile, Elem.sourceline, Fill))
 
             Elem.set('fill', '#000000')
 
+            Timing.Count('attributes rewritten')
+
         # end of if Fill in ColorIsWhite:
 
     # End of if State['lastvalue'] == 'silkscreen':
@@ -4031,7 +7399,7 @@ def SvgStartElem(InFile, Elem, Errors, Warnings, Info, State, Level):
     
         if 'SvgStart' in State:
 
-            Warnings.append('Warning 17: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one svg tag found\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 17: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one svg tag found\n', InFile, Elem.sourceline))
     
         # End of if 'SvgStart' in State:
 
@@ -4049,7 +7417,7 @@ def SvgStartElem(InFile, Elem, Errors, Warnings, Info, State, Level):
 
         if Height == None:
 
-            Warnings.append('Warning 18: File\n\'{0:s}\'\nAt line {1:s}\n\nHeight attribute missing\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 18: File\n\'{0:s}\'\nAt line {1:s}\n\nHeight attribute missing\n', InFile, Elem.sourceline))
 
         else:
 
@@ -4059,7 +7427,7 @@ def SvgStartElem(InFile, Elem, Errors, Warnings, Info, State, Level):
 
             if Units != None:
 
-                Warnings.append('Warning 19: File\n\'{0:s}\'\nAt line {1:s}\n\nHeight {2:s} is defined in px\nin or mm is a better option (px can cause scaling problems!)\n'.format(str(InFile), str(Elem.sourceline), str(Height)))
+                Warnings.append(Diag.Diagnostic('Warning 19: File\n\'{0:s}\'\nAt line {1:s}\n\nHeight {2:s} is defined in px\nin or mm is a better option (px can cause scaling problems!)\n', InFile, Elem.sourceline, Height))
 
             # End of if Height != None:
 
@@ -4067,7 +7435,7 @@ def SvgStartElem(InFile, Elem, Errors, Warnings, Info, State, Level):
 
         if Width == None:
 
-            Warnings.append('Warning 18: File\n\'{0:s}\'\nAt line {1:s}\n\nWidth attribute missing\n'.format(str(InFile), str(Elem.sourceline)))
+            Warnings.append(Diag.Diagnostic('Warning 18: File\n\'{0:s}\'\nAt line {1:s}\n\nWidth attribute missing\n', InFile, Elem.sourceline))
 
         else:
 
@@ -4077,7 +7445,7 @@ def SvgStartElem(InFile, Elem, Errors, Warnings, Info, State, Level):
 
             if Units != None:
 
-                Warnings.append('Warning 19: File\n\'{0:s}\'\nAt line {1:s}\n\nWidth {2:s} is defined in px\nin or mm is a better option (px can cause scaling problems!)\n'.format(str(InFile), str(Elem.sourceline), str(Width)))
+                Warnings.append(Diag.Diagnostic('Warning 19: File\n\'{0:s}\'\nAt line {1:s}\n\nWidth {2:s} is defined in px\nin or mm is a better option (px can cause scaling problems!)\n', InFile, Elem.sourceline, Width))
 
             # End of if Units != "":
 
@@ -4087,7 +7455,7 @@ def SvgStartElem(InFile, Elem, Errors, Warnings, Info, State, Level):
     
         if not 'SvgStart' in State:
 
-            Errors.append('Error 67: File\n\'{0:s}\'\nAt line {1:s}\n\nFirst Tag {2:s} isn\'t an svg definition\n\n'.format(str(InFile), str(Elem.sourceline), str(Tag)))
+            Errors.append(Diag.Diagnostic('Error 67: File\n\'{0:s}\'\nAt line {1:s}\n\nFirst Tag {2:s} isn\'t an svg definition\n\n', InFile, Elem.sourceline, Tag))
 
             # then set 'SvgStart' so we don't repeat this warning.
 
@@ -4150,7 +7518,7 @@ def SvgRefFile(FzpType, InFile, Elem, Errors, Warnings, Info, State, Level):
 
         # They don't match, so correct it (and log it).
 
-        Info.append('Modified 4: File\n\'{0:s}\'\nAt line {1:s}\n\nReferenceFile\n\n\'{2:s}\'\n\ndoesn\'t match input file\n\n\'{3:s}\'\n\nCorrected\n'.format(str(InFile), str(Elem.sourceline), str(Elem.text), str(File)))
+        Info.append(Diag.Diagnostic('Modified 4: File\n\'{0:s}\'\nAt line {1:s}\n\nReferenceFile\n\n\'{2:s}\'\n\ndoesn\'t match input file\n\n\'{3:s}\'\n\nCorrected\n', InFile, Elem.sourceline, Elem.text, File))
 
         Elem.text = File
 
@@ -4176,7 +7544,7 @@ def SvgCheckForLayerId(Tag, InFile, CurView, Elem, Errors, Warnings, Info, FzpDi
 
             # If we haven't seen the svg definition flag an error.
 
-            Errors.append('Error 68: File\n\'{0:s}\'\nAt line {1:s}\n\nFound first group but without a svg definition\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 68: File\n\'{0:s}\'\nAt line {1:s}\n\nFound first group but without a svg definition\n', InFile, Elem.sourceline))
 
         # End of if not 'SvgStart' in State:
 
@@ -4192,7 +7560,7 @@ def SvgCheckForLayerId(Tag, InFile, CurView, Elem, Errors, Warnings, Info, FzpDi
 
             # Complain about a drawing element before a layerId
 
-            Errors.append('Error 69: File\n\'{0:s}\'\nAt line {1:s}\n\nFound a drawing element before a layerId (or no layerId)\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 69: File\n\'{0:s}\'\nAt line {1:s}\n\nFound a drawing element before a layerId (or no layerId)\n', InFile, Elem.sourceline))
 
         # End of if 'SvgFirstGroup' in State and not 'LayerId' in State:
                 
@@ -4248,7 +7616,7 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
             # Already seen is an error. 
 
-            Errors.append('Error 70: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one silkscreen layer\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 70: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one silkscreen layer\n', InFile, Elem.sourceline))
 
             logging.debug (' SvgPcbLayers: Already seen silkscreen State %s\n', State)
 
@@ -4265,7 +7633,7 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
             if 'seencopper0' in State or 'seencopper1' in State:
 
-                Warnings.append('Warning 25: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen layer should be above the copper layers for easier selection\nin pcb view\n'.format(str(InFile), str(Elem.sourceline)))
+                Warnings.append(Diag.Diagnostic('Warning 25: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen layer should be above the copper layers for easier selection\nin pcb view\n', InFile, Elem.sourceline))
 
             # End of if 'seencopper0' in State or 'seencopper1' in State:
 
@@ -4275,7 +7643,7 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
             # Not at the top layer is an error. 
 
-            Errors.append('Error 71: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen layer should be at the top, not under group {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(BaseTag)))
+            Errors.append(Diag.Diagnostic('Error 71: File\n\'{0:s}\'\nAt line {1:s}\n\nSilkscreen layer should be at the top, not under group {2:s}\n', InFile, Elem.sourceline, BaseTag))
             
         # End of if len(TagStack) != 2:
 
@@ -4285,7 +7653,7 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
         if 'seencopper1' in State:
 
-            Errors.append('Error 70: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one copper1 layer\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 70: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one copper1 layer\n', InFile, Elem.sourceline))
 
             logging.debug (' SvgPcbLayers: Already seen copper1 State %s\n', State)
 
@@ -4303,7 +7671,7 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
             # Not at the top layer is an error but not fatal. 
 
-            Warnings.append('Warning 20: File\n\'{0:s}\'\nAt line {1:s}\n\ncopper1 layer should be at the top, not under group {2:s}\n'.format(str(InFile), str(Elem.sourceline), str(BaseTag)))
+            Warnings.append(Diag.Diagnostic('Warning 20: File\n\'{0:s}\'\nAt line {1:s}\n\ncopper1 layer should be at the top, not under group {2:s}\n', InFile, Elem.sourceline, BaseTag))
 
         # End of if len(TagStack) != 2:
 
@@ -4313,7 +7681,7 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
         if 'seencopper0' in State:
 
-            Errors.append('Error 70: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one copper0 layer\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 70: File\n\'{0:s}\'\nAt line {1:s}\n\nMore than one copper0 layer\n', InFile, Elem.sourceline))
 
             logging.debug (' SvgPcbLayers: Already seen copper0 State %s\n', State)
 
@@ -4331,13 +7699,13 @@ def SvgPcbLayers(Id, InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, Tag
 
             # Not under copper1 is an error (this is the same level as copper1) 
 
-            Errors.append('Error 72: File\n\'{0:s}\'\nAt line {1:s}\n\ncopper0 should be under copper1 not the same level\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 72: File\n\'{0:s}\'\nAt line {1:s}\n\ncopper0 should be under copper1 not the same level\n', InFile, Elem.sourceline))
 
         elif len(TagStack) > 3:
 
             # too many layers is an error.
 
-            Errors.append('Error 73: File\n\'{0:s}\'\nAt line {1:s}\n\nToo many layers, there should only be copper1 then copper0\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 73: File\n\'{0:s}\'\nAt line {1:s}\n\nToo many layers, there should only be copper1 then copper0\n', InFile, Elem.sourceline))
 
         # End of if len(TagStack) == 3 and 'seencopper1' in State:
 
@@ -4362,7 +7730,7 @@ def SvgCheckPcbLayers(InFile, Errors, Warnings, Info, FzpDict, TagStack, State):
         # This is a through hole part so note that in Info and 
         # copy any no radius error messages to Errors. 
 
-        Info.append('File\n\'{0:s}\'\n\nThis is a through hole part as both copper0 and copper1 views are present.\n'.format(str(InFile)))
+        Info.append(Diag.Diagnostic('File\n\'{0:s}\'\n\nThis is a through hole part as both copper0 and copper1 views are present.\n', InFile))
 
 
         if State['noradius'] != '':
@@ -4383,24 +7751,24 @@ def SvgCheckPcbLayers(InFile, Errors, Warnings, Info, FzpDict, TagStack, State):
 
         # This appears to be a normal SMD part so note that in Info.
 
-        Info.append('File\n\'{0:s}\'\n\nThis is a smd part as only the copper1 view is present.\n'.format(str(InFile)))
+        Info.append(Diag.Diagnostic('File\n\'{0:s}\'\n\nThis is a smd part as only the copper1 view is present.\n', InFile))
 
     elif 'seencopper0' in State:
 
         # This appears to be a SMD part but on the bottom of the board
         # so note that in Errors.
 
-        Errors.append('Error 75: File\n\'{0:s}\'\n\nThis is a smd part as only the copper0 view is present\nbut it is on the bottom layer, not the top.\n\n'.format(str(InFile)))
+        Errors.append(Diag.Diagnostic('Error 75: File\n\'{0:s}\'\n\nThis is a smd part as only the copper0 view is present\nbut it is on the bottom layer, not the top.\n\n', InFile))
 
     elif 'seensilkscreen' in State:
 
         # This appears to be only a silkscreen so note that in Info.
 
-        Info.append('File\n\'{0:s}\'\n\nThis is an only silkscreen part as has no copper layers present.\n'.format(str(InFile)))
+        Info.append(Diag.Diagnostic('File\n\'{0:s}\'\n\nThis is an only silkscreen part as has no copper layers present.\n', InFile))
 
     else:
 
-        Warnings.append('Warning 21: File\n\'{0:s}\'\n\nThis appears to be a pcb svg but has no copper or silkscreen layers!\n'.format(str(InFile)))
+        Warnings.append(Diag.Diagnostic('Warning 21: File\n\'{0:s}\'\n\nThis appears to be a pcb svg but has no copper or silkscreen layers!\n', InFile))
 
     # End of if 'seencopper0' in State and 'seencopper1' in State:
 
@@ -4466,7 +7834,7 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
                     # Nested tspan which fritzing doesn't support so issue a
                     # warning. 
 
-                    Warnings.append('Warning 26: File\n\'{0:s}\'\nAt line {1:s}\n\nApparant nested tspan which fritzing doesn\'t support\nIf your text doesn\'t appear in Fritzing this is probably why\n'.format(str(InFile), str(Elem.sourceline)))
+                    Warnings.append(Diag.Diagnostic('Warning 26: File\n\'{0:s}\'\nAt line {1:s}\n\nApparant nested tspan which fritzing doesn\'t support\nIf your text doesn\'t appear in Fritzing this is probably why\n', InFile, Elem.sourceline))
 
                 # End of if TspanRegex.match(str(State['lastvalue'])):
 
@@ -4477,7 +7845,7 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
 
                 if not Tag == 'g':
 
-                    Warnings.append('Warning 27: File\n\'{0:s}\'\nAt line {1:s}\n\nFritzing layerId {2:s} isn\'t a group which it usually should be\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                    Warnings.append(Diag.Diagnostic('Warning 27: File\n\'{0:s}\'\nAt line {1:s}\n\nFritzing layerId {2:s} isn\'t a group which it usually should be\n', InFile, Elem.sourceline, Id))
 
                 # End of if not Tag == 'g':
 
@@ -4508,7 +7876,7 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
 
                     # Single layerId case, but more than one layerId. 
 
-                    Warnings.append('Warning 22: File\n\'{0:s}\'\nAt line {1:s}\n\nAlready have a layerId\n'.format(str(InFile), str(Elem.sourceline)))
+                    Warnings.append(Diag.Diagnostic('Warning 22: File\n\'{0:s}\'\nAt line {1:s}\n\nAlready have a layerId\n', InFile, Elem.sourceline))
     
                     logging.debug(' SvgGroup: Warning dup layer issued\n')
 
@@ -4527,16 +7895,20 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
         # We are processing svgs from an fzp and have a FzpDict with a list
         # of expected layers.
 
+        Model = FzpDict['partmodel']
+
+        ViewModel = Model.View(CurView)
+
         if CurView != 'pcbView':
 
-            if CurView == 'schematicView' and 'subparts' in FzpDict:
+            if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
                 # We are in a schematic svg that has subparts so check if this
                 # is a subpart id and add it to the tag stack if so. 
 
-                logging.debug(' SvgGroup: CurView %s subparts %s\n', CurView, FzpDict['subparts'])
+                logging.debug(' SvgGroup: CurView %s subparts %s\n', CurView, list(Model.Subparts))
 
-                if Id in FzpDict['subparts']:
+                if Id in Model.Subparts:
 
                     # Check that schematic is the only thing above this on 
                     # the tag stack and issue a warning if that isn't true.
@@ -4545,7 +7917,7 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
 
                         logging.debug(' SvgGroup: TagStack len %s not top level warning issued\n', len(TagStack))
 
-                        Errors.append('Error 86: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart {2:s} isn\'t at the top level when it must be\nFollowing subpart errors may be invalid until this is fixed\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                        Errors.append(Diag.Diagnostic('Error 86: File\n\'{0:s}\'\nAt line {1:s}\n\nSubpart {2:s} isn\'t at the top level when it must be\nFollowing subpart errors may be invalid until this is fixed\n', InFile, Elem.sourceline, Id))
 
                     # End of if len(TagStack) != 2:
 
@@ -4559,15 +7931,15 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
         
                     State['lastvalue'] = Id
 
-                # End of if Id in FzpDict['subparts']:
+                # End of if Id in Model.Subparts:
 
-            # End of if CurView == 'schematicView' and 'subparts' in FzpDict:
+            # End of if CurView == 'schematicView' and len(Model.Subparts) != 0:
 
             # Only one layerid so check for it.
 
-            logging.debug(' SvgGroup: CurView %s LayerId %s\n', CurView, FzpDict[CurView + '.LayerId'])
+            logging.debug(' SvgGroup: CurView %s LayerId %s\n', CurView, ViewModel.FirstLayerId())
 
-            if Id == FzpDict[CurView + '.LayerId']:
+            if Id == ViewModel.FirstLayerId():
 
                 # Push the Id and Level on to the tag stack.
 
@@ -4577,7 +7949,7 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
 
                     # More than one layerid warning. 
 
-                    Warnings.append('Warning 25: File\n\'{0:s}\'\nAt line {1:s}\n\nAlready have a layerId\n'.format(str(InFile), str(Elem.sourceline)))
+                    Warnings.append(Diag.Diagnostic('Warning 25: File\n\'{0:s}\'\nAt line {1:s}\n\nAlready have a layerId\n', InFile, Elem.sourceline))
 
                 else:
     
@@ -4597,11 +7969,11 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
 
                 if not Tag == 'g':
 
-                    Warnings.append('Warning 27: File\n\'{0:s}\'\nAt line {1:s}\n\nFritzing layerId {2:s} isn\'t a group which it usually should be\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                    Warnings.append(Diag.Diagnostic('Warning 27: File\n\'{0:s}\'\nAt line {1:s}\n\nFritzing layerId {2:s} isn\'t a group which it usually should be\n', InFile, Elem.sourceline, Id))
 
                 # End of if not Tag == 'g':
 
-            # End of if Id == FzpDict[CurView + '.LayerId']:
+            # End of if Id == ViewModel.FirstLayerId():
 
         else:
 
@@ -4613,9 +7985,9 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
             # about copper1 under copper0 and error for copper0 and copper1 on
             # the same level. 
 
-            logging.debug(' SvgGroup: %s Curview %s LayerIds %s\n', Id, CurView, FzpDict[CurView + '.LayerId'])
+            logging.debug(' SvgGroup: %s Curview %s LayerIds %s\n', Id, CurView, list(ViewModel.Layers))
     
-            if Id in FzpDict[CurView + '.LayerId']:
+            if Id in ViewModel.Layers:
     
                 # Push the Id and Level on to the tag stack.
 
@@ -4641,11 +8013,11 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
 
                 if not Tag == 'g':
 
-                    Warnings.append('Warning 27: File\n\'{0:s}\'\nAt line {1:s}\n\nFritzing layerId {2:s} isn\'t a group which it usually should be\n'.format(str(InFile), str(Elem.sourceline), str(Id)))
+                    Warnings.append(Diag.Diagnostic('Warning 27: File\n\'{0:s}\'\nAt line {1:s}\n\nFritzing layerId {2:s} isn\'t a group which it usually should be\n', InFile, Elem.sourceline, Id))
 
                 # End of if not Tag == 'g':
     
-            # End of if Id in FzpDict[CurView + '.LayerId']:
+            # End of if Id in ViewModel.Layers:
 
         # End of if CurView == None:
 
@@ -4665,7 +8037,7 @@ def SvgGroup(InFile, CurView, Elem, Errors, Warnings, Info, FzpDict, TagStack, S
             # We have seen both coppers and they doesn't have  
             # identical transforms so set an error. 
 
-            Errors.append('Error 76: File\n\'{0:s}\'\nAt line {1:s}\n\nCopper0 and copper1 have non identical transforms (no transforms is best)\n'.format(str(InFile), str(Elem.sourceline)))
+            Errors.append(Diag.Diagnostic('Error 76: File\n\'{0:s}\'\nAt line {1:s}\n\nCopper0 and copper1 have non identical transforms (no transforms is best)\n', InFile, Elem.sourceline))
 
             logging.debug(' SvgGroup: set copper transform error\n')
 
@@ -4698,6 +8070,8 @@ def SvgInlineStyle(InFile, Elem, Warnings, State):
 
         Elem.attrib.pop("style", None)
 
+        Timing.Count('attributes rewritten')
+
         # Then add the elements back in inline (replacing current values if 
         # present, as style should overide inline values usually). 
 
@@ -4737,6 +8111,8 @@ def SvgInlineStyle(InFile, Elem, Warnings, State):
                 
                     Elem.set(KeyValue[0], KeyValue[1])
 
+                    Timing.Count('attributes rewritten')
+
                 except ValueError:
 
                     # This is typically an atribute like
@@ -4751,7 +8127,7 @@ def SvgInlineStyle(InFile, Elem, Warnings, State):
 
                         # Haven't seen this one yet so log it.
 
-                        Warnings.append('Warning 23: File\n\'{0:s}\'\nAt line {1:s}\n\nKey {2:s}\nvalue {3:s} is invalid and has been deleted\n'.format(str(InFile), str(Elem.sourceline), str(KeyValue[0]),  str(KeyValue[1])))
+                        Warnings.append(Diag.Diagnostic('Warning 23: File\n\'{0:s}\'\nAt line {1:s}\n\nKey {2:s}\nvalue {3:s} is invalid and has been deleted\n', InFile, Elem.sourceline, KeyValue[0], KeyValue[1]))
 
                         # Then add it to State to ignore more of them
 
@@ -4833,7 +8209,7 @@ def SvgSvgSetInheritedAttributes(InFile, Elem, InheritedAttributes):
 
     logging.info (' Entering SvgSetInheritedAttributes\n')
 
-    Info.append('Modified 5: File\n\'{0:s}\'\nAt line {1:s}\n\nConverted style to inline xml\n'.format(str(InFile), str(Elem.sourceline)))
+    Info.append(Diag.Diagnostic('Modified 5: File\n\'{0:s}\'\nAt line {1:s}\n\nConverted style to inline xml\n', InFile, Elem.sourceline))
 
     logging.debug ('SvgSetInheritedAttributes: Elem attributes on entry %s InheritedAttributes %s\n', Elem.attrib, InheritedAttributes)
 
@@ -4852,6 +8228,8 @@ def SvgSvgSetInheritedAttributes(InFile, Elem, InheritedAttributes):
 
             Elem.set(KeyValue[0], KeyValue[1])
 
+            Timing.Count('attributes rewritten')
+
     logging.debug (' SvgSetInheritedAttributes: At end Elem attributes %s\n', Elem.attrib)
 
     logging.info (' Exiting SvgSetInheritedAttributes\n')
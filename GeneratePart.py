@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+
+# Write synthetic Fritzing parts for benchmarking FritzingCheckPart.py. The
+# parts are generated from the options alone (and --seed for the few random
+# choices) so the same command always writes the same files, and are valid
+# (they check with no errors or warnings, only the Info and Modified
+# messages for the inline style conversions). Both layouts are supported,
+# core (dir/core/name.fzp with dir/svg/core/view/name.svg) and part
+# (dir/parts/part.name.fzp with dir/parts/svg.view.name.svg as from an
+# unzipped .fzpz).
+#
+# usage: GeneratePart.py [options] dir
+#
+# --connectors=N[,N...]  connectors per part, a list makes a part of each
+#                        size (default 10)
+# --parts=N              parts of each size (default 1)
+# --layout=core|part|both  (default core)
+# --buses=N              buses (of 2 connectors each) per part (default 0)
+# --subparts=N           schematic subparts per part (default 0)
+# --depth=N              groups each connector is nested in, in the svgs
+#                        (default 0)
+# --style=N              percent of the svg elements that use a css style
+#                        attribute rather than attributes (default 0)
+# --pcb=tht|smd          copper0 and copper1 (through hole) or copper1 only
+#                        (smd) (default tht)
+# --seed=N               random seed for which elements use style (default 1)
+#
+# For example to make the 10, 100, 1000 and 10000 pin benchmark parts:
+#
+# GeneratePart.py --connectors=10,100,1000,10000 --layout=both bench
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os and sys for the files and argv and random for the style choices.
+
+import os, sys, random
+
+# The defaults for the options.
+
+Defaults = {'connectors': '10', 'parts': '1', 'layout': 'core', 'buses': '0', 'subparts': '0', 'depth': '0', 'style': '0', 'pcb': 'tht', 'seed': '1'}
+
+# The svg header used by all the svgs.
+
+SvgHead = '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n<svg xmlns="http://www.w3.org/2000/svg" version="1.1" width="{0:s}in" height="1in" viewBox="0 0 {1:s} 1000">\n'
+
+def ProcessArgs(Argv):
+
+    # Return the options dictionary and the output directory (or print the
+    # usage and exit if the arguments aren't right).
+
+    Options = dict(Defaults)
+
+    Dirs = []
+
+    for Arg in Argv[1:]:
+
+        if Arg.startswith('--') and '=' in Arg and Arg[2:].split('=')[0] in Defaults:
+
+            Options[Arg[2:].split('=')[0]] = Arg.split('=', 1)[1]
+
+        elif not Arg.startswith('--'):
+
+            Dirs.append(Arg)
+
+        else:
+
+            Usage(Argv, 'unknown option \'{0:s}\''.format(Arg))
+
+        # End of if Arg.startswith('--') and '=' in Arg and Arg[2:].split('=')[0] in Defaults:
+
+    # End of for Arg in Argv[1:]:
+
+    if len(Dirs) != 1:
+
+        Usage(Argv, 'one output directory is required')
+
+    # End of if len(Dirs) != 1:
+
+    for Option in ('parts', 'buses', 'subparts', 'depth', 'style', 'seed'):
+
+        if not Options[Option].isdigit():
+
+            Usage(Argv, '--{0:s} value \'{1:s}\' isn\'t a number'.format(Option, Options[Option]))
+
+        # End of if not Options[Option].isdigit():
+
+        Options[Option] = int(Options[Option])
+
+    # End of for Option in ('parts', 'buses', 'subparts', 'depth', 'style', 'seed'):
+
+    Sizes = Options['connectors'].split(',')
+
+    for Size in Sizes:
+
+        if not Size.isdigit() or int(Size) == 0:
+
+            Usage(Argv, '--connectors value \'{0:s}\' isn\'t a number of connectors'.format(Size))
+
+        # End of if not Size.isdigit() or int(Size) == 0:
+
+    # End of for Size in Sizes:
+
+    Options['connectors'] = [int(Size) for Size in Sizes]
+
+    if not Options['layout'] in ('core', 'part', 'both'):
+
+        Usage(Argv, '--layout must be core, part or both')
+
+    # End of if not Options['layout'] in ('core', 'part', 'both'):
+
+    if not Options['pcb'] in ('tht', 'smd'):
+
+        Usage(Argv, '--pcb must be tht or smd')
+
+    # End of if not Options['pcb'] in ('tht', 'smd'):
+
+    return Options, Dirs[0]
+
+# End of def ProcessArgs(Argv):
+
+def Usage(Argv, Message):
+
+    print('Usage: {0:s} [--connectors=N[,N...]] [--parts=N] [--layout=core|part|both] [--buses=N] [--subparts=N] [--depth=N] [--style=N] [--pcb=tht|smd] [--seed=N] dir\n\n{1:s}\n'.format(Argv[0], Message))
+
+    sys.exit(1)
+
+# End of def Usage(Argv, Message):
+
+def Subparts(Connectors, Options):
+
+    # Split the connectors in to the subparts, returning a list of the
+    # connector numbers in each subpart (there are never more subparts than
+    # connectors).
+
+    Count = min(Options['subparts'], Connectors)
+
+    return [list(range(Index * Connectors // Count, (Index + 1) * Connectors // Count)) for Index in range(Count)]
+
+# End of def Subparts(Connectors, Options):
+
+def FzpText(Name, Connectors, Options):
+
+    # The fzp for a part called Name with Connectors connectors.
+
+    Lines = ['<?xml version="1.0" encoding="UTF-8"?>\n', '<module fritzingVersion="0.9.3" moduleId="{0:s}" referenceFile="{0:s}.fzp">\n'.format(Name)]
+
+    Lines.append(' <version>1</version>\n <title>{0:s}</title>\n <label>U</label>\n <author>GeneratePart.py</author>\n <description>A {1:d} connector benchmark part</description>\n'.format(Name, Connectors))
+
+    Lines.append(' <properties>\n  <property name="family">benchmark</property>\n  <property name="pins">{0:d}</property>\n </properties>\n'.format(Connectors))
+
+    if Options['pcb'] == 'tht':
+
+        PcbLayers = '<layer layerId="copper0"/>\n    <layer layerId="silkscreen"/>\n    <layer layerId="copper1"/>'
+
+    else:
+
+        PcbLayers = '<layer layerId="silkscreen"/>\n    <layer layerId="copper1"/>'
+
+    # End of if Options['pcb'] == 'tht':
+
+    Lines.append(' <views>\n')
+
+    for View, LayerId, Layers in (('iconView', 'icon', None), ('breadboardView', 'breadboard', None), ('schematicView', 'schematic', None), ('pcbView', None, PcbLayers)):
+
+        if Layers == None:
+
+            Layers = '<layer layerId="{0:s}"/>'.format(LayerId)
+
+        # End of if Layers == None:
+
+        Lines.append('  <{0:s}>\n   <layers image="{1:s}/{2:s}.svg">\n    {3:s}\n   </layers>\n  </{0:s}>\n'.format(View, View[:-4], Name, Layers))
+
+    # End of for View, LayerId, Layers in ...
+
+    Lines.append(' </views>\n <connectors>\n')
+
+    for Pin in range(Connectors):
+
+        if Options['pcb'] == 'tht':
+
+            Pcb = '<p layer="copper0" svgId="connector{0:d}pad"/>\n     <p layer="copper1" svgId="connector{0:d}pad"/>'.format(Pin)
+
+        else:
+
+            Pcb = '<p layer="copper1" svgId="connector{0:d}pad"/>'.format(Pin)
+
+        # End of if Options['pcb'] == 'tht':
+
+        Lines.append('  <connector id="connector{0:d}" name="pin{0:d}" type="male">\n   <description>pin {0:d}</description>\n   <views>\n    <breadboardView>\n     <p layer="breadboard" svgId="connector{0:d}pin"/>\n    </breadboardView>\n    <schematicView>\n     <p layer="schematic" svgId="connector{0:d}pin" terminalId="connector{0:d}terminal"/>\n    </schematicView>\n    <pcbView>\n     {1:s}\n    </pcbView>\n   </views>\n  </connector>\n'.format(Pin, Pcb))
+
+    # End of for Pin in range(Connectors):
+
+    Lines.append(' </connectors>\n')
+
+    Buses = min(Options['buses'], Connectors // 2)
+
+    if Buses != 0:
+
+        Lines.append(' <buses>\n')
+
+        for Bus in range(Buses):
+
+            Lines.append('  <bus id="bus{0:d}">\n   <nodeMember connectorId="connector{1:d}"/>\n   <nodeMember connectorId="connector{2:d}"/>\n  </bus>\n'.format(Bus, 2 * Bus, 2 * Bus + 1))
+
+        # End of for Bus in range(Buses):
+
+        Lines.append(' </buses>\n')
+
+    # End of if Buses != 0:
+
+    if Options['subparts'] != 0:
+
+        Lines.append(' <schematic-subparts>\n')
+
+        for Index, Pins in enumerate(Subparts(Connectors, Options)):
+
+            Lines.append('  <subpart id="sub{0:d}" label="U{0:d}">\n   <connectors>\n'.format(Index))
+
+            for Pin in Pins:
+
+                Lines.append('    <connector id="connector{0:d}"/>\n'.format(Pin))
+
+            # End of for Pin in Pins:
+
+            Lines.append('   </connectors>\n  </subpart>\n')
+
+        # End of for Index, Pins in enumerate(Subparts(Connectors, Options)):
+
+        Lines.append(' </schematic-subparts>\n')
+
+    # End of if Options['subparts'] != 0:
+
+    Lines.append('</module>\n')
+
+    return ''.join(Lines)
+
+# End of def FzpText(Name, Connectors, Options):
+
+def Paint(Fill, Stroke, Random, Options):
+
+    # The fill and stroke of an element either as attributes or (for
+    # --style percent of them) as a css style attribute.
+
+    if Random.randrange(100) < Options['style']:
+
+        return 'style="fill:{0:s};stroke:{1:s};stroke-width:1"'.format(Fill, Stroke)
+
+    # End of if Random.randrange(100) < Options['style']:
+
+    return 'fill="{0:s}" stroke="{1:s}" stroke-width="1"'.format(Fill, Stroke)
+
+# End of def Paint(Fill, Stroke, Random, Options):
+
+def Nest(Elements, Pin, Options):
+
+    # Nest a connector's elements in --depth groups.
+
+    for Level in range(Options['depth']):
+
+        Elements = '<g id="g{0:d}_{1:d}">{2:s}</g>'.format(Pin, Level, Elements)
+
+    # End of for Level in range(Options['depth']):
+
+    return Elements
+
+# End of def Nest(Elements, Pin, Options):
+
+def SvgText(View, Connectors, Random, Options):
+
+    # The svg for View of a part with Connectors connectors. The connectors
+    # are 100 units (0.1in) apart in a row.
+
+    Width = max(Connectors, 10) * 100
+
+    Lines = [SvgHead.format(str(Width / 1000), str(Width))]
+
+    if View == 'icon':
+
+        Lines.append('<g id="icon">\n<rect x="0" y="0" width="{0:d}" height="1000" {1:s}/>\n</g>\n'.format(Width, Paint('#8c8c8c', 'none', Random, Options)))
+
+    elif View == 'breadboard':
+
+        Lines.append('<g id="breadboard">\n<rect x="0" y="200" width="{0:d}" height="800" {1:s}/>\n'.format(Width, Paint('#1f1f1f', 'none', Random, Options)))
+
+        for Pin in range(Connectors):
+
+            Lines.append(Nest('<rect id="connector{0:d}pin" x="{1:d}" y="0" width="50" height="200" {2:s}/>'.format(Pin, Pin * 100 + 25, Paint('#8c8c8c', 'none', Random, Options)), Pin, Options) + '\n')
+
+        # End of for Pin in range(Connectors):
+
+        Lines.append('<text x="50" y="600" font-size="100" font-family="Droid Sans" fill="#ffffff">U</text>\n</g>\n')
+
+    elif View == 'schematic':
+
+        Lines.append('<g id="schematic">\n')
+
+        for Index, Pins in enumerate(Subparts(Connectors, Options) or [range(Connectors)]):
+
+            if Options['subparts'] != 0:
+
+                Lines.append('<g id="sub{0:d}">\n'.format(Index))
+
+            # End of if Options['subparts'] != 0:
+
+            for Pin in Pins:
+
+                Pin1 = '<line id="connector{0:d}pin" x1="{1:d}" y1="0" x2="{1:d}" y2="300" stroke="#555555" stroke-width="24"/>'.format(Pin, Pin * 100 + 50)
+
+                Terminal = '<rect id="connector{0:d}terminal" x="{1:d}" y="0" width="24" height="24" fill="none" stroke="none"/>'.format(Pin, Pin * 100 + 38)
+
+                Lines.append(Nest(Pin1 + Terminal, Pin, Options) + '\n')
+
+            # End of for Pin in Pins:
+
+            if Options['subparts'] != 0:
+
+                Lines.append('</g>\n')
+
+            # End of if Options['subparts'] != 0:
+
+        # End of for Index, Pins in enumerate(Subparts(Connectors, Options) or [range(Connectors)]):
+
+        Lines.append('<rect x="0" y="300" width="{0:d}" height="700" {1:s}/>\n</g>\n'.format(Width, Paint('none', '#000000', Random, Options)))
+
+    else:
+
+        Lines.append('<g id="silkscreen">\n<rect x="10" y="10" width="{0:d}" height="980" fill="none" stroke="#000000" stroke-width="10"/>\n</g>\n'.format(Width - 20))
+
+        if Options['pcb'] == 'tht':
+
+            Lines.append('<g id="copper1">\n<g id="copper0">\n')
+
+        else:
+
+            Lines.append('<g id="copper1">\n')
+
+        # End of if Options['pcb'] == 'tht':
+
+        for Pin in range(Connectors):
+
+            if Options['pcb'] == 'tht':
+
+                Pad = '<circle id="connector{0:d}pad" cx="{1:d}" cy="500" r="30" {2:s}/>'.format(Pin, Pin * 100 + 50, Paint('none', '#f7bd13', Random, Options))
+
+            else:
+
+                Pad = '<rect id="connector{0:d}pad" x="{1:d}" y="400" width="60" height="200" {2:s}/>'.format(Pin, Pin * 100 + 20, Paint('#f7bd13', 'none', Random, Options))
+
+            # End of if Options['pcb'] == 'tht':
+
+            Lines.append(Nest(Pad, Pin, Options) + '\n')
+
+        # End of for Pin in range(Connectors):
+
+        if Options['pcb'] == 'tht':
+
+            Lines.append('</g>\n</g>\n')
+
+        else:
+
+            Lines.append('</g>\n')
+
+        # End of if Options['pcb'] == 'tht':
+
+    # End of if View == 'icon':
+
+    Lines.append('</svg>\n')
+
+    return ''.join(Lines)
+
+# End of def SvgText(View, Connectors, Random, Options):
+
+def WriteFile(File, Text):
+
+    os.makedirs(os.path.dirname(File), exist_ok=True)
+
+    with open(File, 'w', encoding='utf-8') as f:
+
+        f.write(Text)
+
+    # End of with open(File, 'w', encoding='utf-8') as f:
+
+# End of def WriteFile(File, Text):
+
+def WritePart(Dir, Layout, Name, Connectors, Random, Options):
+
+    # Write the fzp and the 4 svgs of one part in Layout. Returns the files
+    # written.
+
+    if Layout == 'core':
+
+        Files = [os.path.join(Dir, 'core', Name + '.fzp')]
+
+        SvgFiles = [os.path.join(Dir, 'svg', 'core', View, Name + '.svg') for View in ('icon', 'breadboard', 'schematic', 'pcb')]
+
+    else:
+
+        Files = [os.path.join(Dir, 'parts', 'part.' + Name + '.fzp')]
+
+        SvgFiles = [os.path.join(Dir, 'parts', 'svg.' + View + '.' + Name + '.svg') for View in ('icon', 'breadboard', 'schematic', 'pcb')]
+
+    # End of if Layout == 'core':
+
+    WriteFile(Files[0], FzpText(Name, Connectors, Options))
+
+    for View, File in zip(('icon', 'breadboard', 'schematic', 'pcb'), SvgFiles):
+
+        WriteFile(File, SvgText(View, Connectors, Random, Options))
+
+    # End of for View, File in zip(('icon', 'breadboard', 'schematic', 'pcb'), SvgFiles):
+
+    return Files + SvgFiles
+
+# End of def WritePart(Dir, Layout, Name, Connectors, Random, Options):
+
+def GenerateParts(Dir, Options):
+
+    # Write all the parts asked for, returning the number of files written.
+
+    Random = random.Random(Options['seed'])
+
+    if Options['layout'] == 'both':
+
+        Layouts = ['core', 'part']
+
+    else:
+
+        Layouts = [Options['layout']]
+
+    # End of if Options['layout'] == 'both':
+
+    Written = 0
+
+    for Layout in Layouts:
+
+        for Connectors in Options['connectors']:
+
+            for Part in range(Options['parts']):
+
+                Name = 'bench_{0:s}_{1:d}_{2:d}'.format(Layout, Connectors, Part)
+
+                Written += len(WritePart(Dir, Layout, Name, Connectors, Random, Options))
+
+            # End of for Part in range(Options['parts']):
+
+        # End of for Connectors in Options['connectors']:
+
+    # End of for Layout in Layouts:
+
+    return Written
+
+# End of def GenerateParts(Dir, Options):
+
+if __name__ == '__main__':
+
+    Options, Dir = ProcessArgs(sys.argv)
+
+    print('Wrote {0:d} files to {1:s}'.format(GenerateParts(Dir, Options), Dir))
+
+# End of if __name__ == '__main__':
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+
+# The support routines for the dependency index used by the --index option.
+# The index is a json file that records, for each file of a directory (or
+# library) check, its fingerprint, the svgs it references (by view) and
+# whether it had errors, along with the fingerprint of every svg referenced.
+# The next run with the same index only checks the files that have changed
+# and the fzps that reference a changed svg, and --who-uses answers which
+# fzps use an svg from the index without reading any fzp. The paths in the
+# index are relative to the directory that was checked (the Root) so the
+# index doesn't depend on the current directory.
+#
+# The index is
+#
+# {"version": Version, "config": [the settings the results depend on],
+#  "root": absolute path of the directory checked,
+#  "files": {file: {"fingerprint": fingerprint, "svgs": [[view, svg], ...],
+#                   "errors": "y" or "n"}},
+#  "svgs": {svg: fingerprint or null if it doesn't exist}}
+#
+# where a fingerprint is [size, mtime in ns, sha256 of the contents].
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os for the files and stat, hashlib for the fingerprints, json for
+# the index format and logging to get logging support.
+
+import os, hashlib, json, logging
+
+# The Diagnostic records for the Error messages.
+
+import DiagnosticTools as Diag
+
+def NewIndex(Root, Config):
+
+    # An empty index for the directory Root checked with the settings
+    # Config.
+
+    return {'version': Version, 'config': Config, 'root': os.path.abspath(Root), 'files': {}, 'svgs': {}}
+
+# End of def NewIndex(Root, Config):
+
+def LoadIndex(IndexFile, Root, Config):
+
+    # Read the index in IndexFile. If there isn't one (or it can't be read,
+    # or is for a different directory, version or settings) return an empty
+    # index so everything is checked.
+
+    logging.info (' Entering LoadIndex IndexFile %s\n', IndexFile)
+
+    try:
+
+        with open(IndexFile, 'r', encoding='utf-8') as f:
+
+            Index = json.load(f)
+
+    except (OSError, ValueError):
+
+        logging.info (' Exiting LoadIndex with a new index\n')
+
+        return NewIndex(Root, Config)
+
+    # End of try:
+
+    if type(Index) != dict or Index.get('version') != Version or Index.get('config') != Config or Index.get('root') != os.path.abspath(Root):
+
+        logging.info (' Exiting LoadIndex with a new index as the old one doesn\'t match\n')
+
+        return NewIndex(Root, Config)
+
+    # End of if type(Index) != dict or Index.get('version') != Version ...
+
+    logging.info (' Exiting LoadIndex\n')
+
+    return Index
+
+# End of def LoadIndex(IndexFile, Root, Config):
+
+def ReadIndex(IndexFile, Errors):
+
+    # Read the index in IndexFile for a query (whatever it was built with),
+    # or return None with an error if it can't be read.
+
+    logging.info (' Entering ReadIndex IndexFile %s\n', IndexFile)
+
+    try:
+
+        with open(IndexFile, 'r', encoding='utf-8') as f:
+
+            Index = json.load(f)
+
+    except OSError as e:
+
+        Errors.append(Diag.Diagnostic('Error 2: Can not open {0:s} {1:s} ({2:s})\n', str(e.filename), e.strerror, str(e.errno)))
+
+        logging.info (' Exiting ReadIndex on open error\n')
+
+        return None
+
+    except ValueError:
+
+        Errors.append(Diag.Diagnostic('Error 89: Index file\n\'{0:s}\'\n\nisn\'t an index from --index\n', IndexFile))
+
+        logging.info (' Exiting ReadIndex on bad index\n')
+
+        return None
+
+    # End of try:
+
+    if type(Index) != dict or not 'files' in Index or not 'root' in Index:
+
+        Errors.append(Diag.Diagnostic('Error 89: Index file\n\'{0:s}\'\n\nisn\'t an index from --index\n', IndexFile))
+
+        logging.info (' Exiting ReadIndex on bad index\n')
+
+        return None
+
+    # End of if type(Index) != dict or not 'files' in Index or not 'root' in Index:
+
+    logging.info (' Exiting ReadIndex\n')
+
+    return Index
+
+# End of def ReadIndex(IndexFile, Errors):
+
+def SaveIndex(IndexFile, Index, Errors):
+
+    # Write the index to a temporary file and rename it in to place so an
+    # interrupted run leaves the old index rather than a partial one.
+
+    logging.info (' Entering SaveIndex IndexFile %s\n', IndexFile)
+
+    TmpFile = IndexFile + '.' + str(os.getpid()) + '.tmp'
+
+    try:
+
+        with open(TmpFile, 'w', encoding='utf-8') as f:
+
+            json.dump(Index, f, indent=0, sort_keys=True)
+
+        os.replace(TmpFile, IndexFile)
+
+    except OSError as e:
+
+        Errors.append(Diag.Diagnostic('Error 2: Can not open {0:s} {1:s} ({2:s})\n', str(e.filename), e.strerror, str(e.errno)))
+
+    # End of try:
+
+    logging.info (' Exiting SaveIndex\n')
+
+# End of def SaveIndex(IndexFile, Index, Errors):
+
+def IndexPath(Root, File):
+
+    # The name of File (as the checking code names it) in the index,
+    # relative to Root.
+
+    return os.path.relpath(os.path.normpath(File), Root)
+
+# End of def IndexPath(Root, File):
+
+def Fingerprint(File, Old=None):
+
+    # Return the fingerprint of File (None if it doesn't exist). If the size
+    # and mtime are the same as the Old fingerprint the file isn't read
+    # again, so an unchanged library costs one stat per file.
+
+    try:
+
+        Stat = os.stat(File)
+
+    except OSError:
+
+        return None
+
+    # End of try:
+
+    if Old != None and Old[0] == Stat.st_size and Old[1] == Stat.st_mtime_ns:
+
+        return Old
+
+    # End of if Old != None and Old[0] == Stat.st_size and Old[1] == Stat.st_mtime_ns:
+
+    Hash = hashlib.sha256()
+
+    try:
+
+        with open(File, 'rb') as f:
+
+            for Block in iter(lambda: f.read(1024 * 1024), b''):
+
+                Hash.update(Block)
+
+            # End of for Block in iter(lambda: f.read(1024 * 1024), b''):
+
+    except OSError:
+
+        return None
+
+    # End of try:
+
+    return [Stat.st_size, Stat.st_mtime_ns, Hash.hexdigest()]
+
+# End of def Fingerprint(File, Old=None):
+
+def Changed(Old, New):
+
+    # True if a file has changed between fingerprints Old and New (only
+    # the contents count, so touching a file doesn't cause a check).
+
+    if Old == None or New == None:
+
+        return Old != New
+
+    # End of if Old == None or New == None:
+
+    return Old[2] != New[2]
+
+# End of def Changed(Old, New):
+
+def WhoUses(Index, Svg):
+
+    # Return the (sorted) files in the index that reference the svg Svg,
+    # which may be given relative to the index root or as a path to the
+    # file from the current directory, and the view they use it in as
+    # [file, view] pairs.
+
+    logging.info (' Entering WhoUses Svg %s\n', Svg)
+
+    if os.path.exists(Svg):
+
+        Svg = IndexPath(Index['root'], os.path.abspath(Svg))
+
+    else:
+
+        Svg = os.path.normpath(Svg)
+
+    # End of if os.path.exists(Svg):
+
+    Users = []
+
+    for File in Index['files']:
+
+        for View, SvgFile in Index['files'][File]['svgs']:
+
+            if SvgFile == Svg:
+
+                Users.append([File, View])
+
+            # End of if SvgFile == Svg:
+
+        # End of for View, SvgFile in Index['files'][File]['svgs']:
+
+    # End of for File in Index['files']:
+
+    logging.info (' Exiting WhoUses\n')
+
+    return sorted(Users)
+
+# End of def WhoUses(Index, Svg):
+
+class IndexReporter(object):
+
+    # A reporter (see ReportTools) that notes which files had (unsuppressed)
+    # errors for the index.
+
+    def __init__(self):
+
+        self.Errors = {}
+
+    # End of def __init__(self):
+
+    def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+        if len(Diag.Visible(Errors)) != 0:
+
+            self.Errors[os.path.normpath(InFile)] = 'y'
+
+        else:
+
+            self.Errors[os.path.normpath(InFile)] = 'n'
+
+        # End of if len(Diag.Visible(Errors)) != 0:
+
+    # End of def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+    def Close(self):
+
+        pass
+
+    # End of def Close(self):
+
+# End of class IndexReporter(object):
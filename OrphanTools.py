@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+# The support routines for the --orphans report. ProcessSvgsFromFzp only
+# reports the missing svgs (Error 20) of one fzp at a time and nothing
+# reports the svg files that no fzp uses any more. Here the svgs that every
+# fzp references (from FritzingTools.SvgFilesFromFzp) are compared with one
+# walk of the svg directories, using a set of the file names and a
+# dictionary of the case folded names, so the orphan svgs, the dangling
+# references and the case mismatches of a whole library are found in one
+# run.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os for the directory walk and logging to get logging support.
+
+import os, logging
+
+# The Diagnostic records for the Error and Warning messages.
+
+import DiagnosticTools as Diag
+
+def SvgTree(SvgDirs, Files):
+
+    # Walk each of the SvgDirs (once each, in name order) and return a
+    # dictionary of the (normalized) names of the .svg files found in them
+    # and in Files (the svg files already listed for the work list) to
+    # the case folded name.
+
+    logging.info (' Entering SvgTree SvgDirs %s\n', SvgDirs)
+
+    Svgs = {}
+
+    for SvgDir in SvgDirs:
+
+        for Dir, SubDirs, DirFiles in os.walk(SvgDir):
+
+            SubDirs.sort()
+
+            for File in sorted(DirFiles):
+
+                if File.lower().endswith('.svg'):
+
+                    Svg = os.path.normpath(os.path.join(Dir, File))
+
+                    Svgs[Svg] = Svg.casefold()
+
+                # End of if File.lower().endswith('.svg'):
+
+            # End of for File in sorted(DirFiles):
+
+        # End of for Dir, SubDirs, DirFiles in os.walk(SvgDir):
+
+    # End of for SvgDir in SvgDirs:
+
+    for File in Files:
+
+        Svg = os.path.normpath(File)
+
+        Svgs[Svg] = Svg.casefold()
+
+    # End of for File in Files:
+
+    logging.info (' Exiting SvgTree\n')
+
+    return Svgs
+
+# End of def SvgTree(SvgDirs, Files):
+
+def FindOrphans(References, Svgs):
+
+    # References is a list of [fzp file, svg file] in work list order and
+    # Svgs is from SvgTree. Returns a dictionary of file name to its
+    # messages: for an fzp, each svg it references that doesn't exist
+    # (Error 20) or only exists with a different case (Error 21), and for an
+    # svg that no fzp references (in any case) Warning 33, along with the
+    # number of each found.
+
+    logging.info (' Entering FindOrphans References %s Svgs %s\n', len(References), len(Svgs))
+
+    Folded = {}
+
+    for Svg in Svgs:
+
+        Folded.setdefault(Svgs[Svg], []).append(Svg)
+
+    # End of for Svg in Svgs:
+
+    Messages = {}
+
+    Used = set()
+
+    Counts = {'dangling': 0, 'case': 0, 'orphan': 0}
+
+    for FzpFile, SvgFile in References:
+
+        Svg = os.path.normpath(SvgFile)
+
+        if Svg in Svgs:
+
+            Used.add(Svgs[Svg])
+
+        elif Svg.casefold() in Folded:
+
+            Used.add(Svg.casefold())
+
+            Counts['case'] += 1
+
+            Messages.setdefault(FzpFile, []).append(Diag.Diagnostic('Error 21: Svg file\n\n\'{0:s}\'\n\nHas a different case in the file system than in the fzp file\n\n\'{1:s}\'\n', Svg, FzpFile))
+
+        else:
+
+            Counts['dangling'] += 1
+
+            Messages.setdefault(FzpFile, []).append(Diag.Diagnostic('Error 20: File\n\'{0:s}\'\n\nDuring processing svgs from fzp, svg file doesn\'t exist\n', Svg))
+
+        # End of if Svg in Svgs:
+
+    # End of for FzpFile, SvgFile in References:
+
+    for Svg in Svgs:
+
+        if not Svgs[Svg] in Used:
+
+            Counts['orphan'] += 1
+
+            Messages.setdefault(Svg, []).append(Diag.Diagnostic('Warning 33: File\n\'{0:s}\'\n\nSvg file isn\'t used by any fzp file\n', Svg))
+
+        # End of if not Svgs[Svg] in Used:
+
+    # End of for Svg in Svgs:
+
+    logging.info (' Exiting FindOrphans\n')
+
+    return Messages, Counts
+
+# End of def FindOrphans(References, Svgs):
@@ -16,19 +16,58 @@ Version = '0.0.2'  # Version number of this file.
 
 import os, sys, re, logging 
 
+# locale to find the encoding text mode files are written in.
+
+import locale
+
 # This library lets me write the lxml output to a string (which apparantly
 # can't be done from lxml) to pretty print it further than lxml does.
 
 from io import BytesIO
 
+# The Diagnostic records for the Error, Warning and Info messages.
+
+import DiagnosticTools as Diag
+
 # and the lxml library for the xml parsing.
 
 from lxml import etree
 
+# The members of the .fzpz archive being checked (see 
+# FritzingTools.ProcessFzpz) indexed by the name the checks use for them 
+# (the archive's name joined with the member's name) and the pretty printed
+# output for them, or None when the files are on disk. ParseFile reads the
+# members from MemoryFiles and OutputTree writes in to MemoryOutput rather 
+# than renaming and writing files. 
+
+MemoryFiles = None
+
+MemoryOutput = None
+
 # Try and supress debug messages from PP which is debugged already. 
 
 logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
 
+# The regexes used by Splitter and PrettyPrintElements on every line of 
+# every svg, compiled once here rather than on every call. 
+
+# A regex to match comments (to put a blank after them in Splitter).
+
+CommentRegex = re.compile(r'(<!--.+?-->)')
+
+# A regex to match quoted strings, text, tspan, comments and referenceFile
+# (all of which contain blanks that Splitter must not split on).
+
+NoSplitRegex = re.compile(r'".+?"|>.+?<\/text>|>.+?<\/tspan>|<!--.+?-->|referenceFile\s*>.+?</\s*referenceFile')
+
+# A regex to match and save the leading whitespace
+
+LeadingWhiteSpaceRegex = re.compile(r'^(\s*)')
+
+# A regex to match the most common end tag.
+
+EndTagRegex = re.compile(r'\/>$')
+
 # Define a XML pretty printer function because the system supplied one doesn't
 # pretty print the svg stuff correctly and this does (at least so far).
 # Obtained from:
@@ -82,28 +121,19 @@ def Splitter(S, Debug):
     def Replacer(M):
         return M.group(0).replace(" ", "\x00")
 
-    # Replace the text string '>.+?<\/text>' by ' >.+?<\/text>' so the the 
-    # text will be split on to a new line (even if there wasn't a space 
-    # there before, which in ours is usually the case, it is on a line with 
-    # a grom. 
+    # Substitute a trailing blank for comments so the following element is
+    # correctly indented on a new line. (This used to be preceded by 
+    # substitutions to put a blank in front of text and tspan elements but 
+    # as each started again from S only the comment one ever had an effect,
+    # so only it is done.)
 
-    T = re.sub(r'(>.+?<\/text>)', ' \g<1>', S)
-
-    # Do the same for tspan
-
-    T = re.sub(r'(>.+?<\/tspan>)', ' \g<1>', S)
-
-
-    # Do this with a trailing blank for comments to so the following element
-    # is correctly indented on a new line.
-
-    T = re.sub(r'(<!--.+?-->)', '\g<1> ', S)
+    T = CommentRegex.sub(r'\g<1> ', S)
 
     # Now replace the blanks in quoted strings, text, comments and 
     # referenceFile (all of which contain blanks we need to keep) with \x00 
     # then split the string on blanks. 
 
-    Parts = re.sub(r'".+?"|>.+?<\/text>|>.+?<\/tspan>|<!--.+?-->|referenceFile\s*>.+?</\s*referenceFile', Replacer, T).split()
+    Parts = NoSplitRegex.sub(Replacer, T).split()
 
     # Then substitute the \x00 for blanks again in all the resulting strings. 
 
@@ -123,23 +153,23 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
 
     logging.info (' Entering PrettyPrintElements\n')
 
-    # Since we are processing in a loop, compile our regexes for efficiency. 
-
-    # A regext to match the initial xml def if present
+    XmlPP = ''.join(PrettyPrintLines(XmlIn, Errors, Debug))
 
-    XmlRegex = re.compile(r'^<\?xml')
-
-    # A regex to match and save the leading whitespace
+    logging.info (' Exiting PrettyPrintElements\n')
 
-    LeadingWhiteSpaceRegex = re.compile(r'^(\s*)')
+    return (XmlPP)
 
-    # A regex to match the most common end tag.
+# End of def PrettyPrintElements(XmlIn, Errors, Debug):
 
-    EndTagRegex = re.compile(r'\/>$')
+def PrettyPrintLines(XmlIn, Errors, Debug):
 
-    # Set up the output string initially empty
+    # Does the work for PrettyPrintElements one output line (including its
+    # '\n') at a time, so that OutputTree can write the lines as they are 
+    # produced rather than building the whole output as one string (which 
+    # was done by adding each line to the end of the string, and thus took
+    # time proportional to the square of the file size). 
 
-    XmlPP = ''
+    logging.info (' Entering PrettyPrintLines\n')
 
     # Set that we haven't seen an EndTag in case there isn't one (or more 
     # correctly we can't deal with the end tag present). 
@@ -151,29 +181,27 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
         # if this is the xml definintions line (the first line), pass it 
         # through to the output string unchanged.  
 
-        if (XmlRegex.search(Line)):
+        if Line.startswith('<?xml'):
 
             if Debug > 2:
 
-                logging.debug (' PrettyPrintElements: Pass xml def through\n')
+                logging.debug (' PrettyPrintLines: Pass xml def through\n')
 
             # End of if Debug > 2:
 
-            XmlPP = XmlPP + Line + '\n'
+            yield Line + '\n'
 
         else :
 
             # First get the leading whitespace (if any) and save it 
-            # for later use
+            # for later use, then remove it from the line to leave only the
+            # elements. 
 
-            WhiteSpace = LeadingWhiteSpaceRegex.search(Line)            
+            WhiteSpace = LeadingWhiteSpaceRegex.match(Line)            
 
             LeadingWhiteSpace = WhiteSpace.group(1)
 
-            # Then remove the initial white space from the line to leave
-            # only the elements. 
-
-            Line = LeadingWhiteSpaceRegex.sub('', Line)
+            Line = Line[WhiteSpace.end():]
 
             # Use splitter (again from stackoverflow) to split only 
             # on blanks not inside a quoted string.
@@ -182,7 +210,7 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
 
             if Debug > 2:
 
-                logging.debug (' PrettyPrintElements: Split line\n%s\n', Items)
+                logging.debug (' PrettyPrintLines: Split line\n%s\n', Items)
 
             # End of if Debug > 2:
 
@@ -200,7 +228,7 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
 
                 if Debug > 2:
 
-                    logging.debug (' PrettyPrintElements: Error, blank field in line\n')
+                    logging.debug (' PrettyPrintLines: Error, blank field in line\n')
 
                 # End of if Debug > 2:
 
@@ -209,7 +237,7 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
                 # There is only one element so just copy it to the output 
                 # with out any additional indentation. 
 
-                XmlPP = XmlPP + LeadingWhiteSpace + Items[0] + '\n'
+                yield LeadingWhiteSpace + Items[0] + '\n'
 
             else:
 
@@ -217,11 +245,7 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
                 # thus is the opening tag, so copy it to the output 
                 # without further indentation. 
 
-                XmlPP = XmlPP + LeadingWhiteSpace + Items[0] + '\n'
-
-                # Then remove it from the input. 
-
-                Items.pop(0)
+                yield LeadingWhiteSpace + Items[0] + '\n'
 
                 # Now move to the end of the list to remove the closing
                 # tag if present. Note this ignores end tags of the form 
@@ -244,13 +268,13 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
 
                     # Then remove the end tag from the list element. 
 
-                    Items[len(Items) - 1] = EndTagRegex.sub('', Items[len(Items) - 1])
+                    Items[len(Items) - 1] = Items[len(Items) - 1][:RegexMatch.start()]
 
                 else:
 
                     if Debug > 2:
 
-                        logging.debug (' PrettyPrintElements: regex no match\n%s\n', Items[len(Items) - 1])
+                        logging.debug (' PrettyPrintLines: regex no match\n%s\n', Items[len(Items) - 1])
 
                     # End of if Debug > 2:
             
@@ -258,25 +282,25 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
 
                 if Debug > 2:
 
-                    logging.debug (' PrettyPrintElements: Modified last element\n%s\n', Items[len(Items) - 1])
+                    logging.debug (' PrettyPrintLines: Modified last element\n%s\n', Items[len(Items) - 1])
 
                 # End of if Debug > 2:
 
-                for Item in Items:
+                # Then the rest of the elements (with a 2 space indent),
+                # one to a line. 
 
-                    # Then print the elements (with a 2 space indent),
-                    # one to a line. 
+                for Item in Items[1:]:
 
-                    XmlPP = XmlPP + LeadingWhiteSpace + '  ' + Item + '\n'
+                    yield LeadingWhiteSpace + '  ' + Item + '\n'
 
-                # End of for Item in Items:
+                # End of for Item in Items[1:]:
 
                 # Then, assuming we have an end tag (which we usually
                 #  should) print it without the 2 space indent.
 
                 if EndTag != None:
 
-                    XmlPP = XmlPP + LeadingWhiteSpace + EndTag + '\n'
+                    yield LeadingWhiteSpace + EndTag + '\n'
 
                     # Then clear the EndTag to indicate we have finished
                     # with it,
@@ -287,15 +311,13 @@ def PrettyPrintElements(XmlIn, Errors, Debug):
 
             # End of if len(Items) == 0:
 
-        # end of if (XmlRegex.search(Line)):
+        # end of if Line.startswith('<?xml'):
 
     # End of for Line in XmlIn.split('\n'):
 
-    logging.info (' Exiting PrettyPrintElements\n')
-
-    return (XmlPP)
+    logging.info (' Exiting PrettyPrintLines\n')
 
-# End of def PrettyPrintElements(XmlIn, Errors, Debug):
+# End of def PrettyPrintLines(XmlIn, Errors, Debug):
 
 def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Debug):
 
@@ -334,13 +356,13 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
         logging.debug('  OutputTree doing element level pretty print\n')
 
-        XmlPP = PrettyPrintElements(XmlIn, Errors, Debug)        
+        XmlLines = PrettyPrintLines(XmlIn, Errors, Debug)        
 
     else:
 
         # We aren't detail pretty printing so just copy input to output.
 
-        XmlPP = XmlIn
+        XmlLines = [XmlIn]
 
     # End of if FileType == 'SVG':
 
@@ -367,7 +389,7 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
         # End of if OutFile == None:
 
-        print (XmlPP)
+        print (''.join(XmlLines))
 
     else:
 
@@ -377,6 +399,21 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
         logging.debug('  OutputTree Normal operation OutFile %s Debug %s\n', OutFile, Debug)
 
+        if InMemory(InFile):
+
+            # An archive member, so keep the output (as it would have been
+            # written to the file) for the new archive.
+
+            Encoding = locale.getpreferredencoding(False)
+
+            MemoryOutput[os.path.normpath(OutFile or InFile)] = ''.join(XmlLines).replace('\n', os.linesep).encode(Encoding)
+
+            logging.info (' Exiting OutputTree to memory\n')
+
+            return
+
+        # End of if InMemory(InFile):
+
         if OutFile == None:
 
             # rename the input file to .bak to preserve it, freeing the input
@@ -388,7 +425,7 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
             except os.error as e:
 
-                Errors.append('Error 1: Can not rename {0:s} {1:s} ({2:s})\n'.format(str( e.filename), e.strerror, str(e.errno)))
+                Errors.append(Diag.Diagnostic('Error 1: Can not rename {0:s} {1:s} ({2:s})\n', e.filename, e.strerror, e.errno))
 
                 # Couldn't rename the file, can't proceed so set the error
                 # and return.
@@ -411,15 +448,21 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
         logging.debug('  OutputTree opening OutFile %s\n', OutFile)
 
+        # The file used to be opened in text mode, so to keep the output 
+        # the same write the lines in the encoding (and with the line ends)
+        # text mode would have used. 
+
+        Encoding = locale.getpreferredencoding(False)
+
         try:
 
-            f = open(OutFile, 'w')
+            f = open(OutFile, 'wb')
 
         except os.error as e:
 
             logging.debug('  OutputTree open error %s\n', e.strerror)
 
-            Errors.append('Error 2: Can not open {0:s} {1:s} ({2:s})\n'.format(str( e.filename), e.strerror, str(e.errno)))
+            Errors.append(Diag.Diagnostic('Error 2: Can not open {0:s} {1:s} ({2:s})\n', e.filename, e.strerror, e.errno))
 
         else:
 
@@ -427,15 +470,26 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
                 logging.debug('  OutputTree write\n')
 
-                # and write the xml to it.
+                # and write the xml to it a line at a time as it is pretty
+                # printed.
+
+                for Line in XmlLines:
+
+                    if os.linesep != '\n':
 
-                f.write(XmlPP)
+                        Line = Line.replace('\n', os.linesep)
+
+                    # End of if os.linesep != '\n':
+
+                    f.write(Line.encode(Encoding))
+
+                # End of for Line in XmlLines:
 
             except os.error as e:
 
                 logging.debug('  OutputTree write error %s\n', e.strerror)
 
-                Errors.append('Error 3: Can not write {0:s} {1:s} ({2:s})\n'.format(str( e.filename), e.strerror, str(e.errno)))
+                Errors.append(Diag.Diagnostic('Error 3: Can not write {0:s} {1:s} ({2:s})\n', e.filename, e.strerror, e.errno))
 
             else:
 
@@ -449,13 +503,13 @@ def OutputTree(Doc, Root, FileType, InFile, OutFile, Errors, Warnings, Info, Deb
 
                     logging.debug('  OutputTree close error %s\n', e.strerror)
 
-                    Errors.append('Error 4: Can not close {0:s} {1:s} ({2:s})\n'.format(str( e.filename), e.strerror, str(e.errno)))
+                    Errors.append(Diag.Diagnostic('Error 4: Can not close {0:s} {1:s} ({2:s})\n', e.filename, e.strerror, e.errno))
 
                 # End of try f.close()
 
-            # End of try f.write(XmlPP)
+            # End of try f.write(Line.encode(Encoding))
 
-        # End of try f.open((OutFile, 'w')
+        # End of try f.open((OutFile, 'wb')
 
     # End of if Debug != 0:
 
@@ -480,11 +534,11 @@ def ParseFile (File, Errors):
 
         parser = etree.XMLParser(remove_blank_text=True)
 
-        Doc = etree.parse(File, parser)
+        Doc = etree.parse(InputSource(File), parser, base_url=File)
 
     except IOError:
 
-        Errors.append('Error 5: ParseFile can\'t read file {0:s}\n'.format(str(File)))    
+        Errors.append(Diag.Diagnostic('Error 5: ParseFile can\'t read file {0:s}\n', File))    
 
         logging.info (' Exiting ParseFile on no file error\n')
 
@@ -492,7 +546,7 @@ def ParseFile (File, Errors):
 
     except etree.XMLSyntaxError:
 
-        Errors.append('Error 6: ParseFile error parsing the input xml file {0:s}\n'.format(str(File)))
+        Errors.append(Diag.Diagnostic('Error 6: ParseFile error parsing the input xml file {0:s}\n', File))
 
         logging.debug (' Parse error, parser.error_log %s\n', parser.error_log)
 
@@ -502,7 +556,7 @@ def ParseFile (File, Errors):
 
                 # Extract and log the errors the parser is reporting. 
 
-                Errors.append('{0:s}\n'.format(str(error)))
+                Errors.append(Diag.Diagnostic('{0:s}\n', error))
 
             # End of for error in parser.error_log:
 
@@ -527,10 +581,39 @@ def ParseFile (File, Errors):
 
 # End of def ParseFile (File, Errors):
 
+def InMemory(File):
+
+    # True if File is a member of the archive being checked (rather than a
+    # file on disk).
+
+    return MemoryFiles != None and os.path.normpath(File) in MemoryFiles
+
+# End of def InMemory(File):
+
+def InputSource(File):
+
+    # What to give lxml to read File, the file name itself or (for an 
+    # archive member) a stream of its contents.
+
+    if InMemory(File):
+
+        return BytesIO(MemoryFiles[os.path.normpath(File)])
+
+    # End of if InMemory(File):
+
+    return File
+
+# End of def InputSource(File):
+
 def PrintInfo(Info):
 
     logging.info (' Entering PrintInfo\n')
 
+    # Drop the suppressed messages (without formatting them), the rest are
+    # formatted as they are printed.
+
+    Info = Diag.Visible(Info)
+
     if len(Info) != 0:
 
         for Infodata in Info:
@@ -551,6 +634,10 @@ def PrintWarnings(Warnings):
 
     logging.info (' Entering PrintWarnings\n')
 
+    # Drop the suppressed messages.
+
+    Warnings = Diag.Visible(Warnings)
+
     if len(Warnings) != 0:
 
         for Warning in Warnings:
@@ -571,6 +658,10 @@ def PrintErrors(Errors):
 
     logging.info (' Entering PrintErrors\n')
 
+    # Drop the suppressed messages.
+
+    Errors = Diag.Visible(Errors)
+
     if len(Errors) != 0:
 
         # First print a line to space the error messages.
@@ -605,7 +696,7 @@ def ProcessArgs (Argv, Errors):
 
         # No input file so print a usage message and exit.
 
-        Errors.append('Usage 7: {0:s} filename (filename ...)\n'.format(str(sys.argv[0])))
+        Errors.append(Diag.Diagnostic('Usage 7: {0:s} filename (filename ...)\n', sys.argv[0]))
 
         return(InFile)
 
@@ -621,7 +712,7 @@ def ProcessArgs (Argv, Errors):
 
                 # Input file isn't valid, note that, ignore it and proceed. 
 
-                Errors.append('Error 8: {0:s} isn\'t a file: ignored\n'.format(str(File)))
+                Errors.append(Diag.Diagnostic('Error 8: {0:s} isn\'t a file: ignored\n', File))
 
             else:
 
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+
+# The part model built from a Fritzing fzp file. The fzp checks in
+# FritzingTools.py fill it in as the fzp is read and the svg checks then use
+# it to check the svgs the fzp references. Each class uses __slots__ (there is
+# one Connector per pin and big parts have hundreds of them) and the model
+# keeps its connectors, views, buses and subparts in dictionaries indexed by
+# id so nothing needs a key built out of strings to find it. Lists that are
+# searched once per svg element (the connectors of a view and of a subpart)
+# are dictionaries used as ordered sets (the values are all None) so the
+# search doesn't depend on the number of connectors but messages still come
+# out in the order of the fzp and svg. It only holds data from the fzp (and
+# what the svg checks have found of it) so it can be handed to another tool
+# after a check.
+
+Version = '0.0.1'  # Version number of this file.
+
+class Connector(object):
+
+    # A connector from the connectors section of the fzp.
+
+    __slots__ = ('Id', 'Name', 'Type', 'Bus', 'Subpart', 'Layers', 'SchematicPins')
+
+    def __init__(self, Id):
+
+        self.Id = Id
+
+        self.Name = None
+
+        self.Type = None
+
+        # The id of the bus or subpart this connector is a member of (None
+        # if it isn't in one yet).
+
+        self.Bus = None
+
+        self.Subpart = None
+
+        # The copper layers (copper0 and/or copper1) this connector has been
+        # defined on in pcbView (each may only be used once).
+
+        self.Layers = set()
+
+        # The svg ids of this connector's schematicView pins (None until one
+        # has been seen) which become the subpart's connectors if this
+        # connector is in a subpart.
+
+        self.SchematicPins = None
+
+    # End of def __init__(self, Id):
+
+    def __repr__(self):
+
+        return 'Connector({0:s})'.format(str(self.Id))
+
+    # End of def __repr__(self):
+
+# End of class Connector(object):
+
+class Layer(object):
+
+    # A layerId from the views section of the fzp.
+
+    __slots__ = ('LayerId', 'LineNo')
+
+    def __init__(self, LayerId, LineNo):
+
+        self.LayerId = LayerId
+
+        # The source line of the layer in the fzp for messages.
+
+        self.LineNo = LineNo
+
+    # End of def __init__(self, LayerId, LineNo):
+
+    def __repr__(self):
+
+        return 'Layer({0:s})'.format(str(self.LayerId))
+
+    # End of def __repr__(self):
+
+# End of class Layer(object):
+
+class View(object):
+
+    # A view (iconView, breadboardView, schematicView or pcbView, but views
+    # with typos in their names get one too) and what the fzp says should
+    # be in its svg.
+
+    __slots__ = ('Name', 'Images', 'Layers', 'ConnectorLayers', 'Connectors', 'ConnectorKeys', 'SvgConnectors')
+
+    def __init__(self, Name):
+
+        self.Name = Name
+
+        # The image (svg) file names, more than one is an error.
+
+        self.Images = []
+
+        # The Layer for each layerId in the view indexed by layerId. Only
+        # pcbView may have more than one.
+
+        self.Layers = {}
+
+        # The layers the connectors of this view are on.
+
+        self.ConnectorLayers = []
+
+        # The svg ids the connectors use in this view (to be found in the
+        # svg, an ordered set) and the (svg id, layer) pairs already seen to
+        # catch dups.
+
+        self.Connectors = {}
+
+        self.ConnectorKeys = set()
+
+        # The connector ids found in the svg (an ordered set, None until the
+        # first one).
+
+        self.SvgConnectors = None
+
+    # End of def __init__(self, Name):
+
+    def FirstLayerId(self):
+
+        # The (only) layerId of a view other than pcbView or None if there
+        # isn't one.
+
+        for LayerId in self.Layers:
+
+            return LayerId
+
+        # End of for LayerId in self.Layers:
+
+        return None
+
+    # End of def FirstLayerId(self):
+
+    def LayerIdText(self):
+
+        # The layerId(s) of this view formatted for messages, the single
+        # layerId or for pcbView the list of them.
+
+        if self.Name == 'pcbView':
+
+            return str(list(self.Layers))
+
+        # End of if self.Name == 'pcbView':
+
+        return str(self.FirstLayerId())
+
+    # End of def LayerIdText(self):
+
+    def __repr__(self):
+
+        return 'View({0:s})'.format(str(self.Name))
+
+    # End of def __repr__(self):
+
+# End of class View(object):
+
+class Bus(object):
+
+    # A bus from the buses section of the fzp.
+
+    __slots__ = ('Id', 'NodeCount')
+
+    def __init__(self, Id):
+
+        self.Id = Id
+
+        self.NodeCount = 0
+
+    # End of def __init__(self, Id):
+
+    def __repr__(self):
+
+        return 'Bus({0:s})'.format(str(self.Id))
+
+    # End of def __repr__(self):
+
+# End of class Bus(object):
+
+class Subpart(object):
+
+    # A subpart from the schematic-subparts section of the fzp.
+
+    __slots__ = ('Id', 'Label', 'ConnectorCount', 'Cons', 'SvgCons')
+
+    def __init__(self, Id, Label):
+
+        self.Id = Id
+
+        self.Label = Label
+
+        self.ConnectorCount = 0
+
+        # The schematic svg ids of the pins of the connectors in this subpart
+        # and those found inside the subpart's group in the schematic svg
+        # (both ordered sets, SvgCons is None until the group has been seen).
+
+        self.Cons = {}
+
+        self.SvgCons = None
+
+    # End of def __init__(self, Id, Label):
+
+    def __repr__(self):
+
+        return 'Subpart({0:s})'.format(str(self.Id))
+
+    # End of def __repr__(self):
+
+# End of class Subpart(object):
+
+class PartModel(object):
+
+    # The whole part. Dictionaries keep the order items were added in, which
+    # is the order they are in the fzp and thus the order messages come out.
+
+    __slots__ = ('ViewNames', 'Views', 'Connectors', 'Names', 'Labels', 'PinNos', 'Buses', 'Subparts')
+
+    def __init__(self):
+
+        # The valid view names in the order they appear in the views section
+        # and a View for every view name seen anywhere in the fzp.
+
+        self.ViewNames = []
+
+        self.Views = {}
+
+        # The Connector for each connector id, the connector names and
+        # subpart labels seen (connector ids, names and labels all need to be
+        # unique) and the pin numbers from the connector ids (in fzp order,
+        # one per connector).
+
+        self.Connectors = {}
+
+        self.Names = set()
+
+        self.Labels = set()
+
+        self.PinNos = []
+
+        # The Bus and Subpart for each bus and subpart id.
+
+        self.Buses = {}
+
+        self.Subparts = {}
+
+    # End of def __init__(self):
+
+    def View(self, Name):
+
+        # Return the View for Name creating it if this is the first time it
+        # has been asked for.
+
+        CurView = self.Views.get(Name)
+
+        if CurView == None:
+
+            CurView = View(Name)
+
+            self.Views[Name] = CurView
+
+        # End of if CurView == None:
+
+        return CurView
+
+    # End of def View(self, Name):
+
+    def Connector(self, Id):
+
+        # Return the Connector for Id creating it if this is the first time it
+        # has been asked for.
+
+        Con = self.Connectors.get(Id)
+
+        if Con == None:
+
+            Con = Connector(Id)
+
+            self.Connectors[Id] = Con
+
+        # End of if Con == None:
+
+        return Con
+
+    # End of def Connector(self, Id):
+
+    def IdInUse(self, Value):
+
+        # True if Value is already in use as a connector id, connector name
+        # or subpart label.
+
+        return Value in self.Connectors or Value in self.Names or Value in self.Labels
+
+    # End of def IdInUse(self, Value):
+
+    def CopperLayer(self, LayerId):
+
+        # The pcbView Layer for copper0 or copper1 or None if the fzp doesn't
+        # define it.
+
+        CurView = self.Views.get('pcbView')
+
+        if CurView == None:
+
+            return None
+
+        # End of if CurView == None:
+
+        return CurView.Layers.get(LayerId)
+
+    # End of def CopperLayer(self, LayerId):
+
+    def __repr__(self):
+
+        return 'PartModel(views {0:s} connectors {1:s} buses {2:s} subparts {3:s})'.format(str(self.ViewNames), str(list(self.Connectors)), str(list(self.Buses)), str(list(self.Subparts)))
+
+    # End of def __repr__(self):
+
+# End of class PartModel(object):
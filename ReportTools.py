@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+
+# The machine readable reports from the --ndjson and --sarif options. Each
+# reporter is given the messages for one file (an fzp and the svgs it
+# references, or a single svg) as soon as that file has been processed and
+# writes them out straight away, so nothing but the report file handle (and
+# for SARIF the set of codes seen) is kept between files however many parts
+# are checked. A reporter is any object with a ReportFile and a Close method
+# so another format only needs another class added to OpenReports.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os for the paths, json for the output and logging to get
+# logging support.
+
+import os, json, logging
+
+# The urllib quote to turn a file name in to a SARIF uri.
+
+from urllib.parse import quote
+
+# The Diagnostic records for the messages.
+
+import DiagnosticTools as Diag
+
+# The reporters opened by OpenReports.
+
+Reporters = []
+
+# The severity of the messages in each of the lists (Errors, Warnings and
+# Info) passed to ReportFile.
+
+Severities = ('error', 'warning', 'info')
+
+# The SARIF level for each severity.
+
+SarifLevels = {'error': 'error', 'warning': 'warning', 'info': 'note'}
+
+def MessageRecord(Message, Severity, InFile, ModuleId):
+
+    # Make the dictionary for one message. The file and line come from the
+    # message when it has them (the file processed otherwise) and the code
+    # is None for messages (such as Info and parser messages) that have no
+    # number.
+
+    if type(Message) == Diag.Diagnostic:
+
+        Code = Message.Code()
+
+        File = Message.File()
+
+        Line = Message.Line()
+
+    else:
+
+        # A plain string from an old cache entry.
+
+        Code = None
+
+        File = None
+
+        Line = None
+
+    # End of if type(Message) == Diag.Diagnostic:
+
+    if File == None:
+
+        File = InFile
+
+    # End of if File == None:
+
+    try:
+
+        Line = int(Line)
+
+    except (TypeError, ValueError):
+
+        Line = None
+
+    # End of try:
+
+    return {'code': Code, 'severity': Severity, 'file': str(File), 'line': Line, 'moduleId': ModuleId, 'input': InFile, 'message': str(Message)}
+
+# End of def MessageRecord(Message, Severity, InFile, ModuleId):
+
+def MessageRecords(InFile, ModuleId, Errors, Warnings, Info):
+
+    # Generate the records for the unsuppressed messages of a file, Errors
+    # first then Warnings then Info.
+
+    for Messages, Severity in zip((Errors, Warnings, Info), Severities):
+
+        for Message in Diag.Visible(Messages):
+
+            yield MessageRecord(Message, Severity, InFile, ModuleId)
+
+        # End of for Message in Diag.Visible(Messages):
+
+    # End of for Messages, Severity in zip((Errors, Warnings, Info), Severities):
+
+# End of def MessageRecords(InFile, ModuleId, Errors, Warnings, Info):
+
+class NdjsonReporter(object):
+
+    # One json object per line per message.
+
+    def __init__(self, File):
+
+        self.File = open(File, 'w', encoding='utf-8')
+
+    # End of def __init__(self, File):
+
+    def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+        for Record in MessageRecords(InFile, ModuleId, Errors, Warnings, Info):
+
+            self.File.write(json.dumps(Record))
+
+            self.File.write('\n')
+
+        # End of for Record in MessageRecords(InFile, ModuleId, Errors, Warnings, Info):
+
+        self.File.flush()
+
+    # End of def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+    def Close(self):
+
+        self.File.close()
+
+    # End of def Close(self):
+
+# End of class NdjsonReporter(object):
+
+class SarifReporter(object):
+
+    # A SARIF 2.1.0 log with one run. The results are written as they come
+    # in and the tool section (which has to list the rules, i.e. the codes,
+    # that were used) is written after them when the report is closed, so
+    # only the codes need to be remembered.
+
+    def __init__(self, File):
+
+        self.File = open(File, 'w', encoding='utf-8')
+
+        self.Rules = {}
+
+        self.Results = 0
+
+        self.File.write('{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "version": "2.1.0", "runs": [{"results": [\n')
+
+    # End of def __init__(self, File):
+
+    def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+        for Record in MessageRecords(InFile, ModuleId, Errors, Warnings, Info):
+
+            Result = {'level': SarifLevels[Record['severity']], 'message': {'text': Record['message']}}
+
+            if Record['code'] != None:
+
+                # The rule id can't have spaces in it, so 'Error 47'
+                # becomes 'Error47' (the form --suppress takes as well).
+
+                RuleId = Record['code'].replace(' ', '')
+
+                Result['ruleId'] = RuleId
+
+                self.Rules[RuleId] = Record['code']
+
+            # End of if Record['code'] != None:
+
+            Location = {'artifactLocation': {'uri': quote(Record['file'].replace(os.sep, '/'))}}
+
+            if Record['line'] != None and Record['line'] > 0:
+
+                Location['region'] = {'startLine': Record['line']}
+
+            # End of if Record['line'] != None and Record['line'] > 0:
+
+            Result['locations'] = [{'physicalLocation': Location}]
+
+            Result['properties'] = {'code': Record['code'], 'moduleId': Record['moduleId'], 'input': Record['input']}
+
+            if self.Results != 0:
+
+                self.File.write(',\n')
+
+            # End of if self.Results != 0:
+
+            self.File.write(json.dumps(Result))
+
+            self.Results += 1
+
+        # End of for Record in MessageRecords(InFile, ModuleId, Errors, Warnings, Info):
+
+        self.File.flush()
+
+    # End of def ReportFile(self, InFile, ModuleId, Errors, Warnings, Info):
+
+    def Close(self):
+
+        Rules = [{'id': RuleId, 'name': self.Rules[RuleId]} for RuleId in sorted(self.Rules)]
+
+        Tool = {'driver': {'name': 'FritzingCheckPart', 'informationUri': 'https://github.com/vanepp/FritzingCheckPart', 'rules': Rules}}
+
+        self.File.write('\n], "tool": {0:s}}}]}}\n'.format(json.dumps(Tool)))
+
+        self.File.close()
+
+    # End of def Close(self):
+
+# End of class SarifReporter(object):
+
+def OpenReports(Options, Errors):
+
+    # Open a reporter for each report file in Options (from --ndjson and
+    # --sarif).
+
+    logging.info (' Entering OpenReports\n')
+
+    for Option, Reporter in (('ndjson', NdjsonReporter), ('sarif', SarifReporter)):
+
+        if Options.get(Option) != None:
+
+            try:
+
+                Reporters.append(Reporter(Options[Option]))
+
+            except OSError as e:
+
+                Errors.append(Diag.Diagnostic('Error 2: Can not open {0:s} {1:s} ({2:s})\n', e.filename, e.strerror, e.errno))
+
+            # End of try:
+
+        # End of if Options.get(Option) != None:
+
+    # End of for Option, Reporter in (('ndjson', NdjsonReporter), ('sarif', SarifReporter)):
+
+    logging.info (' Exiting OpenReports\n')
+
+# End of def OpenReports(Options, Errors):
+
+def ReportFile(InFile, ModuleId, Errors, Warnings, Info):
+
+    # Pass the messages for a file that has finished processing to every
+    # open reporter.
+
+    for Reporter in Reporters:
+
+        Reporter.ReportFile(InFile, ModuleId, Errors, Warnings, Info)
+
+    # End of for Reporter in Reporters:
+
+# End of def ReportFile(InFile, ModuleId, Errors, Warnings, Info):
+
+def CloseReports():
+
+    # Finish and close all the open reports.
+
+    logging.info (' Entering CloseReports\n')
+
+    while len(Reporters) != 0:
+
+        Reporters.pop(0).Close()
+
+    # End of while len(Reporters) != 0:
+
+    logging.info (' Exiting CloseReports\n')
+
+# End of def CloseReports():
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# The support routines for auditing Fritzing sketches (.fzz files, a zip of
+# the .fz sketch and the parts that aren't in the core library) and bins
+# (.fzb files, xml listing parts). The parts embedded in a sketch are
+# checked by FritzingTools.ProcessSketch as a .fzpz would be, and here each
+# part instance (the moduleIdRef of an instance element) in the sketch or
+# bin is resolved against the embedded parts and an index of the moduleIds
+# of the installed parts library (the --parts directories), so a missing
+# part is reported without loading the sketch in to Fritzing.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os for the directory walk, re for the regexes and logging to get
+# logging support.
+
+import os, re, logging
+
+# The Diagnostic records for the Error and Warning messages.
+
+import DiagnosticTools as Diag
+
+# and the lxml library for the xml.
+
+from lxml import etree
+
+# The moduleIds of the installed parts library indexed by moduleId (the
+# value is the fzp file that defines it), or None if no --parts directory
+# was given, set by LoadLibrary before any sketch is audited (so a --jobs
+# pool inherits it rather than each process walking the library again).
+
+Library = None
+
+# Parts that Fritzing makes itself when they are used (so they aren't in
+# any parts directory) have moduleIds starting with one of these.
+
+GeneratedRegex = re.compile(r'^(generic_ic_dip_|generic_sip_|generic_female_pin_header_|generic_male_pin_header_|generic_shrouded_pin_header_|screw_terminal_|mystery_part_)')
+
+def LoadLibrary(PartsDirs):
+
+    # Index the moduleId of every fzp under the PartsDirs (such as a
+    # fritzing-parts directory and fritzing-app/resources/parts). Only the
+    # start of each fzp is parsed, up to the module element that holds the
+    # moduleId, and the svg directories aren't walked at all.
+
+    global Library
+
+    logging.info (' Entering LoadLibrary PartsDirs %s\n', PartsDirs)
+
+    Library = {}
+
+    for PartsDir in PartsDirs:
+
+        for Dir, SubDirs, Files in os.walk(PartsDir):
+
+            # Walk the directories in a fixed order and skip the svgs (and
+            # any git metadata).
+
+            SubDirs[:] = sorted(SubDir for SubDir in SubDirs if SubDir not in ('svg', '.git'))
+
+            for File in sorted(Files):
+
+                if not File.lower().endswith('.fzp'):
+
+                    continue
+
+                # End of if not File.lower().endswith('.fzp'):
+
+                ModuleId = FzpModuleIdOnly(os.path.join(Dir, File))
+
+                if ModuleId != None and not ModuleId in Library:
+
+                    Library[ModuleId] = os.path.join(Dir, File)
+
+                # End of if ModuleId != None and not ModuleId in Library:
+
+            # End of for File in sorted(Files):
+
+        # End of for Dir, SubDirs, Files in os.walk(PartsDir):
+
+    # End of for PartsDir in PartsDirs:
+
+    logging.debug (' LoadLibrary: %s moduleIds\n', len(Library))
+
+    logging.info (' Exiting LoadLibrary\n')
+
+# End of def LoadLibrary(PartsDirs):
+
+def FzpModuleIdOnly(File):
+
+    # The moduleId of the fzp File from its first (module) element, or None
+    # if it can't be read or doesn't have one.
+
+    try:
+
+        for Event, Elem in etree.iterparse(File, events=('start',)):
+
+            return Elem.get('moduleId')
+
+        # End of for Event, Elem in etree.iterparse(File, events=('start',)):
+
+    except (IOError, etree.XMLSyntaxError):
+
+        pass
+
+    # End of try:
+
+    return None
+
+# End of def FzpModuleIdOnly(File):
+
+def SketchInstances(Source, InFile, Errors):
+
+    # Return the part instances in the sketch or bin InFile (read from
+    # Source, the file name or a stream of the archive member) as a list
+    # of [moduleIdRef, title, line] in file order, streaming the xml so a
+    # large sketch isn't held in memory. A parse error is Error 6 (as from
+    # PP.ParseFile) and returns None.
+
+    logging.info (' Entering SketchInstances InFile %s\n', InFile)
+
+    Instances = []
+
+    try:
+
+        for Event, Elem in etree.iterparse(Source, events=('end',), tag='instance'):
+
+            ModuleIdRef = Elem.get('moduleIdRef')
+
+            if ModuleIdRef != None:
+
+                Title = Elem.findtext('title')
+
+                Instances.append([ModuleIdRef, Title or '', Elem.sourceline])
+
+            # End of if ModuleIdRef != None:
+
+            # The instance has been read, so free it (and any earlier
+            # siblings) as iterparse would otherwise keep the whole tree.
+
+            Elem.clear()
+
+            while Elem.getprevious() != None:
+
+                del Elem.getparent()[0]
+
+            # End of while Elem.getprevious() != None:
+
+        # End of for Event, Elem in etree.iterparse(Source, events=('end',), tag='instance'):
+
+    except IOError:
+
+        Errors.append(Diag.Diagnostic('Error 5: ParseFile can\'t read file {0:s}\n', InFile))
+
+        logging.info (' Exiting SketchInstances on no file error\n')
+
+        return None
+
+    except etree.XMLSyntaxError as e:
+
+        Errors.append(Diag.Diagnostic('Error 6: ParseFile error parsing the input xml file {0:s}\n', InFile))
+
+        Errors.append(Diag.Diagnostic('{0:s}\n', str(e)))
+
+        logging.info (' Exiting SketchInstances on parser error\n')
+
+        return None
+
+    # End of try:
+
+    logging.info (' Exiting SketchInstances\n')
+
+    return Instances
+
+# End of def SketchInstances(Source, InFile, Errors):
+
+def ResolveInstances(InFile, Instances, Embedded, Errors):
+
+    # Check that the moduleIdRef of every instance in InFile is one of the
+    # Embedded parts' moduleIds, in the Library or made by Fritzing itself.
+    # Each missing moduleId is reported once (Error 93) at its first
+    # instance, along with how many instances use it.
+
+    logging.info (' Entering ResolveInstances InFile %s\n', InFile)
+
+    Missing = {}
+
+    for ModuleIdRef, Title, Line in Instances:
+
+        if ModuleIdRef in Embedded or ModuleIdRef in Library or GeneratedRegex.match(ModuleIdRef):
+
+            continue
+
+        # End of if ModuleIdRef in Embedded or ModuleIdRef in Library or GeneratedRegex.match(ModuleIdRef):
+
+        if ModuleIdRef in Missing:
+
+            Missing[ModuleIdRef][2] += 1
+
+        else:
+
+            Missing[ModuleIdRef] = [Title, Line, 1]
+
+        # End of if ModuleIdRef in Missing:
+
+    # End of for ModuleIdRef, Title, Line in Instances:
+
+    for ModuleIdRef in Missing:
+
+        Title, Line, Count = Missing[ModuleIdRef]
+
+        Errors.append(Diag.Diagnostic('Error 93: File\n\'{0:s}\'\nAt line {1:s}\n\nPart \'{2:s}\' moduleId \'{3:s}\' ({4:s} instance(s)) isn\'t in the sketch or the parts library\n', InFile, Line, Title, ModuleIdRef, str(Count)))
+
+    # End of for ModuleIdRef in Missing:
+
+    logging.info (' Exiting ResolveInstances\n')
+
+# End of def ResolveInstances(InFile, Instances, Embedded, Errors):
+
+def CheckEmbedded(InFile, Embedded, Warnings):
+
+    # Fritzing loads a part from the library in preference to a part of the
+    # same moduleId embedded in a sketch, so warn (Warning 30) about an
+    # embedded part that the library will replace.
+
+    logging.info (' Entering CheckEmbedded InFile %s\n', InFile)
+
+    for ModuleId in Embedded:
+
+        if ModuleId in Library:
+
+            Warnings.append(Diag.Diagnostic('Warning 30: File\n\'{0:s}\'\n\nEmbedded part moduleId \'{1:s}\' is also in the parts library as\n\n\'{2:s}\'\n\nand Fritzing will use the library part\n', InFile, ModuleId, Library[ModuleId]))
+
+        # End of if ModuleId in Library:
+
+    # End of for ModuleId in Embedded:
+
+    logging.info (' Exiting CheckEmbedded\n')
+
+# End of def CheckEmbedded(InFile, Embedded, Warnings):
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+
+# The --timing instrumentation. When it is turned on, Instrument replaces
+# every function in the modules it is given (FritzingTools and PPTools) with
+# a wrapper that adds up the calls, wall clock time and cpu time of that
+# function, so the time spent in each stage (ParseFile, ProcessTree,
+# OutputTree ...) and each check (SvgGroup, SvgInlineStyle, RemovePx ...)
+# can be seen. The times are inclusive (a stage includes the checks it
+# calls) and a recursive function (ProcessTree) is only timed at its
+# outermost call. A generator (PrettyPrintLines) is timed over the items it
+# produces, as that is when its work is done. Count adds to a named counter
+# (such as the attributes rewritten). When --timing isn't given nothing is
+# wrapped and Count returns at once, so the checks run at full speed.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import time for the clocks, json for the dump and logging to get logging
+# support.
+
+import time, json, logging
+
+# inspect to find the functions of a module and functools to make the
+# wrappers look like (and pickle as, for --jobs) the functions they wrap.
+
+import inspect, functools
+
+# Set by Enable.
+
+Enabled = False
+
+# [Calls, Wall, Cpu, Depth, Samples] indexed by function name. Samples is
+# None or (when Enable was asked to keep them, for Benchmark.py) the list of
+# the wall time of each outermost call.
+
+Stats = {}
+
+# The counters indexed by name.
+
+Counters = {}
+
+# The functions whose call counts are the elements visited.
+
+ElementCounters = (('fzp elements visited', 'ProcessFzpLeafNode'), ('svg elements visited', 'ProcessSvgLeafNode'))
+
+def Enable(Modules, Names=None, KeepSamples=False):
+
+    # Turn timing on and instrument all the functions in Modules (or only
+    # those in Names if it is given), keeping the time of every call if
+    # KeepSamples is True.
+
+    global Enabled
+
+    logging.info (' Entering Enable\n')
+
+    Enabled = True
+
+    for Module in Modules:
+
+        Instrument(Module, Names, KeepSamples)
+
+    # End of for Module in Modules:
+
+    logging.info (' Exiting Enable\n')
+
+# End of def Enable(Modules, Names=None, KeepSamples=False):
+
+def Instrument(Module, Names=None, KeepSamples=False):
+
+    # Replace each function defined in Module (or in Names) with a timing 
+    # wrapper. Calls between functions in the module go through the 
+    # module's globals, so they are timed as well.
+
+    for Name, Function in list(vars(Module).items()):
+
+        if inspect.isfunction(Function) and Function.__module__ == Module.__name__ and (Names == None or Name in Names):
+
+            setattr(Module, Name, Wrap(Module.__name__ + '.' + Name, Function, KeepSamples))
+
+        # End of if inspect.isfunction(Function) and Function.__module__ == Module.__name__ ...
+
+    # End of for Name, Function in list(vars(Module).items()):
+
+# End of def Instrument(Module, Names=None, KeepSamples=False):
+
+def Wrap(Name, Function, KeepSamples=False):
+
+    # Return a wrapper for Function that adds its times to Stats[Name].
+
+    Entry = Stats.setdefault(Name, [0, 0.0, 0.0, 0, None])
+
+    if KeepSamples:
+
+        Entry[4] = []
+
+    # End of if KeepSamples:
+
+    if inspect.isgeneratorfunction(Function):
+
+        # A generator (PrettyPrintLines) doesn't run when it is called but 
+        # as it is consumed, so time each step of it instead.
+
+        return WrapGenerator(Function, Entry)
+
+    # End of if inspect.isgeneratorfunction(Function):
+
+    @functools.wraps(Function)
+    def Timed(*Args, **KwArgs):
+
+        Entry[0] += 1
+
+        if Entry[3] != 0:
+
+            # A recursive call, which is included in the outer call's time.
+
+            Entry[3] += 1
+
+            try:
+
+                return Function(*Args, **KwArgs)
+
+            finally:
+
+                Entry[3] -= 1
+
+            # End of try:
+
+        # End of if Entry[3] != 0:
+
+        Entry[3] = 1
+
+        StartWall = time.perf_counter()
+
+        StartCpu = time.process_time()
+
+        try:
+
+            return Function(*Args, **KwArgs)
+
+        finally:
+
+            Wall = time.perf_counter() - StartWall
+
+            Entry[1] += Wall
+
+            Entry[2] += time.process_time() - StartCpu
+
+            Entry[3] = 0
+
+            if Entry[4] != None:
+
+                Entry[4].append(Wall)
+
+            # End of if Entry[4] != None:
+
+        # End of try:
+
+    # End of def Timed(*Args, **KwArgs):
+
+    return Timed
+
+# End of def Wrap(Name, Function, KeepSamples=False):
+
+def WrapGenerator(Function, Entry):
+
+    # Return a wrapper for the generator Function that adds the time of 
+    # every item it produces (not the time of whatever consumes the items)
+    # to Entry, a sample being the total for one generator.
+
+    @functools.wraps(Function)
+    def TimedGenerator(*Args, **KwArgs):
+
+        Entry[0] += 1
+
+        Generator = Function(*Args, **KwArgs)
+
+        Total = 0.0
+
+        try:
+
+            while True:
+
+                StartWall = time.perf_counter()
+
+                StartCpu = time.process_time()
+
+                try:
+
+                    Item = next(Generator)
+
+                except StopIteration:
+
+                    return
+
+                finally:
+
+                    Wall = time.perf_counter() - StartWall
+
+                    Entry[1] += Wall
+
+                    Entry[2] += time.process_time() - StartCpu
+
+                    Total += Wall
+
+                # End of try:
+
+                yield Item
+
+            # End of while True:
+
+        finally:
+
+            Generator.close()
+
+            if Entry[4] != None:
+
+                Entry[4].append(Total)
+
+            # End of if Entry[4] != None:
+
+        # End of try:
+
+    # End of def TimedGenerator(*Args, **KwArgs):
+
+    return TimedGenerator
+
+# End of def WrapGenerator(Function, Entry):
+
+def Count(Name, Amount=1):
+
+    # Add Amount to the counter Name (when timing).
+
+    if Enabled:
+
+        Counters[Name] = Counters.get(Name, 0) + Amount
+
+    # End of if Enabled:
+
+# End of def Count(Name, Amount=1):
+
+def TakeStats():
+
+    # Return the stats and counters collected so far (in a form that can be
+    # pickled back from a --jobs worker) and reset them, or None if timing
+    # is off.
+
+    if not Enabled:
+
+        return None
+
+    # End of if not Enabled:
+
+    Taken = {'functions': {}, 'counters': dict(Counters)}
+
+    for Name in Stats:
+
+        if Stats[Name][0] != 0:
+
+            Taken['functions'][Name] = Stats[Name][0:3]
+
+        # End of if Stats[Name][0] != 0:
+
+    # End of for Name in Stats:
+
+    ResetStats()
+
+    return Taken
+
+# End of def TakeStats():
+
+def ResetStats():
+
+    # Zero the stats and counters. A --jobs worker starts with this so it 
+    # doesn't send back the parent's stats that it was forked with. 
+
+    for Name in Stats:
+
+        Stats[Name][0:3] = [0, 0.0, 0.0]
+
+        if Stats[Name][4] != None:
+
+            Stats[Name][4] = []
+
+        # End of if Stats[Name][4] != None:
+
+    # End of for Name in Stats:
+
+    Counters.clear()
+
+# End of def ResetStats():
+
+def MergeStats(Taken):
+
+    # Add stats from TakeStats (from a --jobs worker) to this process's.
+
+    if Taken == None:
+
+        return
+
+    # End of if Taken == None:
+
+    for Name in Taken['functions']:
+
+        Entry = Stats.setdefault(Name, [0, 0.0, 0.0, 0, None])
+
+        Entry[0] += Taken['functions'][Name][0]
+
+        Entry[1] += Taken['functions'][Name][1]
+
+        Entry[2] += Taken['functions'][Name][2]
+
+    # End of for Name in Taken['functions']:
+
+    for Name in Taken['counters']:
+
+        Counters[Name] = Counters.get(Name, 0) + Taken['counters'][Name]
+
+    # End of for Name in Taken['counters']:
+
+# End of def MergeStats(Taken):
+
+def Summary(RunWall, RunCpu):
+
+    # Return the machine readable summary of the run, functions sorted by
+    # wall time (most first).
+
+    Functions = []
+
+    for Name in Stats:
+
+        Calls, Wall, Cpu = Stats[Name][0:3]
+
+        if Calls != 0:
+
+            Functions.append({'name': Name, 'calls': Calls, 'wall': round(Wall, 6), 'cpu': round(Cpu, 6)})
+
+        # End of if Calls != 0:
+
+    # End of for Name in Stats:
+
+    Functions.sort(key=lambda Function: (-Function['wall'], Function['name']))
+
+    Counts = dict(Counters)
+
+    for Counter, Function in ElementCounters:
+
+        for Name in Stats:
+
+            if Name.endswith('.' + Function):
+
+                Counts[Counter] = Counts.get(Counter, 0) + Stats[Name][0]
+
+            # End of if Name.endswith('.' + Function):
+
+        # End of for Name in Stats:
+
+    # End of for Counter, Function in ElementCounters:
+
+    return {'wall': round(RunWall, 6), 'cpu': round(RunCpu, 6), 'functions': Functions, 'counters': Counts}
+
+# End of def Summary(RunWall, RunCpu):
+
+def PrintSummary(RunWall, RunCpu, DumpFile=None):
+
+    # Print the table of times and counters and then the json dump of them
+    # (to DumpFile if one was given with --timing=FILE, otherwise to
+    # stdout after the table).
+
+    logging.info (' Entering PrintSummary\n')
+
+    Data = Summary(RunWall, RunCpu)
+
+    print('\n**** Timing (wall {0:.3f}s cpu {1:.3f}s, times include the functions called and are added up over --jobs workers)\n'.format(Data['wall'], Data['cpu']))
+
+    print('{0:>10s} {1:>10s} {2:>10s} {3:>7s}  {4:s}'.format('calls', 'wall s', 'cpu s', 'wall %', 'function'))
+
+    for Function in Data['functions']:
+
+        if Data['wall'] > 0:
+
+            Percent = 100.0 * Function['wall'] / Data['wall']
+
+        else:
+
+            Percent = 0.0
+
+        # End of if Data['wall'] > 0:
+
+        print('{0:10d} {1:10.4f} {2:10.4f} {3:7.1f}  {4:s}'.format(Function['calls'], Function['wall'], Function['cpu'], Percent, Function['name']))
+
+    # End of for Function in Data['functions']:
+
+    if len(Data['counters']) != 0:
+
+        print('')
+
+        for Name in sorted(Data['counters']):
+
+            print('{0:10d}  {1:s}'.format(Data['counters'][Name], Name))
+
+        # End of for Name in sorted(Data['counters']):
+
+    # End of if len(Data['counters']) != 0:
+
+    if DumpFile == None:
+
+        print('\n' + json.dumps(Data))
+
+    else:
+
+        try:
+
+            with open(DumpFile, 'w', encoding='utf-8') as f:
+
+                json.dump(Data, f, indent=1)
+
+        except OSError as e:
+
+            print('Error 2: Can not open {0:s} {1:s} ({2:s})\n'.format(str(e.filename), e.strerror, str(e.errno)))
+
+        # End of try:
+
+    # End of if DumpFile == None:
+
+    logging.info (' Exiting PrintSummary\n')
+
+# End of def PrintSummary(RunWall, RunCpu, DumpFile=None):
@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+
+# The --watch mode. The files (a single fzp or svg, or every fzp and svg in
+# a src directory) are checked once and then the directories they (and the
+# svgs the fzps reference) are in are watched, with inotify on Linux or by
+# polling the file times elsewhere. When a file changes only what depends on
+# it is checked again: a changed fzp is checked in full (with its svgs) but
+# a changed svg only has its own view checked, against a copy of the model
+# of its fzp kept from when the fzp was last checked, so neither the fzp nor
+# the other views are parsed again. Nothing is ever written (--watch implies
+# --check) so saving a file from an editor doesn't get it renamed to .bak
+# under the editor.
+
+Version = '0.0.1'  # Version number of this file.
+
+# Import os and sys for the files, time for the polling and the time stamps,
+# copy to copy the fzp model and logging to get logging support.
+
+import os, sys, time, copy, logging
+
+# ctypes, struct and select for inotify.
+
+import ctypes, ctypes.util, struct, select
+
+import FritzingTools as Fritzing, PPTools as PP, DiagnosticTools as Diag, ReportTools as Report
+
+# The inotify events that mean a file has been written, created (including
+# by an editor saving to a temporary file and renaming it), or removed.
+
+InCloseWrite = 0x00000008
+
+InMovedFrom = 0x00000040
+
+InMovedTo = 0x00000080
+
+InCreate = 0x00000100
+
+InDelete = 0x00000200
+
+InotifyMask = InCloseWrite | InMovedFrom | InMovedTo | InCreate | InDelete
+
+# The inotify event header (wd, mask, cookie, len).
+
+InotifyEvent = struct.Struct('iIII')
+
+# How long (in seconds) to wait for more events after the first one, so an
+# editor's save (often several events) causes only one check, and how often
+# to look at the file times when polling.
+
+SettleTime = 0.2
+
+PollInterval = 1.0
+
+class InotifyWatcher(object):
+
+    # Watch directories with the Linux inotify calls (through ctypes so
+    # nothing needs to be installed).
+
+    def __init__(self):
+
+        self.Libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        self.Fd = self.Libc.inotify_init()
+
+        if self.Fd < 0:
+
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+        # End of if self.Fd < 0:
+
+        self.Dirs = {}
+
+    # End of def __init__(self):
+
+    def AddDir(self, Dir):
+
+        if Dir in self.Dirs.values():
+
+            return
+
+        # End of if Dir in self.Dirs.values():
+
+        Wd = self.Libc.inotify_add_watch(self.Fd, os.fsencode(Dir), InotifyMask)
+
+        if Wd >= 0:
+
+            self.Dirs[Wd] = Dir
+
+        # End of if Wd >= 0:
+
+    # End of def AddDir(self, Dir):
+
+    def Wait(self):
+
+        # Wait for changes and return the set of (absolute) files changed.
+
+        Changed = set()
+
+        Timeout = None
+
+        while select.select([self.Fd], [], [], Timeout)[0]:
+
+            Buffer = os.read(self.Fd, 65536)
+
+            Offset = 0
+
+            while Offset < len(Buffer):
+
+                Wd, Mask, Cookie, Length = InotifyEvent.unpack_from(Buffer, Offset)
+
+                Name = Buffer[Offset + InotifyEvent.size:Offset + InotifyEvent.size + Length].rstrip(b'\0')
+
+                Offset += InotifyEvent.size + Length
+
+                if Wd in self.Dirs and Name != b'' and Mask & InotifyMask:
+
+                    Changed.add(os.path.join(self.Dirs[Wd], os.fsdecode(Name)))
+
+                # End of if Wd in self.Dirs and Name != b'' and Mask & InotifyMask:
+
+            # End of while Offset < len(Buffer):
+
+            Timeout = SettleTime
+
+        # End of while select.select([self.Fd], [], [], Timeout)[0]:
+
+        return Changed
+
+    # End of def Wait(self):
+
+    def Close(self):
+
+        os.close(self.Fd)
+
+    # End of def Close(self):
+
+# End of class InotifyWatcher(object):
+
+class PollingWatcher(object):
+
+    # Watch directories by comparing the times and sizes of their files
+    # every PollInterval seconds.
+
+    def __init__(self):
+
+        self.Files = {}
+
+        self.Dirs = set()
+
+    # End of def __init__(self):
+
+    def AddDir(self, Dir):
+
+        if not Dir in self.Dirs:
+
+            self.Dirs.add(Dir)
+
+            self.Files.update(self.Scan(Dir))
+
+        # End of if not Dir in self.Dirs:
+
+    # End of def AddDir(self, Dir):
+
+    def Scan(self, Dir):
+
+        Files = {}
+
+        try:
+
+            with os.scandir(Dir) as Entries:
+
+                for Entry in Entries:
+
+                    if Entry.is_file():
+
+                        Stat = Entry.stat()
+
+                        Files[os.path.join(Dir, Entry.name)] = (Stat.st_mtime_ns, Stat.st_size)
+
+                    # End of if Entry.is_file():
+
+                # End of for Entry in Entries:
+
+        except OSError:
+
+            pass
+
+        # End of try:
+
+        return Files
+
+    # End of def Scan(self, Dir):
+
+    def Wait(self):
+
+        while True:
+
+            time.sleep(PollInterval)
+
+            Files = {}
+
+            for Dir in self.Dirs:
+
+                Files.update(self.Scan(Dir))
+
+            # End of for Dir in self.Dirs:
+
+            Changed = set(File for File in set(Files) | set(self.Files) if Files.get(File) != self.Files.get(File))
+
+            self.Files = Files
+
+            if len(Changed) != 0:
+
+                return Changed
+
+            # End of if len(Changed) != 0:
+
+        # End of while True:
+
+    # End of def Wait(self):
+
+    def Close(self):
+
+        pass
+
+    # End of def Close(self):
+
+# End of class PollingWatcher(object):
+
+def OpenWatcher(Mode):
+
+    # Return an inotify watcher (unless Mode is 'poll' or inotify isn't
+    # available) or a polling one.
+
+    if Mode != 'poll' and sys.platform.startswith('linux'):
+
+        try:
+
+            return InotifyWatcher()
+
+        except (OSError, AttributeError):
+
+            # No inotify (or no libc), so poll.
+
+            pass
+
+        # End of try:
+
+    # End of if Mode != 'poll' and sys.platform.startswith('linux'):
+
+    return PollingWatcher()
+
+# End of def OpenWatcher(Mode):
+
+def FzpTypeOf(File):
+
+    # The FzpType for a file, 'FZPPART' for an unzipped fzpz (part.name.fzp
+    # and svg.view.name.svg) and 'FZPFRITZ' otherwise.
+
+    if os.path.basename(File).lower().startswith(('part.', 'svg.')):
+
+        return 'FZPPART'
+
+    # End of if os.path.basename(File).lower().startswith(('part.', 'svg.')):
+
+    return 'FZPFRITZ'
+
+# End of def FzpTypeOf(File):
+
+def CheckFzp(InFile, PrefixDir, Debug):
+
+    # Check an fzp (and the svgs it references) and return its entry: the
+    # messages for the fzp and for each view, the svg file of each view and
+    # a copy of the fzp model from before any svg was checked for
+    # re-checking a single view later.
+
+    logging.info (' Entering CheckFzp InFile %s\n', InFile)
+
+    FzpType = FzpTypeOf(InFile)
+
+    Errors, Warnings, Info, FzpDict, CurView, TagStack, State, InheritedAttributes = Fritzing.InitializeAll()
+
+    Entry = {'infile': InFile, 'fzptype': FzpType, 'prefixdir': PrefixDir, 'model': None, 'fzp': [Errors, Warnings, Info], 'views': {}, 'svgs': {}}
+
+    if Fritzing.ProcessFzpStream(FzpType, FzpType, InFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug) == 'y':
+
+        Fritzing.FzpCheckConnectors(InFile, None, FzpDict, Errors, Warnings, Info, State)
+
+        Entry['model'] = copy.deepcopy(FzpDict)
+
+        for View, SvgFile, OutFile in Fritzing.SvgFilesFromFzp(FzpType, InFile, None, PrefixDir):
+
+            Entry['svgs'][View] = SvgFile
+
+        # End of for View, SvgFile, OutFile in Fritzing.SvgFilesFromFzp(FzpType, InFile, None, PrefixDir):
+
+        for View in FzpDict['partmodel'].ViewNames:
+
+            CheckView(Entry, View, Debug)
+
+        # End of for View in FzpDict['partmodel'].ViewNames:
+
+    # End of if Fritzing.ProcessFzpStream(FzpType, FzpType, InFile, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, TagStack, State, InheritedAttributes, Debug) == 'y':
+
+    logging.info (' Exiting CheckFzp\n')
+
+    return Entry
+
+# End of def CheckFzp(InFile, PrefixDir, Debug):
+
+def CheckView(Entry, View, Debug):
+
+    # (Re)check the svg of one view of the fzp in Entry against a fresh copy
+    # of the saved fzp model. The svgs of the views before this one are 
+    # marked as processed, so an svg shared between views gets Warning 29
+    # as it does when the whole fzp is checked.
+
+    logging.info (' Entering CheckView InFile %s View %s\n', Entry['infile'], View)
+
+    Errors = []
+
+    Warnings = []
+
+    Info = []
+
+    FilesProcessed = {}
+
+    for OtherView in Entry['model']['partmodel'].ViewNames:
+
+        if OtherView == View:
+
+            break
+
+        # End of if OtherView == View:
+
+        if OtherView != 'iconView' and OtherView in Entry['svgs']:
+
+            FilesProcessed['processed.' + Entry['svgs'][OtherView]] = 'y'
+
+        # End of if OtherView != 'iconView' and OtherView in Entry['svgs']:
+
+    # End of for OtherView in Entry['model']['partmodel'].ViewNames:
+
+    Fritzing.ProcessSvgFromFzp('N', Entry['fzptype'], Entry['fzptype'], Entry['infile'], None, Entry['prefixdir'], View, Errors, Warnings, Info, copy.deepcopy(Entry['model']), FilesProcessed, Debug)
+
+    Entry['views'][View] = [Errors, Warnings, Info]
+
+    logging.info (' Exiting CheckView\n')
+
+# End of def CheckView(Entry, View, Debug):
+
+def CheckSvg(InFile, PrefixDir, Debug):
+
+    # Check an svg that isn't referenced by a watched fzp on its own.
+
+    logging.info (' Entering CheckSvg InFile %s\n', InFile)
+
+    Errors, Warnings, Info, FzpDict, CurView, TagStack, State, InheritedAttributes = Fritzing.InitializeAll()
+
+    Fritzing.ProcessSvg(FzpTypeOf(InFile), 'SVG', InFile, None, CurView, PrefixDir, Errors, Warnings, Info, FzpDict, {}, TagStack, State, InheritedAttributes, Debug)
+
+    logging.info (' Exiting CheckSvg\n')
+
+    return {'infile': InFile, 'model': None, 'fzp': [Errors, Warnings, Info], 'views': {}, 'svgs': {}}
+
+# End of def CheckSvg(InFile, PrefixDir, Debug):
+
+def PrintEntry(Entry, Heading):
+
+    # Print (and report) the current messages of a file, the fzp's first
+    # then each view's, and return 'y' if there are (unsuppressed) errors.
+
+    Errors = list(Entry['fzp'][0])
+
+    Warnings = list(Entry['fzp'][1])
+
+    Info = list(Entry['fzp'][2])
+
+    for View in Entry['views']:
+
+        Errors.extend(Entry['views'][View][0])
+
+        Warnings.extend(Entry['views'][View][1])
+
+        Info.extend(Entry['views'][View][2])
+
+    # End of for View in Entry['views']:
+
+    print('\n**** {0:s} {1:s}'.format(time.strftime('%H:%M:%S'), Heading))
+
+    PP.PrintInfo(Info)
+
+    PP.PrintWarnings(Warnings)
+
+    PP.PrintErrors(Errors)
+
+    if len(Diag.Visible(Errors)) + len(Diag.Visible(Warnings)) == 0:
+
+        print('No errors or warnings\n')
+
+    # End of if len(Diag.Visible(Errors)) + len(Diag.Visible(Warnings)) == 0:
+
+    ModuleId = None
+
+    if Entry['model'] != None:
+
+        ModuleId = Fritzing.FzpModuleId(Entry['model'])
+
+    # End of if Entry['model'] != None:
+
+    Report.ReportFile(Entry['infile'], ModuleId, Errors, Warnings, Info)
+
+    sys.stdout.flush()
+
+    if len(Diag.Visible(Errors)) != 0:
+
+        return 'y'
+
+    # End of if len(Diag.Visible(Errors)) != 0:
+
+    return 'n'
+
+# End of def PrintEntry(Entry, Heading):
+
+def CheckFile(InFile, Heading, Entries, Users, Watcher, PrefixDir, Debug):
+
+    # Check a file (again) and print its messages, remembering which svgs
+    # its views use (and watching their directories).
+
+    Key = os.path.abspath(InFile)
+
+    if Key in Entries:
+
+        for View, SvgFile in Entries[Key]['svgs'].items():
+
+            Users[os.path.abspath(SvgFile)].discard((Key, View))
+
+        # End of for View, SvgFile in Entries[Key]['svgs'].items():
+
+    # End of if Key in Entries:
+
+    if not os.path.isfile(InFile):
+
+        Entries.pop(Key, None)
+
+        print('\n**** {0:s} {1:s} removed'.format(time.strftime('%H:%M:%S'), InFile))
+
+        return
+
+    # End of if not os.path.isfile(InFile):
+
+    if InFile.lower().endswith('.fzp'):
+
+        Entries[Key] = CheckFzp(InFile, PrefixDir, Debug)
+
+    else:
+
+        Entries[Key] = CheckSvg(InFile, PrefixDir, Debug)
+
+    # End of if InFile.lower().endswith('.fzp'):
+
+    for View, SvgFile in Entries[Key]['svgs'].items():
+
+        Users.setdefault(os.path.abspath(SvgFile), set()).add((Key, View))
+
+        Watcher.AddDir(os.path.dirname(os.path.abspath(SvgFile)))
+
+    # End of for View, SvgFile in Entries[Key]['svgs'].items():
+
+    PrintEntry(Entries[Key], Heading.format(InFile))
+
+# End of def CheckFile(InFile, Heading, Entries, Users, Watcher, PrefixDir, Debug):
+
+def Watch(Files, SrcDir, PrefixDir, Mode, Debug):
+
+    # Check Files (the single file given, when SrcDir is None, or every 
+    # file in SrcDir) and then keep checking what changes until interrupted
+    # with ctrl-c. Mode is 'y' or 'poll' (to poll even where inotify is 
+    # available). Returns 'y' if there were errors the last time the files
+    # were checked.
+
+    logging.info (' Entering Watch Files %s SrcDir %s PrefixDir %s\n', Files, SrcDir, PrefixDir)
+
+    # The entries (from CheckFzp or CheckSvg) indexed by absolute file name
+    # and the fzp entries and views that use each (absolute) svg file.
+
+    Entries = {}
+
+    Users = {}
+
+    Watcher = OpenWatcher(Mode)
+
+    # Check the fzps first so the svgs they use are known, then any svgs
+    # that no fzp uses.
+
+    Files = sorted(Files, key=lambda File: not File.lower().endswith('.fzp'))
+
+    for InFile in Files:
+
+        if InFile.lower().endswith('.fzp') or not os.path.abspath(InFile) in Users:
+
+            CheckFile(InFile, 'Checked {0:s}', Entries, Users, Watcher, PrefixDir, Debug)
+
+        # End of if InFile.lower().endswith('.fzp') or not os.path.abspath(InFile) in Users:
+
+    # End of for InFile in Files:
+
+    for InFile in Files:
+
+        Watcher.AddDir(os.path.dirname(os.path.abspath(InFile)))
+
+    # End of for InFile in Files:
+
+    print('\n**** Watching {0:d} files using {1:s}, ctrl-c to stop'.format(len(Entries) + len(Users), 'inotify' if type(Watcher) == InotifyWatcher else 'polling'))
+
+    sys.stdout.flush()
+
+    try:
+
+        while True:
+
+            Changed = Watcher.Wait()
+
+            logging.debug (' Watch: Changed %s\n', Changed)
+
+            # The files to check in full and the views to check again.
+
+            Files = set()
+
+            Views = {}
+
+            for File in Changed:
+
+                Fritzing.DirIndexUpdate(File)
+
+                if File in Entries or (SrcDir != None and os.path.dirname(File) == os.path.abspath(SrcDir) and File.lower().endswith(('.fzp', '.svg')) and not File in Users):
+
+                    # A watched fzp or unused svg, or a new file in the src
+                    # directory (in dir mode).
+
+                    Files.add(File)
+
+                # End of if File in Entries or (SrcDir != None and ...
+
+                for Key, View in Users.get(File, ()):
+
+                    Views.setdefault(Key, set()).add(View)
+
+                # End of for Key, View in Users.get(File, ()):
+
+            # End of for File in Changed:
+
+            for File in sorted(Files):
+
+                if File in Entries:
+
+                    CheckFile(Entries[File]['infile'], 'Changed, checked {0:s}', Entries, Users, Watcher, PrefixDir, Debug)
+
+                elif os.path.isfile(File):
+
+                    CheckFile(os.path.relpath(File), 'New, checked {0:s}', Entries, Users, Watcher, PrefixDir, Debug)
+
+                # End of if File in Entries:
+
+            # End of for File in sorted(Files):
+
+            for Key in sorted(Views):
+
+                if Key in Files or not Key in Entries:
+
+                    # Already checked in full.
+
+                    continue
+
+                # End of if Key in Files or not Key in Entries:
+
+                Entry = Entries[Key]
+
+                for View in sorted(Views[Key]):
+
+                    CheckView(Entry, View, Debug)
+
+                # End of for View in sorted(Views[Key]):
+
+                PrintEntry(Entry, '{0:s} changed, checked {1:s} of {2:s}'.format(', '.join(sorted(set(os.path.normpath(Entry['svgs'][View]) for View in Views[Key]))), ', '.join(sorted(Views[Key])), Entry['infile']))
+
+            # End of for Key in sorted(Views):
+
+        # End of while True:
+
+    except KeyboardInterrupt:
+
+        pass
+
+    finally:
+
+        Watcher.Close()
+
+    # End of try:
+
+    ErrorsSeen = 'n'
+
+    for Entry in Entries.values():
+
+        Errors = list(Entry['fzp'][0])
+
+        for View in Entry['views']:
+
+            Errors.extend(Entry['views'][View][0])
+
+        # End of for View in Entry['views']:
+
+        if len(Diag.Visible(Errors)) != 0:
+
+            ErrorsSeen = 'y'
+
+        # End of if len(Diag.Visible(Errors)) != 0:
+
+    # End of for Entry in Entries.values():
+
+    logging.info (' Exiting Watch\n')
+
+    return ErrorsSeen
+
+# End of def Watch(Files, SrcDir, PrefixDir, Mode, Debug):
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+# Round trip tests of FritzingCheckClient.py through FritzingCheckDaemon.py:
+# a --stdin request for an fzp (as from a parts editor checking on save)
+# must give the same output and exit code as FritzingCheckPart.py run on
+# the file itself, finding the fzp's svgs beside the real file.
+
+import os, sys, json, time, shutil, socket, tempfile, subprocess, unittest
+
+Dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def Run(Script, Args, Cwd, Stdin=None):
+
+    # Run one of the scripts with Args in Cwd, returning the exit code and
+    # the output.
+
+    with open(Stdin, 'rb') if Stdin != None else open(os.devnull, 'rb') as f:
+
+        Result = subprocess.run([sys.executable, os.path.join(Dir, Script)] + Args, cwd=Cwd, stdin=f, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    # End of with open(Stdin, 'rb') if Stdin != None else open(os.devnull, 'rb') as f:
+
+    return Result.returncode, Result.stdout.decode('utf-8')
+
+# End of def Run(Script, Args, Cwd, Stdin=None):
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'the daemon needs Unix domain sockets')
+class TestStdinRoundTrip(unittest.TestCase):
+
+    def setUp(self):
+
+        # A generated part in both layouts and a daemon on its own socket.
+
+        self.Tmp = tempfile.mkdtemp(prefix='FritzingCheckTest')
+
+        self.Parts = os.path.join(self.Tmp, 'parts')
+
+        Code, Output = Run('GeneratePart.py', ['--connectors=40', '--layout=both', self.Parts], self.Tmp)
+
+        self.assertEqual(Code, 0, Output)
+
+        self.Socket = '--socket=' + os.path.join(self.Tmp, 'daemon.sock')
+
+        self.Daemon = subprocess.Popen([sys.executable, os.path.join(Dir, 'FritzingCheckDaemon.py'), self.Socket], cwd=self.Tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        for Try in range(100):
+
+            if os.path.exists(self.Socket[len('--socket='):]):
+
+                break
+
+            # End of if os.path.exists(self.Socket[len('--socket='):]):
+
+            time.sleep(0.1)
+
+        # End of for Try in range(100):
+
+    # End of def setUp(self):
+
+    def tearDown(self):
+
+        self.Daemon.terminate()
+
+        self.Daemon.wait()
+
+        shutil.rmtree(self.Tmp, ignore_errors=True)
+
+    # End of def tearDown(self):
+
+    def CheckSame(self, Name):
+
+        # The client with the fzp on stdin must match checking the file.
+
+        Expected = Run('FritzingCheckPart.py', ['--check', Name], self.Parts)
+
+        Got = Run('FritzingCheckClient.py', [self.Socket, '--check', '--stdin=' + Name], self.Parts, os.path.join(self.Parts, Name))
+
+        self.assertEqual(Got, Expected)
+
+        Code, Output = Run('FritzingCheckClient.py', [self.Socket, '--json', '--check', '--stdin=' + Name], self.Parts, os.path.join(self.Parts, Name))
+
+        Reply = json.loads(Output)
+
+        self.assertEqual(Reply['exit'], 0)
+
+        self.assertEqual([Message for Message in Reply['messages'] if Message['severity'] == 'Error'], [])
+
+    # End of def CheckSame(self, Name):
+
+    def test_core_fzp(self):
+
+        self.CheckSame(os.path.join('core', 'bench_core_40_0.fzp'))
+
+    # End of def test_core_fzp(self):
+
+    def test_part_fzp(self):
+
+        self.CheckSame(os.path.join('parts', 'part.bench_part_40_0.fzp'))
+
+    # End of def test_part_fzp(self):
+
+    def test_fix_leaves_real_files(self):
+
+        # Fixing (without --check) returns the fixed fzp and doesn't touch
+        # the real fzp or svgs.
+
+        Before = {}
+
+        for Root, Dirs, Files in os.walk(self.Parts):
+
+            for File in Files:
+
+                with open(os.path.join(Root, File), 'rb') as f:
+
+                    Before[os.path.join(Root, File)] = f.read()
+
+                # End of with open(os.path.join(Root, File), 'rb') as f:
+
+            # End of for File in Files:
+
+        # End of for Root, Dirs, Files in os.walk(self.Parts):
+
+        Name = os.path.join('core', 'bench_core_40_0.fzp')
+
+        Output = os.path.join(self.Tmp, 'fixed.fzp')
+
+        Code, Text = Run('FritzingCheckClient.py', [self.Socket, '--stdin=' + Name, '--output=' + Output], self.Parts, os.path.join(self.Parts, Name))
+
+        self.assertEqual(Code, 0, Text)
+
+        self.assertTrue(os.path.isfile(Output))
+
+        After = {}
+
+        for Root, Dirs, Files in os.walk(self.Parts):
+
+            for File in Files:
+
+                with open(os.path.join(Root, File), 'rb') as f:
+
+                    After[os.path.join(Root, File)] = f.read()
+
+                # End of with open(os.path.join(Root, File), 'rb') as f:
+
+            # End of for File in Files:
+
+        # End of for Root, Dirs, Files in os.walk(self.Parts):
+
+        self.assertEqual(After, Before)
+
+    # End of def test_fix_leaves_real_files(self):
+
+# End of class TestStdinRoundTrip(unittest.TestCase):
+
+if __name__ == '__main__':
+
+    unittest.main()
+
+# End of if __name__ == '__main__':